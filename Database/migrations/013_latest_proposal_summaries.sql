@@ -0,0 +1,53 @@
+-- ========================================
+-- MIGRATION 013: Latest proposal per RFX (slim projection)
+-- ========================================
+-- Objetivo:
+-- - Resolver la última propuesta por RFX en el servidor (DISTINCT ON)
+-- - Retornar solo estado y metadata comercial, sin HTML ni revisiones históricas
+-- - El payload deja de crecer con el historial de revisiones
+
+CREATE INDEX IF NOT EXISTS idx_generated_documents_proposal_rfx_created
+    ON public.generated_documents (rfx_id, created_at DESC)
+    WHERE document_type = 'proposal';
+
+CREATE OR REPLACE FUNCTION public.get_latest_proposal_summaries(p_rfx_ids UUID[])
+RETURNS TABLE (
+    id UUID,
+    rfx_id UUID,
+    proposal_code TEXT,
+    proposal_revision INTEGER,
+    metadata JSONB,
+    public_token TEXT,
+    public_visibility TEXT,
+    public_view_count INTEGER,
+    public_last_viewed_at TIMESTAMPTZ,
+    total_cost NUMERIC,
+    created_at TIMESTAMPTZ
+) AS $$
+    SELECT DISTINCT ON (gd.rfx_id)
+        gd.id,
+        gd.rfx_id,
+        gd.proposal_code,
+        gd.proposal_revision,
+        jsonb_strip_nulls(jsonb_build_object(
+            'proposal_code', gd.metadata -> 'proposal_code',
+            'commercial_status', gd.metadata -> 'commercial_status',
+            'status', gd.metadata -> 'status',
+            'sent_at', gd.metadata -> 'sent_at',
+            'accepted_at', gd.metadata -> 'accepted_at',
+            'status_updated_at', gd.metadata -> 'status_updated_at'
+        )) AS metadata,
+        gd.public_token,
+        gd.public_visibility,
+        gd.public_view_count,
+        gd.public_last_viewed_at,
+        gd.total_cost,
+        gd.created_at
+    FROM public.generated_documents gd
+    WHERE gd.rfx_id = ANY(p_rfx_ids)
+      AND gd.document_type = 'proposal'
+    ORDER BY gd.rfx_id, gd.created_at DESC;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION public.get_latest_proposal_summaries(UUID[]) IS
+'Última propuesta por rfx_id con proyección ligera (estado, códigos, tracking público). Sin contenido HTML.';
@@ -0,0 +1,52 @@
+-- ========================================
+-- MIGRATION 014: Buffered public proposal view tracking
+-- ========================================
+-- Objetivo:
+-- - Aplicar en batch los contadores de vistas públicas acumulados en memoria
+-- - Incrementos atómicos (public_view_count + n) en lugar de read-increment-write
+-- - Pasar a 'viewed' solo los RFX que siguen en 'draft' o 'sent'
+
+CREATE OR REPLACE FUNCTION public.increment_proposal_public_views(p_views JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS tmp_public_view_increments (
+        proposal_id UUID PRIMARY KEY,
+        views INTEGER NOT NULL,
+        last_viewed_at TIMESTAMPTZ NOT NULL
+    ) ON COMMIT DROP;
+
+    INSERT INTO tmp_public_view_increments (proposal_id, views, last_viewed_at)
+    SELECT
+        (item ->> 'proposal_id')::UUID,
+        GREATEST(COALESCE((item ->> 'views')::INTEGER, 0), 0),
+        COALESCE((item ->> 'last_viewed_at')::TIMESTAMPTZ, NOW())
+    FROM jsonb_array_elements(COALESCE(p_views, '[]'::jsonb)) AS item
+    ON CONFLICT (proposal_id) DO UPDATE SET
+        views = tmp_public_view_increments.views + EXCLUDED.views,
+        last_viewed_at = GREATEST(tmp_public_view_increments.last_viewed_at, EXCLUDED.last_viewed_at);
+
+    UPDATE public.generated_documents gd
+    SET
+        public_view_count = COALESCE(gd.public_view_count, 0) + inc.views,
+        public_last_viewed_at = GREATEST(COALESCE(gd.public_last_viewed_at, inc.last_viewed_at), inc.last_viewed_at)
+    FROM tmp_public_view_increments inc
+    WHERE gd.id = inc.proposal_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    UPDATE public.rfx_v2 r
+    SET sales_stage = 'viewed'
+    FROM public.generated_documents gd
+    JOIN tmp_public_view_increments inc ON inc.proposal_id = gd.id
+    WHERE r.id = gd.rfx_id
+      AND COALESCE(r.sales_stage, 'draft') IN ('draft', 'sent');
+
+    DROP TABLE IF EXISTS tmp_public_view_increments;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION public.increment_proposal_public_views(JSONB) IS
+'Aplica en batch vistas públicas acumuladas: [{proposal_id, views, last_viewed_at}]. Incremento atómico y sales_stage draft/sent -> viewed.';
@@ -0,0 +1,122 @@
+-- ========================================
+-- MIGRATION 015: Indexed RFX search (título, código, solicitante, empresa, propuesta)
+-- ========================================
+-- Objetivo:
+-- - Reemplazar la cascada UUID → requester exacto → ilike '%x%' → empresa por un solo RPC
+-- - Índices trigram (pg_trgm) para que ILIKE '%x%' y similitud usen índice
+-- - Ranking en servidor, scope por organización/usuario y paginación
+-- - Proyección ligera: sin companies(*) / requesters(*) / contenido de propuestas
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_rfx_v2_title_trgm
+    ON public.rfx_v2 USING gin (lower(title) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_rfx_v2_rfx_code_trgm
+    ON public.rfx_v2 USING gin (lower(rfx_code) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_requesters_name_trgm
+    ON public.requesters USING gin (lower(name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_companies_name_trgm
+    ON public.companies USING gin (lower(name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_generated_documents_proposal_code_trgm
+    ON public.generated_documents USING gin (lower(proposal_code) gin_trgm_ops)
+    WHERE document_type = 'proposal';
+
+CREATE OR REPLACE FUNCTION public.search_rfx(
+    p_query TEXT,
+    p_organization_id UUID DEFAULT NULL,
+    p_user_id UUID DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    rfx_code TEXT,
+    status TEXT,
+    sales_stage TEXT,
+    organization_id UUID,
+    user_id UUID,
+    company_name TEXT,
+    requester_name TEXT,
+    proposal_code TEXT,
+    created_at TIMESTAMPTZ,
+    rank REAL,
+    total_count BIGINT
+) AS $$
+    WITH term AS (
+        SELECT
+            lower(btrim(p_query)) AS q,
+            '%' || replace(replace(replace(lower(btrim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    ),
+    -- Cada rama usa su propio índice trigram; UNION deduplica los RFX candidatos.
+    -- El scope org/usuario va en cada rama (y no después, en `scored`) para que los
+    -- índices por organización/usuario acoten los candidatos antes del UNION y
+    -- ningún término recorra RFX de otros tenants.
+    candidates AS (
+        SELECT r.id FROM public.rfx_v2 r, term t
+        WHERE (lower(r.title) LIKE t.pattern OR lower(r.title) % t.q OR lower(r.rfx_code) LIKE t.pattern)
+          AND (p_organization_id IS NULL OR r.organization_id = p_organization_id)
+          AND (p_organization_id IS NOT NULL OR p_user_id IS NULL OR (r.user_id = p_user_id AND r.organization_id IS NULL))
+        UNION
+        SELECT r.id FROM public.rfx_v2 r JOIN public.requesters rq ON rq.id = r.requester_id, term t
+        WHERE (lower(rq.name) LIKE t.pattern OR lower(rq.name) % t.q)
+          AND (p_organization_id IS NULL OR r.organization_id = p_organization_id)
+          AND (p_organization_id IS NOT NULL OR p_user_id IS NULL OR (r.user_id = p_user_id AND r.organization_id IS NULL))
+        UNION
+        SELECT r.id FROM public.rfx_v2 r JOIN public.companies c ON c.id = r.company_id, term t
+        WHERE (lower(c.name) LIKE t.pattern OR lower(c.name) % t.q)
+          AND (p_organization_id IS NULL OR r.organization_id = p_organization_id)
+          AND (p_organization_id IS NOT NULL OR p_user_id IS NULL OR (r.user_id = p_user_id AND r.organization_id IS NULL))
+        UNION
+        SELECT r.id FROM public.generated_documents gd JOIN public.rfx_v2 r ON r.id = gd.rfx_id, term t
+        WHERE gd.document_type = 'proposal' AND lower(gd.proposal_code) LIKE t.pattern
+          AND (p_organization_id IS NULL OR r.organization_id = p_organization_id)
+          AND (p_organization_id IS NOT NULL OR p_user_id IS NULL OR (r.user_id = p_user_id AND r.organization_id IS NULL))
+    ),
+    scored AS (
+        SELECT
+            r.id,
+            r.title,
+            r.rfx_code,
+            r.status::TEXT AS status,
+            r.sales_stage::TEXT AS sales_stage,
+            r.organization_id,
+            r.user_id,
+            c.name AS company_name,
+            rq.name AS requester_name,
+            pc.proposal_code,
+            r.created_at,
+            GREATEST(
+                CASE WHEN lower(r.rfx_code) = t.q OR lower(pc.proposal_code) = t.q THEN 3.0 ELSE 0 END,
+                CASE WHEN lower(rq.name) = t.q OR lower(c.name) = t.q THEN 2.0 ELSE 0 END,
+                CASE WHEN lower(r.rfx_code) LIKE t.pattern OR lower(pc.proposal_code) LIKE t.pattern THEN 1.5 ELSE 0 END,
+                word_similarity(t.q, lower(coalesce(r.title, ''))),
+                similarity(t.q, lower(coalesce(rq.name, ''))),
+                similarity(t.q, lower(coalesce(c.name, '')))
+            )::REAL AS rank
+        FROM candidates cand
+        JOIN public.rfx_v2 r ON r.id = cand.id
+        LEFT JOIN public.requesters rq ON rq.id = r.requester_id
+        LEFT JOIN public.companies c ON c.id = r.company_id
+        LEFT JOIN LATERAL (
+            SELECT gd.proposal_code
+            FROM public.generated_documents gd
+            WHERE gd.rfx_id = r.id AND gd.document_type = 'proposal'
+            ORDER BY gd.created_at DESC
+            LIMIT 1
+        ) pc ON TRUE
+        CROSS JOIN term t
+    )
+    SELECT s.*, COUNT(*) OVER () AS total_count
+    FROM scored s
+    ORDER BY s.rank DESC, s.created_at DESC
+    LIMIT GREATEST(LEAST(COALESCE(p_limit, 20), 100), 1)
+    OFFSET GREATEST(COALESCE(p_offset, 0), 0);
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION public.search_rfx(TEXT, UUID, UUID, INTEGER, INTEGER) IS
+'Búsqueda rankeada de RFX por título, rfx_code, solicitante, empresa y proposal_code (pg_trgm). Scope org/usuario, paginada, proyección ligera con total_count.';
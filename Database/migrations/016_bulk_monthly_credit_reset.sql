@@ -0,0 +1,92 @@
+-- ========================================
+-- MIGRATION 016: Set-based monthly credit reset
+-- ========================================
+-- Objetivo:
+-- - Resetear en una sola sentencia (por tabla) todas las organizaciones y
+--   usuarios personales cuyo credits_reset_date ya venció
+-- - Registrar las transacciones 'monthly_reset' en el mismo INSERT ... SELECT
+-- - Idempotente por run_id: re-ejecutar el mismo run no duplica transacciones
+--   y las filas ya reseteadas dejan de cumplir credits_reset_date <= p_now
+
+-- Una sola transacción 'monthly_reset' por organización y run
+CREATE UNIQUE INDEX IF NOT EXISTS idx_credit_transactions_monthly_reset_run
+    ON public.credit_transactions (organization_id, (metadata ->> 'reset_run_id'))
+    WHERE type = 'monthly_reset' AND metadata ? 'reset_run_id';
+
+CREATE INDEX IF NOT EXISTS idx_organizations_credits_reset_date
+    ON public.organizations (credits_reset_date);
+
+CREATE INDEX IF NOT EXISTS idx_user_credits_credits_reset_date
+    ON public.user_credits (credits_reset_date);
+
+-- p_plan_credits: {"free": 100, "starter": 250, ...} (fuente: backend/core/plans.py)
+CREATE OR REPLACE FUNCTION public.reset_monthly_credits_bulk(
+    p_run_id TEXT,
+    p_now TIMESTAMPTZ,
+    p_next_reset TIMESTAMPTZ,
+    p_plan_credits JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_org_counts JSONB;
+    v_user_counts JSONB;
+    v_transactions INTEGER;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS tmp_reset_organizations (
+        id UUID PRIMARY KEY,
+        plan_tier TEXT NOT NULL,
+        credits_total INTEGER NOT NULL
+    ) ON COMMIT DROP;
+
+    WITH reset_orgs AS (
+        UPDATE public.organizations o
+        SET
+            credits_used = 0,
+            credits_total = (p_plan_credits ->> COALESCE(o.plan_tier, 'free'))::INTEGER,
+            credits_reset_date = p_next_reset
+        WHERE o.credits_reset_date <= p_now
+          AND p_plan_credits ? COALESCE(o.plan_tier, 'free')
+        RETURNING o.id, COALESCE(o.plan_tier, 'free') AS plan_tier, o.credits_total
+    )
+    INSERT INTO tmp_reset_organizations (id, plan_tier, credits_total)
+    SELECT id, plan_tier, credits_total FROM reset_orgs;
+
+    INSERT INTO public.credit_transactions (organization_id, amount, type, description, metadata)
+    SELECT
+        r.id,
+        r.credits_total,
+        'monthly_reset',
+        'Monthly credits reset for ' || r.plan_tier || ' plan',
+        jsonb_build_object('reset_run_id', p_run_id, 'plan_tier', r.plan_tier)
+    FROM tmp_reset_organizations r
+    ON CONFLICT DO NOTHING;
+
+    GET DIAGNOSTICS v_transactions = ROW_COUNT;
+
+    SELECT COALESCE(jsonb_object_agg(plan_tier, n), '{}'::jsonb)
+    INTO v_org_counts
+    FROM (SELECT plan_tier, COUNT(*) AS n FROM tmp_reset_organizations GROUP BY plan_tier) t;
+
+    WITH reset_users AS (
+        UPDATE public.user_credits uc
+        SET
+            credits_used = 0,
+            credits_total = (p_plan_credits ->> COALESCE(uc.plan_tier, 'free'))::INTEGER,
+            credits_reset_date = p_next_reset
+        WHERE uc.credits_reset_date <= p_now
+          AND p_plan_credits ? COALESCE(uc.plan_tier, 'free')
+        RETURNING COALESCE(uc.plan_tier, 'free') AS plan_tier
+    )
+    SELECT COALESCE(jsonb_object_agg(plan_tier, n), '{}'::jsonb)
+    INTO v_user_counts
+    FROM (SELECT plan_tier, COUNT(*) AS n FROM reset_users GROUP BY plan_tier) t;
+
+    DROP TABLE IF EXISTS tmp_reset_organizations;
+
+    RETURN jsonb_build_object(
+        'org_reset_by_tier', v_org_counts,
+        'user_reset_by_tier', v_user_counts,
+        'transactions_recorded', v_transactions
+    );
+END;
+$$ LANGUAGE plpgsql;
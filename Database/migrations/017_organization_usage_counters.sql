@@ -0,0 +1,147 @@
+-- ========================================
+-- MIGRATION 017: Organization usage counters
+-- ========================================
+-- Objetivo:
+-- - Mantener contadores por organización (miembros y RFX del mes) en lugar de
+--   correr count(exact) sobre users / rfx_v2 en cada verificación de límites
+-- - Triggers actualizan los contadores al crear/borrar RFX y al cambiar miembros
+-- - reconcile_organization_usage_counters() corrige la deriva (cron o admin)
+
+CREATE TABLE IF NOT EXISTS public.organization_usage_counters (
+    organization_id UUID PRIMARY KEY REFERENCES public.organizations(id) ON DELETE CASCADE,
+    members_count INTEGER NOT NULL DEFAULT 0,
+    rfx_period DATE NOT NULL DEFAULT date_trunc('month', NOW())::DATE,
+    rfx_count INTEGER NOT NULL DEFAULT 0,
+    reconciled_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rfx_v2_organization_created_at
+    ON public.rfx_v2 (organization_id, created_at);
+
+-- ── Miembros ────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION public.bump_organization_members(p_organization_id UUID, p_delta INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_organization_id IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO public.organization_usage_counters AS c (organization_id, members_count)
+    VALUES (p_organization_id, GREATEST(p_delta, 0))
+    ON CONFLICT (organization_id) DO UPDATE SET
+        members_count = GREATEST(c.members_count + p_delta, 0),
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.track_organization_members()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.bump_organization_members(NEW.organization_id, 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM public.bump_organization_members(OLD.organization_id, -1);
+    ELSIF OLD.organization_id IS DISTINCT FROM NEW.organization_id THEN
+        PERFORM public.bump_organization_members(OLD.organization_id, -1);
+        PERFORM public.bump_organization_members(NEW.organization_id, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_organization_usage ON public.users;
+CREATE TRIGGER trg_users_organization_usage
+    AFTER INSERT OR DELETE OR UPDATE OF organization_id ON public.users
+    FOR EACH ROW EXECUTE FUNCTION public.track_organization_members();
+
+-- ── RFX del mes ─────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION public.track_organization_rfx()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_period DATE;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.organization_id IS NULL THEN
+            RETURN NULL;
+        END IF;
+        v_period := date_trunc('month', COALESCE(NEW.created_at, NOW()))::DATE;
+
+        INSERT INTO public.organization_usage_counters AS c (organization_id, rfx_period, rfx_count)
+        VALUES (NEW.organization_id, v_period, 1)
+        ON CONFLICT (organization_id) DO UPDATE SET
+            rfx_count = CASE
+                WHEN c.rfx_period = EXCLUDED.rfx_period THEN c.rfx_count + 1
+                WHEN c.rfx_period < EXCLUDED.rfx_period THEN 1
+                ELSE c.rfx_count
+            END,
+            rfx_period = GREATEST(c.rfx_period, EXCLUDED.rfx_period),
+            updated_at = NOW();
+    ELSE
+        IF OLD.organization_id IS NULL THEN
+            RETURN NULL;
+        END IF;
+        v_period := date_trunc('month', COALESCE(OLD.created_at, NOW()))::DATE;
+
+        UPDATE public.organization_usage_counters
+        SET rfx_count = GREATEST(rfx_count - 1, 0), updated_at = NOW()
+        WHERE organization_id = OLD.organization_id
+          AND rfx_period = v_period;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rfx_v2_organization_usage ON public.rfx_v2;
+CREATE TRIGGER trg_rfx_v2_organization_usage
+    AFTER INSERT OR DELETE ON public.rfx_v2
+    FOR EACH ROW EXECUTE FUNCTION public.track_organization_rfx();
+
+-- ── Reconciliación ──────────────────────────────────────────────────────────
+-- Recalcula desde users / rfx_v2 y corrige solo las filas con deriva.
+-- Retorna cuántas organizaciones se corrigieron.
+CREATE OR REPLACE FUNCTION public.reconcile_organization_usage_counters(p_organization_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_period DATE := date_trunc('month', NOW())::DATE;
+    v_fixed INTEGER;
+BEGIN
+    WITH actual AS (
+        SELECT
+            o.id AS organization_id,
+            (SELECT COUNT(*) FROM public.users u WHERE u.organization_id = o.id)::INTEGER AS members_count,
+            (SELECT COUNT(*) FROM public.rfx_v2 r
+              WHERE r.organization_id = o.id AND r.created_at >= v_period)::INTEGER AS rfx_count
+        FROM public.organizations o
+        WHERE p_organization_id IS NULL OR o.id = p_organization_id
+    ),
+    drift AS (
+        SELECT a.*
+        FROM actual a
+        LEFT JOIN public.organization_usage_counters c ON c.organization_id = a.organization_id
+        WHERE c.organization_id IS NULL
+           OR c.members_count <> a.members_count
+           OR c.rfx_period <> v_period
+           OR c.rfx_count <> a.rfx_count
+    ),
+    fixed AS (
+        INSERT INTO public.organization_usage_counters AS c
+            (organization_id, members_count, rfx_period, rfx_count, reconciled_at, updated_at)
+        SELECT organization_id, members_count, v_period, rfx_count, NOW(), NOW()
+        FROM drift
+        ON CONFLICT (organization_id) DO UPDATE SET
+            members_count = EXCLUDED.members_count,
+            rfx_period = EXCLUDED.rfx_period,
+            rfx_count = EXCLUDED.rfx_count,
+            reconciled_at = NOW(),
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO v_fixed FROM fixed;
+
+    RETURN v_fixed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill inicial
+SELECT public.reconcile_organization_usage_counters();
@@ -0,0 +1,129 @@
+-- ========================================
+-- MIGRATION 018: Single-transaction RFX persistence
+-- ========================================
+-- Objetivo:
+-- - Guardar company + requester + RFX + productos + historial en UNA llamada
+--   (antes: insert_company, insert_requester, insert_rfx, insert_rfx_products
+--   e insert_rfx_history como round-trips separados)
+-- - Un fallo a mitad de camino ya no deja companies/requesters huérfanos
+-- - Idempotente por p_rfx->>'id': si el RFX ya existe retorna lo guardado sin
+--   escribir, así que reintentar tras un timeout es seguro
+--
+-- Misma semántica de upsert que DatabaseClient.insert_company / insert_requester:
+-- company por email (si viene) o por nombre; requester por email.
+
+CREATE OR REPLACE FUNCTION public.save_rfx_graph(
+    p_company JSONB,
+    p_requester JSONB,
+    p_rfx JSONB,
+    p_products JSONB DEFAULT '[]'::jsonb,
+    p_history JSONB DEFAULT '[]'::jsonb
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_rfx_id UUID := (p_rfx ->> 'id')::UUID;
+    v_company_id UUID;
+    v_requester_id UUID;
+    v_existing public.rfx_v2%ROWTYPE;
+    v_product_count INTEGER := 0;
+BEGIN
+    -- Serializa reintentos concurrentes del mismo RFX
+    PERFORM pg_advisory_xact_lock(hashtext('save_rfx_graph:' || v_rfx_id::TEXT));
+
+    SELECT * INTO v_existing FROM public.rfx_v2 WHERE id = v_rfx_id;
+    IF FOUND THEN
+        RETURN jsonb_build_object(
+            'rfx_id', v_existing.id,
+            'rfx_code', v_existing.rfx_code,
+            'company_id', v_existing.company_id,
+            'requester_id', v_existing.requester_id,
+            'product_count', (SELECT COUNT(*) FROM public.rfx_products WHERE rfx_id = v_rfx_id),
+            'replayed', TRUE
+        );
+    END IF;
+
+    -- 1. Company (por email, luego por nombre)
+    IF NULLIF(p_company ->> 'email', '') IS NOT NULL THEN
+        SELECT id INTO v_company_id FROM public.companies
+        WHERE email = p_company ->> 'email' LIMIT 1;
+    END IF;
+    IF v_company_id IS NULL THEN
+        SELECT id INTO v_company_id FROM public.companies
+        WHERE name = p_company ->> 'name' LIMIT 1;
+    END IF;
+
+    IF v_company_id IS NOT NULL THEN
+        UPDATE public.companies
+        SET name = p_company ->> 'name', email = p_company ->> 'email', phone = p_company ->> 'phone'
+        WHERE id = v_company_id;
+    ELSE
+        INSERT INTO public.companies (id, name, email, phone)
+        VALUES (gen_random_uuid(), p_company ->> 'name', p_company ->> 'email', p_company ->> 'phone')
+        RETURNING id INTO v_company_id;
+    END IF;
+
+    -- 2. Requester (por email)
+    IF NULLIF(p_requester ->> 'email', '') IS NOT NULL THEN
+        SELECT id INTO v_requester_id FROM public.requesters
+        WHERE email = p_requester ->> 'email' LIMIT 1;
+    END IF;
+
+    IF v_requester_id IS NOT NULL THEN
+        UPDATE public.requesters
+        SET company_id = v_company_id,
+            name = p_requester ->> 'name',
+            email = p_requester ->> 'email',
+            phone = p_requester ->> 'phone',
+            position = p_requester ->> 'position'
+        WHERE id = v_requester_id;
+    ELSE
+        INSERT INTO public.requesters (id, company_id, name, email, phone, position)
+        VALUES (
+            gen_random_uuid(), v_company_id, p_requester ->> 'name', p_requester ->> 'email',
+            p_requester ->> 'phone', p_requester ->> 'position'
+        )
+        RETURNING id INTO v_requester_id;
+    END IF;
+
+    -- 3. RFX
+    INSERT INTO public.rfx_v2 (
+        id, company_id, requester_id, rfx_type, title, location, delivery_date, delivery_time,
+        status, original_pdf_text, requested_products, metadata_json, currency,
+        requirements, requirements_confidence, business_unit_id, industry_context,
+        rfx_code, user_id, organization_id
+    )
+    SELECT
+        v_rfx_id, v_company_id, v_requester_id, r.rfx_type, r.title, r.location, r.delivery_date, r.delivery_time,
+        r.status, r.original_pdf_text, COALESCE(r.requested_products, '[]'::jsonb), r.metadata_json,
+        COALESCE(r.currency, 'USD'), r.requirements, r.requirements_confidence, r.business_unit_id,
+        r.industry_context, r.rfx_code, r.user_id, r.organization_id
+    FROM jsonb_populate_record(NULL::public.rfx_v2, p_rfx) AS r;
+
+    -- 4. Productos (filas ya normalizadas por build_rfx_product_rows)
+    INSERT INTO public.rfx_products (
+        id, rfx_id, product_name, quantity, unit, estimated_unit_price, unit_cost,
+        description, specifications, notes
+    )
+    SELECT
+        COALESCE(p.id, gen_random_uuid()), v_rfx_id, p.product_name, p.quantity, p.unit,
+        p.estimated_unit_price, p.unit_cost, p.description, COALESCE(p.specifications, '{}'::jsonb), p.notes
+    FROM jsonb_populate_recordset(NULL::public.rfx_products, COALESCE(p_products, '[]'::jsonb)) AS p;
+
+    GET DIAGNOSTICS v_product_count = ROW_COUNT;
+
+    -- 5. Historial inicial
+    INSERT INTO public.rfx_history (id, rfx_id, event_type, description, new_values, performed_by)
+    SELECT
+        COALESCE(h.id, gen_random_uuid()), v_rfx_id, h.event_type, h.description, h.new_values, h.performed_by
+    FROM jsonb_populate_recordset(NULL::public.rfx_history, COALESCE(p_history, '[]'::jsonb)) AS h;
+
+    RETURN jsonb_build_object(
+        'rfx_id', v_rfx_id,
+        'rfx_code', p_rfx ->> 'rfx_code',
+        'company_id', v_company_id,
+        'requester_id', v_requester_id,
+        'product_count', v_product_count,
+        'replayed', FALSE
+    );
+END;
+$$ LANGUAGE plpgsql;
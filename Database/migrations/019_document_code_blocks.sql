@@ -0,0 +1,50 @@
+-- ========================================
+-- MIGRATION 019: Block-allocated document code sequences (hi/lo)
+-- ========================================
+-- Objetivo:
+-- - Reservar rangos de N secuencias por (code_type, domain_prefix, year) en una
+--   sola operación atómica; cada proceso reparte el rango localmente
+--   (DocumentCodeBlockAllocator, DOCUMENT_CODE_BLOCK_SIZE)
+-- - Menos round-trips y menos contención sobre la fila de document_code_sequences
+--   en imports masivos y procesamiento batch
+--
+-- Tolerancia a huecos: los valores reservados que un proceso no llega a usar
+-- (reinicio, deploy) se pierden. Los códigos siguen siendo únicos pero no
+-- consecutivos ni estrictamente cronológicos entre procesos.
+
+CREATE OR REPLACE FUNCTION public.reserve_document_code_block(
+    p_code_type TEXT,
+    p_domain_prefix TEXT,
+    p_year INTEGER,
+    p_block_size INTEGER
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_hi INTEGER;
+BEGIN
+    IF p_code_type NOT IN ('rfx', 'proposal') THEN
+        RAISE EXCEPTION 'Invalid code type: %', p_code_type;
+    END IF;
+
+    IF p_domain_prefix IS NULL OR length(trim(p_domain_prefix)) = 0 THEN
+        RAISE EXCEPTION 'Domain prefix cannot be empty';
+    END IF;
+
+    IF p_block_size IS NULL OR p_block_size < 1 OR p_block_size > 1000 THEN
+        RAISE EXCEPTION 'Invalid block size: %', p_block_size;
+    END IF;
+
+    INSERT INTO document_code_sequences (code_type, domain_prefix, year, last_value)
+    VALUES (lower(trim(p_code_type)), upper(trim(p_domain_prefix)), p_year, p_block_size)
+    ON CONFLICT (code_type, domain_prefix, year)
+    DO UPDATE SET
+        last_value = document_code_sequences.last_value + p_block_size,
+        updated_at = NOW()
+    RETURNING last_value INTO v_hi;
+
+    -- Rango reservado: (v_hi - p_block_size + 1) .. v_hi
+    RETURN v_hi;
+END;
+$$;
@@ -71,6 +71,7 @@ def generate_apu():
         pct_costos_indirectos (float, optional, alias legacy)
         pct_utilidad (float, optional)
         pct_sobre_costo_labor (float, optional)
+        regenerate (bool, optional) → skip cached LLM output for unchanged partidas
     """
     if not request.is_json:
         return jsonify({
@@ -105,6 +106,7 @@ def generate_apu():
             pct_costos_indirectos=payload.pct_costos_indirectos,
             pct_utilidad=payload.pct_utilidad,
             pct_sobre_costo_labor=payload.pct_sobre_costo_labor,
+            use_cache=not payload.regenerate,
         )
     except APUGenerationError as e:
         logger.error("APU generation failed rfx_id=%s: %s", payload.rfx_id, e)
@@ -202,11 +202,15 @@ def list_opportunities():
         organization_id = get_current_user_organization_id()
         business_unit_id = request.args.get("business_unit_id")
         sales_stage = request.args.get("sales_stage")
+        limit = request.args.get("limit", 1000, type=int)
+        offset = request.args.get("offset", 0, type=int)
         data = budy_domain_service.list_opportunities(
             user_id,
             organization_id,
             business_unit_id=business_unit_id,
             sales_stage=sales_stage,
+            limit=limit,
+            offset=offset,
         )
         return jsonify({"status": "success", "data": data}), 200
     except Exception as exc:
@@ -12,7 +12,14 @@ import hashlib
 from datetime import datetime
 
 from backend.core.database import get_database_client
+from backend.services.pdf_asset_store import pdf_asset_store
+from backend.utils.pdf_html_sanitizer import (
+    CHROMIUM_PDF_SANITIZER,
+    PDF_LAYOUT_SANITIZER,
+    PLAYWRIGHT_STABILITY_SANITIZER,
+)
 from backend.utils.retry_decorator import retry_on_failure
+from backend.utils.metrics import track_stage
 from backend.exceptions import ExternalServiceError
 
 logger = logging.getLogger(__name__)
@@ -88,63 +95,9 @@ def sanitize_html_for_chromium_pdf(html_content: str) -> str:
     """
     Elimina CSS que causa crashes en Chromium PDF engine (page.pdf()).
     Mantiene el estilo visual pero quita propiedades problemáticas.
+    Reglas precompiladas en backend/utils/pdf_html_sanitizer.py.
     """
-    problematic_css = [
-        # Filters y effects (muy problemáticos con page.pdf)
-        (r'filter:\s*[^;]+;', ''),
-        (r'backdrop-filter:\s*[^;]+;', ''),
-        (r'-webkit-backdrop-filter:\s*[^;]+;', ''),
-        (r'mix-blend-mode:\s*[^;]+;', ''),
-        
-        # Masks y clips complejos
-        (r'-webkit-mask:\s*[^;]+;', ''),
-        (r'-webkit-mask-image:\s*[^;]+;', ''),
-        (r'mask:\s*[^;]+;', ''),
-        (r'clip-path:\s*polygon[^;]+;', ''),
-        
-        # Transforms 3D problemáticos
-        (r'transform:\s*[^;]*perspective[^;]+;', ''),
-        (r'transform:\s*[^;]*rotateX[^;]+;', ''),
-        (r'transform:\s*[^;]*rotateY[^;]+;', ''),
-        (r'transform:\s*[^;]*rotateZ[^;]+;', ''),
-        (r'transform-style:\s*preserve-3d;', ''),
-        
-        # Will-change (no sirve en PDF)
-        (r'will-change:\s*[^;]+;', ''),
-        
-        # Contenido generado problemático
-        (r'content:\s*url\([^)]+\);', ''),
-        
-        # Animaciones y transiciones (no tienen sentido en PDF)
-        (r'animation:\s*[^;]+;', ''),
-        (r'animation-[^:]+:\s*[^;]+;', ''),
-        (r'transition:\s*[^;]+;', ''),
-        (r'transition-[^:]+:\s*[^;]+;', ''),
-        
-        # image-rendering no estándar
-        (r'image-rendering:\s*-webkit-optimize-contrast[^;]*;', 'image-rendering: auto;'),
-        
-        # -webkit-print-color-adjust con !important en selectores universales
-        (r'-webkit-print-color-adjust:\s*exact\s*!important\s*;', '-webkit-print-color-adjust: exact;'),
-    ]
-    
-    sanitized = html_content
-    
-    for pattern, replacement in problematic_css:
-        sanitized = re.sub(pattern, replacement, sanitized, flags=re.IGNORECASE)
-    
-    # Remover bloques universales (*) con -webkit-print-color-adjust (principal causa de crash)
-    sanitized = re.sub(
-        r'\*\s*(?:,\s*\*::before\s*,\s*\*::after\s*)?\{[^}]*-webkit-print-color-adjust[^}]*\}',
-        '',
-        sanitized
-    )
-    
-    # Limpiar inline scripts (no sirven en PDF)
-    sanitized = re.sub(r'<script[^>]*>.*?</script>', '', sanitized, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Limpiar event handlers inline
-    sanitized = re.sub(r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '', sanitized, flags=re.IGNORECASE)
+    sanitized = CHROMIUM_PDF_SANITIZER.sanitize(html_content)
     
     logger.info("🧹 HTML sanitized for Chromium PDF engine")
     return sanitized
@@ -155,25 +108,7 @@ def sanitize_html_for_playwright_stability(html_content: str) -> str:
     Sanitización agresiva para casos donde set_content crashea.
     Reduce features de HTML/CSS que suelen romper el renderer.
     """
-    sanitized = html_content
-
-    # Evitar dependencias externas e imports CSS dinámicos
-    sanitized = re.sub(r'<link[^>]+rel=["\']?stylesheet["\']?[^>]*>', '', sanitized, flags=re.IGNORECASE)
-    sanitized = re.sub(r'@import\s+url\([^)]+\)\s*;?', '', sanitized, flags=re.IGNORECASE)
-
-    # Remover tags multimedia/embebidos problemáticos para PDF
-    sanitized = re.sub(r'<(iframe|embed|object|video|audio|canvas)[^>]*>.*?</\1>', '', sanitized, flags=re.IGNORECASE | re.DOTALL)
-    sanitized = re.sub(r'<(iframe|embed|object|video|audio|canvas)[^>]*/?>', '', sanitized, flags=re.IGNORECASE)
-
-    # SVG complejos pueden tumbar el renderer en algunos hosts
-    sanitized = re.sub(r'<svg[^>]*>.*?</svg>', '', sanitized, flags=re.IGNORECASE | re.DOTALL)
-
-    # Reducir payload de data URIs extremadamente largos
-    sanitized = re.sub(r'data:[^"\')\s]{5000,}', 'data:,', sanitized, flags=re.IGNORECASE)
-
-    # Quitar scripts inline y handlers
-    sanitized = re.sub(r'<script[^>]*>.*?</script>', '', sanitized, flags=re.DOTALL | re.IGNORECASE)
-    sanitized = re.sub(r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '', sanitized, flags=re.IGNORECASE)
+    sanitized = PLAYWRIGHT_STABILITY_SANITIZER.sanitize(html_content)
 
     logger.warning("🛟 Applied aggressive HTML stabilization for Playwright")
     return sanitized
@@ -254,6 +189,7 @@ def is_renderer_crash_error(error: Exception) -> bool:
 
 
 @retry_on_failure(max_retries=2, initial_delay=2.0, backoff_factor=2.0)
+@track_stage("pdf_render", engine="playwright")
 def convert_with_playwright(html_content: str, client_name: str, document_id: str):
     """
     Conversión usando Playwright - Máxima fidelidad visual
@@ -271,6 +207,9 @@ def convert_with_playwright(html_content: str, client_name: str, document_id: st
     # PASO 2: Optimizar HTML para PDF
     optimized_html = optimize_html_for_pdf(sanitized_html)
     
+    # PASO 3: Inlinear logos/imágenes remotas (el render no depende de la red)
+    optimized_html = pdf_asset_store.inline_remote_assets(optimized_html)
+    
     with sync_playwright() as p:
         browser = launch_chromium_for_pdf(p)
         
@@ -294,6 +233,7 @@ def convert_with_playwright(html_content: str, client_name: str, document_id: st
 
                 page = browser.new_page()
                 safe_html = optimize_html_for_pdf(sanitize_html_for_playwright_stability(sanitized_html))
+                safe_html = pdf_asset_store.inline_remote_assets(safe_html)
                 try:
                     pdf_bytes = render_html_to_pdf_bytes(page, safe_html)
                 except Exception as safe_error:
@@ -359,6 +299,7 @@ def launch_chromium_for_pdf(playwright_instance):
     raise last_error
 
 
+@track_stage("pdf_render", engine="weasyprint")
 def convert_with_weasyprint(html_content: str, client_name: str, document_id: str):
     """
     Conversión usando WeasyPrint - Buena fidelidad sin necesidad de browser
@@ -368,7 +309,7 @@ def convert_with_weasyprint(html_content: str, client_name: str, document_id: st
     except ImportError as e:
         raise ImportError("WeasyPrint not installed") from e
     
-    optimized_html = optimize_html_for_pdf(html_content)
+    optimized_html = pdf_asset_store.inline_remote_assets(optimize_html_for_pdf(html_content))
     
     logger.info("📄 Converting HTML to PDF with WeasyPrint...")
     
@@ -390,6 +331,7 @@ def convert_with_weasyprint(html_content: str, client_name: str, document_id: st
             pass
 
 
+@track_stage("pdf_render", engine="pdfkit")
 def convert_with_pdfkit(html_content: str, client_name: str, document_id: str):
     """
     Conversión usando pdfkit (requiere wkhtmltopdf instalado en el sistema)
@@ -399,7 +341,7 @@ def convert_with_pdfkit(html_content: str, client_name: str, document_id: str):
     except ImportError as e:
         raise ImportError("pdfkit not installed") from e
     
-    optimized_html = optimize_html_for_pdf(html_content)
+    optimized_html = pdf_asset_store.inline_remote_assets(optimize_html_for_pdf(html_content))
     
     logger.info("📄 Converting HTML to PDF with pdfkit...")
     
@@ -516,69 +458,10 @@ def optimize_html_for_pdf(html_content: str) -> str:
     """
 
     # ── SANITIZE: remove CSS that crashes Chromium page.pdf() ────────────────
-
-    # 1. image-rendering: -webkit-optimize-contrast (non-standard, causes crash)
-    html_content = re.sub(
-        r'image-rendering:\s*-webkit-optimize-contrast[^;]*;',
-        'image-rendering: auto;',
-        html_content
-    )
-
-    # 2. Universal (*) selectors with -webkit-print-color-adjust — main crash cause
-    html_content = re.sub(
-        r'\*\s*(?:,\s*\*::before\s*,\s*\*::after\s*)?\{[^}]*-webkit-print-color-adjust[^}]*\}',
-        '',
-        html_content
-    )
-
-    # 3. Normalize -webkit-print-color-adjust: exact !important to avoid issues
-    html_content = re.sub(
-        r'-webkit-print-color-adjust:\s*exact\s*!important\s*;',
-        '-webkit-print-color-adjust: exact;',
-        html_content
-    )
-
-    # 4. Replace calc()-based widths with 100% (unreliable in print media).
-    #    Pattern is self-contained: calc(...) — no [^;]* needed outside the parens.
-    #    Matches: width: calc(100% - 20mm), width: calc(100% - 2cm), etc.
-    html_content = re.sub(
-        r'(width\s*:\s*)calc\([^)]*\)',
-        r'\1100%',
-        html_content,
-        flags=re.IGNORECASE
-    )
-
-    # 5. Strip fixed dimension body properties that overflow the page content area.
-    #    The LLM often generates: body { width: 216mm; height: 279mm; padding: 0 10mm; }
-    #    Page geometry is controlled by @page, NOT body width/height/padding.
-    #
-    #    Strategy: extract the body {} block, sanitize it, put it back.
-    #    This is safer than regex-on-whole-file for multiline blocks.
-    def _sanitize_body_block(match):
-        block = match.group(0)
-        # Remove width with absolute units (mm, cm, in, px, pt)
-        block = re.sub(r'\bwidth\s*:\s*[\d.]+(?:mm|cm|in|px|pt)\s*;', '', block, flags=re.IGNORECASE)
-        # Remove height with absolute units
-        block = re.sub(r'\bheight\s*:\s*[\d.]+(?:mm|cm|in|px|pt)\s*;', '', block, flags=re.IGNORECASE)
-        # Remove padding with any mm/cm/pt values (e.g. "0 10mm", "5mm 10mm", "10mm")
-        block = re.sub(r'\bpadding\s*:[^;]*\d+(?:mm|cm|in|pt)[^;]*;', '', block, flags=re.IGNORECASE)
-        return block
-
-    html_content = re.sub(
-        r'body\s*\{[^}]*\}',
-        _sanitize_body_block,
-        html_content,
-        flags=re.IGNORECASE
-    )
-
-    # 7. Remove explicit mm margins on <table> elements (inline or stylesheet).
-    #    Matches: margin: 5mm 10mm, margin-left: 10mm, margin: 0 10mm, etc.
-    html_content = re.sub(
-        r'(<table[^>]*style\s*=\s*["\'][^"\']*?)margin(?:-(?:left|right|top|bottom))?\s*:\s*[\d.]+(?:mm|cm|in|pt)[^;]*;',
-        r'\1margin: 0;',
-        html_content,
-        flags=re.IGNORECASE
-    )
+    # image-rendering no estándar, selectores universales con
+    # -webkit-print-color-adjust, widths con calc(), dimensiones fijas en body {}
+    # y márgenes absolutos en <table> (ver PDF_LAYOUT_SANITIZER).
+    html_content = PDF_LAYOUT_SANITIZER.sanitize(html_content)
 
     # ── INJECT normalization CSS (always last, highest specificity via !important)
     if '</head>' in html_content:
@@ -0,0 +1,73 @@
+"""
+📈 Metrics API - Exposición Prometheus de métricas de proceso
+
+Registra hooks globales de request (conteo y latencia por ruta y org tier) y
+expone GET /metrics en formato texto de Prometheus. Con METRICS_MULTIPROC_DIR
+agrega todos los workers de gunicorn.
+
+Si METRICS_AUTH_TOKEN está definido, /metrics exige `Authorization: Bearer <token>`.
+
+Usage:
+    GET /metrics
+"""
+import hmac
+import logging
+import os
+import time
+
+from flask import Blueprint, Response, g, jsonify, request
+
+from backend.utils.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    current_org_tier,
+    registry,
+)
+
+logger = logging.getLogger(__name__)
+
+metrics_bp = Blueprint("metrics", __name__)
+
+_EXCLUDED_ROUTES = {"/metrics", "/health", "/api/health/live"}
+
+
+@metrics_bp.before_app_request
+def _start_request_timer():
+    g.metrics_request_started_at = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def _record_request(response):
+    started_at = getattr(g, "metrics_request_started_at", None)
+    if started_at is None:
+        return response
+    try:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        if route in _EXCLUDED_ROUTES:
+            return response
+        org_tier = current_org_tier()
+        HTTP_REQUESTS.inc(route=route, method=request.method, status=str(response.status_code), org_tier=org_tier)
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at, route=route, method=request.method, org_tier=org_tier
+        )
+    except Exception as e:
+        logger.debug(f"Metrics recording skipped: {e}")
+    return response
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics_exposition():
+    """Métricas en formato de exposición de texto de Prometheus"""
+    token = os.getenv("METRICS_AUTH_TOKEN")
+    if token:
+        provided = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(provided, token):
+            return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    try:
+        body = registry.render()
+    except Exception as e:
+        logger.error(f"❌ Metrics exposition failed: {e}")
+        return jsonify({"status": "error", "message": "Failed to collect metrics", "error": str(e)}), 500
+
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
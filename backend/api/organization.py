@@ -160,6 +160,7 @@ def create_organization():
             })\
             .eq("id", current_user_id)\
             .execute()
+        db.invalidate_organization_usage(organization_id)
 
         logger.info(f"✅ Organization '{name}' created by user {current_user_id} (org_id: {organization_id})")
 
@@ -908,8 +909,8 @@ def invite_member():
                 "message": f"Invalid role. You can invite: {', '.join(valid_roles)}"
             }), 400
         
-        # Verificar límite de usuarios
-        limit_check = db.check_organization_limit(organization_id, 'users')
+        # Verificar límite de usuarios (lectura fresca: agregar miembros debe ser exacto)
+        limit_check = db.check_organization_limit(organization_id, 'users', use_cache=False)
         if not limit_check.get('can_proceed'):
             return jsonify({
                 "status": "error",
@@ -940,6 +941,7 @@ def invite_member():
                     .execute()
                 
                 if success.data:
+                    db.invalidate_organization_usage(organization_id)
                     logger.info(f"✅ Existing user {email} added to organization {organization_id}")
                     return jsonify({
                         "status": "success",
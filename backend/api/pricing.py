@@ -2,7 +2,7 @@
 💰 Pricing Configuration API - Endpoints para configuración de pricing
 Permite al usuario configurar coordinación, costo por persona y otras opciones
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from werkzeug.exceptions import BadRequest
 from pydantic import ValidationError
 import logging
@@ -14,6 +14,8 @@ from backend.models.pricing_models import (
 )
 from backend.services.pricing_config_service_v2 import PricingConfigurationServiceV2
 from backend.core.database import get_database_client
+from backend.utils.auth_middleware import jwt_required, get_current_user_id, get_current_user_organization_id
+from backend.utils.organization_middleware import require_organization, require_role
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,19 @@ logger = logging.getLogger(__name__)
 pricing_bp = Blueprint("pricing_api", __name__, url_prefix="/api/pricing")
 
 
+def _find_rfx_for_write(rfx_id: str):
+    """
+    Lookup estricto para endpoints que escriben pricing: scope del usuario
+    autenticado y solo UUID / código / nombre exacto (sin similitud de texto).
+    """
+    return get_database_client().find_rfx_by_identifier(
+        rfx_id,
+        organization_id=get_current_user_organization_id(),
+        user_id=get_current_user_id(),
+        strict=True,
+    )
+
+
 @pricing_bp.route("/config/<rfx_id>", methods=["GET"])
 def get_pricing_configuration(rfx_id: str):
     """
@@ -113,6 +128,7 @@ def get_pricing_configuration(rfx_id: str):
 
 
 @pricing_bp.route("/config/<rfx_id>", methods=["PUT"])
+@jwt_required
 def update_pricing_configuration(rfx_id: str):
     """
     ⚙️ Actualizar configuración de pricing para un RFX (ENDPOINT GENERAL - FALLBACK)
@@ -142,9 +158,9 @@ def update_pricing_configuration(rfx_id: str):
         except Exception:
             pass
         
-        # 🧠 Smart RFX lookup: Try UUID first, then search by name
+        # 🔒 Strict RFX lookup (caller scope, exact match only)
         db_client = get_database_client()
-        rfx_record = db_client.find_rfx_by_identifier(rfx_id)
+        rfx_record = _find_rfx_for_write(rfx_id)
         
         if not rfx_record:
             logger.error(f"❌ RFX not found for identifier: {rfx_id}")
@@ -216,6 +232,7 @@ def update_pricing_configuration(rfx_id: str):
 
 
 @pricing_bp.route("/config/<rfx_id>/coordination", methods=["PATCH"])
+@jwt_required
 def update_coordination_config(rfx_id: str):
     """
     🔧 Actualizar SOLO configuración de coordinación y logística
@@ -231,9 +248,9 @@ def update_coordination_config(rfx_id: str):
         
         data = request.get_json()
         
-        # 🧠 Smart RFX lookup
+        # 🔒 Strict RFX lookup (caller scope, exact match only)
         db_client = get_database_client()
-        rfx_record = db_client.find_rfx_by_identifier(rfx_id)
+        rfx_record = _find_rfx_for_write(rfx_id)
         
         if not rfx_record:
             return jsonify({
@@ -282,6 +299,7 @@ def update_coordination_config(rfx_id: str):
 
 
 @pricing_bp.route("/config/<rfx_id>/cost-per-person", methods=["PATCH"])
+@jwt_required
 def update_cost_per_person_config(rfx_id: str):
     """
     👥 Actualizar SOLO configuración de costo por persona
@@ -297,9 +315,9 @@ def update_cost_per_person_config(rfx_id: str):
         
         data = request.get_json()
         
-        # 🧠 Smart RFX lookup
+        # 🔒 Strict RFX lookup (caller scope, exact match only)
         db_client = get_database_client()
-        rfx_record = db_client.find_rfx_by_identifier(rfx_id)
+        rfx_record = _find_rfx_for_write(rfx_id)
         
         if not rfx_record:
             return jsonify({
@@ -348,6 +366,7 @@ def update_cost_per_person_config(rfx_id: str):
 
 
 @pricing_bp.route("/config/<rfx_id>/taxes", methods=["PATCH"])
+@jwt_required
 def update_taxes_config(rfx_id: str):
     """
     💵 Actualizar SOLO configuración de impuestos
@@ -363,9 +382,9 @@ def update_taxes_config(rfx_id: str):
         
         data = request.get_json()
         
-        # 🧠 Smart RFX lookup
+        # 🔒 Strict RFX lookup (caller scope, exact match only)
         db_client = get_database_client()
-        rfx_record = db_client.find_rfx_by_identifier(rfx_id)
+        rfx_record = _find_rfx_for_write(rfx_id)
         
         if not rfx_record:
             return jsonify({
@@ -536,6 +555,108 @@ def get_pricing_presets():
         }), 500
 
 
+BULK_MAX_RFX = 1000
+BULK_OPERATIONS = ("coordination", "taxes", "cost_per_person", "preset")
+
+
+@pricing_bp.route("/bulk", methods=["POST"])
+@jwt_required
+@require_organization
+@require_role(['owner', 'admin'])
+def bulk_update_pricing():
+    """
+    🧮 Aplicar una configuración de pricing a varios RFX de la organización
+
+    Body: {"operation": "coordination|taxes|cost_per_person|preset", "rfx_ids": [...], ...}
+    - coordination: enabled, rate, coordination_type
+    - taxes: enabled, tax_rate, tax_type
+    - cost_per_person: enabled, headcount, display_in_proposal
+    - preset: preset_name
+
+    Solo se escriben RFX de la organización del usuario; el resto se reporta
+    como fallido. Respuesta con resultado por RFX.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        operation = data.get("operation")
+        rfx_ids = [str(rfx_id) for rfx_id in (data.get("rfx_ids") or []) if rfx_id]
+
+        if operation not in BULK_OPERATIONS:
+            return jsonify({
+                "status": "error",
+                "message": f"operation must be one of: {', '.join(BULK_OPERATIONS)}"
+            }), 400
+        if not rfx_ids or len(rfx_ids) > BULK_MAX_RFX:
+            return jsonify({
+                "status": "error",
+                "message": f"rfx_ids must contain between 1 and {BULK_MAX_RFX} IDs"
+            }), 400
+        if operation == "preset" and not data.get("preset_name"):
+            return jsonify({
+                "status": "error",
+                "message": "preset_name is required for operation 'preset'"
+            }), 400
+
+        # Multi-tenant: solo RFX de la organización actual
+        db_client = get_database_client()
+        owned = db_client.client.table("rfx_v2")\
+            .select("id")\
+            .in_("id", rfx_ids)\
+            .eq("organization_id", g.organization_id)\
+            .execute()
+        owned_ids = [str(row["id"]) for row in (owned.data or [])]
+        owned_set = set(owned_ids)
+
+        updated_by = get_current_user_id() or "bulk_operation"
+        enabled = bool(data.get("enabled", True))
+        pricing_service = PricingConfigurationServiceV2()
+
+        if operation == "coordination":
+            results = pricing_service.bulk_update_coordination(
+                owned_ids, enabled, float(data.get("rate", 0.18)), updated_by=updated_by,
+                coordination_type=data.get("coordination_type", "standard")
+            )
+        elif operation == "taxes":
+            results = pricing_service.bulk_update_taxes(
+                owned_ids, enabled, float(data.get("tax_rate", 0.16)),
+                tax_type=data.get("tax_type", "IVA"), updated_by=updated_by
+            )
+        elif operation == "cost_per_person":
+            results = pricing_service.bulk_update_cost_per_person(
+                owned_ids, enabled, int(data.get("headcount", 120)),
+                display_in_proposal=bool(data.get("display_in_proposal", True)), updated_by=updated_by
+            )
+        else:
+            results = pricing_service.bulk_apply_preset(owned_ids, data["preset_name"], updated_by=updated_by)
+
+        per_rfx = {rfx_id: bool(results.get(rfx_id, False)) for rfx_id in rfx_ids}
+        succeeded = sum(1 for success in per_rfx.values() if success)
+        logger.info(f"✅ Bulk pricing '{operation}': {succeeded}/{len(per_rfx)} RFX updated")
+        return jsonify({
+            "status": "success" if succeeded == len(per_rfx) else "partial",
+            "message": f"{succeeded}/{len(per_rfx)} RFX updated",
+            "data": {
+                "operation": operation,
+                "results": per_rfx,
+                "not_found": [rfx_id for rfx_id in rfx_ids if rfx_id not in owned_set],
+            }
+        }), 200
+
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid bulk pricing parameters",
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"❌ Error in bulk pricing update: {e}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to apply bulk pricing update",
+            "error": str(e)
+        }), 500
+
+
 @pricing_bp.route("/summary/<rfx_id>", methods=["GET"])
 def get_pricing_summary(rfx_id: str):
     """
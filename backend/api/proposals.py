@@ -371,29 +371,26 @@ def search_proposals_by_code():
         organization_id = get_current_user_organization_id()
         db_client = get_database_client()
 
-        raw_results = db_client.search_proposals_by_code(code, limit=limit)
+        # Scope por org/usuario resuelto en una sola query (sin validar RFX por RFX)
+        raw_results = db_client.search_proposals_by_code(
+            code,
+            limit=limit,
+            organization_id=organization_id,
+            user_id=user_id,
+        )
 
-        # Ownership enforcement by validating each proposal RFX.
-        from backend.utils.rfx_ownership import get_and_validate_rfx_ownership
         results = []
         for proposal in raw_results:
             proposal_rfx_id = proposal.get("rfx_id")
             if not proposal_rfx_id:
                 continue
-            _, err = get_and_validate_rfx_ownership(db_client, proposal_rfx_id, user_id, organization_id)
-            if err:
-                continue
-
-            metadata = proposal.get("metadata") or {}
-            if not isinstance(metadata, dict):
-                metadata = {}
 
             results.append({
                 "id": proposal.get("id"),
                 "rfx_id": proposal_rfx_id,
-                "proposal_code": metadata.get("proposal_code") or proposal.get("proposal_code"),
-                "rfx_code": proposal.get("rfx_code_snapshot") or metadata.get("rfx_code"),
-                "proposal_revision": proposal.get("proposal_revision") or metadata.get("proposal_revision"),
+                "proposal_code": proposal.get("metadata_proposal_code") or proposal.get("proposal_code"),
+                "rfx_code": proposal.get("rfx_code_snapshot") or proposal.get("metadata_rfx_code"),
+                "proposal_revision": proposal.get("proposal_revision") or proposal.get("metadata_proposal_revision"),
                 "created_at": proposal.get("created_at"),
                 "total_cost": proposal.get("total_cost", 0.0),
                 "document_type": proposal.get("document_type", "proposal"),
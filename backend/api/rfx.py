@@ -2,15 +2,15 @@
 🛣️ RFX API Endpoints - Clean endpoint layer using improved services
 Provides backward compatibility while using new architecture
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from werkzeug.exceptions import BadRequest
 from pydantic import ValidationError
 from typing import Optional, Dict, Any, List
+import base64
 import logging
 import time
 import random
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from backend.models.rfx_models import (
@@ -24,13 +24,13 @@ from backend.services.rfx_conversation_state_service import RFXConversationState
 from backend.services.rfx_processing_session_service import RFXProcessingSessionService
 from backend.services.credits_service import get_credits_service
 from backend.services.budy_domain_service import is_virtual_business_unit_id
+from backend.services.job_queue import COMMITTING, JobCancelled, JobQueue
 from backend.core.config import get_file_upload_config
 from backend.core.database import get_database_client
 from backend.utils.auth_middleware import jwt_required, get_current_user_id, get_current_user_organization_id
 from backend.exceptions import InsufficientCreditsError, ExternalServiceError
 
 logger = logging.getLogger(__name__)
-PREVIEW_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rfx-preview")
 
 # Create blueprint
 rfx_bp = Blueprint("rfx_api", __name__, url_prefix="/api/rfx")
@@ -111,85 +111,218 @@ def _resolve_agentic_status(rfx_status: str, latest_proposal: Optional[Dict[str,
     return "in_progress"
 
 
-def _process_preview_session(
+PREVIEW_JOB_KIND = "rfx_preview"
+PREVIEW_RETRYABLE_ERRORS = (ExternalServiceError, TimeoutError, ConnectionError)
+_PREVIEW_STAGE_MESSAGES = {
+    "extracting": "Reading the uploaded documents.",
+    "llm": "Extracting the request details with AI.",
+    "resolving": "Matching products against your catalog and pricing.",
+    COMMITTING: "Saving the extracted request for review.",
+}
+
+
+def _run_preview_extraction(
     session_id: str,
     rfx_input: RFXInput,
     valid_files: List[Dict[str, Any]],
     user_id: str,
     organization_id: Optional[str],
+    progress_callback=None,
+    force_refresh: bool = False,
 ) -> None:
+    """Extrae el preview y deja la sesión lista para revisión. Lanza si falla."""
     session_service = RFXProcessingSessionService()
+    catalog_service = None
     try:
-        catalog_service = None
-        try:
-            from backend.services.catalog_helpers import get_catalog_search_service_for_rfx
+        from backend.services.catalog_helpers import get_catalog_search_service_for_rfx
 
-            catalog_service = get_catalog_search_service_for_rfx()
-            logger.info("🛒 Catalog service initialized for async preview processing")
-        except Exception as e:
-            logger.warning(f"⚠️ Catalog service not available during async preview processing: {e}")
+        catalog_service = get_catalog_search_service_for_rfx()
+        logger.info("🛒 Catalog service initialized for async preview processing")
+    except Exception as e:
+        logger.warning(f"⚠️ Catalog service not available during async preview processing: {e}")
+
+    processor_service = RFXProcessorService(catalog_search_service=catalog_service)
+    preview_kwargs = {"user_id": user_id, "organization_id": organization_id}
+    if progress_callback is not None:
+        preview_kwargs["progress_callback"] = progress_callback
+    if force_refresh:
+        preview_kwargs["force_refresh"] = True
+    preview_result = processor_service.process_rfx_case_preview(rfx_input, valid_files, **preview_kwargs)
+    preview_data = preview_result.get("preview_data") or {}
+    validated_data = preview_result.get("validated_data") or {}
+    evaluation_metadata = preview_result.get("evaluation_metadata") or {}
+    kickoff_message = session_service._build_first_message(preview_data)
+
+    # Último punto de cancelación: después de esto el resultado se guarda
+    if progress_callback is not None:
+        progress_callback(COMMITTING)
+
+    session_service.update_session(
+        session_id,
+        {
+            "status": "clarification",
+            "preview_data": preview_data,
+            "validated_data": validated_data,
+            "evaluation_metadata": evaluation_metadata,
+            "conversation_state": {
+                "workflow_status": "extracted_pending_review",
+                "review_required": True,
+                "review_confirmed": False,
+                "can_proceed_without_answers": True,
+                "suggested_first_message": kickoff_message,
+            },
+        },
+    )
+    # Se agrega a los eventos de progreso/reintento en lugar de reemplazarlos
+    session_service.append_event(
+        session_id=session_id,
+        role="assistant",
+        message=kickoff_message,
+        payload={"event_type": "review_kickoff"},
+    )
+    logger.info("✅ Async preview session ready for review: %s", session_id)
 
-        processor_service = RFXProcessorService(catalog_search_service=catalog_service)
-        preview_result = processor_service.process_rfx_case_preview(
-            rfx_input,
-            valid_files,
-            user_id=user_id,
-            organization_id=organization_id,
-        )
-        preview_data = preview_result.get("preview_data") or {}
-        validated_data = preview_result.get("validated_data") or {}
-        evaluation_metadata = preview_result.get("evaluation_metadata") or {}
-        kickoff_message = session_service._build_first_message(preview_data)
 
-        session_service.update_session(
-            session_id,
-            {
-                "status": "clarification",
-                "preview_data": preview_data,
-                "validated_data": validated_data,
-                "evaluation_metadata": evaluation_metadata,
-                "conversation_state": {
-                    "workflow_status": "extracted_pending_review",
-                    "review_required": True,
-                    "review_confirmed": False,
-                    "can_proceed_without_answers": True,
-                    "suggested_first_message": kickoff_message,
-                },
-                "recent_events": [
-                    {
-                        "role": "assistant",
-                        "message": kickoff_message,
-                        "payload": {"event_type": "review_kickoff"},
-                        "created_at": datetime.utcnow().isoformat(),
-                    }
-                ],
+def _mark_preview_failed(session_id: str, exc: BaseException) -> None:
+    session_service = RFXProcessingSessionService()
+    session_service.update_session(
+        session_id,
+        {
+            "status": "clarification",
+            "conversation_state": {
+                "workflow_status": "preview_failed",
+                "review_required": True,
+                "review_confirmed": False,
+                "can_proceed_without_answers": False,
+                "suggested_first_message": (
+                    "We could not finish extracting this request automatically. "
+                    "Refresh the review or retry the upload."
+                ),
             },
+        },
+    )
+    session_service.append_event(
+        session_id=session_id,
+        role="system",
+        message="Preview processing failed. Please retry the upload or refresh the review state.",
+        payload={"event_type": "preview_failed", "error": str(exc)},
+    )
+
+
+def _process_preview_session(
+    session_id: str,
+    rfx_input: RFXInput,
+    valid_files: List[Dict[str, Any]],
+    user_id: str,
+    organization_id: Optional[str],
+    force_refresh: bool = False,
+) -> None:
+    """Procesamiento síncrono sin cola (un solo intento)."""
+    try:
+        _run_preview_extraction(
+            session_id, rfx_input, valid_files, user_id, organization_id, force_refresh=force_refresh
         )
-        logger.info("✅ Async preview session ready for review: %s", session_id)
     except Exception as exc:
         logger.error("❌ Async preview processing failed for session %s: %s", session_id, exc, exc_info=True)
-        session_service.update_session(
-            session_id,
-            {
-                "status": "clarification",
-                "conversation_state": {
-                    "workflow_status": "preview_failed",
-                    "review_required": True,
-                    "review_confirmed": False,
-                    "can_proceed_without_answers": False,
-                    "suggested_first_message": (
-                        "We could not finish extracting this request automatically. "
-                        "Refresh the review or retry the upload."
-                    ),
-                },
-            },
-        )
+        _mark_preview_failed(session_id, exc)
+
+
+def _encode_preview_job(
+    rfx_input: RFXInput,
+    valid_files: List[Dict[str, Any]],
+    user_id: str,
+    organization_id: Optional[str],
+    force_refresh: bool = False,
+) -> Dict[str, Any]:
+    return {
+        "rfx_input": rfx_input.model_dump(mode="json"),
+        "files": [
+            {"filename": f["filename"], "content_b64": base64.b64encode(f["content"]).decode("ascii")}
+            for f in valid_files
+        ],
+        "user_id": user_id,
+        "organization_id": organization_id,
+        "force_refresh": force_refresh,
+    }
+
+
+def _handle_preview_job(job: Dict[str, Any], progress) -> None:
+    """Handler de la cola: reporta cada etapa en recent_events y relanza errores para reintento."""
+    session_id = job["idempotency_key"]
+    payload = job["payload"] or {}
+    valid_files = [
+        {"filename": f["filename"], "content": base64.b64decode(f["content_b64"])}
+        for f in payload.get("files") or []
+    ]
+    session_service = RFXProcessingSessionService()
+
+    def report_stage(stage: str) -> None:
+        progress(stage)
         session_service.append_event(
             session_id=session_id,
             role="system",
-            message="Preview processing failed. Please retry the upload or refresh the review state.",
-            payload={"event_type": "preview_failed", "error": str(exc)},
+            message=_PREVIEW_STAGE_MESSAGES.get(stage, stage),
+            payload={"event_type": "preview_progress", "stage": stage, "attempt": job["attempts"]},
+        )
+
+    try:
+        _run_preview_extraction(
+            session_id,
+            RFXInput(**payload["rfx_input"]),
+            valid_files,
+            payload.get("user_id"),
+            payload.get("organization_id"),
+            progress_callback=report_stage,
+            force_refresh=bool(payload.get("force_refresh")),
         )
+    except JobCancelled:
+        raise
+    except Exception as exc:
+        if isinstance(exc, PREVIEW_RETRYABLE_ERRORS) and job["attempts"] < job["max_attempts"]:
+            session_service.append_event(
+                session_id=session_id,
+                role="system",
+                message="Extraction hit a temporary error and will be retried automatically.",
+                payload={"event_type": "preview_retry", "attempt": job["attempts"], "error": str(exc)},
+            )
+        raise
+
+
+def _on_preview_job_failed(job: Dict[str, Any], exc: BaseException) -> None:
+    logger.error("❌ Async preview processing failed for session %s: %s", job["idempotency_key"], exc)
+    _mark_preview_failed(job["idempotency_key"], exc)
+
+
+def _on_preview_job_cancelled(job: Dict[str, Any]) -> None:
+    session_id = job["idempotency_key"]
+    session_service = RFXProcessingSessionService()
+    session_service.update_session(
+        session_id,
+        {
+            "conversation_state": {
+                "workflow_status": "preview_cancelled",
+                "review_required": True,
+                "review_confirmed": False,
+                "can_proceed_without_answers": False,
+                "suggested_first_message": "The extraction was cancelled. Upload the request again to restart it.",
+            },
+        },
+    )
+    session_service.append_event(
+        session_id=session_id,
+        role="system",
+        message="Preview processing was cancelled.",
+        payload={"event_type": "preview_cancelled", "stage": job.get("stage")},
+    )
+
+
+PREVIEW_QUEUE = JobQueue(
+    PREVIEW_JOB_KIND,
+    _handle_preview_job,
+    on_failure=_on_preview_job_failed,
+    on_cancel=_on_preview_job_cancelled,
+    retryable=PREVIEW_RETRYABLE_ERRORS,
+)
 
 
 def _submit_preview_processing(
@@ -198,17 +331,22 @@ def _submit_preview_processing(
     valid_files: List[Dict[str, Any]],
     user_id: str,
     organization_id: Optional[str],
+    force_refresh: bool = False,
 ):
-    return PREVIEW_EXECUTOR.submit(
-        _process_preview_session,
+    return PREVIEW_QUEUE.enqueue(
         session_id,
-        rfx_input,
-        valid_files,
-        user_id,
-        organization_id,
+        _encode_preview_job(rfx_input, valid_files, user_id, organization_id, force_refresh),
+        fairness_key=organization_id or f"user:{user_id}",
     )
 
 
+@rfx_bp.before_app_request
+def _ensure_preview_queue_started():
+    """Retoma jobs pendientes (p.ej. tras reinicio del worker) en cuanto el proceso recibe tráfico."""
+    if not current_app.testing:
+        PREVIEW_QUEUE.ensure_started()
+
+
 
 
 @rfx_bp.route("/process", methods=["POST"])
@@ -414,12 +552,15 @@ def process_rfx():
         )
         session_id = str(session_record.get("id"))
 
+        # force_refresh=true: re-extrae y re-resuelve sin usar checkpoints de subidas previas
+        force_refresh = (request.form.get("force_refresh") or "").strip().lower() in ("1", "true", "yes")
         _submit_preview_processing(
             session_id,
             rfx_input,
             valid_files,
             current_user_id,
             organization_id,
+            force_refresh=force_refresh,
         )
 
         logger.info(f"✅ Preview session created and processing in background: {session_id}")
@@ -459,6 +600,97 @@ def process_rfx():
         return jsonify({"status":"error","message":str(e),"error":"internal"}), 500
 
 
+_PREVIEW_JOB_FIELDS = (
+    "status", "stage", "attempts", "max_attempts", "queue_position",
+    "cancel_requested", "last_error", "created_at", "claimed_at", "finished_at",
+)
+
+
+def _get_owned_preview_session(session_id: str):
+    return RFXProcessingSessionService().get_session_for_user(
+        session_id,
+        user_id=get_current_user_id(),
+        organization_id=get_current_user_organization_id(),
+    )
+
+
+def _serialize_preview_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    data = {field: job.get(field) for field in _PREVIEW_JOB_FIELDS}
+    data["session_id"] = job.get("idempotency_key")
+    return data
+
+
+@rfx_bp.route("/preview/<session_id>/status", methods=["GET"])
+@jwt_required
+def get_preview_job_status(session_id: str):
+    """
+    Estado del job de preview en la cola: status, etapa, intentos y posición.
+
+    🔒 AUTENTICACIÓN REQUERIDA (dueño de la sesión)
+    """
+    try:
+        if not _get_owned_preview_session(session_id):
+            return jsonify({"status": "error", "message": "Session not found or access denied"}), 404
+
+        job = PREVIEW_QUEUE.get(session_id)
+        if not job:
+            return jsonify({"status": "error", "message": "No preview job for this session"}), 404
+
+        return jsonify({
+            "status": "success",
+            "data": {**_serialize_preview_job(job), "queue": PREVIEW_QUEUE.stats()},
+        }), 200
+    except Exception as e:
+        logger.exception("❌ Error getting preview job status")
+        return jsonify({"status": "error", "message": str(e), "error": "internal"}), 500
+
+
+@rfx_bp.route("/preview/<session_id>/cancel", methods=["POST"])
+@jwt_required
+def cancel_preview_job(session_id: str):
+    """
+    Cancela la extracción de preview de una sesión.
+    En cola: se cancela de inmediato. Corriendo: se detiene al entrar a la siguiente etapa.
+    Guardando el resultado (etapa COMMITTING): 409, ya no se puede cancelar.
+
+    🔒 AUTENTICACIÓN REQUERIDA (dueño de la sesión)
+    """
+    try:
+        if not _get_owned_preview_session(session_id):
+            return jsonify({"status": "error", "message": "Session not found or access denied"}), 404
+
+        job = PREVIEW_QUEUE.cancel(session_id)
+        if not job:
+            return jsonify({"status": "error", "message": "No preview job for this session"}), 404
+        if job["status"] in ("succeeded", "failed"):
+            return jsonify({
+                "status": "error",
+                "message": f"Preview job already {job['status']}",
+                "data": _serialize_preview_job(job),
+            }), 409
+        if job["status"] == "running" and not job["cancel_requested"]:
+            # Ya está guardando el resultado (etapa COMMITTING): no se puede cancelar
+            return jsonify({
+                "status": "error",
+                "message": "Preview is already being saved and can no longer be cancelled",
+                "data": _serialize_preview_job(job),
+            }), 409
+
+        logger.info(f"🛑 Preview cancel requested: {session_id} (job status: {job['status']})")
+        return jsonify({
+            "status": "success",
+            "message": (
+                "Preview cancelled"
+                if job["status"] == "cancelled"
+                else "Cancellation requested; processing stops at the next stage"
+            ),
+            "data": _serialize_preview_job(job),
+        }), 200
+    except Exception as e:
+        logger.exception("❌ Error cancelling preview job")
+        return jsonify({"status": "error", "message": str(e), "error": "internal"}), 500
+
+
 @rfx_bp.route("/recent", methods=["GET"])
 @jwt_required
 def get_recent_rfx():
@@ -539,6 +771,89 @@ def get_recent_rfx():
         }), 500
 
 
+@rfx_bp.route("/search", methods=["GET"])
+@jwt_required
+def search_rfx():
+    """
+    Búsqueda rankeada de RFX por título, código, solicitante, empresa o código de propuesta.
+
+    🔒 AUTENTICACIÓN REQUERIDA - resultados limitados a la org (o RFX personales).
+
+    Query params: q (requerido), page (default 1), limit (default 20, máx 100)
+    """
+    try:
+        user_id = get_current_user_id()
+        organization_id = get_current_user_organization_id()  # Puede ser None
+
+        query = (request.args.get("q") or "").strip()
+        if not query:
+            return jsonify({
+                "status": "error",
+                "message": "Query parameter 'q' is required",
+                "error": "Missing q"
+            }), 400
+
+        try:
+            page = int(request.args.get("page", 1))
+            limit = int(request.args.get("limit", 20))
+        except (TypeError, ValueError):
+            page, limit = 0, 0
+        if page < 1 or limit < 1 or limit > 100:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid pagination parameters",
+                "error": "Page must be >= 1, limit between 1-100"
+            }), 400
+
+        from ..core.database import get_database_client
+        db_client = get_database_client()
+
+        rows = db_client.search_rfx(
+            query,
+            organization_id=organization_id,
+            user_id=user_id,
+            limit=limit,
+            offset=(page - 1) * limit,
+        )
+        total = int(rows[0].get("total_count") or 0) if rows else 0
+
+        results = [
+            {
+                "id": row.get("id"),
+                "title": row.get("title"),
+                "rfx_code": row.get("rfx_code"),
+                "client": row.get("requester_name"),
+                "company": row.get("company_name"),
+                "proposal_code": row.get("proposal_code"),
+                "status": row.get("status"),
+                "sales_stage": row.get("sales_stage"),
+                "date": row.get("created_at"),
+                "rank": row.get("rank"),
+            }
+            for row in rows
+        ]
+
+        return jsonify({
+            "status": "success",
+            "message": f"Found {total} RFX for '{query}'",
+            "data": results,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "has_more": page * limit < total,
+            },
+        }), 200
+
+    except Exception as e:
+        logger.error(f"❌ Error searching RFX: {e}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to search RFX",
+            "error": str(e)
+        }), 500
+
+
 @rfx_bp.route("/history", methods=["GET"])
 @jwt_required
 def get_rfx_history():
@@ -1510,7 +1510,7 @@ def get_session_review_state(session_id):
                 "suggested_first_message": state_data.get("suggested_first_message"),
                 "requires_clarification": bool(state_data.get("requires_clarification", False)),
                 "status": session.get("status", "clarification"),
-                "preview_ready": workflow_status not in {"processing_preview", "preview_failed"},
+                "preview_ready": workflow_status not in {"processing_preview", "preview_failed", "preview_cancelled"},
                 "preview_error": preview_error,
                 "recent_events": session.get("recent_events") or [],
                 "preview_data": session.get("preview_data") or {},
@@ -19,6 +19,7 @@ from uuid import UUID
 
 from backend.utils.auth_middleware import jwt_required, get_current_user, get_current_user_id
 from backend.core.database import get_database_client
+from backend.services.pricing_config_cache import pricing_config_cache
 
 logger = logging.getLogger(__name__)
 
@@ -473,6 +474,7 @@ def delete_my_rfx(rfx_id: str):
             .delete()\
             .eq("rfx_id", rfx_id)\
             .execute()
+        pricing_config_cache.invalidate_rfx(rfx_id)
         
         # PASO 4: Eliminar productos del RFX
         db_client.client.table("rfx_products")\
@@ -475,6 +475,7 @@ def admin_review_request(request_id: str):
                 })\
                 .eq("id", organization_id)\
                 .execute()
+            db.invalidate_organization_usage(organization_id)
 
             # Registrar transacción de créditos
             db.client.table("credit_transactions")\
@@ -521,6 +522,9 @@ def admin_review_request(request_id: str):
 
             logger.info(f"✅ User {user_id} personal plan upgraded to {requested_tier}")
 
+        from backend.services.credits_service import get_credits_service
+        get_credits_service().invalidate_credit_balance(organization_id=organization_id, user_id=user_id)
+
         # Marcar solicitud como aprobada
         db.client.table("plan_requests")\
             .update({
@@ -567,14 +571,19 @@ def admin_trigger_monthly_reset():
     Útil para MVP donde no hay cron job configurado.
     En producción esto debería ser un cron job automático.
 
+    Body (opcional):
+        run_id: Identificador del run para reanudar/re-ejecutar un reset
+                interrumpido sin duplicar transacciones
+
     Returns:
         JSON con resultado del reset
     """
     try:
         from backend.services.credits_service import get_credits_service
 
+        data = request.get_json(silent=True) or {}
         credits_service = get_credits_service()
-        result = credits_service.reset_monthly_credits()
+        result = credits_service.reset_monthly_credits(run_id=data.get("run_id"))
 
         admin_user_id = str(g.current_user['id'])
         logger.info(f"🔄 Monthly credits reset triggered by admin {admin_user_id}: {result}")
@@ -586,6 +595,10 @@ def admin_trigger_monthly_reset():
                 "org_reset_count": result.get("org_reset_count", 0),
                 "user_reset_count": result.get("user_reset_count", 0),
                 "total_reset": result.get("reset_count", 0),
+                "org_reset_by_tier": result.get("org_reset_by_tier", {}),
+                "user_reset_by_tier": result.get("user_reset_by_tier", {}),
+                "run_id": result.get("run_id"),
+                "elapsed_ms": result.get("elapsed_ms"),
                 "triggered_by": admin_user_id
             }
         }), 200
@@ -593,3 +606,42 @@ def admin_trigger_monthly_reset():
     except Exception as e:
         logger.error(f"❌ Error triggering monthly reset: {e}")
         return jsonify({"status": "error", "message": "Failed to trigger monthly reset"}), 500
+
+
+@subscription_bp.route('/admin/reconcile-usage', methods=['POST'])
+@jwt_required
+def admin_reconcile_usage_counters():
+    """
+    [ADMIN] Reconciliar los contadores de uso por organización.
+
+    Recalcula miembros y RFX del mes desde users / rfx_v2 y corrige la deriva
+    de `organization_usage_counters` (mantenidos por triggers). Pensado para
+    un cron diario; también se puede disparar a mano.
+
+    Body (opcional):
+        organization_id: Reconciliar solo esta organización
+
+    Returns:
+        JSON con el número de organizaciones corregidas
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        db = get_database_client()
+        fixed = db.reconcile_organization_usage_counters(data.get("organization_id"))
+
+        admin_user_id = str(g.current_user['id'])
+        logger.info(f"🔁 Usage counters reconciliation triggered by admin {admin_user_id}: {fixed} corrected")
+
+        return jsonify({
+            "status": "success",
+            "message": f"Usage counters reconciled ({fixed} organizations corrected)",
+            "data": {
+                "corrected_count": fixed,
+                "organization_id": data.get("organization_id"),
+                "triggered_by": admin_user_id
+            }
+        }), 200
+
+    except Exception as e:
+        logger.error(f"❌ Error reconciling usage counters: {e}")
+        return jsonify({"status": "error", "message": "Failed to reconcile usage counters"}), 500
@@ -47,6 +47,7 @@ from backend.api.organization import organization_bp  # ✅ Multi-tenant organiz
 from backend.api.credits import credits_bp  # ✅ Credits management
 from backend.api.contact import contact_bp  # ✅ Contact request emails
 from backend.api.health import health_bp  # ✅ Health checks and monitoring
+from backend.api.metrics import metrics_bp  # 📈 Prometheus metrics exposition
 from backend.api.recommendations import recommendations_bp  # 🧠 AI Learning System recommendations
 from backend.api.subscription import subscription_bp  # ✅ Plan requests & approval
 try:
@@ -176,6 +177,7 @@ def _register_blueprints(app: Flask) -> None:
     app.register_blueprint(credits_bp)  # ✅ /api/credits/* - Credits management
     app.register_blueprint(contact_bp)  # ✅ /api/contact-request - Email notifications
     app.register_blueprint(health_bp)  # ✅ /api/health/* - Health checks and monitoring
+    app.register_blueprint(metrics_bp)  # 📈 /metrics - Prometheus exposition + request metrics
     app.register_blueprint(recommendations_bp)  # 🧠 /api/recommendations/* - AI Learning System
     app.register_blueprint(subscription_bp)  # ✅ /api/subscription/* - Plan requests & approval
     
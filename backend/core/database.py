@@ -2,19 +2,107 @@
 🔌 Database Client V2.0 - English Schema Compatible
 Centralized database operations with the new normalized structure
 """
-from typing import Optional, Dict, Any, List, Union, Callable
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union, Callable
 from backend.core.config import get_database_config
+from backend.core.plans import get_plan_limits
+from backend.utils.lazy_import import lazy_attr
+from backend.utils.ttl_cache import TTLCache
+from datetime import datetime, timezone
 from uuid import UUID, uuid4
 import json
 import logging
+import os
+import re
 import time
 import threading
+from difflib import SequenceMatcher
 from functools import wraps
 from urllib.parse import urlparse, unquote
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
+# supabase (gotrue/httpx/postgrest) tarda ~400ms en importar: se carga al primer query
+create_client = lazy_attr("supabase", "create_client")
+
+# Uso/límites por organización (contadores de la migración 017), cache por proceso
+ORG_USAGE_NAMESPACE = "org_usage"
+ORG_USAGE_CACHE_TTL_SECONDS = float(os.getenv("ORG_USAGE_CACHE_TTL_SECONDS", "30"))
+_org_usage_cache = TTLCache(ttl_seconds=ORG_USAGE_CACHE_TTL_SECONDS, max_entries=4096)
+
+
+def current_usage_period() -> str:
+    """Inicio del mes actual (UTC) como 'YYYY-MM-01', igual que rfx_period en la DB."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-01")
+
+
+# Rank mínimo para lookups de escritura: código exacto (3.0) o solicitante/empresa exacto (2.0)
+RFX_STRICT_LOOKUP_MIN_RANK = 2.0
+
+
+def rank_rfx_search_match(term: str, row: Dict[str, Any]) -> float:
+    """
+    Score local de un resultado de búsqueda RFX (mismo orden de prioridad que el RPC search_rfx):
+    código exacto > solicitante/empresa exacto > código parcial > similitud de texto.
+    """
+    q = " ".join((term or "").split()).lower()
+    if not q:
+        return 0.0
+
+    def _text(key: str) -> str:
+        return str(row.get(key) or "").lower()
+
+    codes = [_text("rfx_code"), _text("proposal_code")]
+    names = [_text("requester_name"), _text("company_name")]
+    if q in codes:
+        return 3.0
+    if q in names:
+        return 2.0
+    if any(q in code for code in codes if code):
+        return 1.5
+
+    title = _text("title")
+    title_score = 1.0 if q in title else max(
+        (SequenceMatcher(None, q, word).ratio() for word in title.split()), default=0.0
+    )
+    name_score = max((SequenceMatcher(None, q, name).ratio() for name in names if name), default=0.0)
+    return round(max(title_score, name_score), 4)
+
+
+def build_rfx_product_rows(rfx_id: Union[str, UUID], products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalizar productos para rfx_products: id, rfx_id, defaults de quantity/unit
+    y sin None en columnas NOT NULL. Productos sin product_name se descartan.
+    """
+    products_data = []
+    for i, product in enumerate(products or []):
+        product_data = product.copy()
+        product_data['rfx_id'] = str(rfx_id)
+        if 'id' not in product_data:
+            product_data['id'] = str(uuid4())
+        
+        # Ensure required fields exist
+        if 'product_name' not in product_data or not product_data['product_name']:
+            logger.warning(f"Product {i} missing product_name, skipping")
+            continue
+            
+        if 'quantity' not in product_data or product_data.get('quantity') is None:
+            product_data['quantity'] = 1
+            
+        if 'unit' not in product_data or not product_data.get('unit'):
+            product_data['unit'] = 'unidades'
+        
+        # Clean any None values that might cause issues
+        for key, value in list(product_data.items()):
+            if value is None and key not in ['estimated_unit_price', 'unit_cost', 'total_estimated_cost', 'supplier_id', 'catalog_product_id', 'description', 'notes']:
+                del product_data[key]
+        
+        products_data.append(product_data)
+        logger.debug(f"✅ Prepared product {i}: {product_data.get('product_name')} (ID: {product_data['id']})")
+    return products_data
+
 
 def retry_on_connection_error(max_retries: int = 3, initial_delay: float = 0.3, backoff_factor: float = 2.0):
     """
@@ -87,7 +175,7 @@ class DatabaseClient:
         self._config = get_database_config()
     
     @property
-    def client(self) -> Client:
+    def client(self) -> "Client":
         """Get or create Supabase client instance"""
         if self._client is None:
             try:
@@ -245,6 +333,9 @@ class DatabaseClient:
             
             response = self.client.table("rfx_v2").insert(rfx_data).execute()
             if response.data:
+                if rfx_data.get('organization_id'):
+                    # rfx_count lo incrementa el trigger de la migración 017
+                    self.invalidate_organization_usage(rfx_data['organization_id'])
                 logger.info(f"✅ RFX inserted successfully: {response.data[0]['id']}")
                 return response.data[0]
             else:
@@ -253,6 +344,55 @@ class DatabaseClient:
             logger.error(f"❌ Failed to insert RFX: {e}")
             raise
     
+    @retry_on_connection_error(max_retries=3, initial_delay=0.3)
+    def save_rfx_graph(
+        self,
+        company: Dict[str, Any],
+        requester: Dict[str, Any],
+        rfx: Dict[str, Any],
+        products: List[Dict[str, Any]],
+        history: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Persistir company + requester + RFX + productos + historial en una sola
+        transacción server-side (RPC `save_rfx_graph`, migración 018).
+        
+        `rfx["id"]` es la clave de idempotencia: si el RFX ya existe el RPC no
+        escribe nada y retorna lo guardado (`replayed: true`), así que reintentar
+        tras un timeout es seguro.
+        
+        Returns:
+            {'rfx_id', 'rfx_code', 'company_id', 'requester_id', 'product_count', 'replayed'}
+            o None si el RPC no está desplegado (el caller usa el camino secuencial)
+        """
+        rfx_id = str(rfx["id"])
+        payload = {
+            "p_company": company,
+            "p_requester": requester,
+            "p_rfx": rfx,
+            "p_products": build_rfx_product_rows(rfx_id, products),
+            "p_history": [{"id": str(uuid4()), **event, "rfx_id": rfx_id} for event in history],
+        }
+        try:
+            response = self.client.rpc("save_rfx_graph", payload).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e, "save_rfx_graph"):
+                raise
+            logger.warning("⚠️ save_rfx_graph RPC unavailable, saving RFX with sequential inserts")
+            return None
+        
+        result = response.data[0] if isinstance(response.data, list) else response.data
+        if not result or not result.get("rfx_id"):
+            raise Exception(f"Unexpected save_rfx_graph response: {response.data}")
+        
+        if rfx.get("organization_id"):
+            self.invalidate_organization_usage(rfx["organization_id"])
+        logger.info(
+            f"✅ RFX graph saved in one transaction: {result['rfx_id']} "
+            f"({result.get('product_count', 0)} products{', replayed' if result.get('replayed') else ''})"
+        )
+        return result
+    
     @retry_on_connection_error(max_retries=3, initial_delay=0.3)
     def get_rfx_by_id(self, rfx_id: Union[str, UUID]) -> Optional[Dict[str, Any]]:
         """
@@ -451,6 +591,12 @@ class DatabaseClient:
     # RFX PRODUCTS OPERATIONS
     # ========================
 
+    def _is_missing_function_error(self, error: Exception, function_name: str) -> bool:
+        message = str(error).lower()
+        return function_name in message and (
+            "pgrst202" in message or "could not find the function" in message or "42883" in message
+        )
+    
     def _is_missing_column_error(self, error: Exception, column_name: str) -> bool:
         message = str(error).lower()
         return ("42703" in message) and (f"column rfx_products.{column_name}" in message or f"column \"{column_name}\"" in message)
@@ -462,31 +608,7 @@ class DatabaseClient:
                 logger.warning(f"No products to insert for RFX {rfx_id}")
                 return []
             
-            products_data = []
-            for i, product in enumerate(products):
-                product_data = product.copy()
-                product_data['rfx_id'] = str(rfx_id)
-                if 'id' not in product_data:
-                    product_data['id'] = str(uuid4())
-                
-                # Ensure required fields exist
-                if 'product_name' not in product_data or not product_data['product_name']:
-                    logger.warning(f"Product {i} missing product_name, skipping")
-                    continue
-                    
-                if 'quantity' not in product_data or product_data.get('quantity') is None:
-                    product_data['quantity'] = 1
-                    
-                if 'unit' not in product_data or not product_data.get('unit'):
-                    product_data['unit'] = 'unidades'
-                
-                # Clean any None values that might cause issues
-                for key, value in list(product_data.items()):
-                    if value is None and key not in ['estimated_unit_price', 'unit_cost', 'total_estimated_cost', 'supplier_id', 'catalog_product_id', 'description', 'notes']:
-                        del product_data[key]
-                
-                products_data.append(product_data)
-                logger.debug(f"✅ Prepared product {i}: {product_data.get('product_name')} (ID: {product_data['id']})")
+            products_data = build_rfx_product_rows(rfx_id, products)
             
             if not products_data:
                 logger.warning(f"No valid products to insert for RFX {rfx_id}")
@@ -807,8 +929,19 @@ class DatabaseClient:
             logger.error(f"❌ Failed to get proposals for RFX {rfx_id}: {e}")
             raise
 
-    def search_proposals_by_code(self, code_query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search proposals by corporate proposal code (exact or prefix-like)."""
+    def search_proposals_by_code(
+        self,
+        code_query: str,
+        limit: int = 20,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search proposals by corporate proposal code (exact or prefix-like).
+
+        Returns a slim projection (no HTML/content). When organization_id or user_id
+        is given, results are scoped to RFX the caller can access with one extra query.
+        """
         try:
             query = (code_query or "").strip()
             if not query:
@@ -816,29 +949,63 @@ class DatabaseClient:
 
             # Case-insensitive prefix search for fast operational lookup.
             response = self.client.table("generated_documents")\
-                .select("*")\
+                .select(
+                    "id, rfx_id, proposal_code, proposal_revision, rfx_code_snapshot, total_cost, "
+                    "document_type, created_at, metadata_proposal_code:metadata->>proposal_code, "
+                    "metadata_rfx_code:metadata->>rfx_code, metadata_proposal_revision:metadata->>proposal_revision"
+                )\
                 .eq("document_type", "proposal")\
                 .ilike("proposal_code", f"{query}%")\
                 .order("created_at", desc=True)\
                 .limit(limit)\
                 .execute()
 
-            return response.data or []
+            proposals = response.data or []
+            if not proposals or not (organization_id or user_id):
+                return proposals
+
+            rfx_ids = list({str(p["rfx_id"]) for p in proposals if p.get("rfx_id")})
+            if not rfx_ids:
+                return []
+            scope_query = self.client.table("rfx_v2").select("id").in_("id", rfx_ids)
+            if organization_id:
+                scope_query = scope_query.eq("organization_id", organization_id)
+            else:
+                scope_query = scope_query.eq("user_id", user_id).is_("organization_id", "null")
+            allowed = {str(row["id"]) for row in (scope_query.execute().data or [])}
+            return [p for p in proposals if str(p.get("rfx_id")) in allowed]
         except Exception as e:
             logger.error(f"❌ Failed to search proposals by code '{code_query}': {e}")
             return []
 
+    # Proyección ligera de la última propuesta (sin HTML ni contenido)
+    LATEST_PROPOSAL_FIELDS = (
+        "id, rfx_id, proposal_code, proposal_revision, metadata, public_token, public_visibility, "
+        "public_view_count, public_last_viewed_at, total_cost, created_at"
+    )
+
     def get_latest_proposals_for_rfx_ids(self, rfx_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """
         Get latest proposal per RFX for a list of RFX IDs.
-        Returns a dict keyed by rfx_id.
+        Returns a dict keyed by rfx_id with a slim projection (status, code, revision,
+        commercial metadata, public tracking, timestamps) - never the HTML content.
+
+        Uses the `get_latest_proposal_summaries` RPC (migration 013, DISTINCT ON rfx_id),
+        so the payload does not grow with revision history. Falls back to a slim select.
         """
+        rfx_ids = [str(rid) for rid in (rfx_ids or []) if rid]
+        if not rfx_ids:
+            return {}
+
         try:
-            if not rfx_ids:
-                return {}
+            response = self.client.rpc("get_latest_proposal_summaries", {"p_rfx_ids": rfx_ids}).execute()
+            return {str(row["rfx_id"]): row for row in (response.data or []) if row.get("rfx_id")}
+        except Exception as e:
+            logger.warning(f"⚠️ get_latest_proposal_summaries RPC unavailable, using slim select: {e}")
 
+        try:
             response = self.client.table("generated_documents")\
-                .select("*")\
+                .select(self.LATEST_PROPOSAL_FIELDS)\
                 .eq("document_type", "proposal")\
                 .in_("rfx_id", rfx_ids)\
                 .order("created_at", desc=True)\
@@ -915,6 +1082,29 @@ class DatabaseClient:
             logger.error(f"❌ Failed to insert RFX history: {e}")
             raise
     
+    def insert_rfx_history_batch(self, history_events: List[Dict[str, Any]]) -> int:
+        """
+        Insert several RFX history events in a single multi-row insert.
+
+        Returns:
+            Number of inserted events
+        """
+        if not history_events:
+            return 0
+        try:
+            rows = []
+            for event in history_events:
+                row = dict(event)
+                row.setdefault('id', str(uuid4()))
+                rows.append(row)
+            response = self.client.table("rfx_history").insert(rows).execute()
+            inserted = len(response.data or [])
+            logger.debug(f"✅ RFX history batch inserted: {inserted}/{len(rows)} events")
+            return inserted
+        except Exception as e:
+            logger.error(f"❌ Failed to insert RFX history batch ({len(history_events)} events): {e}")
+            raise
+    
     def get_rfx_history_events(self, rfx_id: Union[str, UUID]) -> List[Dict[str, Any]]:
         """
         Get all history events for an RFX.
@@ -1019,138 +1209,205 @@ class DatabaseClient:
     # SMART RFX LOOKUP METHODS
     # ========================
     
-    def find_rfx_by_identifier(self, identifier: str) -> Optional[Dict[str, Any]]:
+    def find_rfx_by_identifier(
+        self,
+        identifier: str,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        strict: bool = False,
+    ) -> Optional[Dict[str, Any]]:
         """
-        🔍 Smart RFX lookup: Try UUID first, then search by requester name, then company name
-        
+        🔍 Smart RFX lookup: UUID directo, si no el mejor resultado de search_rfx
+        (título, código, solicitante, empresa o código de propuesta).
+
         Args:
-            identifier: Could be UUID, requester name, or company name
-            
+            identifier: UUID, código, nombre de solicitante/empresa o título
+            organization_id / user_id: scope de la búsqueda (y del UUID si se pasa)
+            strict: Para rutas que escriben. Exige scope, solo acepta un match
+                exacto (código o solicitante/empresa, rank >= RFX_STRICT_LOOKUP_MIN_RANK)
+                y rechaza empates; nunca resuelve por similitud de texto.
+
         Returns:
-            RFX record if found, None otherwise
+            RFX record (con companies/requesters) si existe, None si no
         """
         try:
-            logger.info(f"🔍 Smart RFX lookup for identifier: '{identifier}'")
-            
-            # 1. Try UUID first (fastest)
+            logger.info(f"🔍 Smart RFX lookup for identifier: '{identifier}' (strict={strict})")
+
+            if strict and not (organization_id or user_id):
+                logger.warning(f"❌ Strict RFX lookup without organization/user scope refused: '{identifier}'")
+                return None
+
             try:
                 import uuid as _uuid
                 _ = _uuid.UUID(identifier)
                 logger.info(f"✅ Identifier '{identifier}' is valid UUID, direct lookup")
-                return self.get_rfx_by_id(identifier)
+                rfx = self.get_rfx_by_id(identifier)
+                if rfx and not self._rfx_in_scope(rfx, organization_id, user_id):
+                    logger.warning(f"❌ RFX {identifier} is outside the caller's scope")
+                    return None
+                return rfx
             except (ValueError, TypeError):
-                logger.info(f"🔄 Identifier '{identifier}' is not UUID, trying name-based search")
-            
-            # 2. Search by requester name
-            requester_result = self._find_rfx_by_requester_name(identifier)
-            if requester_result:
-                logger.info(f"✅ Found RFX by requester name: {requester_result['id']}")
-                return requester_result
-            
-            # 3. Search by company name
-            company_result = self._find_rfx_by_company_name(identifier)
-            if company_result:
-                logger.info(f"✅ Found RFX by company name: {company_result['id']}")
-                return company_result
-            
-            logger.warning(f"❌ No RFX found for identifier: '{identifier}'")
-            return None
-            
+                logger.info(f"🔄 Identifier '{identifier}' is not UUID, using ranked search")
+
+            matches = self.search_rfx(
+                identifier, organization_id=organization_id, user_id=user_id, limit=2 if strict else 1
+            )
+            if not matches:
+                logger.warning(f"❌ No RFX found for identifier: '{identifier}'")
+                return None
+
+            best = matches[0]
+            if strict:
+                if float(best.get("rank") or 0) < RFX_STRICT_LOOKUP_MIN_RANK:
+                    logger.warning(f"❌ No exact RFX match for '{identifier}' (best rank {best.get('rank')})")
+                    return None
+                if len(matches) > 1 and matches[1].get("rank") == best.get("rank"):
+                    logger.warning(f"❌ Ambiguous RFX identifier '{identifier}': several exact matches")
+                    return None
+
+            logger.info(f"✅ Found RFX by search: {best['id']} (rank {best.get('rank')})")
+            return self.get_rfx_by_id(best["id"])
+
         except Exception as e:
             logger.error(f"❌ Error in smart RFX lookup for '{identifier}': {e}")
             return None
-    
-    def _find_rfx_by_requester_name(self, requester_name: str) -> Optional[Dict[str, Any]]:
+
+    @staticmethod
+    def _rfx_in_scope(rfx: Dict[str, Any], organization_id: Optional[str], user_id: Optional[str]) -> bool:
+        """Mismo scope que search_rfx: org → RFX de la org; si no, user → RFX personales."""
+        if organization_id:
+            return str(rfx.get("organization_id") or "") == str(organization_id)
+        if user_id:
+            return str(rfx.get("user_id") or "") == str(user_id) and not rfx.get("organization_id")
+        return True
+
+    def search_rfx(
+        self,
+        query: str,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
         """
-        Find RFX by requester name (case insensitive).
-        
-        Optimizations:
-            - Batch query with IN clause instead of loop (eliminates N+1 problem)
-            - Single query for all matching RFX
-        
-        Performance:
-            - Recommended index: CREATE INDEX idx_requesters_name ON requesters(name)
-            - Recommended index: CREATE INDEX idx_rfx_v2_requester_created ON rfx_v2(requester_id, created_at DESC)
+        Ranked RFX search over title, rfx_code, requester, company and proposal code.
+
+        Uses the `search_rfx` RPC (migration 015, pg_trgm indexes). Rows are slim:
+        id, title, rfx_code, status, sales_stage, organization_id, user_id,
+        company_name, requester_name, proposal_code, created_at, rank, total_count.
+
+        Scope: organization_id → RFX de la org; si no, user_id → RFX personales;
+        sin ninguno → búsqueda global (lookups internos legacy).
         """
+        term = " ".join((query or "").split())
+        if not term:
+            return []
+        limit = max(1, min(int(limit or 20), 100))
+        offset = max(0, int(offset or 0))
+
         try:
-            # First, find requester by name
-            requester_response = self.client.table("requesters")\
-                .select("id, name, company_id")\
-                .eq("name", requester_name)\
-                .execute()
-            
-            if not requester_response.data:
-                # Try fuzzy search
-                requester_response = self.client.table("requesters")\
-                    .select("id, name, company_id")\
-                    .ilike("name", f"%{requester_name}%")\
-                    .execute()
-            
-            if requester_response.data:
-                # Optimized: Batch query with IN clause instead of loop
-                requester_ids = [req["id"] for req in requester_response.data]
-                
-                rfx_response = self.client.table("rfx_v2")\
-                    .select("*, companies(*), requesters(*)")\
-                    .in_("requester_id", requester_ids)\
-                    .order("created_at", desc=True)\
-                    .limit(1)\
-                    .execute()
-                
-                if rfx_response.data:
-                    logger.info(f"Found RFX by requester name '{requester_name}': {rfx_response.data[0]['id']}")
-                    return rfx_response.data[0]
-                
-            return None
+            response = self.client.rpc(
+                "search_rfx",
+                {
+                    "p_query": term,
+                    "p_organization_id": organization_id,
+                    "p_user_id": user_id,
+                    "p_limit": limit,
+                    "p_offset": offset,
+                },
+            ).execute()
+            return response.data or []
         except Exception as e:
-            logger.error(f"❌ Error searching RFX by requester name '{requester_name}': {e}")
-            return None
-    
-    def _find_rfx_by_company_name(self, company_name: str) -> Optional[Dict[str, Any]]:
-        """
-        Find RFX by company name (case insensitive).
-        
-        Optimizations:
-            - Batch query with IN clause instead of loop (eliminates N+1 problem)
-            - Single query for all matching RFX
-        
-        Performance:
-            - Recommended index: CREATE INDEX idx_companies_name ON companies(name)
-            - Recommended index: CREATE INDEX idx_rfx_v2_company_created ON rfx_v2(company_id, created_at DESC)
-        """
+            if "search_rfx" not in str(e):
+                logger.error(f"❌ search_rfx RPC failed for '{term}': {e}")
+                return []
+            logger.warning("⚠️ search_rfx RPC unavailable, using query fallback")
+
         try:
-            # First, find company by name
-            company_response = self.client.table("companies")\
-                .select("id, name")\
-                .eq("name", company_name)\
-                .execute()
-            
-            if not company_response.data:
-                # Try fuzzy search
-                company_response = self.client.table("companies")\
-                    .select("id, name")\
-                    .ilike("name", f"%{company_name}%")\
-                    .execute()
-            
-            if company_response.data:
-                # Optimized: Batch query with IN clause instead of loop
-                company_ids = [comp["id"] for comp in company_response.data]
-                
-                rfx_response = self.client.table("rfx_v2")\
-                    .select("*, companies(*), requesters(*)")\
-                    .in_("company_id", company_ids)\
-                    .order("created_at", desc=True)\
-                    .limit(1)\
-                    .execute()
-                
-                if rfx_response.data:
-                    logger.info(f"Found RFX by company name '{company_name}': {rfx_response.data[0]['id']}")
-                    return rfx_response.data[0]
-                
-            return None
+            return self._search_rfx_fallback(term, organization_id, user_id, limit, offset)
         except Exception as e:
-            logger.error(f"❌ Error searching RFX by company name '{company_name}': {e}")
-            return None
+            logger.error(f"❌ RFX search fallback failed for '{term}': {e}")
+            return []
+
+    def _search_rfx_fallback(
+        self,
+        term: str,
+        organization_id: Optional[str],
+        user_id: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> List[Dict[str, Any]]:
+        """Búsqueda por queries ilike (sin migración 015). Ranking local equivalente al RPC."""
+        # Caracteres reservados en filtros or_() de PostgREST
+        safe_term = re.sub(r"[,()%*\\]", " ", term).strip()
+        if not safe_term:
+            return []
+        pattern = f"%{safe_term}%"
+        columns = "id, title, rfx_code, status, sales_stage, organization_id, user_id, created_at, companies(name), requesters(name)"
+
+        def _scoped(query_builder):
+            if organization_id:
+                return query_builder.eq("organization_id", organization_id)
+            if user_id:
+                return query_builder.eq("user_id", user_id).is_("organization_id", "null")
+            return query_builder
+
+        rows: Dict[str, Dict[str, Any]] = {}
+
+        def _collect(query_builder):
+            for row in (_scoped(query_builder).limit(200).execute().data or []):
+                rows.setdefault(str(row.get("id")), row)
+
+        _collect(self.client.table("rfx_v2").select(columns).or_(f"title.ilike.{pattern},rfx_code.ilike.{pattern}"))
+
+        requester_ids = [r["id"] for r in (self.client.table("requesters").select("id").ilike("name", pattern).limit(200).execute().data or [])]
+        if requester_ids:
+            _collect(self.client.table("rfx_v2").select(columns).in_("requester_id", requester_ids))
+
+        company_ids = [c["id"] for c in (self.client.table("companies").select("id").ilike("name", pattern).limit(200).execute().data or [])]
+        if company_ids:
+            _collect(self.client.table("rfx_v2").select(columns).in_("company_id", company_ids))
+
+        proposal_codes: Dict[str, str] = {}
+        for doc in (
+            self.client.table("generated_documents")
+            .select("rfx_id, proposal_code")
+            .eq("document_type", "proposal")
+            .ilike("proposal_code", pattern)
+            .order("created_at", desc=True)
+            .limit(200)
+            .execute()
+            .data
+            or []
+        ):
+            proposal_codes.setdefault(str(doc.get("rfx_id")), doc.get("proposal_code"))
+        missing = [rid for rid in proposal_codes if rid not in rows]
+        if missing:
+            _collect(self.client.table("rfx_v2").select(columns).in_("id", missing))
+
+        results = []
+        for rid, row in rows.items():
+            item = {
+                "id": row.get("id"),
+                "title": row.get("title"),
+                "rfx_code": row.get("rfx_code"),
+                "status": row.get("status"),
+                "sales_stage": row.get("sales_stage"),
+                "organization_id": row.get("organization_id"),
+                "user_id": row.get("user_id"),
+                "company_name": (row.get("companies") or {}).get("name"),
+                "requester_name": (row.get("requesters") or {}).get("name"),
+                "proposal_code": proposal_codes.get(rid),
+                "created_at": row.get("created_at"),
+            }
+            item["rank"] = rank_rfx_search_match(term, item)
+            results.append(item)
+
+        results.sort(key=lambda item: str(item.get("created_at") or ""), reverse=True)
+        results.sort(key=lambda item: item["rank"], reverse=True)
+        for item in results:
+            item["total_count"] = len(results)
+        return results[offset:offset + limit]
 
     # ========================
     # USER INFORMATION METHODS
@@ -1703,14 +1960,22 @@ class DatabaseClient:
     def check_organization_limit(
         self, 
         organization_id: Union[str, UUID], 
-        limit_type: str
+        limit_type: str,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Verificar si una organización ha alcanzado sus límites.
         
+        Lee los contadores mantenidos por triggers (`organization_usage_counters`,
+        migración 017) en una sola query cacheada por proceso, en lugar de correr
+        count(exact) sobre users / rfx_v2 en cada verificación.
+        
         Args:
             organization_id: UUID de la organización
             limit_type: Tipo de límite ('users' o 'rfx_monthly')
+            use_cache: False fuerza una lectura fresca de los contadores; usarlo
+                en toda ruta que haga cumplir el límite (el cache por proceso
+                puede ir hasta ORG_USAGE_CACHE_TTL_SECONDS detrás de otros workers)
         
         Returns:
             Diccionario con:
@@ -1724,60 +1989,29 @@ class DatabaseClient:
             if not result['can_proceed']:
                 return error_response("User limit reached")
         """
+        if limit_type not in ('users', 'rfx_monthly'):
+            return {
+                'can_proceed': False,
+                'error': f'Invalid limit_type: {limit_type}'
+            }
+        
         try:
-            # Obtener organización
-            org = self.get_organization(organization_id)
-            if not org:
+            usage = self.get_organization_usage(organization_id, use_cache=use_cache)
+            if not usage:
                 return {
                     'can_proceed': False,
                     'error': 'Organization not found'
                 }
             
-            plan_tier = org.get('plan_tier', 'free')
-            
-            if limit_type == 'users':
-                # Contar usuarios actuales
-                response = self.client.table("users")\
-                    .select("id", count="exact")\
-                    .eq("organization_id", str(organization_id))\
-                    .execute()
-                
-                current_count = response.count or 0
-                limit = org.get('max_users', 2)
-                
-                return {
-                    'can_proceed': current_count < limit,
-                    'current_count': current_count,
-                    'limit': limit,
-                    'plan_tier': plan_tier
-                }
-            
-            elif limit_type == 'rfx_monthly':
-                # Contar RFX del mes actual
-                from datetime import datetime
-                current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                
-                response = self.client.table("rfx_v2")\
-                    .select("id", count="exact")\
-                    .eq("organization_id", str(organization_id))\
-                    .gte("created_at", current_month_start.isoformat())\
-                    .execute()
-                
-                current_count = response.count or 0
-                limit = org.get('max_rfx_per_month', 10)
-                
-                return {
-                    'can_proceed': current_count < limit,
-                    'current_count': current_count,
-                    'limit': limit,
-                    'plan_tier': plan_tier
-                }
+            current_count = usage['members_count'] if limit_type == 'users' else usage['rfx_count']
+            limit = usage['limits'][limit_type]
             
-            else:
-                return {
-                    'can_proceed': False,
-                    'error': f'Invalid limit_type: {limit_type}'
-                }
+            return {
+                'can_proceed': current_count < limit,
+                'current_count': current_count,
+                'limit': limit,
+                'plan_tier': usage['plan_tier']
+            }
                 
         except Exception as e:
             logger.error(f"❌ Failed to check organization limit: {e}")
@@ -1786,6 +2020,122 @@ class DatabaseClient:
                 'error': str(e)
             }
     
+    def get_organization_usage(
+        self,
+        organization_id: Union[str, UUID],
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Uso actual (miembros, RFX del mes) y límites de una organización.
+        
+        Cacheado por proceso (ORG_USAGE_CACHE_TTL_SECONDS); los writers de este
+        proceso invalidan con `invalidate_organization_usage`. Los cambios hechos
+        por otro worker se ven recién al expirar el TTL, así que las lecturas
+        cacheadas son solo para mostrar uso / pre-checks: las rutas que hacen
+        cumplir un límite (p.ej. agregar miembros) pasan use_cache=False y leen
+        la fila de organization_usage_counters.
+        
+        Returns:
+            {'plan_tier', 'members_count', 'rfx_count', 'limits': {'users', 'rfx_monthly'}}
+            o None si la organización no existe
+        """
+        key = (ORG_USAGE_NAMESPACE, str(organization_id))
+        if not use_cache:
+            _org_usage_cache.invalidate(key)
+        return _org_usage_cache.get_or_load(key, lambda: self._load_organization_usage(organization_id))
+    
+    def invalidate_organization_usage(self, organization_id: Optional[Union[str, UUID]] = None) -> None:
+        """Invalidar el uso cacheado de una organización (o de todas si es None)."""
+        if organization_id is None:
+            _org_usage_cache.invalidate_where(lambda key: key[0] == ORG_USAGE_NAMESPACE)
+        else:
+            _org_usage_cache.invalidate((ORG_USAGE_NAMESPACE, str(organization_id)))
+    
+    def reconcile_organization_usage_counters(self, organization_id: Optional[Union[str, UUID]] = None) -> int:
+        """
+        Recalcular los contadores de uso desde users / rfx_v2 y corregir la deriva.
+        
+        Args:
+            organization_id: Solo esta organización (None = todas)
+        
+        Returns:
+            Número de organizaciones cuyos contadores se corrigieron
+        """
+        response = self.client.rpc(
+            "reconcile_organization_usage_counters",
+            {"p_organization_id": str(organization_id) if organization_id else None}
+        ).execute()
+        self.invalidate_organization_usage(organization_id)
+        
+        fixed = int(response.data or 0)
+        logger.info(f"🔁 Organization usage counters reconciled: {fixed} corrected")
+        return fixed
+    
+    def _load_organization_usage(self, organization_id: Union[str, UUID]) -> Optional[Dict[str, Any]]:
+        try:
+            response = self.client.table("organizations")\
+                .select("id, plan_tier, max_users, max_rfx_per_month, "
+                        "organization_usage_counters(members_count, rfx_period, rfx_count)")\
+                .eq("id", str(organization_id))\
+                .limit(1)\
+                .execute()
+        except Exception as e:
+            if "organization_usage_counters" not in str(e):
+                raise
+            logger.warning("⚠️ organization_usage_counters unavailable, counting usage with count(exact)")
+            org = self.get_organization(organization_id)
+            return self._organization_usage(org, None, organization_id) if org else None
+        
+        if not response.data:
+            return None
+        org = response.data[0]
+        counters = org.get("organization_usage_counters")
+        # PostgREST embebe relaciones 1:1 como objeto (v11+) o como lista
+        if isinstance(counters, list):
+            counters = counters[0] if counters else None
+        return self._organization_usage(org, counters, organization_id)
+    
+    def _organization_usage(
+        self,
+        org: Dict[str, Any],
+        counters: Optional[Dict[str, Any]],
+        organization_id: Union[str, UUID]
+    ) -> Dict[str, Any]:
+        plan_tier = org.get('plan_tier') or 'free'
+        plan_limits = get_plan_limits(plan_tier)
+        current_period = current_usage_period()
+        
+        if counters is None:
+            # Sin fila de contadores (migración 017 no aplicada o aún sin reconciliar)
+            members_count, rfx_count = self._count_organization_usage(organization_id, current_period)
+        else:
+            members_count = int(counters.get('members_count') or 0)
+            rfx_count = int(counters.get('rfx_count') or 0) if str(counters.get('rfx_period')) == current_period else 0
+        
+        return {
+            'plan_tier': plan_tier,
+            'members_count': members_count,
+            'rfx_count': rfx_count,
+            'limits': {
+                # Columnas de la organización tienen prioridad (overrides por org)
+                'users': org.get('max_users') or plan_limits['users'],
+                'rfx_monthly': org.get('max_rfx_per_month') or plan_limits['rfx_monthly'],
+            }
+        }
+    
+    def _count_organization_usage(self, organization_id: Union[str, UUID], period: str) -> tuple:
+        """Conteo histórico con count(exact) — fallback sin contadores."""
+        users = self.client.table("users")\
+            .select("id", count="exact")\
+            .eq("organization_id", str(organization_id))\
+            .execute()
+        rfx = self.client.table("rfx_v2")\
+            .select("id", count="exact")\
+            .eq("organization_id", str(organization_id))\
+            .gte("created_at", period)\
+            .execute()
+        return users.count or 0, rfx.count or 0
+    
     def get_organization_members(self, organization_id: Union[str, UUID]) -> List[Dict[str, Any]]:
         """
         Obtener todos los miembros de una organización.
@@ -1828,6 +2178,7 @@ class DatabaseClient:
                 .execute()
             
             if response.data:
+                self.invalidate_organization_usage(organization_id)
                 logger.info(f"✅ Organization updated: {organization_id}")
                 return response.data[0]
             return None
@@ -1894,6 +2245,8 @@ class DatabaseClient:
                 .execute()
             
             if response.data:
+                # La organización previa no viene en la respuesta: invalidar todo el uso cacheado
+                self.invalidate_organization_usage()
                 logger.info(f"✅ User removed from organization (now has personal plan): {user_id}")
                 return True
             return False
@@ -2135,6 +2488,6 @@ def get_database_client() -> DatabaseClient:
 
 
 # Alias for backward compatibility
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     """Get raw Supabase client (for backward compatibility)"""
     return get_database_client().client
@@ -16,6 +16,7 @@ Sigue principio KISS: simple, fácil de modificar, sin overengineering.
 
 from typing import Dict, Optional
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 
 @dataclass
@@ -168,6 +169,26 @@ def get_plan(tier: str) -> Optional[SubscriptionPlan]:
     return PLANS.get(tier.lower())
 
 
+@lru_cache(maxsize=32)
+def get_plan_limits(tier: Optional[str]) -> Dict[str, int]:
+    """
+    Límites de un plan ('users', 'rfx_monthly'), cacheados por tier.
+
+    Tiers desconocidos o vacíos retornan los límites históricos por defecto
+    (2 usuarios, 10 RFX/mes). El diccionario es compartido: no mutarlo.
+    
+    Args:
+        tier: Plan tier
+    
+    Returns:
+        Diccionario {'users': int, 'rfx_monthly': int}
+    """
+    plan = get_plan(tier or 'free')
+    if not plan:
+        return {'users': 2, 'rfx_monthly': 10}
+    return {'users': plan.max_users, 'rfx_monthly': plan.max_rfx_per_month}
+
+
 def get_all_plans() -> list:
     """
     Obtener todos los planes disponibles.
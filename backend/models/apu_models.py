@@ -208,6 +208,8 @@ class APUGenerateRequest(BaseModel):
     )
     pct_utilidad: Optional[float] = Field(None, ge=0, le=1)
     pct_sobre_costo_labor: Optional[float] = Field(None, ge=0, le=20)
+    # True = ignore cached LLM batch outputs and call the model again
+    regenerate: bool = False
 
     @property
     def pct_costos_indirectos(self) -> Optional[float]:
@@ -338,29 +338,17 @@ class AgentOrchestrator:
         ✅ MIGRADO A CLOUDINARY: Ya no busca en filesystem local
         """
         try:
-            from backend.core.database import get_database_client
+            from backend.services.user_branding_service import user_branding_service
             
-            # Obtener URL de Cloudinary desde BD
-            db = get_database_client()
-            response = db.client.table("company_branding_assets")\
-                .select("logo_url")\
-                .eq("user_id", user_id)\
-                .eq("is_active", True)\
-                .execute()
+            # Branding cacheado por usuario: sin query adicional por propuesta
+            logo_url = user_branding_service.get_logo_url(user_id)
             
-            if not response.data or not response.data[0].get('logo_url'):
+            if not logo_url:
                 logger.warning(f"⚠️ No Cloudinary logo URL found for user: {user_id}")
                 return None
             
-            logo_url = response.data[0]['logo_url']
-            
-            # Verificar que sea URL pública de Cloudinary
-            if logo_url and logo_url.startswith('http'):
-                logger.info(f"☁️ Cloudinary logo URL retrieved: {logo_url}")
-                return logo_url
-            else:
-                logger.warning(f"⚠️ Invalid logo URL format: {logo_url}")
-                return None
+            logger.info(f"☁️ Cloudinary logo URL retrieved: {logo_url}")
+            return logo_url
             
         except Exception as e:
             logger.error(f"❌ Error getting Cloudinary logo URL: {e}")
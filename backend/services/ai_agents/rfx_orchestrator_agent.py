@@ -11,7 +11,7 @@ import json
 import logging
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 
 from backend.prompts.rfx_orchestrator_system_prompt import RFX_ORCHESTRATOR_SYSTEM_PROMPT
 from backend.services.tools.search_catalog_variants_tool import search_catalog_variants_tool
@@ -22,6 +22,8 @@ from backend.services.tools.resolve_complex_bundle_tool import resolve_complex_b
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class RFXOrchestratorAgent:
     """LLM orchestrator for product matching and pricing."""
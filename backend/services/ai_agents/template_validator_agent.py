@@ -9,12 +9,14 @@ import logging
 import asyncio
 import json
 from typing import Dict, Any
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 
 from backend.core.config import get_openai_config
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class TemplateValidatorAgent:
     """
@@ -23,10 +25,17 @@ class TemplateValidatorAgent:
     
     def __init__(self):
         self.openai_config = get_openai_config()
-        self.client = OpenAI(
-            api_key=self.openai_config.api_key,
-            max_retries=0  # Desactivar reintentos automáticos del SDK
-        )
+        self._client = None
+
+    @property
+    def client(self):
+        """Cliente OpenAI creado en el primer uso (el singleton se instancia al importar)"""
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=self.openai_config.api_key,
+                max_retries=0  # Desactivar reintentos automáticos del SDK
+            )
+        return self._client
     
     async def validate(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
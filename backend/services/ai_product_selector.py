@@ -15,10 +15,12 @@ Ejemplo:
 """
 import logging
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class AIProductSelector:
     """
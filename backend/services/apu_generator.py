@@ -17,19 +17,21 @@ Why this is NOT a copy of proposal_generator._call_ai:
 """
 from __future__ import annotations
 
+import hashlib
 import io
 import json
 import logging
+import os
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import copy
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from pydantic import ValidationError
 
 from backend.core.config import get_openai_config
@@ -45,9 +47,23 @@ from backend.models.apu_models import (
     APUProductInput,
     APUResult,
 )
+from backend.services.rfx_pipeline_checkpoints import RFXPipelineCheckpointStore
+from backend.utils.lazy_import import lazy_attr
 
 logger = logging.getLogger(__name__)
 
+# openpyxl solo se usa al construir el Excel
+Workbook = lazy_attr("openpyxl", "Workbook")
+load_workbook = lazy_attr("openpyxl", "load_workbook")
+XLImage = lazy_attr("openpyxl.drawing.image", "Image")
+Alignment = lazy_attr("openpyxl.styles", "Alignment")
+Border = lazy_attr("openpyxl.styles", "Border")
+Font = lazy_attr("openpyxl.styles", "Font")
+PatternFill = lazy_attr("openpyxl.styles", "PatternFill")
+Side = lazy_attr("openpyxl.styles", "Side")
+Cell = lazy_attr("openpyxl.cell.cell", "Cell")
+StyleArray = lazy_attr("openpyxl.styles.cell_style", "StyleArray")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Constants
@@ -61,9 +77,19 @@ LLM_TOP_P = 1.0
 LLM_MAX_TOKENS = 16000  # gpt-4o ceiling; 30 partidas with full breakdowns can run ~14k chars
 LLM_MAX_ATTEMPTS = 2  # first try + 1 retry
 LLM_MAX_PRODUCTS_PER_BATCH = 6  # keep Chevron-sized outputs comfortably below truncation
+# Batches are independent LLM calls; run them in parallel, bounded to stay under rate limits
+LLM_MAX_CONCURRENT_BATCHES = max(1, int(os.getenv("APU_LLM_MAX_CONCURRENT_BATCHES", "4")))
 
 STORAGE_BUCKET = "apu-exports"
 
+# Validated APUOutput per LLM batch. temperature=0 + same input/prompt/model is
+# treated as reproducible, so unchanged batches skip the LLM on re-export.
+APU_OUTPUT_CACHE_STAGE = "apu_batch_output"
+apu_output_cache = RFXPipelineCheckpointStore(
+    ttl_seconds=float(os.getenv("APU_OUTPUT_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    enabled=os.getenv("APU_OUTPUT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"},
+)
+
 
 # Excel style palette (mirrors the branding section in apu_construction_ve.md)
 COLOR_HEADER_BG = "1F4E79"        # Azul acero
@@ -76,6 +102,9 @@ COLOR_WHITE_TEXT = "FFFFFF"
 FONT_NAME = "Arial"
 
 
+_OPENAI_CLIENT_LOCK = threading.Lock()
+
+
 class APUGenerationError(RuntimeError):
     """Raised when the APU pipeline cannot produce a valid output."""
 
@@ -104,6 +133,7 @@ class APUGeneratorService:
         pct_costos_indirectos: Optional[float] = None,
         pct_utilidad: Optional[float] = None,
         pct_sobre_costo_labor: Optional[float] = None,
+        use_cache: bool = True,
     ) -> APUResult:
         """Run the full pipeline. Raises APUGenerationError on failure.
 
@@ -113,6 +143,8 @@ class APUGeneratorService:
             pct_utilidad → fraction in [0,1] (None = 0.10 default)
             pct_sobre_costo_labor → labor social factor as fraction over base
                                      cost (e.g. 6.6091 = 660.91%)
+            use_cache → reuse validated batch outputs for unchanged input;
+                        False forces a fresh LLM run (results are re-cached)
         """
         started_at = time.time()
         logger.info("APU generation started for rfx_id=%s", rfx_id)
@@ -133,7 +165,9 @@ class APUGeneratorService:
                 f"RFX {rfx_id} has no products. Cannot generate APU."
             )
 
-        output, attempts = self._call_llm_batched_with_validation(apu_input)
+        output, attempts = self._call_llm_batched_with_validation(
+            apu_input, use_cache=use_cache
+        )
 
         excel_bytes = _APUExcelBuilder(output).build()
         excel_url, storage_path = self._persist(rfx_id, excel_bytes)
@@ -340,46 +374,121 @@ class APUGeneratorService:
             f"Last error: {last_error}"
         )
 
+    def _output_cache_key(self, batch_input: APUInput) -> str:
+        prompt_hash = hashlib.sha256(self._prompt_text.encode("utf-8")).hexdigest()
+        return apu_output_cache.fingerprint(
+            APU_OUTPUT_CACHE_STAGE,
+            PROMPT_VERSION,
+            prompt_hash,
+            self.openai_config.model,
+            LLM_TEMPERATURE,
+            LLM_TOP_P,
+            batch_input.model_dump(mode="json"),
+        )
+
+    def _call_llm_batch_cached(
+        self,
+        batch_input: APUInput,
+        use_cache: bool = True,
+    ) -> Tuple[APUOutput, int]:
+        """_call_llm_with_validation behind the per-batch output cache.
+
+        A hit returns the stored (already validated) output with 0 attempts.
+        """
+        cache_key = self._output_cache_key(batch_input)
+        if use_cache:
+            cached = apu_output_cache.get(APU_OUTPUT_CACHE_STAGE, cache_key)
+            if cached is not None:
+                try:
+                    output = APUOutput.model_validate(cached)
+                    self._assert_invariants(output)
+                    return output, 0
+                except (ValidationError, APUGenerationError) as e:
+                    logger.warning("Ignoring invalid cached APU batch output: %s", e)
+
+        output, attempts = self._call_llm_with_validation(batch_input)
+        apu_output_cache.put(APU_OUTPUT_CACHE_STAGE, cache_key, output.model_dump(mode="json"))
+        return output, attempts
+
     def _call_llm_batched_with_validation(
         self,
         apu_input: APUInput,
+        use_cache: bool = True,
     ) -> Tuple[APUOutput, int]:
         """Generate APU output in product batches to avoid truncated JSON.
 
         The model remains the "brain" of the system, but we stop asking it to
         serialize 30 Chevron-style partidas in one response. Each batch is
         validated independently, then merged into one canonical APUOutput.
+
+        Batches run concurrently (up to LLM_MAX_CONCURRENT_BATCHES), each with
+        its own retry loop, so wall time is close to the slowest batch. Results
+        are merged in batch order regardless of completion order. The first
+        failed batch fails the whole APU: batches not yet started are cancelled
+        and the ones already running are not waited for.
+
+        Each batch is looked up in apu_output_cache first, so changing one
+        product only regenerates its batch; fully cached runs report 0 attempts.
         """
         batches = self._chunk_apu_input(apu_input)
         if len(batches) == 1:
-            return self._call_llm_with_validation(apu_input)
+            return self._call_llm_batch_cached(apu_input, use_cache=use_cache)
 
+        workers = min(LLM_MAX_CONCURRENT_BATCHES, len(batches))
         logger.info(
-            "APU generation split into %d LLM batches for rfx_id=%s (%d products)",
+            "APU generation split into %d LLM batches for rfx_id=%s (%d products, %d concurrent)",
             len(batches),
             apu_input.rfx_id,
             len(apu_input.products),
+            workers,
         )
 
+        results: List[Optional[Tuple[APUOutput, int]]] = [None] * len(batches)
+        completed = 0
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="apu-llm-batch")
+        try:
+            futures = {
+                executor.submit(self._call_llm_batch_cached, batch_input, use_cache): batch_idx
+                for batch_idx, batch_input in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                batch_idx = futures[future]
+                completed += 1
+                try:
+                    results[batch_idx] = future.result()
+                except Exception as e:
+                    cancelled = sum(1 for pending in futures if pending.cancel())
+                    logger.warning(
+                        "APU batch %d/%d failed for rfx_id=%s, cancelled %d pending batches: %s",
+                        batch_idx + 1, len(batches), apu_input.rfx_id, cancelled, e,
+                    )
+                    raise APUGenerationError(
+                        f"APU batch {batch_idx + 1} of {len(batches)} failed: {e}"
+                    ) from e
+                logger.info(
+                    "APU batch %d/%d done for rfx_id=%s (%d products, %d attempts) [%d/%d complete]",
+                    batch_idx + 1,
+                    len(batches),
+                    apu_input.rfx_id,
+                    len(batches[batch_idx].products),
+                    results[batch_idx][1],
+                    completed,
+                    len(batches),
+                )
+        finally:
+            # On failure do not wait for batches still running; their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+
         merged_partidas: List[APUPartida] = []
         merged_warnings: List[str] = []
         total_attempts = 0
         first_output: Optional[APUOutput] = None
 
-        for batch_idx, batch_input in enumerate(batches, start=1):
-            logger.info(
-                "APU batch %d/%d for rfx_id=%s (%d products)",
-                batch_idx,
-                len(batches),
-                batch_input.rfx_id,
-                len(batch_input.products),
-            )
-            batch_output, batch_attempts = self._call_llm_with_validation(batch_input)
+        for batch_output, batch_attempts in results:
             total_attempts += batch_attempts
-
             if first_output is None:
                 first_output = batch_output
-
             merged_partidas.extend(batch_output.partidas)
             merged_warnings.extend(batch_output.warnings)
 
@@ -488,11 +597,14 @@ class APUGeneratorService:
 
     def _get_openai_client(self):
         if self.openai_client is None:
-            from openai import OpenAI
-            self.openai_client = OpenAI(
-                api_key=self.openai_config.api_key,
-                max_retries=0,
-            )
+            # Batches run in threads; build a single shared (thread-safe) client
+            with _OPENAI_CLIENT_LOCK:
+                if self.openai_client is None:
+                    from openai import OpenAI
+                    self.openai_client = OpenAI(
+                        api_key=self.openai_config.api_key,
+                        max_retries=0,
+                    )
         return self.openai_client
 
     def _summarize_validation_errors(self, err: ValidationError) -> str:
@@ -674,10 +786,111 @@ CHEVRON_ROW_HEIGHTS = {
 }
 
 
+# cell attribute → (workbook shared table, StyleArray field)
+_STYLE_TABLES = {
+    "font": ("_fonts", "fontId"),
+    "fill": ("_fills", "fillId"),
+    "border": ("_borders", "borderId"),
+    "alignment": ("_alignments", "alignmentId"),
+}
+
+
+class _TemplateStamp:
+    """Chevron template layout resolved once per build against the target workbook.
+
+    Captured from the first sheet cloned with `_copy_template_cells`: cell values
+    and their StyleArray (indices into the workbook's shared font/fill/border/
+    number-format tables), plus dimensions, merged ranges and print setup.
+    `apply` stamps another sheet by reusing those indices, so no style object is
+    copied, hashed or looked up again.
+    """
+
+    def __init__(self) -> None:
+        self.column_dimensions: List[Tuple[str, Any, Any, Any]] = []
+        self.row_dimensions: List[Tuple[int, Any, Any]] = []
+        self.merged_ranges: List[str] = []
+        self.cells: List[Tuple[int, int, Any, Any]] = []
+        self.sheet_settings: Dict[str, Any] = {}
+
+    @classmethod
+    def capture(cls, src, stamped_ws) -> "_TemplateStamp":
+        stamp = cls()
+        stamp.column_dimensions = [
+            (col, dim.width, dim.hidden, dim.bestFit)
+            for col, dim in src.column_dimensions.items()
+        ]
+        stamp.row_dimensions = [
+            (row_idx, dim.height, dim.hidden)
+            for row_idx, dim in src.row_dimensions.items()
+        ]
+        stamp.merged_ranges = [str(merge_ref) for merge_ref in src.merged_cells.ranges]
+
+        stamped_cells = stamped_ws._cells
+        for row in range(1, src.max_row + 1):
+            for col in range(1, src.max_column + 1):
+                src_cell = src.cell(row=row, column=col)
+                stamp.cells.append(
+                    (row, col, src_cell.value, copy(stamped_cells[(row, col)]._style))
+                )
+
+        stamp.sheet_settings = {
+            "view": src.sheet_view.view,
+            "showGridLines": src.sheet_view.showGridLines,
+            "page_margins": copy(src.page_margins),
+            "page_setup": copy(src.page_setup),
+            "print_options": copy(src.print_options),
+            "sheet_properties": copy(src.sheet_properties),
+            "print_title_cols": src.print_title_cols,
+            "print_title_rows": src.print_title_rows,
+            "freeze_panes": src.freeze_panes,
+            "print_area": src.print_area,
+        }
+        return stamp
+
+    def apply(self, ws) -> None:
+        for col, width, hidden, best_fit in self.column_dimensions:
+            dst_dim = ws.column_dimensions[col]
+            dst_dim.width = width
+            dst_dim.hidden = hidden
+            dst_dim.bestFit = best_fit
+
+        for row_idx, height, hidden in self.row_dimensions:
+            dst_dim = ws.row_dimensions[row_idx]
+            dst_dim.height = height
+            dst_dim.hidden = hidden
+
+        for merge_ref in self.merged_ranges:
+            ws.merge_cells(merge_ref)
+
+        cells = ws._cells
+        for row, col, value, style in self.cells:
+            cell = cells.get((row, col))
+            if cell is None:
+                cells[(row, col)] = Cell(ws, row=row, column=col, value=value, style_array=style)
+                continue
+            # Cells already created by merge_cells (top-left / MergedCell)
+            if value is not None:
+                cell.value = value
+            cell._style = copy(style)
+
+        settings = self.sheet_settings
+        ws.sheet_view.view = settings["view"]
+        ws.sheet_view.showGridLines = settings["showGridLines"]
+        ws.page_margins = copy(settings["page_margins"])
+        ws.page_setup = copy(settings["page_setup"])
+        ws.print_options = copy(settings["print_options"])
+        ws.sheet_properties = copy(settings["sheet_properties"])
+        ws.print_title_cols = settings["print_title_cols"]
+        ws.print_title_rows = settings["print_title_rows"]
+        ws.freeze_panes = settings["freeze_panes"]
+        if settings["print_area"]:
+            ws.print_area = settings["print_area"]
+
+
 class _APUExcelBuilder:
     """Builds a Chevron-style workbook while preserving the current pipeline."""
 
-    def __init__(self, output: APUOutput) -> None:
+    def __init__(self, output: APUOutput, use_template_stamp: bool = True) -> None:
         self.output = output
         self.wb = Workbook()
         self.summary_ws = self.wb.active
@@ -685,6 +898,11 @@ class _APUExcelBuilder:
         self._logo_bytes = _load_default_logo_bytes()
         self._template_wb = self._load_chevron_template()
         self._template_ws = self._template_wb[self._template_wb.sheetnames[0]]
+        # False = per-cell style copy on every sheet (reference path for benchmarks)
+        self._use_template_stamp = use_template_stamp
+        self._template_stamp: Optional[_TemplateStamp] = None
+        self._template_images: Optional[List[Tuple[bytes, Any, Any, str]]] = None
+        self._style_ids: Dict[Tuple[str, int], int] = {}
 
     def build(self) -> bytes:
         sheet_specs: List[Tuple[str, APUPartida]] = []
@@ -713,6 +931,21 @@ class _APUExcelBuilder:
         self._write_partida_totals(ws, partida)
 
     def _clone_template_sheet(self, ws) -> None:
+        if not self._use_template_stamp:
+            self._copy_template_cells(ws)
+        elif self._template_stamp is None:
+            # First sheet goes through the per-cell copy; its styles are now in
+            # the workbook's shared style table and are reused for every other sheet.
+            self._copy_template_cells(ws)
+            self._template_stamp = _TemplateStamp.capture(self._template_ws, ws)
+        else:
+            self._template_stamp.apply(ws)
+
+        self._add_template_logo(ws)
+        ws.sheet_view.view = "normal"
+
+    def _copy_template_cells(self, ws) -> None:
+        """Reference clone: copies every template cell and style object into ws."""
         src = self._template_ws
 
         for col, src_dim in src.column_dimensions.items():
@@ -764,19 +997,28 @@ class _APUExcelBuilder:
         if src.print_area:
             ws.print_area = src.print_area
 
-        self._add_template_logo(ws)
-        ws.sheet_view.view = "normal"
+    def _load_template_images(self) -> List[Tuple[bytes, Any, Any, str]]:
+        # Image._data() closes the source stream, so read each image once per build
+        if self._template_images is None:
+            self._template_images = []
+            for src_image in getattr(self._template_ws, "_images", None) or []:
+                try:
+                    anchor = src_image.anchor._from
+                    coord = f"{chr(65 + anchor.col)}{anchor.row + 1}"
+                    self._template_images.append(
+                        (src_image._data(), src_image.width, src_image.height, coord)
+                    )
+                except Exception as e:
+                    logger.warning("Could not read template image: %s", e)
+        return self._template_images
 
     def _add_template_logo(self, ws) -> None:
         if getattr(self._template_ws, "_images", None):
-            for src_image in self._template_ws._images:
+            for image_bytes, width, height, coord in self._load_template_images():
                 try:
-                    image_bytes = src_image._data()
                     image = XLImage(io.BytesIO(image_bytes))
-                    image.width = src_image.width
-                    image.height = src_image.height
-                    anchor = src_image.anchor._from
-                    coord = f"{chr(65 + anchor.col)}{anchor.row + 1}"
+                    image.width = width
+                    image.height = height
                     ws.add_image(image, coord)
                 except Exception as e:
                     logger.warning(
@@ -818,32 +1060,32 @@ class _APUExcelBuilder:
         self._set_text(ws, "A7", "Descripción de la Partida:", font_size=10)
         description_cell = ws["A8"]
         description_cell.value = partida.descripcion
-        description_cell.font = Font(name=FONT_NAME, size=11)
-        description_cell.alignment = Alignment(
-            horizontal="left",
-            vertical="top",
-            wrap_text=True,
+        self._set_style(description_cell, "font", _font(size=11))
+        self._set_style(
+            description_cell,
+            "alignment",
+            _alignment(horizontal="left", vertical="top", wrap_text=True),
         )
 
         qty_cell = ws["E7"]
         qty_cell.value = partida.cantidad_obra
         qty_cell.number_format = "#,##0.00"
-        qty_cell.font = Font(name=FONT_NAME, size=11, bold=True)
-        qty_cell.alignment = Alignment(horizontal="center")
-        qty_cell.border = _thin_border()
+        self._set_style(qty_cell, "font", _font(size=11, bold=True))
+        self._set_style(qty_cell, "alignment", _alignment(horizontal="center"))
+        self._set_style(qty_cell, "border", _thin_border())
 
         unit_cell = ws["F7"]
         unit_cell.value = partida.unidad
-        unit_cell.font = Font(name=FONT_NAME, size=11, bold=True)
-        unit_cell.alignment = Alignment(horizontal="center")
-        unit_cell.border = _thin_border()
+        self._set_style(unit_cell, "font", _font(size=11, bold=True))
+        self._set_style(unit_cell, "alignment", _alignment(horizontal="center"))
+        self._set_style(unit_cell, "border", _thin_border())
 
         rendimiento_cell = ws["G7"]
         rendimiento_cell.value = partida.rendimiento_und_dia
         rendimiento_cell.number_format = "#,##0.00000"
-        rendimiento_cell.font = Font(name=FONT_NAME, size=11, bold=True)
-        rendimiento_cell.alignment = Alignment(horizontal="center")
-        rendimiento_cell.border = _thin_border()
+        self._set_style(rendimiento_cell, "font", _font(size=11, bold=True))
+        self._set_style(rendimiento_cell, "alignment", _alignment(horizontal="center"))
+        self._set_style(rendimiento_cell, "border", _thin_border())
 
     def _write_materiales(self, ws, partida: APUPartida) -> None:
         items = [self._coerce_material(item) for item in partida.materiales]
@@ -863,7 +1105,7 @@ class _APUExcelBuilder:
 
         for index, row_num in enumerate(CHEVRON_MATERIAL_ROWS, start=1):
             ws[f"A{row_num}"] = index
-            ws[f"A{row_num}"].alignment = Alignment(horizontal="center")
+            self._set_style(ws[f"A{row_num}"], "alignment", _alignment(horizontal="center"))
 
             item = items[index - 1] if index <= len(items) else None
             if item:
@@ -888,12 +1130,12 @@ class _APUExcelBuilder:
             ws[f"I{row_num}"].number_format = "#,##0.00"
 
             for col in "ABCDEFG":
-                ws[f"{col}{row_num}"].border = _thin_border()
+                self._set_style(ws[f"{col}{row_num}"], "border", _thin_border())
 
         self._set_text(ws, "F21", "Total Materiales:", bold=True, font_size=11, align="right")
         ws["G21"] = "=+SUM(G12:G20)"
         ws["G21"].number_format = "#,##0.00"
-        ws["G21"].border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"))
+        self._set_style(ws["G21"], "border", _open_bottom_border())
 
         self._set_text(
             ws,
@@ -905,7 +1147,7 @@ class _APUExcelBuilder:
         )
         ws["G22"] = "=+G21"
         ws["G22"].number_format = "#,##0.00"
-        ws["G22"].border = _medium_border()
+        self._set_style(ws["G22"], "border", _medium_border())
 
     def _write_equipos(self, ws, partida: APUPartida) -> None:
         items = [self._coerce_equipo(item) for item in partida.equipos]
@@ -924,7 +1166,7 @@ class _APUExcelBuilder:
 
         for index, row_num in enumerate(CHEVRON_EQUIPO_ROWS, start=1):
             ws[f"A{row_num}"] = index
-            ws[f"A{row_num}"].alignment = Alignment(horizontal="center")
+            self._set_style(ws[f"A{row_num}"], "alignment", _alignment(horizontal="center"))
 
             item = items[index - 1] if index <= len(items) else None
             if item:
@@ -948,12 +1190,12 @@ class _APUExcelBuilder:
             ws[f"I{row_num}"].number_format = "#,##0.00"
 
             for col in "ABCDEFG":
-                ws[f"{col}{row_num}"].border = _thin_border()
+                self._set_style(ws[f"{col}{row_num}"], "border", _thin_border())
 
         self._set_text(ws, "F34", "Total Equipos:", bold=True, font_size=11, align="right")
         ws["G34"] = "=SUM(G25:G33)"
         ws["G34"].number_format = "#,##0.00"
-        ws["G34"].border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"))
+        self._set_style(ws["G34"], "border", _open_bottom_border())
 
         self._set_text(
             ws,
@@ -965,7 +1207,7 @@ class _APUExcelBuilder:
         )
         ws["G35"] = "=(G34/$G$7)"
         ws["G35"].number_format = "#,##0.00"
-        ws["G35"].border = _medium_border()
+        self._set_style(ws["G35"], "border", _medium_border())
 
     def _write_mano_obra(self, ws, partida: APUPartida) -> None:
         items = [self._coerce_mano_obra(item) for item in partida.mano_obra]
@@ -984,7 +1226,7 @@ class _APUExcelBuilder:
 
         for index, row_num in enumerate(CHEVRON_MO_ROWS, start=1):
             ws[f"A{row_num}"] = index
-            ws[f"A{row_num}"].alignment = Alignment(horizontal="center")
+            self._set_style(ws[f"A{row_num}"], "alignment", _alignment(horizontal="center"))
 
             item = items[index - 1] if index <= len(items) else None
             if item:
@@ -1006,18 +1248,18 @@ class _APUExcelBuilder:
             ws[f"G{row_num}"].number_format = "#,##0.00"
 
             for col in "ABCDEFG":
-                ws[f"{col}{row_num}"].border = _thin_border()
+                self._set_style(ws[f"{col}{row_num}"], "border", _thin_border())
 
         ws["D47"] = "=SUM(D38:D46)"
         ws["D47"].number_format = "0.00"
-        ws["D47"].font = Font(name=FONT_NAME, size=11, bold=True)
-        ws["D47"].alignment = Alignment(horizontal="center")
+        self._set_style(ws["D47"], "font", _font(size=11, bold=True))
+        self._set_style(ws["D47"], "alignment", _alignment(horizontal="center"))
         self._set_text(ws, "E47", "Sub-total mano de obra:", font_size=11, align="right")
         ws["G47"] = "=+SUM(G38:G46)"
         ws["G47"].number_format = "#,##0.00"
-        ws["G47"].font = Font(name=FONT_NAME, size=11, bold=True)
-        ws["G47"].alignment = Alignment(horizontal="right")
-        ws["G47"].border = _thin_border()
+        self._set_style(ws["G47"], "font", _font(size=11, bold=True))
+        self._set_style(ws["G47"], "alignment", _alignment(horizontal="right"))
+        self._set_style(ws["G47"], "border", _thin_border())
 
         self._set_text(ws, "F48", "Sub-total labor(%):", font_size=11, align="right")
         self._set_number(
@@ -1029,18 +1271,18 @@ class _APUExcelBuilder:
             bold=True,
             align="center",
         )
-        ws["G48"].border = _thin_border()
+        self._set_style(ws["G48"], "border", _thin_border())
 
         self._set_text(ws, "E49", "Sobre costo de Labor:", font_size=11, align="right")
         ws["G49"] = "=+G47*G48"
         ws["G49"].number_format = "#,##0.00"
-        ws["G49"].alignment = Alignment(horizontal="center")
-        ws["G49"].border = _thin_border()
+        self._set_style(ws["G49"], "alignment", _alignment(horizontal="center"))
+        self._set_style(ws["G49"], "border", _thin_border())
 
         self._set_text(ws, "F50", "Total Mano de Obra:", font_size=11, align="right")
         ws["G50"] = "=+G47+G49"
         ws["G50"].number_format = "#,##0.00"
-        ws["G50"].border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"))
+        self._set_style(ws["G50"], "border", _open_bottom_border())
 
         self._set_text(
             ws,
@@ -1052,8 +1294,8 @@ class _APUExcelBuilder:
         )
         ws["G51"] = "=+G50/$G$7"
         ws["G51"].number_format = "#,##0.00"
-        ws["G51"].font = Font(name=FONT_NAME, size=11, bold=True)
-        ws["G51"].border = _medium_border()
+        self._set_style(ws["G51"], "font", _font(size=11, bold=True))
+        self._set_style(ws["G51"], "border", _medium_border())
 
     def _write_partida_totals(self, ws, partida: APUPartida) -> None:
         self._set_text(ws, "A52", "HH Totales:", font_size=11)
@@ -1067,36 +1309,36 @@ class _APUExcelBuilder:
         self._set_text(ws, "F53", "Costo Directo por Unidad:", bold=True, font_size=11, align="right")
         ws["G53"] = "=+G51+G35+G22"
         ws["G53"].number_format = "#,##0.00"
-        ws["G53"].border = _thin_border()
+        self._set_style(ws["G53"], "border", _thin_border())
 
         self._set_number(ws, "D54", self.output.pct_admin_gg, "0%", editable=True)
         self._set_text(ws, "F54", " Administración y Gastos Gener.:", font_size=11, align="right")
         ws["G54"] = "=+G53*D54"
         ws["G54"].number_format = "#,##0.00"
-        ws["G54"].border = _thin_border()
+        self._set_style(ws["G54"], "border", _thin_border())
 
         self._set_text(ws, "F55", "Sub-Total:", font_size=11, align="right")
         ws["G55"] = "=+G53+G54"
         ws["G55"].number_format = "#,##0.00"
-        ws["G55"].border = _thin_border()
+        self._set_style(ws["G55"], "border", _thin_border())
 
         self._set_number(ws, "E56", self.output.pct_utilidad, "0%", editable=True)
         self._set_text(ws, "F56", "Utilidad e Impr.:", font_size=11, align="right")
         ws["G56"] = "=+G55*E56"
         ws["G56"].number_format = "#,##0.00"
-        ws["G56"].border = _thin_border()
+        self._set_style(ws["G56"], "border", _thin_border())
 
         self._set_text(ws, "F57", "Sub-Total:", font_size=11, align="right")
         ws["G57"] = "=+G55+G56"
         ws["G57"].number_format = "#,##0.00"
-        ws["G57"].border = _thin_border()
+        self._set_style(ws["G57"], "border", _thin_border())
 
         self._set_text(ws, "F58", "PRECIO UNITARIO $.", bold=True, font_size=11, align="right")
         ws["G58"] = "=+G57"
         ws["G58"].number_format = "#,##0.00"
-        ws["G58"].font = Font(name=FONT_NAME, size=12, bold=True)
-        ws["G58"].alignment = Alignment(horizontal="center")
-        ws["G58"].border = _thin_border()
+        self._set_style(ws["G58"], "font", _font(size=12, bold=True))
+        self._set_style(ws["G58"], "alignment", _alignment(horizontal="center"))
+        self._set_style(ws["G58"], "border", _thin_border())
 
     def _write_summary_sheet(self, sheet_specs: List[Tuple[str, APUPartida]]) -> None:
         ws = self.summary_ws
@@ -1165,7 +1407,7 @@ class _APUExcelBuilder:
             ws[f"G{row}"] = f"=F{row}*$B$6"
             ws[f"G{row}"].number_format = "#,##0.00"
             for col in "ABCDEFG":
-                ws[f"{col}{row}"].border = _thin_border()
+                self._set_style(ws[f"{col}{row}"], "border", _thin_border())
             row += 1
 
         self._set_text(ws, f"E{row}", "TOTAL", bold=True, align="right")
@@ -1174,8 +1416,8 @@ class _APUExcelBuilder:
         ws[f"G{row}"] = f"=SUM(G11:G{row - 1})"
         ws[f"G{row}"].number_format = "#,##0.00"
         for col in "EFG":
-            ws[f"{col}{row}"].font = Font(name=FONT_NAME, bold=True)
-            ws[f"{col}{row}"].border = _medium_border()
+            self._set_style(ws[f"{col}{row}"], "font", _font(bold=True))
+            self._set_style(ws[f"{col}{row}"], "border", _medium_border())
 
         if self.output.warnings:
             row += 2
@@ -1272,12 +1514,29 @@ class _APUExcelBuilder:
             "es_precio_estimado": item.es_precio_estimado,
         }
 
+    def _set_style(self, cell, attr: str, style) -> None:
+        """Equivalent to `setattr(cell, attr, style)` for font/fill/border/alignment.
+
+        openpyxl hashes and compares the style against the workbook's shared
+        table on every assignment; here the table index is resolved once per
+        (attr, shared style instance) and written straight into the StyleArray.
+        """
+        key = (attr, id(style))
+        style_id = self._style_ids.get(key)
+        if style_id is None:
+            collection, _ = _STYLE_TABLES[attr]
+            style_id = getattr(self.wb, collection).add(style)
+            self._style_ids[key] = style_id
+        if not cell._style:
+            cell._style = StyleArray()
+        setattr(cell._style, _STYLE_TABLES[attr][1], style_id)
+
     def _set_header_cell(self, ws, coord: str, value: str) -> None:
         cell = ws[coord]
         cell.value = value
-        cell.font = Font(name=FONT_NAME, size=11, bold=True)
-        cell.alignment = Alignment(horizontal="center")
-        cell.border = _thin_border()
+        self._set_style(cell, "font", _font(size=11, bold=True))
+        self._set_style(cell, "alignment", _alignment(horizontal="center"))
+        self._set_style(cell, "border", _thin_border())
 
     def _set_text(
         self,
@@ -1291,9 +1550,9 @@ class _APUExcelBuilder:
     ) -> None:
         cell = ws[coord]
         cell.value = value
-        cell.font = Font(name=FONT_NAME, size=font_size, bold=bold)
+        self._set_style(cell, "font", _font(size=font_size, bold=bold))
         if align:
-            cell.alignment = Alignment(horizontal=align)
+            self._set_style(cell, "alignment", _alignment(horizontal=align))
 
     def _set_number(
         self,
@@ -1309,11 +1568,11 @@ class _APUExcelBuilder:
         cell = ws[coord]
         cell.value = value
         cell.number_format = fmt
-        cell.font = Font(name=FONT_NAME, size=11, bold=bold)
+        self._set_style(cell, "font", _font(size=11, bold=bold))
         if align:
-            cell.alignment = Alignment(horizontal=align)
+            self._set_style(cell, "alignment", _alignment(horizontal=align))
         if editable:
-            cell.fill = PatternFill("solid", fgColor=COLOR_EDITABLE_BG)
+            self._set_style(cell, "fill", _editable_fill())
 
     def _to_bytes(self) -> bytes:
         buf = io.BytesIO()
@@ -1326,16 +1585,46 @@ class _APUExcelBuilder:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+# Style factories return one shared instance per argument set so
+# _APUExcelBuilder._set_style can resolve each table index once per build.
+
+
+@lru_cache(maxsize=None)
+def _font(size: Optional[float] = None, bold: bool = False) -> Font:
+    return Font(name=FONT_NAME, size=size, bold=bold)
+
+
+@lru_cache(maxsize=None)
+def _alignment(
+    horizontal: Optional[str] = None,
+    vertical: Optional[str] = None,
+    wrap_text: Optional[bool] = None,
+) -> Alignment:
+    return Alignment(horizontal=horizontal, vertical=vertical, wrap_text=wrap_text)
+
+
+@lru_cache(maxsize=None)
+def _editable_fill() -> PatternFill:
+    return PatternFill("solid", fgColor=COLOR_EDITABLE_BG)
+
+
+@lru_cache(maxsize=None)
 def _thin_border() -> Border:
     side = Side(style="thin", color="CCCCCC")
     return Border(left=side, right=side, top=side, bottom=side)
 
 
+@lru_cache(maxsize=None)
 def _medium_border() -> Border:
     side = Side(style="medium", color="000000")
     return Border(left=side, right=side, top=side, bottom=side)
 
 
+@lru_cache(maxsize=None)
+def _open_bottom_border() -> Border:
+    return Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"))
+
+
 def _load_default_logo_bytes() -> Optional[bytes]:
     if not DEFAULT_LOGO_PATH.exists():
         logger.warning("APU logo file not found at %s", DEFAULT_LOGO_PATH)
@@ -11,8 +11,11 @@ import logging
 import os
 import re
 import ssl
+import threading
+import time
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, Optional
+from uuid import uuid4
 from urllib import error as urllib_error
 from urllib import request as urllib_request
 
@@ -33,6 +36,15 @@ class BCVRateError(RuntimeError):
 class BCVRateService:
     """Fetch and cache BCV USD/VES rate snapshots."""
 
+    REFRESH_LOCK_KEY = "bcv_rate:refresh_lock"
+    # Compare-and-delete so a worker never releases a lock it no longer owns.
+    _RELEASE_LOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
     # Public JSON proxies that expose BCV USD/VES — tried in order when the
     # primary provider is unreachable.
     FALLBACK_PROVIDERS: list = [
@@ -63,6 +75,24 @@ class BCVRateService:
             except ValueError:
                 logger.warning("⚠️ BCV_RATE_MANUAL_OVERRIDE is not a valid float: %s", raw_override)
 
+        # In-process snapshot cache + single-flight refresh. Requests read the
+        # cached snapshot while it is fresh; only one thread per process (and,
+        # with BCV_RATE_DISTRIBUTED_LOCK, one worker overall) hits the provider.
+        self.refresh_ahead_seconds = float(os.getenv("BCV_RATE_REFRESH_AHEAD_SECONDS", "300"))
+        self.distributed_lock_enabled = os.getenv("BCV_RATE_DISTRIBUTED_LOCK", "false").lower() == "true"
+        self.distributed_lock_ttl_seconds = int(os.getenv("BCV_RATE_LOCK_TTL_SECONDS", "30"))
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+        self._redis_client: Any = None
+        # Negative cache: after a failed provider cascade, callers get the stale
+        # snapshot (or fail fast) for the cool-down instead of queueing on
+        # `_refresh_lock` and retrying every provider with full timeouts.
+        self.failure_cooldown_seconds = float(os.getenv("BCV_RATE_FAILURE_COOLDOWN_SECONDS", "60"))
+        self._last_failure_at: Optional[float] = None
+        self._last_failure_error: Optional[str] = None
+
     def get_current_rate(
         self,
         *,
@@ -70,21 +100,147 @@ class BCVRateService:
         force_refresh: bool = False,
     ) -> Dict[str, Any]:
         """Return the current BCV snapshot, refreshing if needed."""
-        latest = self._get_latest_snapshot()
-        if latest and not force_refresh and self._is_fresh(latest):
-            return latest
+        if not force_refresh:
+            cached = self._get_cached_snapshot()
+            if cached and self._is_fresh(cached):
+                self._maybe_schedule_refresh(cached)
+                return cached
+            if self._in_failure_cooldown():
+                return self._serve_during_cooldown(cached, allow_stale=allow_stale)
+
+        with self._refresh_lock:
+            latest = None
+            if not force_refresh:
+                # Another thread may have refreshed (or failed) while this one waited.
+                cached = self._get_cached_snapshot()
+                if cached and self._is_fresh(cached):
+                    return cached
+                if self._in_failure_cooldown():
+                    return self._serve_during_cooldown(cached, allow_stale=allow_stale)
+                latest = self._get_latest_snapshot()
+                if latest and self._is_fresh(latest):
+                    self._set_cached_snapshot(latest)
+                    return latest
+            else:
+                latest = self._get_latest_snapshot()
+
+            return self._refresh_snapshot(latest, allow_stale=allow_stale)
+
+    def _refresh_snapshot(self, latest: Optional[Dict[str, Any]], *, allow_stale: bool) -> Dict[str, Any]:
+        """Fetch from the provider. Caller must hold `_refresh_lock`."""
+        lock_token = self._acquire_distributed_lock()
+        if lock_token is False:
+            # Another worker is refreshing; reuse whatever it has persisted.
+            persisted = self._get_latest_snapshot()
+            if persisted and self._is_fresh(persisted):
+                self._set_cached_snapshot(persisted)
+                return persisted
+            if latest and allow_stale and self._is_within_staleness(latest):
+                latest["is_stale"] = True
+                return latest
+            lock_token = None
 
         try:
             fetched = self._fetch_provider_snapshot()
             saved = self._save_snapshot(fetched)
+            self._set_cached_snapshot(saved)
+            self._last_failure_at = None
+            self._last_failure_error = None
             logger.info("✅ BCV rate refreshed successfully: %s", saved.get("rate"))
             return saved
         except Exception as exc:
+            self._last_failure_at = time.monotonic()
+            self._last_failure_error = str(exc)
             if latest and allow_stale and self._is_within_staleness(latest):
                 logger.warning("⚠️ BCV refresh failed, using stale snapshot: %s", exc)
                 latest["is_stale"] = True
                 return latest
             raise BCVRateError(f"Unable to resolve BCV rate: {exc}") from exc
+        finally:
+            if lock_token:
+                self._release_distributed_lock(lock_token)
+
+    def _in_failure_cooldown(self) -> bool:
+        failed_at = self._last_failure_at
+        return (
+            failed_at is not None
+            and self.failure_cooldown_seconds > 0
+            and time.monotonic() - failed_at < self.failure_cooldown_seconds
+        )
+
+    def _serve_during_cooldown(self, cached: Optional[Dict[str, Any]], *, allow_stale: bool) -> Dict[str, Any]:
+        """Stale snapshot or fast failure while the providers are cooling down."""
+        snapshot = cached or self._get_latest_snapshot()
+        if snapshot and allow_stale and self._is_within_staleness(snapshot):
+            snapshot["is_stale"] = True
+            return snapshot
+        raise BCVRateError(f"Unable to resolve BCV rate (provider cool-down): {self._last_failure_error}")
+
+    def _get_cached_snapshot(self) -> Optional[Dict[str, Any]]:
+        with self._snapshot_lock:
+            return dict(self._snapshot) if self._snapshot else None
+
+    def _set_cached_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        with self._snapshot_lock:
+            self._snapshot = dict(snapshot)
+
+    def _maybe_schedule_refresh(self, snapshot: Dict[str, Any]) -> None:
+        """Refresh in the background when the snapshot is about to expire."""
+        if self.refresh_ahead_seconds <= 0:
+            return
+        expires_at = self._expires_at(snapshot)
+        if not expires_at:
+            return
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if remaining > self.refresh_ahead_seconds:
+            return
+        with self._snapshot_lock:
+            if self._background_refresh and self._background_refresh.is_alive():
+                return
+            self._background_refresh = threading.Thread(
+                target=self._run_background_refresh,
+                name="bcv-rate-refresh",
+                daemon=True,
+            )
+            self._background_refresh.start()
+
+    def _run_background_refresh(self) -> None:
+        if self._in_failure_cooldown() or not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh_snapshot(self._get_cached_snapshot(), allow_stale=True)
+        except Exception as exc:
+            logger.warning("⚠️ Background BCV refresh failed: %s", exc)
+        finally:
+            self._refresh_lock.release()
+
+    def _get_redis_client(self) -> Any:
+        if self._redis_client is None:
+            import redis
+            from backend.core.config import config
+
+            self._redis_client = redis.from_url(config.redis.url, decode_responses=True)
+        return self._redis_client
+
+    def _acquire_distributed_lock(self) -> Any:
+        """Return a lock token, False if another worker holds it, or None when unavailable."""
+        if not self.distributed_lock_enabled:
+            return None
+        token = uuid4().hex
+        try:
+            acquired = self._get_redis_client().set(
+                self.REFRESH_LOCK_KEY, token, nx=True, ex=self.distributed_lock_ttl_seconds
+            )
+        except Exception as exc:
+            logger.warning("⚠️ BCV refresh lock unavailable, refreshing without it: %s", exc)
+            return None
+        return token if acquired else False
+
+    def _release_distributed_lock(self, token: str) -> None:
+        try:
+            self._get_redis_client().eval(self._RELEASE_LOCK_SCRIPT, 1, self.REFRESH_LOCK_KEY, token)
+        except Exception as exc:
+            logger.warning("⚠️ Failed to release BCV refresh lock: %s", exc)
 
     def convert_usd_to_ves(self, amount_usd: float, snapshot: Optional[Dict[str, Any]] = None) -> float:
         snapshot = snapshot or self.get_current_rate()
@@ -270,14 +426,18 @@ class BCVRateService:
         normalized["is_stale"] = bool(snapshot.get("is_stale", False))
         return normalized
 
-    def _is_fresh(self, snapshot: Dict[str, Any]) -> bool:
+    def _expires_at(self, snapshot: Dict[str, Any]) -> Optional[datetime]:
         expires_at = self._parse_datetime(snapshot.get("expires_at"))
         if expires_at:
-            return expires_at >= datetime.now(timezone.utc)
+            return expires_at
         fetched_at = self._parse_datetime(snapshot.get("fetched_at"))
         if not fetched_at:
-            return False
-        return fetched_at + timedelta(minutes=self.ttl_minutes) >= datetime.now(timezone.utc)
+            return None
+        return fetched_at + timedelta(minutes=self.ttl_minutes)
+
+    def _is_fresh(self, snapshot: Dict[str, Any]) -> bool:
+        expires_at = self._expires_at(snapshot)
+        return bool(expires_at) and expires_at >= datetime.now(timezone.utc)
 
     def _is_within_staleness(self, snapshot: Dict[str, Any]) -> bool:
         fetched_at = self._parse_datetime(snapshot.get("fetched_at"))
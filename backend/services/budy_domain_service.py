@@ -7,6 +7,7 @@ operations used by the Budy Phase 1 experience.
 from __future__ import annotations
 
 from collections import defaultdict
+import copy
 from datetime import datetime, timezone
 import logging
 import mimetypes
@@ -17,6 +18,8 @@ from uuid import uuid4
 
 from backend.core.database import get_database_client, retry_on_connection_error
 from backend.services.bcv_rate_service import bcv_rate_service
+from backend.services.public_view_tracker import public_view_tracker
+from backend.utils.ttl_cache import TTLCache
 from backend.utils.rfx_ownership import get_and_validate_rfx_ownership
 
 logger = logging.getLogger(__name__)
@@ -49,6 +52,12 @@ class BudyDomainService:
 
     def __init__(self) -> None:
         self.db = get_database_client()
+        # Short TTL: the payload embeds the BCV rate and payment state, and every
+        # write on the public flow invalidates its token explicitly.
+        self._public_payload_cache = TTLCache(
+            ttl_seconds=float(os.getenv("BUDY_PUBLIC_PROPOSAL_CACHE_TTL_SECONDS", "30")),
+            max_entries=512,
+        )
 
     # ------------------------------------------------------------------
     # Helpers
@@ -751,23 +760,10 @@ class BudyDomainService:
             )
         return {"company": company, "contact": requester}
 
+    # Latest proposal per RFX as a slim summary (no HTML); see
+    # DatabaseClient.get_latest_proposals_for_rfx_ids for the RPC/select fallback.
     def _batch_latest_proposals(self, rfx_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-        if not rfx_ids:
-            return {}
-        response = (
-            self.db.client.table("generated_documents")
-            .select("*")
-            .in_("rfx_id", rfx_ids)
-            .eq("document_type", "proposal")
-            .order("created_at", desc=True)
-            .execute()
-        )
-        latest: Dict[str, Dict[str, Any]] = {}
-        for doc in response.data or []:
-            rfx_id = str(doc.get("rfx_id") or "")
-            if rfx_id and rfx_id not in latest:
-                latest[rfx_id] = doc
-        return latest
+        return self.db.get_latest_proposals_for_rfx_ids(rfx_ids)
 
     def list_opportunities(
         self,
@@ -776,17 +772,20 @@ class BudyDomainService:
         *,
         business_unit_id: Optional[str] = None,
         sales_stage: Optional[str] = None,
+        limit: int = 1000,
+        offset: int = 0,
     ) -> List[Dict[str, Any]]:
         if is_virtual_business_unit_id(business_unit_id):
             business_unit_id = None
         records = self.db.get_rfx_history(
             user_id=user_id,
             organization_id=organization_id,
-            limit=1000,
-            offset=0,
+            limit=max(1, min(int(limit), 1000)),
+            offset=max(0, int(offset)),
             business_unit_id=business_unit_id,
             sales_stage=sales_stage,
         )
+        # Proposals are resolved only for the current page of RFXs
         rfx_ids = [str(r["id"]) for r in records if r.get("id")]
         proposals_by_rfx = self._batch_latest_proposals(rfx_ids)
         return [
@@ -910,6 +909,7 @@ class BudyDomainService:
         if business_unit and not rfx.get("industry_context"):
             extra_updates["industry_context"] = business_unit.get("industry_context")
         self._update_rfx_sales_stage(rfx_id, "sent", extra_updates=extra_updates)
+        self.invalidate_public_proposal(public_token)
 
         return {
             "proposal_id": proposal_id,
@@ -919,7 +919,28 @@ class BudyDomainService:
             "proposal": updated_proposal,
         }
 
+    def invalidate_public_proposal(self, token: Optional[str]) -> None:
+        if token:
+            self._public_payload_cache.invalidate(token)
+
     def get_public_proposal(self, token: str) -> Dict[str, Any]:
+        public_data = self._get_public_payload(token)
+        try:
+            public_view_tracker.record_view(public_data["proposal"]["id"], public_data["opportunity"].get("id"))
+        except Exception as exc:
+            logger.warning("⚠️ Failed to update public view tracking: %s", exc)
+        return public_data
+
+    def _get_public_payload(self, token: str, use_cache: bool = True) -> Dict[str, Any]:
+        if use_cache:
+            cached = self._public_payload_cache.get(token)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        public_data = self._build_public_payload(token)
+        self._public_payload_cache.set(token, public_data)
+        return copy.deepcopy(public_data)
+
+    def _build_public_payload(self, token: str) -> Dict[str, Any]:
         response = (
             self.db.client.table("generated_documents")
             .select("*")
@@ -950,20 +971,6 @@ class BudyDomainService:
         contract_total_usd = payment_summary["contract_total_usd"]
         equivalent_ves = bcv_rate_service.convert_usd_to_ves(contract_total_usd, rate_snapshot)
 
-        try:
-            next_view_count = int(proposal.get("public_view_count") or 0) + 1
-            self.db.client.table("generated_documents").update(
-                {
-                    "public_view_count": next_view_count,
-                    "public_last_viewed_at": datetime.now(timezone.utc).isoformat(),
-                }
-            ).eq("id", proposal["id"]).execute()
-            current_stage = rfx.get("sales_stage") or "draft"
-            if current_stage in {"draft", "sent"}:
-                self._update_rfx_sales_stage(str(rfx["id"]), "viewed")
-        except Exception as exc:
-            logger.warning("⚠️ Failed to update public view tracking: %s", exc)
-
         return {
             "proposal": proposal,
             "opportunity": {
@@ -992,7 +999,7 @@ class BudyDomainService:
         }
 
     def accept_public_proposal(self, token: str, payload: Dict[str, Any], *, ip_address: Optional[str], user_agent: Optional[str]) -> Dict[str, Any]:
-        public_data = self.get_public_proposal(token)
+        public_data = self._get_public_payload(token, use_cache=False)
         proposal = public_data["proposal"]
         existing = self._get_acceptance(proposal["id"])
         if existing:
@@ -1024,6 +1031,7 @@ class BudyDomainService:
             },
         )
         self._update_rfx_sales_stage(str(proposal["rfx_id"]), "payment_pending")
+        self.invalidate_public_proposal(token)
         return {"acceptance": response.data[0], "payment_methods": public_data["payment_methods"]}
 
     def submit_public_payment(
@@ -1032,7 +1040,7 @@ class BudyDomainService:
         form_data: Dict[str, Any],
         proof_file: Any,
     ) -> Dict[str, Any]:
-        public_data = self.get_public_proposal(token)
+        public_data = self._get_public_payload(token, use_cache=False)
         proposal = public_data["proposal"]
         acceptance = self._get_acceptance(proposal["id"])
         if not acceptance:
@@ -1086,6 +1094,7 @@ class BudyDomainService:
         if not response.data:
             raise RuntimeError("Failed to create payment submission")
         self._update_rfx_sales_stage(str(proposal["rfx_id"]), "payment_pending")
+        self.invalidate_public_proposal(token)
         return response.data[0]
 
     def confirm_payment(self, user_id: str, organization_id: Optional[str], payment_id: str) -> Dict[str, Any]:
@@ -1125,6 +1134,7 @@ class BudyDomainService:
         summary = self._calculate_payment_summary(proposal, payments)
         next_stage = "confirmed" if summary["is_fully_paid"] else "partially_paid"
         self._update_rfx_sales_stage(rfx_id, next_stage)
+        self.invalidate_public_proposal((proposal or {}).get("public_token"))
 
         service_order = None
         if summary["is_fully_paid"]:
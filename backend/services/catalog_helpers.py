@@ -2,11 +2,13 @@
 Catalog Service Helpers
 Funciones auxiliares para inicializar servicios de catálogo
 """
-import redis
-from openai import OpenAI
 from backend.core.config import config
 from backend.core.database import get_database_client
 from backend.services.catalog_search_service_sync import CatalogSearchServiceSync
+from backend.utils.lazy_import import lazy_attr, lazy_import
+
+redis = lazy_import("redis")
+OpenAI = lazy_attr("openai", "OpenAI")
 
 
 def get_catalog_search_service_sync() -> CatalogSearchServiceSync:
@@ -3,17 +3,21 @@ Catalog Import Service V2 - AI-First Simple
 El AI mapea columnas del Excel a columnas de BD, luego pandas parsea correctamente.
 """
 
+from __future__ import annotations
+
 from typing import Dict, List, Optional
-import pandas as pd
 import logging
 from datetime import datetime
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr, lazy_import
 import json
 import re
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+pd = lazy_import("pandas")
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class CatalogImportService:
     """Servicio de importación AI-First"""
@@ -7,14 +7,22 @@ Arquitectura híbrida:
 2. Fuzzy match (pg_trgm) - 0 tokens, <50ms  
 3. Semantic search (Redis embeddings) - 50 tokens, ~150ms
 """
+from __future__ import annotations
+
 import json
 import logging
-import numpy as np
-from typing import Optional, Dict, Any, List
-from openai import OpenAI  # Sync client
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+
+from backend.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from openai import OpenAI  # Sync client
 
 logger = logging.getLogger(__name__)
 
+# numpy solo se necesita en búsqueda semántica
+np = lazy_import("numpy")
+
 
 class CatalogSearchServiceSync:
     """
@@ -608,6 +616,37 @@ class CatalogSearchServiceSync:
         
         return results
     
+    def get_catalog_version(
+        self,
+        organization_id: str = None,
+        user_id: str = None,
+        business_unit_id: str = None,
+    ) -> Optional[str]:
+        """
+        Versión del catálogo visible para el scope: último updated_at + número de filas.
+        Cambia al crear, editar (trigger de updated_at), desactivar o borrar productos.
+
+        Returns:
+            "<updated_at>|<count>" o None si no se pudo consultar
+        """
+        if not organization_id and not user_id:
+            return "empty"
+        try:
+            query_builder = self.db.client.table("product_catalog")\
+                .select("updated_at", count="exact")
+            query_builder = self._apply_catalog_visibility_filter(
+                query_builder,
+                organization_id=organization_id,
+                user_id=user_id,
+                business_unit_id=business_unit_id,
+            )
+            response = query_builder.order("updated_at", desc=True).limit(1).execute()
+            latest = (response.data or [{}])[0].get("updated_at")
+            return f"{latest}|{response.count or 0}"
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read catalog version: {e}")
+            return None
+
     def get_catalog_stats(
         self,
         organization_id: str = None,
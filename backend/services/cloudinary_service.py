@@ -116,7 +116,9 @@ def upload_logo(user_id: str, logo_file) -> str:
         # Returns: https://res.cloudinary.com/<cloud-name>/image/upload/v123/logos/user-123/logo.png
     """
     _configure_cloudinary()
-    return _upload_to_cloudinary(user_id, logo_file)
+    public_url = _upload_to_cloudinary(user_id, logo_file)
+    _invalidate_logo_assets(user_id)
+    return public_url
 
 
 def delete_logo(user_id: str) -> bool:
@@ -139,6 +141,7 @@ def delete_logo(user_id: str) -> bool:
         logger.info(f"🗑️ Deleting logo from Cloudinary: {public_id}")
         
         result = cloudinary.uploader.destroy(public_id)
+        _invalidate_logo_assets(user_id)
         
         if result.get('result') == 'ok':
             logger.info(f"✅ Logo deleted successfully from Cloudinary")
@@ -166,24 +169,14 @@ def get_logo_url(user_id: str, validate: bool = True) -> Optional[str]:
     _configure_cloudinary()
     
     try:
-        import cloudinary
-        
-        # Construir URL pública del logo
-        public_id = f"logos/{user_id}/logo"
-        
-        url = cloudinary.CloudinaryImage(public_id).build_url(
-            secure=True,
-            transformation=[
-                {'width': 500, 'crop': 'limit'},
-                {'quality': 'auto'},
-                {'fetch_format': 'auto'}
-            ]
-        )
+        url = _build_logo_url(user_id)
         
         logger.info(f"🔗 Generated Cloudinary URL for user {user_id}: {url}")
         
-        # Validar que la URL sea accesible si se solicita
-        if validate and not _validate_cloudinary_url(url):
+        # Validar que la URL sea accesible si se solicita. Se resuelve a través del
+        # store de assets PDF: una sola descarga que además deja el logo listo
+        # para el render, en lugar de un HEAD por llamada.
+        if validate and not _is_logo_resolvable(url):
             logger.warning(f"⚠️ Cloudinary URL exists but is not accessible: {url}")
             return None
         
@@ -194,6 +187,43 @@ def get_logo_url(user_id: str, validate: bool = True) -> Optional[str]:
         return None
 
 
+def _build_logo_url(user_id: str) -> str:
+    """URL pública (sin versión) del logo del usuario"""
+    import cloudinary
+    
+    return cloudinary.CloudinaryImage(f"logos/{user_id}/logo").build_url(
+        secure=True,
+        transformation=[
+            {'width': 500, 'crop': 'limit'},
+            {'quality': 'auto'},
+            {'fetch_format': 'auto'}
+        ]
+    )
+
+
+def _invalidate_logo_assets(user_id: str) -> None:
+    """
+    Olvida el logo cacheado en el store de assets PDF.
+    
+    La URL sin versión se reutiliza cuando el logo se reemplaza o elimina, así que
+    sin esto `get_logo_url(validate=True)` y el render seguirían sirviendo el
+    logo anterior hasta que expire la referencia.
+    """
+    from backend.services.pdf_asset_store import pdf_asset_store
+    
+    try:
+        pdf_asset_store.invalidate(_build_logo_url(user_id))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not invalidate cached logo for user {user_id}: {e}")
+
+
+def _is_logo_resolvable(url: str) -> bool:
+    """True si el logo ya está (o puede quedar) en el store local de assets"""
+    from backend.services.pdf_asset_store import pdf_asset_store
+    
+    return pdf_asset_store.resolve(url) is not None
+
+
 def _validate_cloudinary_url(url: str, timeout: int = 10) -> bool:
     """
     Valida que una URL de Cloudinary sea accesible
@@ -17,8 +17,12 @@ Principio KISS: Lógica simple y directa, sin over-engineering.
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
+import os
+import time
 
 from backend.core.database import get_database_client, retry_on_connection_error
+from backend.utils.ttl_cache import TTLCache
+from backend.utils.metrics import set_request_org_tier
 from backend.core.plans import (
     get_operation_cost,
     get_free_regenerations,
@@ -28,6 +32,17 @@ from backend.core.plans import (
 
 logger = logging.getLogger(__name__)
 
+# Filas vencidas por página en el reset mensual sin RPC (PostgREST)
+MONTHLY_RESET_BATCH_SIZE = 500
+
+# Saldo por org/usuario para pre-checks del hot path (por proceso, TTL corto).
+# Con varios workers, otro proceso puede haber consumido créditos sin invalidar
+# este cache: un pre-check puede pasar con un saldo viejo durante hasta
+# CREDITS_BALANCE_CACHE_TTL_SECONDS. El límite real se aplica en consume_credits,
+# que relee la fila de la org/usuario (use_cache=False) antes de descontar.
+CREDITS_BALANCE_CACHE_TTL_SECONDS = float(os.getenv("CREDITS_BALANCE_CACHE_TTL_SECONDS", "10"))
+_credits_balance_cache = TTLCache(ttl_seconds=CREDITS_BALANCE_CACHE_TTL_SECONDS, max_entries=4096)
+
 
 class CreditsService:
     """Servicio para gestión de créditos en sistema multi-tenant"""
@@ -44,15 +59,20 @@ class CreditsService:
         self, 
         organization_id: Optional[str], 
         operation: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        use_cache: bool = True
     ) -> Tuple[bool, int, str]:
         """
         Verificar si hay créditos disponibles para una operación.
         
+        El saldo se cachea por proceso (CREDITS_BALANCE_CACHE_TTL_SECONDS) para
+        los pre-checks del hot path; `consume_credits` siempre lee fresco.
+        
         Args:
             organization_id: ID de la organización (None para usuarios personales)
             operation: Tipo de operación ('extraction', 'generation', 'complete', etc.)
             user_id: ID del usuario (requerido para créditos personales)
+            use_cache: False fuerza una lectura fresca del saldo
         
         Returns:
             Tuple (tiene_creditos, creditos_disponibles, mensaje)
@@ -72,26 +92,12 @@ class CreditsService:
                     return False, 0, "User ID required for personal plan credits"
                 
                 # Obtener créditos del usuario personal
-                user_result = self.db.client.table("user_credits")\
-                    .select("credits_total, credits_used, plan_tier")\
-                    .eq("user_id", user_id)\
-                    .single()\
-                    .execute()
-                
-                if not user_result.data:
-                    # Inicializar créditos si no existen
-                    self.db.client.rpc("initialize_user_credits", {"p_user_id": user_id}).execute()
-                    # Reintentar
-                    user_result = self.db.client.table("user_credits")\
-                        .select("credits_total, credits_used, plan_tier")\
-                        .eq("user_id", user_id)\
-                        .single()\
-                        .execute()
+                user_data = self._get_credit_balance("user", user_id, use_cache)
                 
-                if not user_result.data:
+                if not user_data:
                     return False, 0, f"Could not initialize credits for user {user_id}"
                 
-                user_data = user_result.data
+                set_request_org_tier(user_data.get("plan_tier"))
                 credits_total = user_data.get("credits_total", 0)
                 credits_used = user_data.get("credits_used", 0)
                 credits_available = credits_total - credits_used
@@ -106,16 +112,12 @@ class CreditsService:
                     )
             
             # Si hay organización → créditos organizacionales
-            org_result = self.db.client.table("organizations")\
-                .select("credits_total, credits_used, plan_tier")\
-                .eq("id", organization_id)\
-                .single()\
-                .execute()
+            org_data = self._get_credit_balance("organization", organization_id, use_cache)
             
-            if not org_result.data:
+            if not org_data:
                 return False, 0, f"Organization {organization_id} not found"
             
-            org_data = org_result.data
+            set_request_org_tier(org_data.get("plan_tier"))
             credits_total = org_data.get("credits_total", 0)
             credits_used = org_data.get("credits_used", 0)
             credits_available = credits_total - credits_used
@@ -134,6 +136,47 @@ class CreditsService:
             logger.error(f"Error checking credits: {e}")
             return False, 0, f"Error checking credits: {str(e)}"
     
+    @retry_on_connection_error(max_retries=3, initial_delay=0.5, backoff_factor=2.0)
+    def _get_credit_balance(self, scope: str, scope_id: str, use_cache: bool = True) -> Optional[Dict]:
+        """Saldo (credits_total, credits_used, plan_tier) de una org o usuario personal."""
+        key = (scope, str(scope_id))
+        if not use_cache:
+            _credits_balance_cache.invalidate(key)
+        return _credits_balance_cache.get_or_load(key, lambda: self._load_credit_balance(scope, scope_id))
+    
+    def _load_credit_balance(self, scope: str, scope_id: str) -> Optional[Dict]:
+        if scope == "organization":
+            result = self.db.client.table("organizations")\
+                .select("credits_total, credits_used, plan_tier")\
+                .eq("id", scope_id)\
+                .single()\
+                .execute()
+            return result.data or None
+        
+        user_result = self.db.client.table("user_credits")\
+            .select("credits_total, credits_used, plan_tier")\
+            .eq("user_id", scope_id)\
+            .single()\
+            .execute()
+        
+        if not user_result.data:
+            # Inicializar créditos si no existen
+            self.db.client.rpc("initialize_user_credits", {"p_user_id": scope_id}).execute()
+            # Reintentar
+            user_result = self.db.client.table("user_credits")\
+                .select("credits_total, credits_used, plan_tier")\
+                .eq("user_id", scope_id)\
+                .single()\
+                .execute()
+        return user_result.data or None
+    
+    def invalidate_credit_balance(self, organization_id: Optional[str] = None, user_id: Optional[str] = None) -> None:
+        """Invalidar el saldo cacheado tras modificar créditos (consumo, upgrade, reset)."""
+        if organization_id:
+            _credits_balance_cache.invalidate(("organization", str(organization_id)))
+        if user_id:
+            _credits_balance_cache.invalidate(("user", str(user_id)))
+    
     @retry_on_connection_error(max_retries=3, initial_delay=0.5, backoff_factor=2.0)
     def get_credits_info(self, organization_id: str, user_id: Optional[str] = None) -> Dict:
         """
@@ -353,7 +396,7 @@ class CreditsService:
         
         # Verificar disponibilidad
         has_credits, available, msg = self.check_credits_available(
-            organization_id, operation, user_id
+            organization_id, operation, user_id, use_cache=False
         )
         
         if not has_credits:
@@ -387,6 +430,7 @@ class CreditsService:
                     .update({"credits_used": new_used})\
                     .eq("user_id", user_id)\
                     .execute()
+                self.invalidate_credit_balance(user_id=user_id)
                 
                 logger.info(f"✅ Personal credits updated: {current_used} → {new_used} (user: {user_id})")
                 
@@ -421,6 +465,7 @@ class CreditsService:
                 .update({"credits_used": new_used})\
                 .eq("id", organization_id)\
                 .execute()
+            self.invalidate_credit_balance(organization_id=organization_id)
             
             logger.info(f"✅ Credits updated: {current_used} → {new_used}")
             
@@ -598,108 +643,222 @@ class CreditsService:
     # RESET MENSUAL (CRON JOB)
     # ========================
     
-    def reset_monthly_credits(self) -> Dict:
+    def reset_monthly_credits(self, run_id: Optional[str] = None, now: Optional[datetime] = None) -> Dict:
         """
         Reset mensual de créditos para todas las organizaciones Y usuarios personales.
 
+        Set-based: una sentencia por tabla vía RPC `reset_monthly_credits_bulk`
+        (migración 016) o, si la RPC no está desplegada, un UPDATE condicional por
+        plan y página más un INSERT en lote de las transacciones.
+
+        Idempotente y reanudable por `run_id`: las filas reseteadas dejan de cumplir
+        `credits_reset_date <= now` y cada transacción lleva `metadata.reset_run_id`,
+        así que re-ejecutar un run interrumpido solo completa lo pendiente.
+
         NOTA: Este método debe ser llamado por un cron job mensual o por un admin
         desde el endpoint POST /api/subscription/admin/reset-credits.
 
+        Args:
+            run_id: Identificador del run (default: monthly-reset-YYYY-MM-DD)
+            now: Instante de referencia (default: datetime.now())
+
         Returns:
-            Diccionario con resultado del reset
+            Diccionario con resultado del reset, conteos por plan y duración
         """
+        started = time.perf_counter()
+        now = now or datetime.now()
+        run_id = run_id or f"monthly-reset-{now:%Y-%m-%d}"
+        next_reset = now + timedelta(days=30)
+
         try:
-            now = datetime.now()
-            from backend.core.plans import get_plan
+            from backend.core.plans import PLANS
+            plan_credits = {tier: plan.credits_per_month for tier, plan in PLANS.items()}
 
-            # ── 1. Reset de organizaciones ───────────────────────────────────
-            orgs_result = self.db.client.table("organizations")\
-                .select("id, plan_tier, credits_reset_date")\
-                .lte("credits_reset_date", now.isoformat())\
-                .execute()
+            try:
+                summary = self._reset_monthly_credits_rpc(run_id, now, next_reset, plan_credits)
+                mode = "rpc"
+            except Exception as rpc_err:
+                if "reset_monthly_credits_bulk" not in str(rpc_err):
+                    raise
+                logger.warning("⚠️ reset_monthly_credits_bulk RPC unavailable, resetting credits in batches")
+                summary = self._reset_monthly_credits_batched(run_id, now, next_reset, plan_credits)
+                mode = "batched"
 
-            org_reset_count = 0
+            _credits_balance_cache.clear()
+            org_reset_count = sum(summary["org_reset_by_tier"].values())
+            user_reset_count = sum(summary["user_reset_by_tier"].values())
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
 
-            for org in orgs_result.data:
-                org_id = org["id"]
-                plan_tier = org.get("plan_tier", "free")
+            logger.info(
+                f"✅ Monthly credits reset {run_id} ({mode}): {org_reset_count} organizations "
+                f"{summary['org_reset_by_tier']}, {user_reset_count} personal users "
+                f"{summary['user_reset_by_tier']} in {elapsed_ms}ms"
+            )
 
-                plan = get_plan(plan_tier)
-                if not plan:
-                    logger.warning(f"Plan not found for organization {org_id}")
-                    continue
+            return {
+                "status": "success",
+                "message": f"Credits reset for {org_reset_count} organizations and {user_reset_count} personal users",
+                "run_id": run_id,
+                "mode": mode,
+                "reset_count": org_reset_count + user_reset_count,
+                "org_reset_count": org_reset_count,
+                "user_reset_count": user_reset_count,
+                "org_reset_by_tier": summary["org_reset_by_tier"],
+                "user_reset_by_tier": summary["user_reset_by_tier"],
+                "transactions_recorded": summary["transactions_recorded"],
+                "skipped_count": summary.get("skipped_count", 0),
+                "elapsed_ms": elapsed_ms
+            }
 
-                # Reset créditos de la organización
-                self.db.client.table("organizations")\
-                    .update({
-                        "credits_used": 0,
-                        "credits_total": plan.credits_per_month,
-                        "credits_reset_date": (now + timedelta(days=30)).isoformat()
-                    })\
-                    .eq("id", org_id)\
-                    .execute()
+        except Exception as e:
+            logger.error(f"Error resetting monthly credits (run {run_id}): {e}")
+            return {
+                "status": "error",
+                "message": str(e),
+                "run_id": run_id
+            }
 
-                # Registrar transacción de reset
-                try:
-                    self.db.client.table("credit_transactions")\
-                        .insert({
-                            "organization_id": org_id,
-                            "amount": plan.credits_per_month,
-                            "type": "monthly_reset",
-                            "description": f"Monthly credits reset for {plan_tier} plan"
-                        })\
-                        .execute()
-                except Exception as tx_err:
-                    logger.warning(f"Could not record credit transaction for org {org_id}: {tx_err}")
-
-                org_reset_count += 1
-                logger.info(f"✅ Credits reset for organization {org_id} ({plan_tier})")
-
-            # ── 2. Reset de usuarios personales (user_credits) ───────────────
-            users_result = self.db.client.table("user_credits")\
-                .select("user_id, plan_tier, credits_reset_date")\
-                .lte("credits_reset_date", now.isoformat())\
-                .execute()
+    def _reset_monthly_credits_rpc(
+        self,
+        run_id: str,
+        now: datetime,
+        next_reset: datetime,
+        plan_credits: Dict[str, int]
+    ) -> Dict:
+        """Reset completo en una transacción de base de datos (migración 016)."""
+        result = self.db.client.rpc(
+            "reset_monthly_credits_bulk",
+            {
+                "p_run_id": run_id,
+                "p_now": now.isoformat(),
+                "p_next_reset": next_reset.isoformat(),
+                "p_plan_credits": plan_credits
+            }
+        ).execute()
+
+        data = result.data or {}
+        return {
+            "org_reset_by_tier": dict(data.get("org_reset_by_tier") or {}),
+            "user_reset_by_tier": dict(data.get("user_reset_by_tier") or {}),
+            "transactions_recorded": int(data.get("transactions_recorded") or 0)
+        }
 
-            user_reset_count = 0
+    def _reset_monthly_credits_batched(
+        self,
+        run_id: str,
+        now: datetime,
+        next_reset: datetime,
+        plan_credits: Dict[str, int]
+    ) -> Dict:
+        """Fallback PostgREST: un UPDATE condicional por plan y página de filas vencidas."""
+        org_by_tier, transactions, org_skipped = self._reset_due_rows(
+            "organizations", "id", run_id, now, next_reset, plan_credits, record_transactions=True
+        )
+        user_by_tier, _, user_skipped = self._reset_due_rows(
+            "user_credits", "user_id", run_id, now, next_reset, plan_credits, record_transactions=False
+        )
+        return {
+            "org_reset_by_tier": org_by_tier,
+            "user_reset_by_tier": user_by_tier,
+            "transactions_recorded": transactions,
+            "skipped_count": org_skipped + user_skipped
+        }
+
+    def _reset_due_rows(
+        self,
+        table: str,
+        key: str,
+        run_id: str,
+        now: datetime,
+        next_reset: datetime,
+        plan_credits: Dict[str, int],
+        record_transactions: bool
+    ) -> Tuple[Dict[str, int], int, int]:
+        """
+        Resetear las filas vencidas de `table` paginando por `key` (keyset).
 
-            for uc in (users_result.data or []):
-                user_id = uc["user_id"]
-                plan_tier = uc.get("plan_tier", "free")
+        Las transacciones se registran ANTES del UPDATE: si el job se corta entre
+        ambos pasos, la fila sigue vencida y el siguiente intento con el mismo
+        run_id salta la transacción ya registrada y completa el reset.
 
-                plan = get_plan(plan_tier)
-                if not plan:
-                    logger.warning(f"Plan not found for user {user_id}")
+        Returns:
+            (filas reseteadas por plan, transacciones registradas, filas con plan desconocido)
+        """
+        now_iso = now.isoformat()
+        reset_by_tier: Dict[str, int] = {}
+        transactions = 0
+        skipped = 0
+        last_key = None
+
+        while True:
+            query = self.db.client.table(table)\
+                .select(f"{key}, plan_tier")\
+                .lte("credits_reset_date", now_iso)
+            if last_key is not None:
+                query = query.gt(key, last_key)
+            page = query.order(key).limit(MONTHLY_RESET_BATCH_SIZE).execute().data or []
+            if not page:
+                break
+            last_key = page[-1][key]
+
+            ids_by_tier: Dict[str, list] = {}
+            for row in page:
+                plan_tier = row.get("plan_tier") or "free"
+                if plan_tier not in plan_credits:
+                    logger.warning(f"Plan '{plan_tier}' not found for {table} {row[key]}")
+                    skipped += 1
                     continue
+                ids_by_tier.setdefault(plan_tier, []).append(row[key])
 
-                self.db.client.table("user_credits")\
+            for plan_tier, ids in ids_by_tier.items():
+                if record_transactions:
+                    transactions += self._record_reset_transactions(run_id, plan_tier, ids, plan_credits[plan_tier])
+
+                # Condición credits_reset_date <= now: no re-resetea filas ya procesadas
+                updated = self.db.client.table(table)\
                     .update({
                         "credits_used": 0,
-                        "credits_total": plan.credits_per_month,
-                        "credits_reset_date": (now + timedelta(days=30)).isoformat()
+                        "credits_total": plan_credits[plan_tier],
+                        "credits_reset_date": next_reset.isoformat()
                     })\
-                    .eq("user_id", user_id)\
+                    .in_(key, ids)\
+                    .lte("credits_reset_date", now_iso)\
                     .execute()
+                reset_by_tier[plan_tier] = reset_by_tier.get(plan_tier, 0) + len(updated.data or [])
 
-                user_reset_count += 1
-                logger.info(f"✅ Credits reset for personal user {user_id} ({plan_tier})")
+            if len(page) < MONTHLY_RESET_BATCH_SIZE:
+                break
 
-            total_reset = org_reset_count + user_reset_count
+        return reset_by_tier, transactions, skipped
 
-            return {
-                "status": "success",
-                "message": f"Credits reset for {org_reset_count} organizations and {user_reset_count} personal users",
-                "reset_count": total_reset,
-                "org_reset_count": org_reset_count,
-                "user_reset_count": user_reset_count
-            }
+    def _record_reset_transactions(self, run_id: str, plan_tier: str, org_ids: list, credits: int) -> int:
+        """Insertar en lote las transacciones 'monthly_reset' que este run aún no registró."""
+        try:
+            existing = self.db.client.table("credit_transactions")\
+                .select("organization_id")\
+                .eq("type", "monthly_reset")\
+                .contains("metadata", {"reset_run_id": run_id})\
+                .in_("organization_id", org_ids)\
+                .execute()
+            recorded = {row["organization_id"] for row in (existing.data or [])}
 
-        except Exception as e:
-            logger.error(f"Error resetting monthly credits: {e}")
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+            rows = [
+                {
+                    "organization_id": org_id,
+                    "amount": credits,
+                    "type": "monthly_reset",
+                    "description": f"Monthly credits reset for {plan_tier} plan",
+                    "metadata": {"reset_run_id": run_id, "plan_tier": plan_tier}
+                }
+                for org_id in org_ids
+                if org_id not in recorded
+            ]
+            if rows:
+                self.db.client.table("credit_transactions").insert(rows).execute()
+            return len(rows)
+        except Exception as tx_err:
+            logger.warning(f"Could not record monthly reset transactions for {plan_tier} plan: {tx_err}")
+            return 0
 
 
 # ========================
@@ -4,17 +4,28 @@ Corporate code generation service for RFX and proposals.
 Formats:
 - RFX code: SAB-PP-{ORIGIN}-{YY}-{NNN}
 - Proposal code: {RFX_CODE}-R{REV2}
+
+RFX sequences are allocated hi/lo: each process reserves blocks of
+DOCUMENT_CODE_BLOCK_SIZE values per (code_type, scope, year) through the
+`reserve_document_code_block` RPC and hands them out locally. Unused values
+of a block are lost when the process exits, so codes are unique but may
+have gaps.
 """
 
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Valores reservados por round-trip; 1 = una RPC por código (sin bloques)
+DOCUMENT_CODE_BLOCK_SIZE = max(1, int(os.getenv("DOCUMENT_CODE_BLOCK_SIZE", "10")))
+
 
 class DocumentCodeService:
     CODE_PREFIX = "SAB"
@@ -34,8 +45,9 @@ class DocumentCodeService:
         "manual": "H",
     }
 
-    def __init__(self, db_client):
+    def __init__(self, db_client, allocator: Optional["DocumentCodeBlockAllocator"] = None):
         self.db_client = db_client
+        self.allocator = allocator or document_code_allocator
 
     @classmethod
     def normalize_origin(cls, origin: Optional[str]) -> str:
@@ -85,18 +97,7 @@ class DocumentCodeService:
 
     def _next_document_sequence(self, code_type: str, domain_prefix: str, year: int) -> int:
         try:
-            response = self.db_client.client.rpc(
-                "next_document_code_seq",
-                {
-                    "p_code_type": code_type,
-                    "p_domain_prefix": domain_prefix,
-                    "p_year": int(year),
-                },
-            ).execute()
-            sequence = int(self._extract_scalar(response.data) or 0)
-            if sequence <= 0:
-                raise ValueError(f"Invalid document sequence response: {response.data}")
-            return sequence
+            return self.allocator.next_value(self.db_client, code_type, domain_prefix, int(year))
         except Exception as exc:
             logger.error(
                 "❌ Failed to get next document code sequence "
@@ -120,6 +121,7 @@ class DocumentCodeService:
                 # defensive fallback for unexpected shapes
                 for key in (
                     "next_document_code_seq",
+                    "reserve_document_code_block",
                     "next_proposal_revision",
                     "value",
                 ):
@@ -131,8 +133,69 @@ class DocumentCodeService:
         if isinstance(payload, dict):
             if len(payload) == 1:
                 return next(iter(payload.values()))
-            for key in ("next_document_code_seq", "next_proposal_revision", "value"):
+            for key in ("next_document_code_seq", "reserve_document_code_block", "next_proposal_revision", "value"):
                 if key in payload:
                     return payload[key]
 
         return payload
+
+
+class DocumentCodeBlockAllocator:
+    """
+    Hi/lo allocator: one atomic RPC reserves `block_size` sequence values per
+    (code_type, scope, year); the rest of the block is served from memory.
+    """
+
+    def __init__(self, block_size: int = DOCUMENT_CODE_BLOCK_SIZE):
+        self.block_size = max(1, int(block_size))
+        self._blocks: Dict[Tuple[str, str, int], List[int]] = {}  # key -> [next, hi]
+        self._lock = threading.Lock()
+        self._block_rpc_available = True
+
+    def next_value(self, db_client, code_type: str, scope: str, year: int) -> int:
+        key = (code_type, scope, int(year))
+        with self._lock:
+            block = self._blocks.get(key)
+            if block and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+
+            lo, hi = self._reserve(db_client, code_type, scope, int(year))
+            self._blocks[key] = [lo + 1, hi]
+            return lo
+
+    def reset(self) -> None:
+        """Descartar los bloques locales (los valores no usados quedan como huecos)."""
+        with self._lock:
+            self._blocks.clear()
+
+    def _reserve(self, db_client, code_type: str, scope: str, year: int) -> Tuple[int, int]:
+        params = {"p_code_type": code_type, "p_domain_prefix": scope, "p_year": year}
+
+        if self.block_size > 1 and self._block_rpc_available:
+            try:
+                response = db_client.client.rpc(
+                    "reserve_document_code_block",
+                    {**params, "p_block_size": self.block_size},
+                ).execute()
+                hi = int(DocumentCodeService._extract_scalar(response.data) or 0)
+                if hi < self.block_size:
+                    raise ValueError(f"Invalid document code block response: {response.data}")
+                logger.info(f"🏷️ Reserved {code_type} codes {hi - self.block_size + 1}-{hi} ({scope}, {year})")
+                return hi - self.block_size + 1, hi
+            except Exception as exc:
+                if "reserve_document_code_block" not in str(exc):
+                    raise
+                logger.warning("⚠️ reserve_document_code_block RPC unavailable, allocating one code per RPC")
+                self._block_rpc_available = False
+
+        response = db_client.client.rpc("next_document_code_seq", params).execute()
+        sequence = int(DocumentCodeService._extract_scalar(response.data) or 0)
+        if sequence <= 0:
+            raise ValueError(f"Invalid document sequence response: {response.data}")
+        return sequence, sequence
+
+
+# Bloques compartidos por todas las instancias del proceso
+document_code_allocator = DocumentCodeBlockAllocator()
@@ -5,11 +5,75 @@ Analiza el contenido y determina qué evaluadores específicos aplicar.
 from typing import Dict, Any, List, Tuple, Optional
 import re
 from collections import Counter
+from functools import lru_cache
 from backend.core.feature_flags import FeatureFlags
 import logging
 
 logger = logging.getLogger(__name__)
 
+_WORD_CHAR = re.compile(r'\w')
+_WORD_BOUNDED = re.compile(r'\w(?:.*\w)?', re.DOTALL)
+
+
+class _KeywordMatcher:
+    """
+    Cuenta todas las keywords en una sola pasada sobre el texto.
+
+    Equivale a `len(re.findall(r'\b' + re.escape(kw) + r'\b', text))` por
+    keyword: una regex combinada con el primer token de cada keyword encuentra
+    los candidatos y cada keyword que empieza con ese token se verifica en esa
+    posición (frontera de palabra al final, sin solapar su match anterior).
+    Keywords que no empiezan/terminan en carácter de palabra conservan su
+    regex individual para mantener la semántica exacta de \b.
+    """
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.by_first_token: Dict[str, List[str]] = {}
+        self.fallback_patterns: Dict[str, re.Pattern] = {}
+        for keyword in dict.fromkeys(keywords):
+            if _WORD_BOUNDED.fullmatch(keyword):
+                first_token = re.match(r'\w+', keyword).group()
+                self.by_first_token.setdefault(first_token, []).append(keyword)
+            else:
+                self.fallback_patterns[keyword] = re.compile(r'\b' + re.escape(keyword) + r'\b')
+
+        tokens = sorted(self.by_first_token, key=len, reverse=True)
+        self.candidates = (
+            re.compile(r'\b(?:' + '|'.join(re.escape(token) for token in tokens) + r')\b')
+            if tokens else None
+        )
+
+    def count(self, text: str) -> Counter:
+        counts: Counter = Counter()
+        if self.candidates is not None:
+            text_length = len(text)
+            last_end: Dict[str, int] = {}
+            for match in self.candidates.finditer(text):
+                start, token = match.start(), match.group()
+                for keyword in self.by_first_token[token]:
+                    if start < last_end.get(keyword, 0):
+                        continue  # findall no solapa matches de la misma keyword
+                    end = start + len(keyword)
+                    if keyword != token and not (
+                        text.startswith(keyword, start)
+                        and (end == text_length or not _WORD_CHAR.match(text, end))
+                    ):
+                        continue
+                    counts[keyword] += 1
+                    last_end[keyword] = end
+
+        for keyword, pattern in self.fallback_patterns.items():
+            matches = len(pattern.findall(text))
+            if matches:
+                counts[keyword] += matches
+        return counts
+
+
+@lru_cache(maxsize=32)
+def _compile_keyword_matcher(keywords: Tuple[str, ...]) -> _KeywordMatcher:
+    # detect_rfx_domain crea un detector por RFX; el matcher se comparte por set de keywords
+    return _KeywordMatcher(keywords)
+
 
 class DomainDetectorService:
     """Detecta automáticamente el dominio/industria del RFX basado en contenido"""
@@ -70,6 +134,17 @@ class DomainDetectorService:
             'services': 1.5,    # Servicios son moderadamente indicativos
             'venues': 1.0       # Venues son menos indicativos pero útiles
         }
+
+        self._rebuild_keyword_matcher()
+
+    def _rebuild_keyword_matcher(self) -> None:
+        """Compila el matcher de una pasada para el set actual de keywords"""
+        self._keyword_matcher = _compile_keyword_matcher(tuple(
+            keyword.lower()
+            for categories in self.domain_keywords.values()
+            for keywords in categories.values()
+            for keyword in keywords
+        ))
     
     def detect_domain(self, rfx_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -181,7 +256,42 @@ class DomainDetectorService:
         return full_text
     
     def _analyze_domains(self, full_text: str) -> Dict[str, Any]:
-        """Analiza el texto buscando keywords de cada dominio"""
+        """Analiza el texto buscando keywords de cada dominio (una sola pasada)"""
+        text_lower = full_text.lower()
+        keyword_counts = self._keyword_matcher.count(text_lower)
+        
+        domain_analysis = {
+            'keywords_by_domain': {},
+            'matches_by_category': {},
+            'total_matches': 0
+        }
+        
+        for domain, categories in self.domain_keywords.items():
+            domain_matches = {}
+            domain_total = 0
+            
+            for category, keywords in categories.items():
+                category_matches = []
+                
+                for keyword in keywords:
+                    keyword_lower = keyword.lower()
+                    count = keyword_counts.get(keyword_lower, 0)
+                    if count:
+                        category_matches.extend([keyword_lower] * count)
+                        domain_total += count
+                
+                if category_matches:
+                    domain_matches[category] = category_matches
+            
+            if domain_matches:
+                domain_analysis['keywords_by_domain'][domain] = domain_matches
+                domain_analysis['matches_by_category'][domain] = domain_total
+                domain_analysis['total_matches'] += domain_total
+        
+        return domain_analysis
+
+    def _analyze_domains_reference(self, full_text: str) -> Dict[str, Any]:
+        """Implementación histórica (un re.findall por keyword); referencia para tests/benchmark"""
         text_lower = full_text.lower()
         
         domain_analysis = {
@@ -319,6 +429,8 @@ class DomainDetectorService:
             
             self.domain_keywords[domain][category].extend(keyword_list)
         
+        self._rebuild_keyword_matcher()
+        
         if self.debug_mode:
             logger.info(f"Added keywords for domain '{domain}': {keywords}")
     
@@ -7,7 +7,7 @@ Reemplazo robusto del sistema de JSON mode/parsing manual
 import json
 import logging
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 import time
 from pydantic import ValidationError
 from backend.exceptions import ExternalServiceError
@@ -21,6 +21,8 @@ from backend.schemas.rfx_extraction_schema import (
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 class FunctionCallingRFXExtractor:
     """
     Extractor de RFX usando OpenAI Function Calling
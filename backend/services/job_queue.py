@@ -0,0 +1,634 @@
+"""
+📬 Job Queue - Cola durable de trabajos en background (SQLite compartido)
+
+Reemplaza al ThreadPoolExecutor en memoria para trabajos largos (preview de
+extracción RFX). Los trabajos viven en un archivo SQLite compartido por todos
+los workers de gunicorn del host:
+
+- Durable: un job `running` cuyo worker murió vuelve a la cola al vencer su
+  lease (heartbeat cada lease/3) y se reintenta.
+- Idempotente: `enqueue` con la misma `idempotency_key` devuelve el job
+  existente mientras esté queued/running/succeeded.
+- Concurrencia configurable: hilos por proceso (`concurrency`) y tope global
+  de jobs corriendo entre procesos (`max_running`).
+- Fairness: como máximo `max_per_key` jobs corriendo por org; entre orgs con
+  trabajo pendiente se atiende primero la que menos corre y la que hace más
+  tiempo no se atiende (round-robin).
+- Reintentos con backoff para errores reintentables y cancelación cooperativa
+  (`report_progress` lanza JobCancelled entre etapas). La etapa COMMITTING es
+  el punto de no retorno: el handler la reporta justo antes de escribir su
+  resultado y a partir de ahí `cancel` ya no marca el job.
+
+Para sobrevivir reinicios del contenedor, JOB_QUEUE_DB_PATH debe apuntar a un
+volumen persistente.
+
+Usage:
+    queue = JobQueue("rfx_preview", handler=run_job, on_failure=mark_failed)
+    job = queue.enqueue(session_id, payload, fairness_key=organization_id)
+    queue.cancel(session_id)
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Etapa reportada antes de persistir el resultado; ya no se puede cancelar
+COMMITTING = "committing"
+
+_JOB_COLUMNS = (
+    "id, kind, idempotency_key, fairness_key, payload, status, stage, attempts, max_attempts, "
+    "available_at, lease_owner, lease_expires_at, cancel_requested, last_error, "
+    "created_at, claimed_at, finished_at, updated_at"
+)
+
+
+def default_db_path() -> str:
+    return os.getenv("JOB_QUEUE_DB_PATH") or os.path.join(tempfile.gettempdir(), "rfx_job_queue.sqlite3")
+
+
+class JobCancelled(Exception):
+    """El job fue cancelado mientras corría; el handler debe detenerse."""
+
+
+class SQLiteJobStore:
+    """Tabla de jobs en SQLite (WAL). Una conexión por hilo."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_db_path()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ------------------------------------------------------------------ conexión
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    fairness_key TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    claimed_at REAL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_kind_status_available ON jobs(kind, status, available_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_kind_fairness_status ON jobs(kind, fairness_key, status);
+                """
+            )
+            self._initialized = True
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection())
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["cancel_requested"] = bool(job.get("cancel_requested"))
+        return job
+
+    # ------------------------------------------------------------------ escritura
+
+    def enqueue(
+        self,
+        kind: str,
+        idempotency_key: str,
+        payload: Dict[str, Any],
+        *,
+        fairness_key: str,
+        max_attempts: int = 3,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Inserta el job o devuelve el existente. Retorna (job, created)."""
+        now = time.time()
+        encoded = json.dumps(payload, default=str)
+        with self._transaction() as conn:
+            existing = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+            if existing is not None and existing["status"] not in (FAILED, CANCELLED):
+                return self._row(existing), False
+            if existing is not None:
+                # Reenvío de un job fallido/cancelado: vuelve a la cola desde cero
+                conn.execute(
+                    """
+                    UPDATE jobs SET payload = ?, status = ?, stage = NULL, attempts = 0, max_attempts = ?,
+                        available_at = ?, lease_owner = NULL, lease_expires_at = NULL, cancel_requested = 0,
+                        last_error = NULL, fairness_key = ?, finished_at = NULL, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (encoded, QUEUED, max_attempts, now, fairness_key, now, existing["id"]),
+                )
+                job_id = existing["id"]
+            else:
+                job_id = str(uuid.uuid4())
+                conn.execute(
+                    f"""
+                    INSERT INTO jobs ({_JOB_COLUMNS})
+                    VALUES (?, ?, ?, ?, ?, ?, NULL, 0, ?, ?, NULL, NULL, 0, NULL, ?, NULL, NULL, ?)
+                    """,
+                    (job_id, kind, idempotency_key, fairness_key, encoded, QUEUED, max_attempts, now, now, now),
+                )
+            row = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row), True
+
+    def claim(
+        self,
+        kind: str,
+        owner: str,
+        *,
+        lease_seconds: float,
+        max_running: int,
+        max_per_key: int,
+    ) -> Optional[Dict[str, Any]]:
+        """Toma el siguiente job elegible respetando tope global y fairness por clave."""
+        now = time.time()
+        with self._transaction() as conn:
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE kind = ? AND status = ? AND lease_expires_at >= ?",
+                (kind, RUNNING, now),
+            ).fetchone()[0]
+            if running >= max_running:
+                return None
+
+            row = conn.execute(
+                """
+                WITH running_per_key AS (
+                    SELECT fairness_key, COUNT(*) AS running
+                    FROM jobs WHERE kind = :kind AND status = :running
+                    GROUP BY fairness_key
+                ),
+                last_served AS (
+                    SELECT fairness_key, MAX(claimed_at) AS claimed_at
+                    FROM jobs WHERE kind = :kind AND claimed_at IS NOT NULL
+                    GROUP BY fairness_key
+                )
+                SELECT j.id
+                FROM jobs j
+                LEFT JOIN running_per_key r ON r.fairness_key = j.fairness_key
+                LEFT JOIN last_served s ON s.fairness_key = j.fairness_key
+                WHERE j.kind = :kind AND j.status = :queued AND j.available_at <= :now
+                  AND COALESCE(r.running, 0) < :max_per_key
+                ORDER BY COALESCE(r.running, 0), COALESCE(s.claimed_at, 0), j.created_at
+                LIMIT 1
+                """,
+                {"kind": kind, "running": RUNNING, "queued": QUEUED, "now": now, "max_per_key": max_per_key},
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                """
+                UPDATE jobs SET status = ?, stage = NULL, attempts = attempts + 1, lease_owner = ?,
+                    lease_expires_at = ?, claimed_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (RUNNING, owner, now + lease_seconds, now, now, row["id"]),
+            )
+            claimed = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return self._row(claimed)
+
+    def heartbeat(self, job_ids: Iterable[str], owner: str, lease_seconds: float) -> None:
+        ids = list(job_ids)
+        if not ids:
+            return
+        now = time.time()
+        placeholders = ",".join("?" for _ in ids)
+        self._connection().execute(
+            f"UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+            f"WHERE id IN ({placeholders}) AND lease_owner = ? AND status = ?",
+            (now + lease_seconds, now, *ids, owner, RUNNING),
+        )
+
+    def set_stage(self, job_id: str, owner: str, stage: str, lease_seconds: float) -> bool:
+        """Registra la etapa, extiende el lease y retorna True si se pidió cancelar."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row and row["cancel_requested"]:
+                return True
+            conn.execute(
+                "UPDATE jobs SET stage = ?, lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (stage, now + lease_seconds, now, job_id, owner),
+            )
+        return False
+
+    def complete(self, job_id: str, owner: str) -> None:
+        self._finish(job_id, owner, SUCCEEDED, None)
+
+    def fail(self, job_id: str, owner: str, error: str, retry_in: Optional[float]) -> str:
+        """Reencola con backoff si quedan intentos y `retry_in` no es None; si no, marca failed."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts, cancel_requested FROM jobs WHERE id = ? AND lease_owner = ?",
+                (job_id, owner),
+            ).fetchone()
+            if row is None:
+                return FAILED
+            if retry_in is not None and not row["cancel_requested"] and row["attempts"] < row["max_attempts"]:
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                        last_error = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (QUEUED, now + retry_in, error[:2000], now, job_id),
+                )
+                return QUEUED
+        self._finish(job_id, owner, FAILED, error)
+        return FAILED
+
+    def mark_cancelled(self, job_id: str, owner: str) -> None:
+        self._finish(job_id, owner, CANCELLED, None)
+
+    def _finish(self, job_id: str, owner: str, status: str, error: Optional[str]) -> None:
+        now = time.time()
+        self._connection().execute(
+            """
+            UPDATE jobs SET status = ?, payload = NULL, lease_owner = NULL, lease_expires_at = NULL,
+                last_error = COALESCE(?, last_error), finished_at = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ?
+            """,
+            (status, error[:2000] if error else None, now, now, job_id, owner),
+        )
+
+    def cancel(self, kind: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancela un job en cola de inmediato; a uno corriendo le marca cancel_requested,
+        salvo que ya esté en COMMITTING (el caller debe tratarlo como no cancelable).
+        `cancelled_now` indica si esta llamada hizo la transición a cancelled.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cancelled_now = conn.execute(
+                """
+                UPDATE jobs SET status = ?, payload = NULL, finished_at = ?, updated_at = ?
+                WHERE kind = ? AND idempotency_key = ? AND status = ?
+                """,
+                (CANCELLED, now, now, kind, idempotency_key, QUEUED),
+            ).rowcount
+            conn.execute(
+                """
+                UPDATE jobs SET cancel_requested = 1, updated_at = ?
+                WHERE kind = ? AND idempotency_key = ? AND status = ? AND stage IS NOT ?
+                """,
+                (now, kind, idempotency_key, RUNNING, COMMITTING),
+            )
+            row = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE kind = ? AND idempotency_key = ?", (kind, idempotency_key)
+            ).fetchone()
+        job = self._row(row)
+        if job is not None:
+            job["cancelled_now"] = bool(cancelled_now)
+        return job
+
+    def reap_expired(self, kind: str) -> List[Dict[str, Any]]:
+        """
+        Devuelve a la cola los jobs cuyo worker dejó de enviar heartbeat.
+        Retorna los que agotaron intentos (quedan failed) para notificar al dueño.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            expired = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE kind = ? AND status = ? AND lease_expires_at < ?",
+                (kind, RUNNING, now),
+            ).fetchall()
+            exhausted = []
+            for row in expired:
+                if row["cancel_requested"]:
+                    status, error = CANCELLED, None
+                elif row["attempts"] >= row["max_attempts"]:
+                    status, error = FAILED, "worker lost (lease expired)"
+                    exhausted.append(self._row(row))
+                else:
+                    status, error = QUEUED, "worker lost (lease expired)"
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                        last_error = COALESCE(?, last_error),
+                        payload = CASE WHEN ? = 'queued' THEN payload ELSE NULL END,
+                        finished_at = CASE WHEN ? = 'queued' THEN NULL ELSE ? END,
+                        updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (status, now, error, status, status, now, now, row["id"]),
+                )
+            if expired:
+                logger.warning(f"♻️ Job queue {kind}: recovered {len(expired)} job(s) with expired lease")
+        return exhausted
+
+    def purge_finished(self, kind: str, older_than_seconds: float) -> int:
+        cutoff = time.time() - older_than_seconds
+        placeholders = ",".join("?" for _ in TERMINAL_STATUSES)
+        cursor = self._connection().execute(
+            f"DELETE FROM jobs WHERE kind = ? AND status IN ({placeholders}) AND finished_at < ?",
+            (kind, *TERMINAL_STATUSES, cutoff),
+        )
+        return cursor.rowcount or 0
+
+    # ------------------------------------------------------------------ lectura
+
+    def get(self, kind: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        row = conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE kind = ? AND idempotency_key = ?", (kind, idempotency_key)
+        ).fetchone()
+        job = self._row(row)
+        if job is None:
+            return None
+        job["queue_position"] = None
+        if job["status"] == QUEUED:
+            job["queue_position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE kind = ? AND status = ? AND created_at < ?",
+                (kind, QUEUED, job["created_at"]),
+            ).fetchone()[0] + 1
+        return job
+
+    def stats(self, kind: str) -> Dict[str, int]:
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) AS total FROM jobs WHERE kind = ? GROUP BY status", (kind,)
+        ).fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, *TERMINAL_STATUSES)}
+        counts.update({row["status"]: row["total"] for row in rows})
+        return counts
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK: serializa writers entre procesos."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class JobQueue:
+    """Consumidores en hilos daemon sobre un SQLiteJobStore compartido."""
+
+    def __init__(
+        self,
+        kind: str,
+        handler: Callable[[Dict[str, Any], Callable[[str], None]], None],
+        *,
+        on_failure: Optional[Callable[[Dict[str, Any], BaseException], None]] = None,
+        on_cancel: Optional[Callable[[Dict[str, Any]], None]] = None,
+        retryable: Tuple[Type[BaseException], ...] = (Exception,),
+        store: Optional[SQLiteJobStore] = None,
+        concurrency: Optional[int] = None,
+        max_running: Optional[int] = None,
+        max_per_key: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        retry_backoff_seconds: Optional[float] = None,
+        poll_interval_seconds: float = 1.0,
+        retention_seconds: float = 7 * 24 * 3600,
+    ):
+        self.kind = kind
+        self.handler = handler
+        self.on_failure = on_failure
+        self.on_cancel = on_cancel
+        self.retryable = retryable
+        self.store = store or SQLiteJobStore()
+        self.concurrency = max(1, concurrency or int(os.getenv("JOB_QUEUE_CONCURRENCY", "2")))
+        self.max_running = max(1, max_running or int(os.getenv("JOB_QUEUE_MAX_RUNNING", str(self.concurrency))))
+        self.max_per_key = max(1, max_per_key or int(os.getenv("JOB_QUEUE_MAX_PER_ORG", "1")))
+        self.max_attempts = max(1, max_attempts or int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "3")))
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_QUEUE_LEASE_SECONDS", "60"))
+        self.retry_backoff_seconds = (
+            retry_backoff_seconds
+            if retry_backoff_seconds is not None
+            else float(os.getenv("JOB_QUEUE_RETRY_BACKOFF_SECONDS", "5"))
+        )
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running_jobs: Dict[str, Dict[str, Any]] = {}
+        self._pid: Optional[int] = None
+        self.owner = ""
+
+    # ------------------------------------------------------------------ ciclo de vida
+
+    def ensure_started(self) -> None:
+        """Arranca los consumidores una vez por proceso (re-arranca tras fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._running_jobs = {}
+            self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._threads = [
+                threading.Thread(target=self._worker_loop, name=f"{self.kind}-worker-{index}", daemon=True)
+                for index in range(self.concurrency)
+            ]
+            self._threads.append(
+                threading.Thread(target=self._maintenance_loop, name=f"{self.kind}-heartbeat", daemon=True)
+            )
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+            logger.info(
+                f"📬 Job queue {self.kind} started: {self.concurrency} worker(s), max_running={self.max_running}, "
+                f"max_per_org={self.max_per_key}, db={self.store.path}"
+            )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pid = None
+
+    # ------------------------------------------------------------------ API
+
+    def enqueue(self, idempotency_key: str, payload: Dict[str, Any], *, fairness_key: Optional[str]) -> Dict[str, Any]:
+        job, created = self.store.enqueue(
+            self.kind,
+            idempotency_key,
+            payload,
+            fairness_key=fairness_key or "anonymous",
+            max_attempts=self.max_attempts,
+        )
+        if created:
+            logger.info(f"📬 Job queued ({self.kind}): {idempotency_key} [key={job['fairness_key']}]")
+        else:
+            logger.info(f"📬 Job already {job['status']} ({self.kind}): {idempotency_key} - not enqueued again")
+        self.ensure_started()
+        self._wake.set()
+        job.pop("payload", None)
+        return job
+
+    def cancel(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        job = self.store.cancel(self.kind, idempotency_key)
+        if job is None:
+            return None
+        if job.pop("cancelled_now") and self.on_cancel:
+            self._safe_callback(self.on_cancel, job)
+        job.pop("payload", None)
+        return job
+
+    def get(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(self.kind, idempotency_key)
+        if job:
+            job.pop("payload", None)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats(self.kind)
+
+    # ------------------------------------------------------------------ ejecución
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(
+                    self.kind,
+                    self.owner,
+                    lease_seconds=self.lease_seconds,
+                    max_running=self.max_running,
+                    max_per_key=self.max_per_key,
+                )
+            except Exception as e:
+                logger.error(f"❌ Job queue {self.kind}: claim failed: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval_seconds)
+                self._wake.clear()
+                continue
+            self.run_job(job)
+
+    def run_job(self, job: Dict[str, Any]) -> str:
+        """Ejecuta un job reclamado y registra su resultado. Retorna el estado final."""
+        job_id = job["id"]
+        job["payload"] = json.loads(job["payload"]) if isinstance(job.get("payload"), str) else job.get("payload")
+
+        def progress(stage: str) -> None:
+            if self.store.set_stage(job_id, self.owner, stage, self.lease_seconds):
+                raise JobCancelled(f"{self.kind} job {job['idempotency_key']} cancelled at stage {stage}")
+
+        with self._lock:
+            self._running_jobs[job_id] = job
+        try:
+            logger.info(
+                f"▶️ Job {self.kind} {job['idempotency_key']} attempt {job['attempts']}/{job['max_attempts']}"
+            )
+            self.handler(job, progress)
+            self.store.complete(job_id, self.owner)
+            return SUCCEEDED
+        except JobCancelled:
+            logger.info(f"🛑 Job {self.kind} {job['idempotency_key']} cancelled")
+            self.store.mark_cancelled(job_id, self.owner)
+            if self.on_cancel:
+                self._safe_callback(self.on_cancel, job)
+            return CANCELLED
+        except Exception as exc:
+            retry_in = None
+            if isinstance(exc, self.retryable):
+                retry_in = self.retry_backoff_seconds * (2 ** max(job["attempts"] - 1, 0))
+            status = self.store.fail(job_id, self.owner, f"{type(exc).__name__}: {exc}", retry_in)
+            if status == QUEUED:
+                logger.warning(
+                    f"🔁 Job {self.kind} {job['idempotency_key']} failed (attempt {job['attempts']}), "
+                    f"retrying in {retry_in:.0f}s: {exc}"
+                )
+            else:
+                logger.error(f"❌ Job {self.kind} {job['idempotency_key']} failed permanently: {exc}")
+                if self.on_failure:
+                    self._safe_callback(self.on_failure, job, exc)
+            return status
+        finally:
+            with self._lock:
+                self._running_jobs.pop(job_id, None)
+
+    def _maintenance_loop(self) -> None:
+        last_purge = 0.0
+        interval = max(self.lease_seconds / 3, 0.5)
+        while not self._stop.wait(interval):
+            try:
+                with self._lock:
+                    running_ids = list(self._running_jobs)
+                self.store.heartbeat(running_ids, self.owner, self.lease_seconds)
+                for job in self.store.reap_expired(self.kind):
+                    if self.on_failure:
+                        self._safe_callback(self.on_failure, job, RuntimeError(job.get("last_error") or "worker lost"))
+                if time.time() - last_purge > 3600:
+                    self.store.purge_finished(self.kind, self.retention_seconds)
+                    last_purge = time.time()
+            except Exception as e:
+                logger.error(f"❌ Job queue {self.kind}: maintenance failed: {e}")
+
+    @staticmethod
+    def _safe_callback(callback: Callable, *args) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"❌ Job queue callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+__all__ = [
+    "JobQueue",
+    "JobCancelled",
+    "SQLiteJobStore",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "FAILED",
+    "CANCELLED",
+    "default_db_path",
+]
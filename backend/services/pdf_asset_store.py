@@ -0,0 +1,213 @@
+"""
+🖼️ PDF Asset Store - Pre-resolución de imágenes remotas para render PDF
+
+Los HTML de propuestas referencian logos en Cloudinary. Si el renderer
+(Playwright/WeasyPrint/pdfkit) los descarga durante el render, cada PDF paga
+latencia de red y falla de forma intermitente. Este store descarga cada URL
+una sola vez, la guarda en disco direccionada por contenido (sha256) con una
+variante redimensionada y reescribe el HTML con data URIs, de modo que el
+render no necesita red.
+
+Usage:
+    html = pdf_asset_store.inline_remote_assets(html)
+"""
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from backend.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# src="https://..." en <img> y url(https://...) en CSS
+_IMG_SRC_RE = re.compile(r'(\bsrc\s*=\s*)(["\'])(https?://[^"\'\s>]+)\2', re.IGNORECASE)
+_CSS_URL_RE = re.compile(r'(url\(\s*)(["\']?)(https?://[^"\')\s]+)\2(\s*\))', re.IGNORECASE)
+
+_RASTER_FORMATS = {"image/png": "PNG", "image/jpeg": "JPEG", "image/webp": "WEBP", "image/gif": "GIF"}
+
+
+class PDFAssetStore:
+    """Store local content-addressed de imágenes remotas usadas en PDFs"""
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        inline_max_bytes: Optional[int] = None,
+        max_dimension: Optional[int] = None,
+    ):
+        self.base_dir = Path(base_dir or os.getenv("PDF_ASSET_STORE_DIR", "/tmp/rfx_pdf_assets"))
+        self.inline_max_bytes = inline_max_bytes or int(os.getenv("PDF_ASSET_INLINE_MAX_BYTES", str(512 * 1024)))
+        self.max_dimension = max_dimension or int(os.getenv("PDF_ASSET_MAX_DIMENSION", "1200"))
+        self.fetch_timeout = float(os.getenv("PDF_ASSET_FETCH_TIMEOUT_SECONDS", "5"))
+        self.max_fetch_bytes = int(os.getenv("PDF_ASSET_MAX_FETCH_BYTES", str(5 * 1024 * 1024)))
+        # Las URLs sin versión (p.ej. logos/<user>/logo) pueden cambiar de contenido
+        # o desaparecer: la referencia url -> digest y el data URI en memoria se
+        # revalidan con el mismo TTL para que ninguno sobreviva al otro.
+        self.ref_ttl_seconds = float(os.getenv("PDF_ASSET_REF_TTL_SECONDS", "3600"))
+        # url -> data URI listo para inyectar; los fallos se recuerdan un rato
+        # para no reintentar la descarga en cada render.
+        self._data_uris = TTLCache(ttl_seconds=self.ref_ttl_seconds, max_entries=512)
+        self._failures = TTLCache(ttl_seconds=float(os.getenv("PDF_ASSET_FAILURE_TTL_SECONDS", "300")), max_entries=512)
+
+    # ========================
+    # API PÚBLICA
+    # ========================
+
+    def inline_remote_assets(self, html_content: str) -> str:
+        """Reemplaza imágenes remotas por data URIs. URLs no resolubles se mantienen."""
+        if not html_content or "http" not in html_content:
+            return html_content
+
+        urls = {match.group(3) for match in _IMG_SRC_RE.finditer(html_content)}
+        urls.update(match.group(3) for match in _CSS_URL_RE.finditer(html_content))
+        if not urls:
+            return html_content
+
+        resolved = {url: self.get_data_uri(url) for url in urls}
+        resolved = {url: data_uri for url, data_uri in resolved.items() if data_uri}
+        if not resolved:
+            return html_content
+
+        html_content = _IMG_SRC_RE.sub(
+            lambda m: f"{m.group(1)}{m.group(2)}{resolved[m.group(3)]}{m.group(2)}" if m.group(3) in resolved else m.group(0),
+            html_content,
+        )
+        html_content = _CSS_URL_RE.sub(
+            lambda m: f"{m.group(1)}{m.group(2)}{resolved[m.group(3)]}{m.group(2)}{m.group(4)}" if m.group(3) in resolved else m.group(0),
+            html_content,
+        )
+        logger.info(f"🖼️ Inlined {len(resolved)}/{len(urls)} remote assets for PDF render")
+        return html_content
+
+    def get_data_uri(self, url: str) -> Optional[str]:
+        """Data URI de la variante para PDF de `url`, o None si no se puede resolver bajo el límite"""
+        return self._data_uris.get_or_load(url, lambda: self._build_data_uri(url))
+
+    def resolve(self, url: str) -> Optional[Dict[str, str]]:
+        """Asegura que `url` esté en el store. Retorna {digest, path, mime_type} o None"""
+        if self._failures.get(url):
+            return None
+
+        ref = self._read_ref(url)
+        if ref and Path(ref["path"]).exists():
+            return ref
+
+        try:
+            content, mime_type = self._fetch(url)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch asset for PDF ({url}): {e}")
+            self._failures.set(url, True)
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._content_path(digest)
+        if not path.exists():
+            self._write_atomic(path, content)
+
+        ref = {"digest": digest, "path": str(path), "mime_type": mime_type}
+        self._write_atomic(self._ref_path(url), json.dumps(ref).encode("utf-8"))
+        return ref
+
+    def invalidate(self, url: str) -> None:
+        """Olvida la referencia de `url` (logo reemplazado o eliminado); el contenido ya guardado se conserva"""
+        self._data_uris.invalidate(url)
+        self._failures.invalidate(url)
+        try:
+            self._ref_path(url).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove asset reference ({url}): {e}")
+
+    # ========================
+    # INTERNOS
+    # ========================
+
+    def _build_data_uri(self, url: str) -> Optional[str]:
+        ref = self.resolve(url)
+        if not ref:
+            return None
+
+        path, mime_type = self._variant_for_pdf(ref)
+        content = path.read_bytes()
+        if len(content) > self.inline_max_bytes:
+            logger.warning(f"⚠️ Asset exceeds inline cap ({len(content)} bytes), keeping remote URL: {url}")
+            return None
+        return f"data:{mime_type};base64,{base64.b64encode(content).decode('ascii')}"
+
+    def _variant_for_pdf(self, ref: Dict[str, str]):
+        """Variante redimensionada (lado mayor <= max_dimension). SVG y formatos no raster se usan tal cual"""
+        original = Path(ref["path"])
+        mime_type = ref["mime_type"]
+        image_format = _RASTER_FORMATS.get(mime_type)
+        if not image_format:
+            return original, mime_type
+
+        variant = original.with_name(f"{ref['digest']}_max{self.max_dimension}")
+        if variant.exists():
+            return variant, mime_type
+
+        try:
+            from PIL import Image
+
+            with Image.open(original) as image:
+                if max(image.size) <= self.max_dimension:
+                    return original, mime_type
+                image.thumbnail((self.max_dimension, self.max_dimension))
+                buffer = io.BytesIO()
+                image.save(buffer, format=image_format)
+            self._write_atomic(variant, buffer.getvalue())
+            return variant, mime_type
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create resized asset variant, using original: {e}")
+            return original, mime_type
+
+    def _fetch(self, url: str):
+        with requests.get(url, timeout=self.fetch_timeout, stream=True) as response:
+            response.raise_for_status()
+            mime_type = (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if not mime_type.startswith("image/"):
+                raise ValueError(f"Unexpected content type: {mime_type or 'unknown'}")
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                size += len(chunk)
+                if size > self.max_fetch_bytes:
+                    raise ValueError(f"Asset larger than {self.max_fetch_bytes} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks), mime_type
+
+    def _read_ref(self, url: str) -> Optional[Dict[str, str]]:
+        ref_path = self._ref_path(url)
+        try:
+            if time.time() - ref_path.stat().st_mtime > self.ref_ttl_seconds:
+                return None
+            return json.loads(ref_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _content_path(self, digest: str) -> Path:
+        return self.base_dir / "objects" / digest[:2] / digest
+
+    def _ref_path(self, url: str) -> Path:
+        return self.base_dir / "refs" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _write_atomic(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+
+# Instancia global del store
+pdf_asset_store = PDFAssetStore()
@@ -0,0 +1,152 @@
+"""
+💾 Pricing Configuration Cache - Read-through por request y por proceso
+
+Una sola generación de propuesta lee la configuración de pricing del mismo RFX
+varias veces (unified budget service, RPC `get_rfx_pricing_config`, vista
+`active_rfx_pricing`). Este cache colapsa esas lecturas:
+
+- Nivel request: dict en `flask.g`, consistente durante toda la request.
+- Nivel proceso: TTLCache corto (PRICING_CONFIG_CACHE_TTL_SECONDS, default 30s)
+  para requests consecutivas del mismo worker.
+
+Los writers (`update_*`, `apply_preset_to_rfx`, `save_rfx_pricing_configuration`,
+`update_user_defaults`) deben llamar a `invalidate_rfx` / `invalidate_user`.
+
+La invalidación solo alcanza al worker que escribe: los demás workers de
+gunicorn pueden servir la configuración anterior hasta que expire su TTL
+(ventana de PRICING_CONFIG_CACHE_TTL_SECONDS). Poner 0 desactiva el nivel
+proceso si esa ventana no es aceptable.
+
+Defaults y fallbacks sintetizados no se cachean: el loader los envuelve en
+`Uncached(...)` para que una configuración real escrita poco después se lea
+en la siguiente request.
+"""
+import copy
+import logging
+import os
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from flask import g, has_app_context
+
+from backend.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Namespaces de claves: (namespace, id)
+RFX_PRICING_CONFIG = "rfx_pricing_config"
+ACTIVE_RFX_PRICING = "active_rfx_pricing"
+RFX_EFFECTIVE_CONFIG = "rfx_effective_config"
+USER_UNIFIED_CONFIG = "user_unified_config"
+
+_RFX_NAMESPACES = (RFX_PRICING_CONFIG, ACTIVE_RFX_PRICING, RFX_EFFECTIVE_CONFIG)
+
+
+class Uncached:
+    """Resultado de un loader que se retorna pero no se guarda (defaults/fallbacks)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class PricingConfigCache:
+    """Cache de dos niveles (request + proceso) para configuración de pricing"""
+
+    REQUEST_ATTR = "_pricing_config_cache"
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 2048):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("PRICING_CONFIG_CACHE_TTL_SECONDS", "30"))
+        self.enabled = ttl_seconds > 0
+        self._process_cache = TTLCache(ttl_seconds=max(ttl_seconds, 0.001), max_entries=max_entries)
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key_id: Any,
+        loader: Callable[[], Any],
+        *,
+        should_cache: Callable[[Any], bool] = lambda value: value is not None,
+    ) -> Any:
+        """Retorna una copia del valor cacheado o lo carga con `loader`."""
+        if not key_id:
+            value = loader()
+            return value.value if isinstance(value, Uncached) else value
+
+        key = (namespace, str(key_id))
+        request_cache = self._request_cache()
+
+        if request_cache is not None and key in request_cache:
+            return copy.deepcopy(request_cache[key])
+
+        value = self._process_cache.get(key, _MISSING) if self.enabled else _MISSING
+        if value is _MISSING:
+            value = loader()
+            if isinstance(value, Uncached):
+                return value.value
+            if not should_cache(value):
+                return value
+            if self.enabled:
+                self._process_cache.set(key, value)
+        else:
+            logger.debug(f"💾 Pricing cache hit: {namespace}:{key_id}")
+
+        if request_cache is not None:
+            request_cache[key] = value
+        return copy.deepcopy(value)
+
+    def invalidate_rfx(self, rfx_id: Any) -> None:
+        """Invalida todas las vistas de configuración de un RFX."""
+        if not rfx_id:
+            return
+        keys = [(namespace, str(rfx_id)) for namespace in _RFX_NAMESPACES]
+        for key in keys:
+            self._process_cache.invalidate(key)
+        request_cache = self._request_cache()
+        if request_cache is not None:
+            for key in keys:
+                request_cache.pop(key, None)
+        logger.debug(f"🧹 Pricing cache invalidated for RFX {rfx_id}")
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """
+        Invalida la configuración unificada del usuario.
+
+        La configuración efectiva de sus RFX hereda de los defaults del usuario,
+        así que también se descartan todas las entradas `rfx_effective_config`.
+        """
+        if not user_id:
+            return
+        user_key = (USER_UNIFIED_CONFIG, str(user_id))
+
+        def _is_stale(key: Hashable) -> bool:
+            return key == user_key or (isinstance(key, tuple) and key[0] == RFX_EFFECTIVE_CONFIG)
+
+        self._process_cache.invalidate_where(_is_stale)
+        request_cache = self._request_cache()
+        if request_cache is not None:
+            for key in [k for k in request_cache if _is_stale(k)]:
+                request_cache.pop(key, None)
+        logger.debug(f"🧹 Pricing cache invalidated for user {user_id}")
+
+    def clear(self) -> None:
+        self._process_cache.clear()
+        request_cache = self._request_cache()
+        if request_cache is not None:
+            request_cache.clear()
+
+    def _request_cache(self) -> Optional[Dict[Hashable, Any]]:
+        if not has_app_context():
+            return None
+        request_cache = getattr(g, self.REQUEST_ATTR, None)
+        if request_cache is None:
+            request_cache = {}
+            setattr(g, self.REQUEST_ATTR, request_cache)
+        return request_cache
+
+
+# Instancia global compartida por los servicios de pricing
+pricing_config_cache = PricingConfigCache()
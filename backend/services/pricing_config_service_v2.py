@@ -5,7 +5,7 @@ Coordinación y costo por persona completamente independientes
 """
 import uuid
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Union
 from datetime import datetime
 
 from backend.models.pricing_models import (
@@ -14,6 +14,9 @@ from backend.models.pricing_models import (
     get_default_presets, PricingConfigValue, CoordinationLevel
 )
 from backend.core.database import get_database_client
+from backend.services.pricing_config_cache import (
+    pricing_config_cache, Uncached, RFX_PRICING_CONFIG, ACTIVE_RFX_PRICING
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +33,9 @@ except ImportError:
 class PricingConfigurationServiceV2:
     """Servicio V2.2 que usa las nuevas tablas de pricing directamente"""
     
+    # Máximo de RFX por chunk en operaciones bulk (limita el tamaño de `in_` y upserts)
+    BULK_CHUNK_SIZE = 200
+    
     def __init__(self):
         self.db_client = get_database_client()
     
@@ -38,32 +44,39 @@ class PricingConfigurationServiceV2:
     # ========================
     
     def get_rfx_pricing_configuration(self, rfx_id: str) -> Optional[RFXPricingConfiguration]:
-        """Obtener configuración de pricing desde las nuevas tablas"""
+        """Obtener configuración de pricing desde las nuevas tablas (read-through cache)"""
         try:
-            logger.info(f"🔍 Getting pricing configuration for RFX: {rfx_id} (from DB tables)")
-            
-            # Usar la vista optimizada para obtener configuración completa
-            response = self.db_client.client.rpc(
-                'get_rfx_pricing_config',
-                {'rfx_uuid': rfx_id}
-            ).execute()
-            
-            if not response.data:
-                logger.info(f"📝 No pricing configuration found for RFX {rfx_id}")
-                # 🧠 Try to get user preferences from learning system
-                return self._create_default_configuration(rfx_id, use_learning=True)
-            
-            config_data = response.data[0]
-            config = self._map_db_data_to_model(rfx_id, config_data)
-            
-            logger.info(f"✅ Retrieved pricing configuration for RFX {rfx_id}")
-            return config
-            
+            return pricing_config_cache.get_or_load(
+                RFX_PRICING_CONFIG, rfx_id,
+                lambda: self._load_rfx_pricing_configuration(rfx_id)
+            )
         except Exception as e:
             logger.error(f"❌ Error getting pricing configuration for RFX {rfx_id}: {e}")
-            # Fallback a configuración por defecto
+            # Fallback a configuración por defecto (no se cachea)
             return self._create_default_configuration(rfx_id)
     
+    def _load_rfx_pricing_configuration(self, rfx_id: str) -> Union[RFXPricingConfiguration, Uncached]:
+        """Leer configuración de pricing desde DB (sin cache)"""
+        logger.info(f"🔍 Getting pricing configuration for RFX: {rfx_id} (from DB tables)")
+        
+        # Usar la vista optimizada para obtener configuración completa
+        response = self.db_client.client.rpc(
+            'get_rfx_pricing_config',
+            {'rfx_uuid': rfx_id}
+        ).execute()
+        
+        if not response.data:
+            logger.info(f"📝 No pricing configuration found for RFX {rfx_id}")
+            # 🧠 Try to get user preferences from learning system
+            # Default recién creado: no se cachea, la próxima lectura lo trae de DB
+            return Uncached(self._create_default_configuration(rfx_id, use_learning=True))
+        
+        config_data = response.data[0]
+        config = self._map_db_data_to_model(rfx_id, config_data)
+        
+        logger.info(f"✅ Retrieved pricing configuration for RFX {rfx_id}")
+        return config
+    
     def update_rfx_pricing_from_request(self, request: PricingConfigurationRequest) -> Optional[RFXPricingConfiguration]:
         """Actualizar configuración de pricing para un RFX usando tablas normalizadas (V2.2)
 
@@ -136,6 +149,7 @@ class PricingConfigurationServiceV2:
                 raise Exception("upsert_rfx_pricing_configuration_atomic returned invalid config id")
 
             logger.info(f"✅ [V2] Atomic pricing upsert completed for RFX {rfx_id}, config_id={pricing_config_id}")
+            pricing_config_cache.invalidate_rfx(rfx_id)
 
             # 6) Log y retorno de configuración actualizada
             updated_config = self.get_rfx_pricing_configuration(rfx_id)
@@ -191,6 +205,7 @@ class PricingConfigurationServiceV2:
                     'config_data': self._model_to_db_data(config)
                 }
             ).execute()
+            pricing_config_cache.invalidate_rfx(rfx_id)
             
             if response.data and response.data[0].get('success'):
                 logger.info(f"✅ Pricing configuration saved for RFX {rfx_id}")
@@ -254,6 +269,7 @@ class PricingConfigurationServiceV2:
                     })\
                     .execute()
             
+            pricing_config_cache.invalidate_rfx(rfx_id)
             logger.info(f"✅ Coordination config updated independently for RFX {rfx_id}")
             return self.get_rfx_pricing_configuration(rfx_id)
             
@@ -305,6 +321,7 @@ class PricingConfigurationServiceV2:
                     })\
                     .execute()
             
+            pricing_config_cache.invalidate_rfx(rfx_id)
             logger.info(f"✅ Cost per person config updated independently for RFX {rfx_id}")
             return self.get_rfx_pricing_configuration(rfx_id)
             
@@ -364,6 +381,7 @@ class PricingConfigurationServiceV2:
                         .eq('id', tax_existing.data[0]['id'])\
                         .execute()
             
+            pricing_config_cache.invalidate_rfx(rfx_id)
             logger.info(f"✅ Taxes config updated independently for RFX {rfx_id}")
             return self.get_rfx_pricing_configuration(rfx_id)
             
@@ -402,6 +420,7 @@ class PricingConfigurationServiceV2:
                     'updated_by_user': updated_by
                 }
             ).execute()
+            pricing_config_cache.invalidate_rfx(rfx_id)
             
             success = bool(result.data and result.data[0].get('updated'))
             
@@ -434,6 +453,7 @@ class PricingConfigurationServiceV2:
                     'updated_by_user': updated_by
                 }
             ).execute()
+            pricing_config_cache.invalidate_rfx(rfx_id)
             
             success = bool(result.data and result.data[0].get('updated'))
             
@@ -459,18 +479,16 @@ class PricingConfigurationServiceV2:
         try:
             logger.info(f"🧮 Calculating pricing for RFX {rfx_id}, subtotal: ${base_subtotal:.2f} (from DB)")
             
-            # Obtener configuración activa usando vista optimizada
-            result = self.db_client.client.table('active_rfx_pricing')\
-                .select('*')\
-                .eq('rfx_id', rfx_id)\
-                .execute()
+            # Obtener configuración activa usando vista optimizada (read-through cache)
+            config_data = pricing_config_cache.get_or_load(
+                ACTIVE_RFX_PRICING, rfx_id,
+                lambda: self._load_active_pricing_row(rfx_id)
+            )
             
-            if not result.data:
+            if not config_data:
                 logger.warning(f"⚠️ No active pricing configuration for RFX {rfx_id}")
                 return self._calculate_basic_pricing(base_subtotal)
             
-            config_data = result.data[0]
-            
             # Inicializar cálculo
             calculation = PricingCalculation(subtotal=base_subtotal)
             
@@ -518,6 +536,14 @@ class PricingConfigurationServiceV2:
             logger.error(f"❌ Error calculating pricing for RFX {rfx_id}: {e}")
             return self._calculate_basic_pricing(base_subtotal)
     
+    def _load_active_pricing_row(self, rfx_id: str) -> Optional[Dict[str, Any]]:
+        """Leer la fila de `active_rfx_pricing` para un RFX (sin cache)"""
+        result = self.db_client.client.table('active_rfx_pricing')\
+            .select('*')\
+            .eq('rfx_id', rfx_id)\
+            .execute()
+        return result.data[0] if result.data else None
+    
     def get_pricing_breakdown(self, rfx_id: str) -> Dict[str, Any]:
         """Obtener desglose detallado de pricing desde DB"""
         try:
@@ -600,29 +626,241 @@ class PricingConfigurationServiceV2:
             logger.error(f"❌ Error applying preset to RFX {rfx_id}: {e}")
             return False
     
-    def bulk_update_coordination(self, rfx_ids: List[str], enabled: bool, rate: float, 
-                               updated_by: str = 'bulk_operation') -> Dict[str, bool]:
-        """Actualizar coordinación para múltiples RFX"""
-        try:
-            logger.info(f"🔄 Bulk updating coordination for {len(rfx_ids)} RFX records")
-            
-            results = {}
-            for rfx_id in rfx_ids:
-                try:
-                    success = self.update_coordination_config(rfx_id, enabled, rate, 'standard', updated_by)
-                    results[rfx_id] = success
-                except Exception as e:
-                    logger.error(f"❌ Failed to update coordination for RFX {rfx_id}: {e}")
-                    results[rfx_id] = False
-            
-            successful_updates = sum(1 for success in results.values() if success)
-            logger.info(f"✅ Bulk coordination update: {successful_updates}/{len(rfx_ids)} successful")
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"❌ Error in bulk coordination update: {e}")
+    def bulk_update_coordination(self, rfx_ids: List[str], enabled: bool, rate: float = 0.18,
+                               updated_by: str = 'bulk_operation',
+                               coordination_type: str = 'standard') -> Dict[str, bool]:
+        """Actualizar coordinación para múltiples RFX con operaciones set-based"""
+        coordination_type = coordination_type if coordination_type in {'basic', 'standard', 'premium', 'custom'} else 'standard'
+        
+        def apply_chunk(config_ids: Dict[str, str]) -> List[Dict[str, Any]]:
+            self._bulk_upsert_child_rows('coordination_configurations', [
+                {
+                    'pricing_config_id': config_id,
+                    'is_enabled': bool(enabled),
+                    'rate': float(rate),
+                    'coordination_type': coordination_type,
+                    'updated_at': datetime.now().isoformat()
+                }
+                for config_id in config_ids.values()
+            ])
+            return [
+                self._coordination_change_event(rfx_id, enabled, rate, updated_by)
+                for rfx_id in config_ids
+            ]
+        
+        return self._run_bulk_operation('coordination', rfx_ids, apply_chunk)
+    
+    def bulk_update_taxes(self, rfx_ids: List[str], enabled: bool, tax_rate: float = 0.16,
+                          tax_type: str = 'IVA', updated_by: str = 'bulk_operation') -> Dict[str, bool]:
+        """Actualizar impuestos para múltiples RFX con operaciones set-based"""
+        
+        def apply_chunk(config_ids: Dict[str, str]) -> List[Dict[str, Any]]:
+            self._bulk_set_taxes(list(config_ids.values()), enabled, tax_rate, tax_type)
+            return [
+                {
+                    "rfx_id": rfx_id,
+                    "change_type": "taxes_updated",
+                    "change_description": f"Taxes {'enabled' if enabled else 'disabled'}" +
+                                 (f" at {tax_rate*100:.1f}% ({tax_type})" if enabled else ""),
+                    "new_values": {"enabled": bool(enabled), "tax_rate": float(tax_rate), "tax_type": tax_type},
+                    "changed_by": updated_by
+                }
+                for rfx_id in config_ids
+            ]
+        
+        return self._run_bulk_operation('taxes', rfx_ids, apply_chunk)
+    
+    def bulk_update_cost_per_person(self, rfx_ids: List[str], enabled: bool, headcount: int = 120,
+                                    display_in_proposal: bool = True,
+                                    updated_by: str = 'bulk_operation') -> Dict[str, bool]:
+        """Actualizar costo por persona para múltiples RFX con operaciones set-based"""
+        headcount = headcount if (headcount and headcount > 0) else 120
+        
+        def apply_chunk(config_ids: Dict[str, str]) -> List[Dict[str, Any]]:
+            self._bulk_set_cost_per_person(list(config_ids.values()), enabled, headcount, display_in_proposal)
+            return [
+                self._cost_per_person_change_event(rfx_id, enabled, headcount, updated_by)
+                for rfx_id in config_ids
+            ]
+        
+        return self._run_bulk_operation('cost_per_person', rfx_ids, apply_chunk)
+    
+    def bulk_apply_preset(self, rfx_ids: List[str], preset_name: str,
+                          updated_by: str = 'bulk_operation') -> Dict[str, bool]:
+        """Aplicar un preset a múltiples RFX: una escritura por tabla hija y chunk"""
+        presets = get_default_presets()
+        preset = next((p for p in presets if p.name.lower().replace(" ", "_") == preset_name.lower()), None)
+        if not preset:
+            logger.error(f"❌ Preset '{preset_name}' not found")
             return {rfx_id: False for rfx_id in rfx_ids}
+        
+        coordination_rate = preset.coordination_rate if preset.coordination_rate is not None else 0.18
+        headcount = preset.default_headcount or 120
+        tax_rate = preset.default_tax_rate if preset.default_tax_rate is not None else 0.16
+        tax_type = preset.default_tax_type or 'IVA'
+        
+        def apply_chunk(config_ids: Dict[str, str]) -> List[Dict[str, Any]]:
+            pricing_config_ids = list(config_ids.values())
+            if preset.coordination_enabled:
+                self._bulk_upsert_child_rows('coordination_configurations', [
+                    {
+                        'pricing_config_id': config_id,
+                        'is_enabled': True,
+                        'rate': float(coordination_rate),
+                        'coordination_type': 'standard',
+                        'updated_at': datetime.now().isoformat()
+                    }
+                    for config_id in pricing_config_ids
+                ])
+            else:
+                self._bulk_disable_child_rows('coordination_configurations', pricing_config_ids)
+            self._bulk_set_cost_per_person(pricing_config_ids, preset.cost_per_person_enabled, headcount, True)
+            self._bulk_set_taxes(pricing_config_ids, preset.taxes_enabled, tax_rate, tax_type)
+            return [
+                {
+                    "rfx_id": rfx_id,
+                    "change_type": "preset_applied",
+                    "change_description": f"Applied pricing preset: {preset_name}",
+                    "new_values": {"preset_name": preset_name},
+                    "changed_by": updated_by
+                }
+                for rfx_id in config_ids
+            ]
+        
+        return self._run_bulk_operation(f"preset '{preset_name}'", rfx_ids, apply_chunk)
+    
+    def _run_bulk_operation(self, label: str, rfx_ids: List[str],
+                            apply_chunk: Callable[[Dict[str, str]], List[Dict[str, Any]]]) -> Dict[str, bool]:
+        """
+        Ejecuta una operación bulk por chunks de BULK_CHUNK_SIZE RFX.
+        
+        Por chunk: 1 select (+1 insert si faltan configs), 1 escritura por tabla
+        hija y 1 insert batch de historial. Si el chunk falla se reintenta RFX por
+        RFX, así una fila inválida solo marca como fallido a su propio RFX.
+        """
+        unique_ids = list(dict.fromkeys(str(rfx_id) for rfx_id in rfx_ids if rfx_id))
+        results = {str(rfx_id): False for rfx_id in rfx_ids}
+        logger.info(f"🔄 Bulk updating {label} for {len(unique_ids)} RFX records")
+        
+        for start in range(0, len(unique_ids), self.BULK_CHUNK_SIZE):
+            chunk = unique_ids[start:start + self.BULK_CHUNK_SIZE]
+            try:
+                history_events = self._apply_bulk_chunk(chunk, apply_chunk, results)
+            except Exception as e:
+                logger.warning(f"⚠️ Bulk {label} chunk of {len(chunk)} RFX failed ({e}), retrying per RFX")
+                history_events = []
+                for rfx_id in chunk:
+                    try:
+                        history_events.extend(self._apply_bulk_chunk([rfx_id], apply_chunk, results))
+                    except Exception as row_error:
+                        logger.error(f"❌ Bulk {label} update failed for RFX {rfx_id}: {row_error}")
+            finally:
+                for rfx_id in chunk:
+                    pricing_config_cache.invalidate_rfx(rfx_id)
+            
+            if not history_events:
+                continue
+            try:
+                self.db_client.insert_rfx_history_batch(history_events)
+            except Exception as e:
+                logger.error(f"❌ Error logging bulk {label} changes: {e}")
+        
+        successful_updates = sum(1 for success in results.values() if success)
+        logger.info(f"✅ Bulk {label} update: {successful_updates}/{len(unique_ids)} successful")
+        return results
+    
+    def _apply_bulk_chunk(self, rfx_ids: List[str],
+                          apply_chunk: Callable[[Dict[str, str]], List[Dict[str, Any]]],
+                          results: Dict[str, bool]) -> List[Dict[str, Any]]:
+        """Resuelve configs y aplica la escritura de un chunk; marca en `results` los RFX escritos."""
+        config_ids = self._resolve_active_pricing_config_ids(rfx_ids)
+        history_events = apply_chunk(config_ids)
+        for rfx_id in config_ids:
+            results[rfx_id] = True
+        return history_events
+    
+    def _resolve_active_pricing_config_ids(self, rfx_ids: List[str]) -> Dict[str, str]:
+        """Versión set-based de `_get_or_create_active_pricing_config_id` (rfx_id -> config_id)"""
+        if not rfx_ids:
+            return {}
+        existing = self.db_client.client.table('rfx_pricing_configurations')\
+            .select('id, rfx_id')\
+            .in_('rfx_id', rfx_ids)\
+            .eq('is_active', True)\
+            .execute()
+        
+        config_ids = {str(row['rfx_id']): str(row['id']) for row in (existing.data or [])}
+        missing = [rfx_id for rfx_id in rfx_ids if rfx_id not in config_ids]
+        if missing:
+            new_rows = [
+                {
+                    'id': str(uuid.uuid4()),
+                    'rfx_id': rfx_id,
+                    'configuration_name': 'Default Configuration',
+                    'is_active': True,
+                    'status': 'active',
+                    'created_by': 'bulk_operation'
+                }
+                for rfx_id in missing
+            ]
+            self.db_client.client.table('rfx_pricing_configurations').insert(new_rows).execute()
+            config_ids.update({row['rfx_id']: row['id'] for row in new_rows})
+            logger.info(f"📝 Created {len(new_rows)} active pricing configurations in one insert")
+        
+        return {rfx_id: config_ids[rfx_id] for rfx_id in rfx_ids}
+    
+    def _bulk_upsert_child_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Upsert multi-fila sobre una tabla hija (único por pricing_config_id)"""
+        if rows:
+            self.db_client.client.table(table)\
+                .upsert(rows, on_conflict='pricing_config_id')\
+                .execute()
+    
+    def _bulk_disable_child_rows(self, table: str, pricing_config_ids: List[str],
+                                 extra_fields: Optional[Dict[str, Any]] = None) -> None:
+        """Deshabilitar filas existentes sin tocar tasas ni headcount (no crea filas nuevas)"""
+        if pricing_config_ids:
+            self.db_client.client.table(table)\
+                .update({'is_enabled': False, 'updated_at': datetime.now().isoformat(), **(extra_fields or {})})\
+                .in_('pricing_config_id', pricing_config_ids)\
+                .execute()
+    
+    def _bulk_set_taxes(self, pricing_config_ids: List[str], enabled: bool,
+                        tax_rate: float, tax_type: str) -> None:
+        if not enabled:
+            self._bulk_disable_child_rows('tax_configurations', pricing_config_ids)
+            return
+        self._bulk_upsert_child_rows('tax_configurations', [
+            {
+                'pricing_config_id': config_id,
+                'is_enabled': True,
+                'tax_rate': float(tax_rate),
+                'tax_name': str(tax_type),
+                'updated_at': datetime.now().isoformat()
+            }
+            for config_id in pricing_config_ids
+        ])
+    
+    def _bulk_set_cost_per_person(self, pricing_config_ids: List[str], enabled: bool,
+                                  headcount: int, display_in_proposal: bool) -> None:
+        if not enabled:
+            # Igual que update_cost_per_person_only: se preserva el headcount existente
+            self._bulk_disable_child_rows(
+                'cost_per_person_configurations', pricing_config_ids,
+                {'display_in_proposal': bool(display_in_proposal)}
+            )
+            return
+        self._bulk_upsert_child_rows('cost_per_person_configurations', [
+            {
+                'pricing_config_id': config_id,
+                'is_enabled': True,
+                'headcount': int(headcount),
+                'display_in_proposal': bool(display_in_proposal),
+                'calculation_base': 'final_total',
+                'updated_at': datetime.now().isoformat()
+            }
+            for config_id in pricing_config_ids
+        ])
     
     # ========================
     # MÉTODOS PRIVADOS/UTILITARIOS
@@ -771,6 +1009,7 @@ class PricingConfigurationServiceV2:
                 config_value=PricingConfigValue(headcount=120, description="Cálculo por persona")
             )
             
+            pricing_config_cache.invalidate_rfx(rfx_id)
             logger.info(f"📝 Created {'learned' if recommended_config else 'default'} pricing configuration for RFX {rfx_id} in DB")
             return config
             
@@ -890,31 +1129,41 @@ class PricingConfigurationServiceV2:
     def _log_coordination_change(self, rfx_id: str, enabled: bool, rate: float, updated_by: str):
         """Log cambio específico de coordinación"""
         try:
-            self.db_client.insert_rfx_history({
-                "rfx_id": rfx_id,
-                "change_type": "coordination_updated",
-                "change_description": f"Coordination {'enabled' if enabled else 'disabled'}" + 
-                             (f" at {rate*100:.1f}%" if enabled else ""),
-                "new_values": {"enabled": bool(enabled), "rate": float(rate)},
-                "changed_by": updated_by
-            })
+            self.db_client.insert_rfx_history(
+                self._coordination_change_event(rfx_id, enabled, rate, updated_by)
+            )
         except Exception as e:
             logger.error(f"❌ Error logging coordination change: {e}")
     
+    def _coordination_change_event(self, rfx_id: str, enabled: bool, rate: float, updated_by: str) -> Dict[str, Any]:
+        return {
+            "rfx_id": rfx_id,
+            "change_type": "coordination_updated",
+            "change_description": f"Coordination {'enabled' if enabled else 'disabled'}" + 
+                         (f" at {rate*100:.1f}%" if enabled else ""),
+            "new_values": {"enabled": bool(enabled), "rate": float(rate)},
+            "changed_by": updated_by
+        }
+    
     def _log_cost_per_person_change(self, rfx_id: str, enabled: bool, headcount: int, updated_by: str):
         """Log cambio específico de costo por persona"""
         try:
-            self.db_client.insert_rfx_history({
-                "rfx_id": rfx_id,
-                "change_type": "cost_per_person_updated",
-                "change_description": f"Cost per person {'enabled' if enabled else 'disabled'}" + 
-                             (f" for {headcount} people" if enabled else ""),
-                "new_values": {"enabled": bool(enabled), "headcount": int(headcount)},
-                "changed_by": updated_by
-            })
+            self.db_client.insert_rfx_history(
+                self._cost_per_person_change_event(rfx_id, enabled, headcount, updated_by)
+            )
         except Exception as e:
             logger.error(f"❌ Error logging cost per person change: {e}")
     
+    def _cost_per_person_change_event(self, rfx_id: str, enabled: bool, headcount: int, updated_by: str) -> Dict[str, Any]:
+        return {
+            "rfx_id": rfx_id,
+            "change_type": "cost_per_person_updated",
+            "change_description": f"Cost per person {'enabled' if enabled else 'disabled'}" + 
+                         (f" for {headcount} people" if enabled else ""),
+            "new_values": {"enabled": bool(enabled), "headcount": int(headcount)},
+            "changed_by": updated_by
+        }
+    
     def _log_preset_application(self, rfx_id: str, preset_name: str, updated_by: str):
         """Log aplicación de preset"""
         try:
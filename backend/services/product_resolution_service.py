@@ -11,8 +11,10 @@ Objetivo: una sola lógica para matching + unidad + pricing + bundles.
 from __future__ import annotations
 
 import logging
+import os
 import re
-from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from backend.services.tools.search_catalog_variants_tool import search_catalog_variants_tool
 from backend.services.tools.resolve_complex_bundle_tool import resolve_complex_bundle_tool
@@ -22,6 +24,112 @@ from backend.services.tools.verify_pricing_totals_tool import verify_pricing_tot
 
 logger = logging.getLogger(__name__)
 
+CATALOG_PREFETCH_WORKERS = max(1, int(os.getenv("PRODUCT_RESOLUTION_CATALOG_WORKERS", "6")))
+
+
+class _CatalogVariantPrefetch:
+    """
+    Vista de catálogo con búsquedas pre-resueltas para una sola resolución.
+
+    Agrupa los nombres que necesitan precio (productos + items de breakdown),
+    los deduplica y ejecuta la cascada exact → fuzzy → semantic de cada uno en
+    paralelo. Las llamadas posteriores a `search_product_variants` se sirven
+    desde memoria; lo que no se pre-resolvió se delega al servicio real.
+    """
+
+    def __init__(self, catalog_search, organization_id: Optional[str], user_id: Optional[str]):
+        self.catalog_search = catalog_search
+        self.organization_id = organization_id
+        self.user_id = user_id
+        self._results: Dict[Tuple[str, Optional[str]], Tuple[int, Any]] = {}
+
+    @staticmethod
+    def _key(query: str, business_unit_id: Optional[str]) -> Tuple[str, Optional[str]]:
+        return " ".join(str(query or "").split()).casefold(), business_unit_id or None
+
+    def prefetch(self, requests: List[Tuple[str, Optional[str], int]]) -> None:
+        """requests: [(query, business_unit_id, max_variants)]"""
+        pending: Dict[Tuple[str, Optional[str]], Tuple[str, int]] = {}
+        for query, business_unit_id, max_variants in requests:
+            if not str(query or "").strip():
+                continue
+            key = self._key(query, business_unit_id)
+            cached = self._results.get(key)
+            if cached and cached[0] >= max_variants:
+                continue
+            first_query, current_max = pending.get(key, (query, 0))
+            pending[key] = (first_query, max(current_max, max_variants))
+
+        if not pending:
+            return
+
+        def _search(item):
+            key, (query, max_variants) = item
+            try:
+                return key, max_variants, self._search_remote(query, key[1], max_variants)
+            except Exception as e:
+                return key, max_variants, e
+
+        items = list(pending.items())
+        if len(items) == 1:
+            results = [_search(items[0])]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(CATALOG_PREFETCH_WORKERS, len(items)),
+                thread_name_prefix="catalog-prefetch",
+            ) as executor:
+                results = list(executor.map(_search, items))
+
+        for key, max_variants, result in results:
+            self._results[key] = (max_variants, result)
+
+        logger.info(
+            "🔍 Catalog prefetch: %s requested, %s unique searches",
+            len(requests),
+            len(items),
+        )
+
+    def search_product_variants(
+        self,
+        query: str,
+        organization_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        business_unit_id: Optional[str] = None,
+        max_variants: int = 5,
+    ) -> List[Dict[str, Any]]:
+        if organization_id != self.organization_id or user_id != self.user_id:
+            return self.catalog_search.search_product_variants(
+                query=query,
+                organization_id=organization_id,
+                user_id=user_id,
+                business_unit_id=business_unit_id,
+                max_variants=max_variants,
+            )
+
+        key = self._key(query, business_unit_id)
+        cached = self._results.get(key)
+        if not cached or cached[0] < max_variants:
+            try:
+                result = self._search_remote(query, business_unit_id, max_variants)
+            except Exception as e:
+                result = e
+            self._results[key] = (max_variants, result)
+            cached = self._results[key]
+
+        result = cached[1]
+        if isinstance(result, Exception):
+            raise result
+        return list(result[:max_variants])
+
+    def _search_remote(self, query: str, business_unit_id: Optional[str], max_variants: int):
+        return self.catalog_search.search_product_variants(
+            query=query,
+            organization_id=self.organization_id,
+            user_id=self.user_id,
+            business_unit_id=business_unit_id,
+            max_variants=max_variants,
+        ) or []
+
 
 class ProductResolutionService:
     """
@@ -113,6 +221,19 @@ class ProductResolutionService:
         business_unit_id = str(rfx_context.get("business_unit_id") or "").strip() or None
         resolved: List[Dict[str, Any]] = []
 
+        # Una sola pasada concurrente de catálogo para productos + breakdowns
+        catalog = self._catalog_view(organization_id, user_id)
+        if isinstance(catalog, _CatalogVariantPrefetch):
+            lookups: List[Tuple[str, Optional[str], int]] = []
+            for product in products:
+                name = self._product_name(product)
+                if name:
+                    lookups.append((name, None, 5))
+                lookups.extend(
+                    self._breakdown_price_lookups(self._provided_breakdown(product), business_unit_id)
+                )
+            catalog.prefetch(lookups)
+
         for product in products:
             resolved.append(
                 self._resolve_single_product_deterministic(
@@ -120,6 +241,7 @@ class ProductResolutionService:
                     organization_id=organization_id,
                     user_id=user_id,
                     rfx_context=rfx_context,
+                    catalog_search=catalog,
                 )
             )
 
@@ -146,6 +268,19 @@ class ProductResolutionService:
         clarifications = 0
         business_unit_id = str((rfx_context or {}).get("business_unit_id") or "").strip() or None
 
+        catalog = self._catalog_view(organization_id, user_id)
+        if isinstance(catalog, _CatalogVariantPrefetch):
+            lookups: List[Tuple[str, Optional[str], int]] = []
+            for idx, original in enumerate(original_products):
+                item = orchestrated_items[idx] if idx < len(orchestrated_items) else {}
+                price = item.get("precio_unitario", original.get("precio_unitario", original.get("unit_price")))
+                cost = item.get("costo_unitario", original.get("costo_unitario", original.get("unit_cost")))
+                if original.get("nombre") and (
+                    item.get("requires_clarification") or price in (None, 0, 0.0) or cost in (None, 0, 0.0)
+                ):
+                    lookups.append((original.get("nombre"), business_unit_id, 5))
+            catalog.prefetch(lookups)
+
         for idx, original in enumerate(original_products):
             item = orchestrated_items[idx] if idx < len(orchestrated_items) else {}
             qty = item.get("cantidad", original.get("cantidad", 1))
@@ -159,9 +294,9 @@ class ProductResolutionService:
             should_force_top_confidence = (
                 requires_clarification or price in (None, 0, 0.0) or cost in (None, 0, 0.0)
             )
-            if self.catalog_search and product_name and should_force_top_confidence:
+            if catalog and product_name and should_force_top_confidence:
                 try:
-                    variants = self.catalog_search.search_product_variants(
+                    variants = catalog.search_product_variants(
                         query=product_name,
                         organization_id=organization_id,
                         user_id=user_id,
@@ -227,13 +362,10 @@ class ProductResolutionService:
         organization_id: Optional[str],
         user_id: Optional[str],
         rfx_context: Dict[str, Any],
+        catalog_search=None,
     ) -> Dict[str, Any]:
-        name = str(
-            product.get("nombre")
-            or product.get("name")
-            or product.get("product_name")
-            or ""
-        ).strip()
+        catalog_search = catalog_search or self.catalog_search
+        name = self._product_name(product)
         qty = float(product.get("cantidad") or product.get("quantity") or 1)
         req_unit = str(product.get("unidad") or product.get("unit") or "unidades").strip().lower()
         description = str(product.get("descripcion") or product.get("description") or "").strip()
@@ -260,24 +392,23 @@ class ProductResolutionService:
             details = raw_specs_value.get("details")
             if isinstance(details, str):
                 specs_text = details.strip()
-        provided_breakdown = self._normalize_breakdown_items(
-            product.get("bundle_breakdown") or provided_specs.get("bundle_breakdown") or []
-        )
+        provided_breakdown = self._provided_breakdown(product)
         if provided_breakdown:
             provided_breakdown = self._enrich_breakdown_with_catalog_prices(
                 breakdown=provided_breakdown,
                 organization_id=organization_id,
                 user_id=user_id,
                 business_unit_id=str((rfx_context or {}).get("business_unit_id") or "").strip() or None,
+                catalog_search=catalog_search,
             )
 
         catalog_variant: Optional[Dict[str, Any]] = None
-        if self.catalog_search and name:
+        if catalog_search and name:
             variants_result = search_catalog_variants_tool(
                 product_name=name,
                 organization_id=organization_id,
                 user_id=user_id,
-                catalog_search=self.catalog_search,
+                catalog_search=catalog_search,
                 max_variants=5,
             )
             variants = variants_result.get("variants", [])
@@ -796,6 +927,7 @@ class ProductResolutionService:
         organization_id: Optional[str],
         user_id: Optional[str],
         business_unit_id: Optional[str] = None,
+        catalog_search=None,
     ) -> List[Dict[str, Any]]:
         if not breakdown:
             return []
@@ -803,25 +935,20 @@ class ProductResolutionService:
         if not self.catalog_search or not (organization_id or user_id):
             return breakdown
 
+        catalog = catalog_search or self._catalog_view(organization_id, user_id)
+        if isinstance(catalog, _CatalogVariantPrefetch):
+            # No-op para nombres ya pre-resueltos por resolve_for_chat_products
+            catalog.prefetch(self._breakdown_price_lookups(breakdown, business_unit_id))
+
         enriched: List[Dict[str, Any]] = []
         for item in breakdown:
             row = dict(item)
-            name = str(
-                row.get("nombre")
-                or row.get("name")
-                or (row.get("selected", {}).get("name") if isinstance(row.get("selected"), dict) else "")
-            ).strip()
-            current_price = self._safe_float(
-                row.get("precio_unitario")
-                or row.get("unit_price")
-                or row.get("price")
-                or row.get("price_unit"),
-                0.0,
-            )
+            name = self._breakdown_item_name(row)
+            current_price = self._breakdown_item_price(row)
 
             if name and current_price <= 0:
                 try:
-                    variants = self.catalog_search.search_product_variants(
+                    variants = catalog.search_product_variants(
                         query=name,
                         organization_id=organization_id,
                         user_id=user_id,
@@ -840,3 +967,57 @@ class ProductResolutionService:
             enriched.append(row)
 
         return enriched
+
+    # ------------------------------------------------------------------
+    # Catalog lookup helpers
+    # ------------------------------------------------------------------
+    def _catalog_view(self, organization_id: Optional[str], user_id: Optional[str]):
+        """Catálogo con prefetch por resolución; sin owner se usa el servicio tal cual."""
+        if not self.catalog_search or not (organization_id or user_id):
+            return self.catalog_search
+        return _CatalogVariantPrefetch(self.catalog_search, organization_id, user_id)
+
+    def _product_name(self, product: Dict[str, Any]) -> str:
+        return str(
+            product.get("nombre")
+            or product.get("name")
+            or product.get("product_name")
+            or ""
+        ).strip()
+
+    def _provided_breakdown(self, product: Dict[str, Any]) -> List[Dict[str, Any]]:
+        raw_specs_value = product.get("specifications")
+        if raw_specs_value is None:
+            raw_specs_value = product.get("especificaciones")
+        provided_specs = raw_specs_value if isinstance(raw_specs_value, dict) else {}
+        return self._normalize_breakdown_items(
+            product.get("bundle_breakdown") or provided_specs.get("bundle_breakdown") or []
+        )
+
+    def _breakdown_item_name(self, row: Dict[str, Any]) -> str:
+        return str(
+            row.get("nombre")
+            or row.get("name")
+            or (row.get("selected", {}).get("name") if isinstance(row.get("selected"), dict) else "")
+        ).strip()
+
+    def _breakdown_item_price(self, row: Dict[str, Any]) -> float:
+        return self._safe_float(
+            row.get("precio_unitario")
+            or row.get("unit_price")
+            or row.get("price")
+            or row.get("price_unit"),
+            0.0,
+        )
+
+    def _breakdown_price_lookups(
+        self,
+        breakdown: List[Dict[str, Any]],
+        business_unit_id: Optional[str],
+    ) -> List[Tuple[str, Optional[str], int]]:
+        lookups: List[Tuple[str, Optional[str], int]] = []
+        for row in breakdown:
+            name = self._breakdown_item_name(row)
+            if name and self._breakdown_item_price(row) <= 0:
+                lookups.append((name, business_unit_id, 3))
+        return lookups
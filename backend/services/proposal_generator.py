@@ -351,14 +351,10 @@ class ProposalGenerationService:
         Si no hay company name configurado, retorna vacío para que el LLM no invente."""
         try:
             # Buscar company name desde branding (template_analysis puede tenerlo)
-            branding_result = self.db_client.client.table("company_branding_assets")\
-                .select("template_analysis")\
-                .eq("user_id", user_id)\
-                .eq("is_active", True)\
-                .execute()
+            branding = user_branding_service.get_branding_with_analysis(user_id)
             
-            if branding_result.data and branding_result.data[0].get("template_analysis"):
-                analysis = branding_result.data[0]["template_analysis"]
+            if branding and branding.get("template_analysis"):
+                analysis = branding["template_analysis"]
                 if isinstance(analysis, dict):
                     company_name = analysis.get("company_name", "")
                     if company_name:
@@ -947,24 +943,12 @@ class ProposalGenerationService:
                     proposal_code=proposal_code, rfx_code=rfx_code, proposal_revision=proposal_revision
                 )
             
-            # 2. Obtener template HTML desde BD
+            # 2. Template HTML: viene en el mismo registro de branding cacheado
             html_template = branding.get('html_template')
             
             if not html_template:
-                logger.info("📝 Fetching HTML template from database...")
-                # Obtener HTML template directamente desde BD
-                db = get_database_client()
-                template_result = db.client.table("company_branding_assets")\
-                    .select("html_template")\
-                    .eq("user_id", user_id)\
-                    .eq("is_active", True)\
-                    .execute()
-                
-                if template_result.data and template_result.data[0].get('html_template'):
-                    html_template = template_result.data[0]['html_template']
-                    logger.info(f"✅ HTML template retrieved - Length: {len(html_template)} chars")
-                else:
-                    raise ValueError(f"No HTML template found for user: {user_id}. Please upload and analyze a template first.")
+                raise ValueError(f"No HTML template found for user: {user_id}. Please upload and analyze a template first.")
+            logger.info(f"✅ HTML template retrieved - Length: {len(html_template)} chars")
             
             # 3. Preparar datos del RFX para los agentes
             from datetime import datetime, timedelta
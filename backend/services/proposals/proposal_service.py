@@ -5,16 +5,19 @@ Servicio AI-FIRST que coordina generación de HTML profesional
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from openai import OpenAI
 
 from backend.core.config import get_openai_config
 from backend.core.database import get_database_client
 from backend.services.user_branding_service import user_branding_service
-from backend.prompts.proposal_generation import ProposalPrompts
 from backend.utils.html_validator import HTMLValidator
+from backend.utils.lazy_import import lazy_attr
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+# Prompt de ~30KB: se carga al generar la primera propuesta
+ProposalPrompts = lazy_attr("backend.prompts.proposal_generation", "ProposalPrompts")
+
 
 class ProposalService:
     """
@@ -26,14 +29,22 @@ class ProposalService:
     
     def __init__(self):
         config = get_openai_config()
-        self.client = OpenAI(
-            api_key=config.api_key,
-            max_retries=0  # Desactivar reintentos automáticos del SDK
-        )
+        self._api_key = config.api_key
+        self._client = None
         self.db = get_database_client()
         self.model = config.model
         self.validator = HTMLValidator()
         logger.info("📄 ProposalService initialized")
+
+    @property
+    def client(self):
+        """Cliente OpenAI creado en el primer uso (el singleton se instancia al importar)"""
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=self._api_key,
+                max_retries=0  # Desactivar reintentos automáticos del SDK
+            )
+        return self._client
     
     async def generate_proposal(
         self, 
@@ -0,0 +1,172 @@
+"""
+Buffered view tracking for public Budy proposals.
+
+Public proposal links are opened repeatedly (mobile clients, link previews),
+so views are accumulated in memory and flushed in batches through the
+`increment_proposal_public_views` RPC, which applies atomic increments and
+moves draft/sent opportunities to `viewed` server-side.
+"""
+from __future__ import annotations
+
+import atexit
+from datetime import datetime, timezone
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.core.database import get_database_client
+
+logger = logging.getLogger(__name__)
+
+
+class PublicViewTracker:
+    """Accumulate public proposal views and flush them in batches."""
+
+    def __init__(
+        self,
+        flush_interval_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.db = get_database_client()
+        self.flush_interval_seconds = (
+            flush_interval_seconds
+            if flush_interval_seconds is not None
+            else float(os.getenv("BUDY_VIEW_FLUSH_INTERVAL_SECONDS", "10"))
+        )
+        self.max_pending = max_pending or int(os.getenv("BUDY_VIEW_FLUSH_MAX_PENDING", "200"))
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def record_view(self, proposal_id: str, rfx_id: Optional[str] = None) -> None:
+        """Buffer one view. Flushes inline only when the buffer is full."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            entry = self._pending.setdefault(
+                str(proposal_id), {"proposal_id": str(proposal_id), "rfx_id": rfx_id, "views": 0}
+            )
+            entry["views"] += 1
+            entry["last_viewed_at"] = now
+            pending_count = len(self._pending)
+            self._arm_timer_locked()
+
+        if pending_count >= self.max_pending or self.flush_interval_seconds <= 0:
+            self.flush()
+
+    def pending_views(self, proposal_id: str) -> int:
+        with self._lock:
+            return int((self._pending.get(str(proposal_id)) or {}).get("views", 0))
+
+    def flush(self) -> int:
+        """Write buffered views to the database. Returns the number of proposals flushed."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending.values())
+                self._pending = {}
+            if not batch:
+                return 0
+            try:
+                failed = self._write_batch(batch)
+            except Exception as exc:
+                logger.warning("⚠️ Failed to flush public views, re-queueing %s proposals: %s", len(batch), exc)
+                self._requeue(batch)
+                return 0
+            if failed:
+                logger.warning("⚠️ Re-queueing public views for %s of %s proposals", len(failed), len(batch))
+                self._requeue(failed)
+            flushed = len(batch) - len(failed)
+            logger.info("✅ Flushed public views for %s proposals", flushed)
+            return flushed
+
+    def _arm_timer_locked(self) -> None:
+        """Schedule a timed flush if none is pending. Caller holds self._lock."""
+        if self._timer is None and self.flush_interval_seconds > 0:
+            self._timer = threading.Timer(self.flush_interval_seconds, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write a batch of views. Returns the entries that were NOT written.
+
+        The RPC is all-or-nothing (raises on failure). The per-proposal fallback
+        is not, so only the entries whose count update failed are returned and
+        re-queued; already written ones must not be counted twice.
+        """
+        payload = [
+            {
+                "proposal_id": entry["proposal_id"],
+                "views": entry["views"],
+                "last_viewed_at": entry["last_viewed_at"],
+            }
+            for entry in batch
+        ]
+        try:
+            self.db.client.rpc("increment_proposal_public_views", {"p_views": payload}).execute()
+            return []
+        except Exception as exc:
+            if "increment_proposal_public_views" not in str(exc):
+                raise
+            logger.warning("⚠️ increment_proposal_public_views RPC unavailable, applying views per proposal")
+
+        failed = []
+        for entry in batch:
+            try:
+                self._write_entry_fallback(entry)
+            except Exception as exc:
+                logger.warning("⚠️ Failed to apply views for proposal %s: %s", entry["proposal_id"], exc)
+                failed.append(entry)
+        return failed
+
+    def _write_entry_fallback(self, entry: Dict[str, Any]) -> None:
+        current = (
+            self.db.client.table("generated_documents")
+            .select("public_view_count")
+            .eq("id", entry["proposal_id"])
+            .limit(1)
+            .execute()
+        )
+        current_count = int(((current.data or [{}])[0]).get("public_view_count") or 0)
+        self.db.client.table("generated_documents").update(
+            {
+                "public_view_count": current_count + entry["views"],
+                "public_last_viewed_at": entry["last_viewed_at"],
+            }
+        ).eq("id", entry["proposal_id"]).execute()
+        if not entry.get("rfx_id"):
+            return
+        # The count is already written: a stage failure must not re-queue the views
+        try:
+            (
+                self.db.client.table("rfx_v2")
+                .update({"sales_stage": "viewed"})
+                .eq("id", entry["rfx_id"])
+                # NULL stage reads as draft (see BudyDomainService)
+                .or_("sales_stage.is.null,sales_stage.in.(draft,sent)")
+                .execute()
+            )
+        except Exception as exc:
+            logger.warning("⚠️ Failed to move RFX %s to viewed: %s", entry["rfx_id"], exc)
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for entry in batch:
+                existing = self._pending.get(entry["proposal_id"])
+                if existing:
+                    existing["views"] += entry["views"]
+                    existing["last_viewed_at"] = max(existing["last_viewed_at"], entry["last_viewed_at"])
+                else:
+                    self._pending[entry["proposal_id"]] = entry
+            # Re-queued views must not wait for the next view to be retried
+            self._arm_timer_locked()
+
+
+public_view_tracker = PublicViewTracker()
+atexit.register(public_view_tracker.flush)
@@ -5,7 +5,7 @@ Usa GPT-4o para extraer y validar datos de documentos RFX
 import json
 import logging
 from typing import Dict, Any, Optional
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 
 from backend.core.config import get_openai_config
 from backend.schemas.rfx_extraction_schema import RFX_EXTRACTION_FUNCTION
@@ -14,6 +14,8 @@ from backend.utils.retry_decorator import retry_on_failure
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class AIExtractor:
     """
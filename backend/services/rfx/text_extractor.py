@@ -5,12 +5,16 @@ Soporta: PDF, Excel, Word, imágenes (OCR), archivos ZIP
 import io
 import os
 import logging
-import zipfile
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from backend.utils.zip_intake import ZipIntakeLimitError, iter_zip_members
+
 logger = logging.getLogger(__name__)
 
+# Tipos que se descomprimen desde un ZIP; ZIP anidados se omiten
+ZIP_MEMBER_TYPES = frozenset({'pdf', 'excel', 'word', 'image'})
+
 
 class TextExtractor:
     """
@@ -202,20 +206,24 @@ class TextExtractor:
             return ""
     
     def _extract_zip(self, content: bytes) -> str:
-        """Extrae y procesa archivos dentro de ZIP."""
+        """
+        Extrae y procesa archivos dentro de ZIP.
+
+        Los miembros se descomprimen uno a uno (ver utils.zip_intake); los no
+        soportados y los ZIP anidados se omiten sin leerlos.
+        """
         try:
-            zip_file = zipfile.ZipFile(io.BytesIO(content))
-            
             text_parts = []
-            for file_info in zip_file.filelist:
-                if file_info.is_dir():
-                    continue
-                
+            members = iter_zip_members(
+                content,
+                detect_kind=self._detect_file_type,
+                supported_kinds=ZIP_MEMBER_TYPES,
+            )
+            for member in members:
                 try:
-                    file_content = zip_file.read(file_info.filename)
                     file_data = {
-                        'content': file_content,
-                        'filename': file_info.filename
+                        'content': member.read(),
+                        'filename': member.filename
                     }
                     
                     # Recursión para extraer contenido del archivo
@@ -224,11 +232,14 @@ class TextExtractor:
                         text_parts.append(file_text)
                         
                 except Exception as e:
-                    logger.error(f"❌ Error extracting {file_info.filename} from ZIP: {e}")
+                    logger.error(f"❌ Error extracting {member.filename} from ZIP: {e}")
                     continue
             
             return "\n\n".join(text_parts)
             
+        except ZipIntakeLimitError as e:
+            logger.warning(f"⚠️ ZIP truncated: {e}")
+            return "\n\n".join(text_parts)
         except Exception as e:
             logger.error(f"❌ ZIP extraction error: {e}")
             return ""
@@ -0,0 +1,134 @@
+"""
+🧷 RFX Pipeline Checkpoints - Resultados por etapa con clave por contenido
+
+`_extract_rfx_case_data` corre en etapas (fuentes → LLM → resolución →
+validación/evaluación). Cada etapa guarda su resultado bajo un hash de sus
+entradas; si un intento falla tarde (catálogo, evaluación, DB) el reintento
+—reencolado por la cola de previews o re-subida del mismo documento— retoma
+desde la última etapa completada sin repetir OCR ni la llamada de extracción.
+
+- Claves por contenido: sha256 de las entradas de la etapa + versión del
+  pipeline; un cambio de documento, org o modelo produce otra clave.
+- Solo se guardan valores JSON nativos (roundtrip exacto); si no, se omite.
+- SQLite en el mismo archivo que la cola de jobs (JOB_QUEUE_DB_PATH), con
+  TTL RFX_CHECKPOINT_TTL_SECONDS (default 24h, igual que las sesiones).
+- RFX_CHECKPOINTS_ENABLED=false desactiva lectura y escritura.
+
+Usage:
+    key = rfx_checkpoint_store.fingerprint(combined_text, industry_context, model)
+    raw = rfx_checkpoint_store.get(STAGE_LLM, key)
+    if raw is None:
+        raw = call_llm(...)
+        rfx_checkpoint_store.put(STAGE_LLM, key, raw)
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from backend.services.job_queue import default_db_path
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_CHECKPOINT_VERSION = "1"
+
+STAGE_SOURCES = "sources"
+STAGE_LLM = "llm_extraction"
+STAGE_RESOLVED = "resolved_products"
+STAGE_VALIDATED = "validated"
+
+
+class RFXPipelineCheckpointStore:
+    """Checkpoints de etapa en SQLite con expiración."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None, enabled: Optional[bool] = None):
+        self.path = path or default_db_path()
+        self.ttl_seconds = float(
+            ttl_seconds if ttl_seconds is not None else os.getenv("RFX_CHECKPOINT_TTL_SECONDS", "86400")
+        )
+        if enabled is None:
+            enabled = os.getenv("RFX_CHECKPOINTS_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+        self.enabled = enabled and self.ttl_seconds > 0
+        self._local = threading.local()
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Hash estable de las entradas de una etapa."""
+        encoded = json.dumps(
+            [PIPELINE_CHECKPOINT_VERSION, *parts], sort_keys=True, default=str, ensure_ascii=False
+        ).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content or b"").hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rfx_pipeline_checkpoints ("
+                "stage TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (stage, key))"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT data FROM rfx_pipeline_checkpoints WHERE stage = ? AND key = ? AND expires_at > ?",
+                (stage, key, time.time()),
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"⚠️ Checkpoint read failed ({stage}): {e}")
+            return None
+        if row is None:
+            return None
+        logger.info(f"♻️ Checkpoint hit: {stage} ({key[:12]})")
+        return json.loads(row[0])
+
+    def put(self, stage: str, key: str, value: Any) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            data = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Checkpoint skipped ({stage}): value is not JSON-native: {e}")
+            return False
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO rfx_pipeline_checkpoints (stage, key, data, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (stage, key, data, now, now + self.ttl_seconds),
+            )
+            conn.execute("DELETE FROM rfx_pipeline_checkpoints WHERE expires_at <= ?", (now,))
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Checkpoint write failed ({stage}): {e}")
+            return False
+
+
+rfx_checkpoint_store = RFXPipelineCheckpointStore()
+
+
+__all__ = [
+    "RFXPipelineCheckpointStore",
+    "rfx_checkpoint_store",
+    "PIPELINE_CHECKPOINT_VERSION",
+    "STAGE_SOURCES",
+    "STAGE_LLM",
+    "STAGE_RESOLVED",
+    "STAGE_VALIDATED",
+]
@@ -12,18 +12,84 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
+import json
 import logging
+import os
+import sqlite3
+import threading
+import time
 
 from backend.core.database import get_supabase
+from backend.services.job_queue import default_db_path
 
 logger = logging.getLogger(__name__)
 
 
+class LocalSessionStore:
+    """
+    Fallback local cuando la tabla rfx_processing_sessions no está disponible.
+    SQLite en el mismo archivo que la cola de jobs: compartido por todos los
+    workers de gunicorn del host (el worker que procesa el preview no es
+    necesariamente el que atiende el chat de revisión).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_db_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_fallback "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT data FROM session_fallback WHERE id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, data: Dict[str, Any], ttl_seconds: float) -> None:
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO session_fallback (id, data, expires_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(data, default=str), time.time() + ttl_seconds),
+        )
+        conn.execute("DELETE FROM session_fallback WHERE expires_at <= ?", (time.time(),))
+
+    def update(self, session_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM session_fallback WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            data = {**json.loads(row[0]), **updates}
+            conn.execute(
+                "UPDATE session_fallback SET data = ? WHERE id = ?", (json.dumps(data, default=str), session_id)
+            )
+            conn.execute("COMMIT")
+            return data
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
 class RFXProcessingSessionService:
     """Persistencia de sesiones temporales de procesamiento."""
 
     DEFAULT_TTL_HOURS = 24
-    _MEMORY_SESSIONS: Dict[str, Dict[str, Any]] = {}
+    _LOCAL_SESSIONS = LocalSessionStore()
 
     def __init__(self):
         self.supabase = get_supabase()
@@ -95,8 +161,8 @@ class RFXProcessingSessionService:
             if result.data:
                 return result.data[0]
         except Exception as e:
-            logger.warning(f"⚠️ Session table unavailable, using in-memory fallback: {e}")
-            self._MEMORY_SESSIONS[session_id] = payload
+            logger.warning(f"⚠️ Session table unavailable, using local fallback store: {e}")
+            self._LOCAL_SESSIONS.put(session_id, payload, self.DEFAULT_TTL_HOURS * 3600)
         return payload
 
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -111,10 +177,10 @@ class RFXProcessingSessionService:
             )
             if result.data:
                 return result.data[0]
-            return self._MEMORY_SESSIONS.get(session_id)
+            return self._LOCAL_SESSIONS.get(session_id)
         except Exception as e:
-            logger.warning(f"⚠️ Error fetching session from DB, trying memory fallback: {e}")
-            return self._MEMORY_SESSIONS.get(session_id)
+            logger.warning(f"⚠️ Error fetching session from DB, trying local fallback: {e}")
+            return self._LOCAL_SESSIONS.get(session_id)
 
     def get_session_for_user(
         self,
@@ -159,16 +225,12 @@ class RFXProcessingSessionService:
             )
             if result.data:
                 return result.data[0]
-            if session_id in self._MEMORY_SESSIONS:
-                self._MEMORY_SESSIONS[session_id].update(update_payload)
-                return self._MEMORY_SESSIONS[session_id]
-            return None
+            return self._LOCAL_SESSIONS.update(session_id, update_payload)
         except Exception as e:
-            logger.warning(f"⚠️ Error updating session in DB, trying memory fallback: {e}")
-            if session_id in self._MEMORY_SESSIONS:
-                self._MEMORY_SESSIONS[session_id].update({**(updates or {}), "updated_at": datetime.utcnow().isoformat()})
-                return self._MEMORY_SESSIONS[session_id]
-            return None
+            logger.warning(f"⚠️ Error updating session in DB, trying local fallback: {e}")
+            return self._LOCAL_SESSIONS.update(
+                session_id, {**(updates or {}), "updated_at": datetime.utcnow().isoformat()}
+            )
 
     def append_event(
         self,
@@ -8,14 +8,11 @@ modo debug con confidence scores y arquitectura extensible.
 import io
 import re
 import json
-import PyPDF2
 import time
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable
 from enum import Enum
-from openai import OpenAI
-import zipfile
 import mimetypes
 
 # Feature flags for optional functionality
@@ -46,13 +43,28 @@ from backend.services.catalog_search_service_sync import CatalogSearchServiceSyn
 from backend.services.ai_agents.rfx_orchestrator_agent import RFXOrchestratorAgent
 from backend.services.product_resolution_service import ProductResolutionService
 from backend.services.document_code_service import DocumentCodeService
+from backend.services.rfx_pipeline_checkpoints import (
+    rfx_checkpoint_store,
+    STAGE_SOURCES,
+    STAGE_LLM,
+    STAGE_RESOLVED,
+    STAGE_VALIDATED,
+)
 from backend.utils.retry_decorator import retry_on_failure
+from backend.utils.metrics import track_stage
+from backend.utils.pdf_page_extractor import extract_pdf_text
+from backend.utils.zip_intake import ZipIntakeLimitError, iter_zip_members
+from backend.utils.lazy_import import lazy_attr, lazy_import
 from backend.exceptions import ExternalServiceError
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Dependencias pesadas: se importan en el primer documento procesado, no al arrancar
+PyPDF2 = lazy_import("PyPDF2")
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 # ============================================================================
 # 🎯 MODELOS PYDANTIC PARA VALIDACIÓN ESTRUCTURADA
@@ -491,6 +503,7 @@ class RFXProcessorService:
             logger.error(f"❌ RFX processing failed for {rfx_input.id}: {e}")
             raise
     
+    @track_stage("text_extraction")
     def _extract_text_from_document(self, pdf_content: bytes) -> str:
         """Extract text content from PDF bytes or other file types"""
         try:
@@ -499,17 +512,8 @@ class RFXProcessorService:
             # Try to detect file type from content
             if pdf_content.startswith(b'%PDF'):
                 logger.info("📄 Detected PDF file")
-                # This is a PDF file
-                pdf_file = io.BytesIO(pdf_content)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                
-                text_pages = []
-                for i, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    text_pages.append(page_text)
-                    logger.debug(f"📄 Page {i+1} extracted {len(page_text)} characters")
-                
-                full_text = "\n".join(text_pages)
+                # Páginas perezosas, cacheadas por hash y recortadas a RFX_PDF_CHAR_BUDGET
+                full_text = extract_pdf_text(pdf_content, PyPDF2.PdfReader)
                 
                 if not full_text.strip() or len(re.sub(r"\s+", "", full_text)) < 50:
                     # Attempt OCR for scanned PDFs
@@ -521,7 +525,6 @@ class RFXProcessorService:
                     raise ValueError("No text could be extracted from PDF")
                 
                 logger.info(f"✅ PDF extraction successful: {len(full_text)} total characters")
-                logger.debug(f"📄 PDF text preview: {full_text[:500]}...")
                 return full_text
                 
             elif pdf_content.startswith(b'PK'):
@@ -606,6 +609,7 @@ class RFXProcessorService:
             return "catering"
         return "services"
 
+    @track_stage("llm_extraction")
     def _process_with_ai(self, text: str, industry_context: Optional[str] = None) -> Dict[str, Any]:
         """🚀 REFACTORIZADO: Process COMPLETE text with single AI call - NO CHUNKING"""
         try:
@@ -1543,6 +1547,7 @@ TEXTO: {text[:5000]}"""
             logger.error(f"❌ Failed to create RFXProcessed object: {e}")
             raise
     
+    @track_stage("db_write")
     def _save_rfx_to_database(
         self,
         rfx_processed: RFXProcessed,
@@ -1580,7 +1585,6 @@ TEXTO: {text[:5000]}"""
                 "email": email_empresa,
                 "phone": metadata.get("telefono_empresa")
             }
-            company_record = self.db_client.insert_company(company_data)
             
             # 2. Create or find requester
             # Clean requester email to meet database constraints
@@ -1593,19 +1597,16 @@ TEXTO: {text[:5000]}"""
                 requester_email = None
                 
             requester_data = {
-                "company_id": company_record.get("id"),
                 "name": rfx_processed.requester_name or "Unknown Requester",
                 "email": requester_email,
                 "phone": metadata.get("telefono_solicitante"),
                 "position": metadata.get("cargo_solicitante")
             }
-            requester_record = self.db_client.insert_requester(requester_data)
             
             # 3. Prepare RFX data for database (V2.0 schema)
+            # company_id / requester_id se asignan al persistir (RPC o inserts secuenciales)
             rfx_data = {
                 "id": str(rfx_processed.id),
-                "company_id": company_record.get("id"),
-                "requester_id": requester_record.get("id"),
                 "rfx_type": rfx_processed.rfx_type.value if hasattr(rfx_processed.rfx_type, 'value') else str(rfx_processed.rfx_type),
                 "title": rfx_processed.title or f"{rfx_processed.company_name}",
                 "location": rfx_processed.location,
@@ -1632,25 +1633,11 @@ TEXTO: {text[:5000]}"""
             if existing_rfx_code:
                 rfx_code = str(existing_rfx_code)
             else:
-                try:
-                    rfx_code = self.document_code_service.generate_rfx_code(
-                        rfx_type=rfx_data.get("rfx_type"),
-                        origin=self.document_code_service.DEFAULT_ORIGIN,
-                    )
-                except Exception:
-                    # Non-atomic fallback only when sequence RPC is unavailable.
-                    current_year = datetime.utcnow().year
-                    fallback_sequence = self._fallback_next_rfx_sequence(
-                        current_year=current_year,
-                        origin=self.document_code_service.DEFAULT_ORIGIN,
-                    )
-                    rfx_code = self.document_code_service.build_rfx_code(
-                        document_type=self.document_code_service.DEFAULT_DOCUMENT_TYPE,
-                        origin=self.document_code_service.DEFAULT_ORIGIN,
-                        year=current_year,
-                        sequence=fallback_sequence,
-                    )
-                    logger.warning(f"⚠️ Using fallback rfx_code generation: {rfx_code}")
+                # Atomic block-allocated sequence (hi/lo); failures abort the save
+                rfx_code = self.document_code_service.generate_rfx_code(
+                    rfx_type=rfx_data.get("rfx_type"),
+                    origin=self.document_code_service.DEFAULT_ORIGIN,
+                )
 
             # Persist canonical code in both column + metadata_json for compatibility.
             metadata_json["rfx_code"] = rfx_code
@@ -1672,12 +1659,9 @@ TEXTO: {text[:5000]}"""
             else:
                 logger.warning(f"⚠️ No organization_id provided - rfx_data will not have organization_id field")
             
-            # 4. Insert RFX data
-            rfx_record = self.db_client.insert_rfx(rfx_data)
-            
-            # 5. Insert structured products if available
+            # 4. Structured products if available
+            structured_products = []
             if rfx_processed.products:
-                structured_products = []
                 full_products = []
                 if isinstance(rfx_processed.metadata_json, dict):
                     full_products = list(rfx_processed.metadata_json.get("validated_products_full") or [])
@@ -1758,14 +1742,11 @@ TEXTO: {text[:5000]}"""
                     # 🔍 DEBUG: Log each product's pricing
                     logger.info(f"   💰 Saving product: {product_data['product_name']} - cost: ${costo if costo is not None else 'None'}, price: ${precio if precio is not None else 'None'}")
                 
-                self.db_client.insert_rfx_products(rfx_record["id"], structured_products)
-                logger.info(f"✅ {len(structured_products)} structured products saved")
-                
                 # 🔍 DEBUG: Log summary of pricing
                 total_with_price = sum(1 for p in structured_products if p.get('estimated_unit_price') and p['estimated_unit_price'] > 0)
                 logger.info(f"   💰 Products with estimated_unit_price > 0: {total_with_price}/{len(structured_products)}")
             
-            # 6. Create history event
+            # 5. Create history event
             history_event = {
                 "rfx_id": str(rfx_processed.id),
                 "event_type": "rfx_processed",
@@ -1779,7 +1760,17 @@ TEXTO: {text[:5000]}"""
                 },
                 "performed_by": "system_ai"
             }
-            self.db_client.insert_rfx_history(history_event)
+            
+            # 6. Persist the whole graph in one transaction (idempotent by RFX id)
+            saved = self.db_client.save_rfx_graph(
+                company=company_data,
+                requester=requester_data,
+                rfx=rfx_data,
+                products=structured_products,
+                history=[history_event],
+            )
+            if saved is None:
+                self._save_rfx_graph_sequentially(company_data, requester_data, rfx_data, structured_products, history_event)
             
             logger.info(f"✅ RFX saved to database V2.0: {rfx_processed.id}")
             
@@ -1787,40 +1778,28 @@ TEXTO: {text[:5000]}"""
             logger.error(f"❌ Failed to save RFX to database: {e}")
             raise
 
-    def _fallback_next_rfx_sequence(self, current_year: int, origin: str) -> int:
-        """
-        Best-effort fallback when DB RPC sequence is unavailable.
-        NOTE: This path is non-atomic and should remain exceptional.
-        """
-        try:
-            normalized_origin = self.document_code_service.normalize_origin(origin)
-            yy = int(current_year) % 100
-            prefix = (
-                f"{self.document_code_service.CODE_PREFIX}-"
-                f"{self.document_code_service.DEFAULT_DOCUMENT_TYPE}-"
-                f"{normalized_origin}-{yy:02d}-"
-            )
-
-            response = (
-                self.db_client.client
-                .table("rfx_v2")
-                .select("rfx_code")
-                .ilike("rfx_code", f"{prefix}%")
-                .order("rfx_code", desc=True)
-                .limit(1)
-                .execute()
-            )
-
-            if response.data:
-                last_code = str((response.data[0] or {}).get("rfx_code") or "")
-                match = re.search(r"-(\d+)$", last_code)
-                if match:
-                    return int(match.group(1)) + 1
-        except Exception as fallback_exc:
-            logger.warning(f"⚠️ Could not derive fallback RFX sequence from DB: {fallback_exc}")
+    def _save_rfx_graph_sequentially(
+        self,
+        company_data: Dict[str, Any],
+        requester_data: Dict[str, Any],
+        rfx_data: Dict[str, Any],
+        structured_products: List[Dict[str, Any]],
+        history_event: Dict[str, Any],
+    ) -> None:
+        """Fallback sin RPC save_rfx_graph: un round-trip por entidad (no transaccional)."""
+        company_record = self.db_client.insert_company(company_data)
+        requester_record = self.db_client.insert_requester({**requester_data, "company_id": company_record.get("id")})
+        
+        rfx_data["company_id"] = company_record.get("id")
+        rfx_data["requester_id"] = requester_record.get("id")
+        rfx_record = self.db_client.insert_rfx(rfx_data)
+        
+        if structured_products:
+            self.db_client.insert_rfx_products(rfx_record["id"], structured_products)
+            logger.info(f"✅ {len(structured_products)} structured products saved")
+        
+        self.db_client.insert_rfx_history(history_event)
 
-        return 1
-    
     # REMOVED: _generate_proposal_automatically
     # La generación de propuestas ahora se maneja por separado cuando el usuario lo solicite
     # mediante el endpoint /api/proposals/generate después de revisar datos y establecer costos
@@ -2143,18 +2122,173 @@ TEXTO: {text[:5000]}"""
             'single_call_extraction': True  # ✅ CAMBIO #3: Todo en una llamada
         }
 
+    def _extract_blob_sources(self, fname: str, content: bytes) -> List[Dict[str, Any]]:
+        """
+        Expande un blob (ZIP → archivos internos) y extrae texto/ítems de cada archivo.
+        El resultado se guarda como checkpoint por hash de contenido: un reintento
+        o re-subida del mismo archivo no repite OCR ni parseo.
+        """
+        sources_key = rfx_checkpoint_store.fingerprint(
+            STAGE_SOURCES, rfx_checkpoint_store.content_hash(content), fname, USE_ZIP
+        )
+        cached = rfx_checkpoint_store.get(STAGE_SOURCES, sources_key)
+        if cached is not None:
+            return cached
+
+        sources: List[Dict[str, Any]] = []
+        complete = True
+        is_zip = USE_ZIP and (fname.endswith(".zip") or (content[:2] == b"PK" and not fname.endswith(".docx") and not fname.endswith(".xlsx")))
+        if is_zip:
+            # Streaming: un miembro descomprimido a la vez; el tipo se confirma con el miembro completo si la cabecera no basta
+            expanded = 0
+            try:
+                members = iter_zip_members(
+                    content,
+                    detect_kind=self._sniff_zip_member_kind,
+                    full_detect_kind=lambda data, name: self._detect_content_type(data, name.lower()),
+                )
+                for member in members:
+                    expanded += 1
+                    complete = self._append_file_source(sources, expanded, member.filename, member.read()) and complete
+                logger.info(f"🗜️ ZIP expanded: {fname} → {expanded} internal files")
+            except ZipIntakeLimitError as e:
+                logger.warning(f"⚠️ ZIP truncated {fname}: {e}")
+                complete = False
+            except Exception as e:
+                logger.warning(f"⚠️ ZIP expand failed {fname}: {e}")
+                return []
+        else:
+            complete = self._append_file_source(sources, 1, fname, content)
+
+        # Solo se cachea una extracción completa; un archivo fallido se reintenta
+        if complete:
+            rfx_checkpoint_store.put(STAGE_SOURCES, sources_key, sources)
+        return sources
+
+    def _sniff_zip_member_kind(self, head: bytes, filename: str) -> str:
+        """
+        Tipo de un miembro de ZIP por su cabecera. Sin extensión no se adivina
+        ("unknown"): iter_zip_members lo detecta con el miembro completo.
+        """
+        name = filename.lower()
+        if "." not in name.rsplit("/", 1)[-1]:
+            return "unknown"
+        return self._detect_content_type(head, name)
+
+    def _append_file_source(self, sources: List[Dict[str, Any]], position: int, filename: str, file_content: bytes) -> bool:
+        """Extrae un archivo y lo agrega a `sources`; False si falló o no produjo contenido."""
+        file_name = filename.lower()
+        logger.info(f"🔎 PROCESSING FILE {position}: '{file_name}' size={len(file_content)} bytes")
+        try:
+            source = self._extract_file_source(file_name, file_content)
+        except Exception as e:
+            logger.error(f"❌ PROCESSING ERROR for {file_name}: {e}")
+            import traceback
+            logger.error(f"❌ FULL ERROR TRACE: {traceback.format_exc()}")
+            return False
+        sources.append(source)
+        return bool(source["text_part"] or source["items"])
+
+    def _extract_file_source(self, fname: str, content: bytes) -> Dict[str, Any]:
+        """Texto para el LLM (con fallback OCR) e ítems canónicos de un archivo según su tipo."""
+        kind = self._detect_content_type(content, fname)
+        logger.info(f"🔎 Routing '{fname}' kind={kind}")
+        text_part = ""
+        items: List[Dict[str, Any]] = []
+
+        if kind in ("pdf", "docx", "text"):
+            logger.info(f"📄 Extracting text from {kind.upper()}: {fname}")
+            txt = self._extract_text_from_document(content)
+            logger.info(f"📄 TEXT EXTRACTED from {fname}: {len(txt)} characters")
+
+            # Fallback OCR if PDF nearly empty
+            if kind == "pdf" and (not txt.strip() or len(re.sub(r"\s+", "", txt)) < 50):
+                logger.info(f"🧠 PDF text too short ({len(txt)} chars), trying OCR for: {fname}")
+                ocr_txt = self._extract_text_with_ocr(content, kind="pdf", filename=fname)
+                if ocr_txt.strip():
+                    logger.info(f"🧠 OCR SUCCESS: {fname} → {len(ocr_txt)} characters")
+                    txt = ocr_txt
+                else:
+                    logger.warning(f"🧠 OCR FAILED for: {fname}")
+
+            if txt.strip():
+                text_part = f"\n\n### SOURCE: {fname}\n{txt}"
+                logger.info(f"✅ ADDED TO AI CONTEXT: {fname} ({len(txt)} chars)")
+                # Show preview of text to verify content
+                preview = txt[:300].replace('\n', ' ')
+                logger.info(f"📝 CONTENT PREVIEW: {fname} → {preview}...")
+            else:
+                logger.error(f"❌ NO TEXT EXTRACTED from {fname} - file will be ignored!")
+
+        elif kind in ("xlsx", "csv"):
+            logger.info(f"📊 Parsing spreadsheet: {fname}")
+            parsed = self._parse_spreadsheet_items(fname, content)
+            items_count = len(parsed.get('items', []))
+            text_length = len(parsed.get('text', ''))
+            logger.info(f"📊 SPREADSHEET PARSED: {fname} → {items_count} items, {text_length} chars of text")
+
+            if parsed["items"]: 
+                items = list(parsed["items"])
+                logger.info(f"📋 PRODUCTS FOUND in {fname}: {items_count} items")
+                # Log first 3 items for verification
+                for i, item in enumerate(parsed['items'][:3]):
+                    logger.info(f"📋 PRODUCT {i+1}: {item}")
+            else:
+                logger.warning(f"⚠️ NO PRODUCTS found in spreadsheet: {fname}")
+
+            # Always add text for AI metadata extraction
+            if parsed["text"]:  
+                text_part = f"\n\n### SOURCE: {fname}\n{parsed['text']}"
+                preview = parsed['text'][:300].replace('\n', ' ')
+                logger.info(f"📄 SPREADSHEET TEXT ADDED: {fname} → {preview}...")
+            else:
+                # Create summary for AI if we have items but no text
+                if parsed["items"]:
+                    summary = f"EXCEL: {len(parsed['items'])} productos encontrados:\n"
+                    for item in parsed["items"][:5]:  # First 5 products
+                        summary += f"- {item['nombre']}: {item['cantidad']} {item['unidad']}\n"
+                    text_part = f"\n\n### SOURCE: {fname}\n{summary}"
+                    logger.info(f"📄 SUMMARY CREATED for {fname}: {len(summary)} chars")
+
+        elif kind == "image":
+            logger.info(f"🖼️ Applying OCR to image: {fname}")
+            ocr_txt = self._extract_text_with_ocr(content, kind="image", filename=fname)
+            if ocr_txt.strip():
+                text_part = f"\n\n### SOURCE: {fname} (OCR)\n{ocr_txt}"
+                logger.info(f"✅ IMAGE OCR SUCCESS: {fname} → {len(ocr_txt)} chars")
+                preview = ocr_txt[:300].replace('\n', ' ')
+                logger.info(f"📝 OCR PREVIEW: {fname} → {preview}...")
+            else:
+                logger.error(f"❌ IMAGE OCR FAILED: {fname}")
+        else:
+            logger.error(f"❌ UNSUPPORTED FILE TYPE: {fname} (kind={kind})")
+
+        return {"filename": fname, "kind": kind, "text_part": text_part, "items": items}
+
     # NEW: Multi-file processing
     def _extract_rfx_case_data(
         self,
         rfx_input: RFXInput,
         blobs: List[Dict[str, Any]],
         user_id: str = None,
-        organization_id: str = None
+        organization_id: str = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        force_refresh: bool = False,
     ) -> Dict[str, Any]:
         """
         Pipeline de extracción/resolución SIN persistencia final.
         Retorna datos listos para revisión conversacional y/o guardado posterior.
+
+        progress_callback(stage) se invoca al entrar a cada etapa
+        ("extracting", "llm", "resolving"); puede lanzar para abortar (cancelación).
+
+        Etapas con checkpoint (ver rfx_pipeline_checkpoints): fuentes por blob,
+        extracción LLM, productos resueltos y datos validados. Un reintento con
+        las mismas entradas retoma desde la última etapa completada. Los productos
+        resueltos se invalidan solos si cambia el catálogo (get_catalog_version);
+        force_refresh=True ignora los checkpoints de LLM y resolución (los reescribe).
         """
+        report_progress = progress_callback or (lambda stage: None)
         logger.info(f"📦 process_rfx_case start: {rfx_input.id} with {len(blobs)} file(s)")
         if user_id:
             logger.info(f"✅ user_id provided for RFX: {user_id}")
@@ -2172,114 +2306,29 @@ TEXTO: {text[:5000]}"""
             content_size = len(b.get("content", b.get("bytes", b"")))
             logger.info(f"🔍 INPUT FILE {i+1}: '{fname}' ({content_size} bytes)")
         
-        # 1) Expand ZIPs
-        expanded: List[Dict[str, Any]] = []
+        # 1-2) Fuentes: expansión de ZIPs + texto/ítems por archivo (checkpoint por blob)
+        report_progress("extracting")
+        text_parts: List[str] = []
+        canonical_items: List[Dict[str, Any]] = []
+        files_processed = 0
         for i, b in enumerate(blobs):
             fname = (b.get("filename") or f"file_{i}").lower()
             content = b.get("content") or b.get("bytes")
             if not content: 
                 logger.warning(f"⚠️ EMPTY FILE {i+1}: '{fname}' - skipping")
                 continue
-            if USE_ZIP and (fname.endswith(".zip") or (content[:2] == b"PK" and not fname.endswith(".docx") and not fname.endswith(".xlsx"))):
-                try:
-                    with zipfile.ZipFile(io.BytesIO(content)) as zf:
-                        for name in zf.namelist():
-                            if name.endswith("/"): continue
-                            expanded.append({"filename": name, "content": zf.read(name)})
-                    logger.info(f"🗜️ ZIP expanded: {fname} → {len(expanded)} internal files")
-                except Exception as e:
-                    logger.warning(f"⚠️ ZIP expand failed {fname}: {e}")
-            else:
-                expanded.append({"filename": fname, "content": content})
-
-        text_parts: List[str] = []
-        canonical_items: List[Dict[str, Any]] = []
-        
-        # 2) Per-file routing with DETAILED DEBUG LOGGING
-        for file_index, b in enumerate(expanded):
-            fname = b["filename"].lower()
-            content: bytes = b["content"]
-            kind = self._detect_content_type(content, fname)
-            logger.info(f"🔎 PROCESSING FILE {file_index+1}: '{fname}' kind={kind} size={len(content)} bytes")
-            
-            try:
-                if kind in ("pdf", "docx", "text"):
-                    logger.info(f"📄 Extracting text from {kind.upper()}: {fname}")
-                    txt = self._extract_text_from_document(content)
-                    logger.info(f"📄 TEXT EXTRACTED from {fname}: {len(txt)} characters")
-                    
-                    # Fallback OCR if PDF nearly empty
-                    if kind == "pdf" and (not txt.strip() or len(re.sub(r"\s+", "", txt)) < 50):
-                        logger.info(f"🧠 PDF text too short ({len(txt)} chars), trying OCR for: {fname}")
-                        ocr_txt = self._extract_text_with_ocr(content, kind="pdf", filename=fname)
-                        if ocr_txt.strip():
-                            logger.info(f"🧠 OCR SUCCESS: {fname} → {len(ocr_txt)} characters")
-                            txt = ocr_txt
-                        else:
-                            logger.warning(f"🧠 OCR FAILED for: {fname}")
-                    
-                    if txt.strip():
-                        text_parts.append(f"\n\n### SOURCE: {fname}\n{txt}")
-                        logger.info(f"✅ ADDED TO AI CONTEXT: {fname} ({len(txt)} chars)")
-                        # Show preview of text to verify content
-                        preview = txt[:300].replace('\n', ' ')
-                        logger.info(f"📝 CONTENT PREVIEW: {fname} → {preview}...")
-                    else:
-                        logger.error(f"❌ NO TEXT EXTRACTED from {fname} - file will be ignored!")
-                        
-                elif kind in ("xlsx", "csv"):
-                    logger.info(f"📊 Parsing spreadsheet: {fname}")
-                    parsed = self._parse_spreadsheet_items(fname, content)
-                    items_count = len(parsed.get('items', []))
-                    text_length = len(parsed.get('text', ''))
-                    logger.info(f"📊 SPREADSHEET PARSED: {fname} → {items_count} items, {text_length} chars of text")
-                    
-                    if parsed["items"]: 
-                        canonical_items.extend(parsed["items"])
-                        logger.info(f"📋 PRODUCTS FOUND in {fname}: {items_count} items")
-                        # Log first 3 items for verification
-                        for i, item in enumerate(parsed['items'][:3]):
-                            logger.info(f"📋 PRODUCT {i+1}: {item}")
-                    else:
-                        logger.warning(f"⚠️ NO PRODUCTS found in spreadsheet: {fname}")
-                    
-                    # Always add text for AI metadata extraction
-                    if parsed["text"]:  
-                        text_parts.append(f"\n\n### SOURCE: {fname}\n{parsed['text']}")
-                        preview = parsed['text'][:300].replace('\n', ' ')
-                        logger.info(f"📄 SPREADSHEET TEXT ADDED: {fname} → {preview}...")
-                    else:
-                        # Create summary for AI if we have items but no text
-                        if parsed["items"]:
-                            summary = f"EXCEL: {len(parsed['items'])} productos encontrados:\n"
-                            for item in parsed["items"][:5]:  # First 5 products
-                                summary += f"- {item['nombre']}: {item['cantidad']} {item['unidad']}\n"
-                            text_parts.append(f"\n\n### SOURCE: {fname}\n{summary}")
-                            logger.info(f"📄 SUMMARY CREATED for {fname}: {len(summary)} chars")
-                        
-                elif kind == "image":
-                    logger.info(f"🖼️ Applying OCR to image: {fname}")
-                    ocr_txt = self._extract_text_with_ocr(content, kind="image", filename=fname)
-                    if ocr_txt.strip():
-                        text_parts.append(f"\n\n### SOURCE: {fname} (OCR)\n{ocr_txt}")
-                        logger.info(f"✅ IMAGE OCR SUCCESS: {fname} → {len(ocr_txt)} chars")
-                        preview = ocr_txt[:300].replace('\n', ' ')
-                        logger.info(f"📝 OCR PREVIEW: {fname} → {preview}...")
-                    else:
-                        logger.error(f"❌ IMAGE OCR FAILED: {fname}")
-                else:
-                    logger.error(f"❌ UNSUPPORTED FILE TYPE: {fname} (kind={kind})")
-                    
-            except Exception as e:
-                logger.error(f"❌ PROCESSING ERROR for {fname}: {e}")
-                import traceback
-                logger.error(f"❌ FULL ERROR TRACE: {traceback.format_exc()}")
+            sources = self._extract_blob_sources(fname, content)
+            files_processed += len(sources)
+            for source in sources:
+                if source.get("text_part"):
+                    text_parts.append(source["text_part"])
+                canonical_items.extend(source.get("items") or [])
 
         combined_text = "\n\n".join(tp for tp in text_parts if tp.strip()) or ""
         
         # 🔍 CRITICAL DEBUG: Show what's being sent to AI
         logger.info(f"📊 FINAL PROCESSING SUMMARY:")
-        logger.info(f"📊   - Files processed: {len(expanded)}")
+        logger.info(f"📊   - Files processed: {files_processed}")
         logger.info(f"📊   - Text parts created: {len(text_parts)}")
         logger.info(f"📊   - Canonical items found: {len(canonical_items)}")
         logger.info(f"📊   - Combined text length: {len(combined_text)} characters")
@@ -2299,12 +2348,20 @@ TEXTO: {text[:5000]}"""
             logger.error(f"❌ FATAL: No content extracted from ANY file!")
             raise ValueError("No se pudo extraer texto ni ítems de los archivos proporcionados")
 
-        # 3) AI pipeline
+        # 3) AI pipeline (checkpoint por texto combinado + contexto + modelo)
         normalized_industry_context = str(rfx_input.industry_context or "services").strip().lower()
         rfx_input.industry_context = normalized_industry_context
         rfx_input.extracted_content = combined_text
-        logger.info(f"🤖 SENDING TO AI: {len(combined_text)} characters of combined text")
-        raw_data = self._process_with_ai(combined_text, industry_context=normalized_industry_context)
+        report_progress("llm")
+        llm_key = rfx_checkpoint_store.fingerprint(
+            STAGE_LLM, combined_text, normalized_industry_context, self.openai_config.model
+        )
+        raw_data = None if force_refresh else rfx_checkpoint_store.get(STAGE_LLM, llm_key)
+        if raw_data is None:
+            logger.info(f"🤖 SENDING TO AI: {len(combined_text)} characters of combined text")
+            raw_data = self._process_with_ai(combined_text, industry_context=normalized_industry_context)
+            if raw_data is not None:
+                rfx_checkpoint_store.put(STAGE_LLM, llm_key, raw_data)
         
         # 🛡️ SAFETY CHECK: Handle None raw_data before accessing
         if raw_data is None:
@@ -2333,8 +2390,9 @@ TEXTO: {text[:5000]}"""
 
         raw_data["industry_context"] = normalized_industry_context
 
-        # 🛒 Resolver/Enriquecer productos (con o sin catálogo)
+        # 🛒 Resolver/Enriquecer productos (con o sin catálogo) - checkpoint por productos + contexto
         if raw_data.get("productos"):
+            report_progress("resolving")
             # Preparar contexto del RFX para selección inteligente de variantes / bundles.
             rfx_context = {
                 'rfx_type': raw_data.get('tipo_evento') or self._resolve_default_rfx_type(normalized_industry_context),
@@ -2345,10 +2403,31 @@ TEXTO: {text[:5000]}"""
                 'business_unit_id': rfx_input.business_unit_id,
                 'source_text': (combined_text or "")[:8000],
             }
+            use_orchestrator = bool(FeatureFlags.rfx_llm_orchestrator_enabled() and self.rfx_orchestrator_agent)
+            # Precios/matches dependen del catálogo: su versión entra en la llave
+            catalog_version = self._get_catalog_version(organization_id, user_id, rfx_input.business_unit_id)
+            resolve_key = rfx_checkpoint_store.fingerprint(
+                STAGE_RESOLVED,
+                raw_data["productos"],
+                rfx_context,
+                organization_id,
+                user_id,
+                catalog_version,
+                use_orchestrator,
+                bool(self.product_resolution_service),
+            )
+            use_resolve_checkpoint = catalog_version is not None
+            resolved_products = (
+                rfx_checkpoint_store.get(STAGE_RESOLVED, resolve_key)
+                if use_resolve_checkpoint and not force_refresh
+                else None
+            )
 
-            if self.catalog_search and organization_id:
+            if resolved_products is not None:
+                raw_data["productos"] = resolved_products
+            elif self.catalog_search and organization_id:
                 logger.info(f"🛒 Processing {len(raw_data['productos'])} products with catalog pricing...")
-                if FeatureFlags.rfx_llm_orchestrator_enabled() and self.rfx_orchestrator_agent:
+                if use_orchestrator:
                     raw_data["productos"] = self._orchestrate_products_with_llm_tools(
                         raw_data["productos"],
                         organization_id,
@@ -2375,6 +2454,9 @@ TEXTO: {text[:5000]}"""
                     rfx_context=rfx_context,
                 )
 
+            if resolved_products is None and use_resolve_checkpoint:
+                rfx_checkpoint_store.put(STAGE_RESOLVED, resolve_key, raw_data["productos"])
+
             # 🔍 DEBUG: Verificar que los productos resueltos tienen precios
             logger.info("🔍 AFTER RESOLUTION - Checking first product:")
             if raw_data["productos"]:
@@ -2385,9 +2467,22 @@ TEXTO: {text[:5000]}"""
                 logger.info(f"   💰 unit_cost: {first_product.get('unit_cost')}")
                 logger.info(f"   💰 unit_price: {first_product.get('unit_price')}")
 
-        validated_data = self._validate_and_clean_data(raw_data, rfx_input.id)
-        
-        evaluation_metadata = self._evaluate_rfx_intelligently(validated_data, rfx_input.id)
+        # 4) Validación + evaluación (checkpoint por datos resueltos)
+        validated_key = rfx_checkpoint_store.fingerprint(STAGE_VALIDATED, raw_data, FeatureFlags.evals_enabled())
+        validated_checkpoint = rfx_checkpoint_store.get(STAGE_VALIDATED, validated_key)
+        if validated_checkpoint is not None:
+            validated_data = validated_checkpoint["validated_data"]
+            evaluation_metadata = validated_checkpoint["evaluation_metadata"]
+        else:
+            validated_data = self._validate_and_clean_data(raw_data, rfx_input.id)
+            evaluation_metadata = self._evaluate_rfx_intelligently(validated_data, rfx_input.id)
+            if "evaluation_error" not in evaluation_metadata:
+                rfx_checkpoint_store.put(
+                    STAGE_VALIDATED,
+                    validated_key,
+                    {"validated_data": validated_data, "evaluation_metadata": evaluation_metadata},
+                )
+
         rfx_processed = self._create_rfx_processed(validated_data, rfx_input, evaluation_metadata)
 
         return {
@@ -2397,13 +2492,21 @@ TEXTO: {text[:5000]}"""
             "combined_text": combined_text,
         }
 
-    def process_rfx_case(self, rfx_input: RFXInput, blobs: List[Dict[str, Any]], user_id: str = None, organization_id: str = None) -> RFXProcessed:
+    def process_rfx_case(
+        self,
+        rfx_input: RFXInput,
+        blobs: List[Dict[str, Any]],
+        user_id: str = None,
+        organization_id: str = None,
+        force_refresh: bool = False,
+    ) -> RFXProcessed:
         """Multi-file processing pipeline con persistencia final inmediata (legacy/current flow)."""
         extracted = self._extract_rfx_case_data(
             rfx_input=rfx_input,
             blobs=blobs,
             user_id=user_id,
             organization_id=organization_id,
+            force_refresh=force_refresh,
         )
         rfx_processed: RFXProcessed = extracted["rfx_processed"]
         self._save_rfx_to_database(
@@ -2421,7 +2524,9 @@ TEXTO: {text[:5000]}"""
         rfx_input: RFXInput,
         blobs: List[Dict[str, Any]],
         user_id: str = None,
-        organization_id: str = None
+        organization_id: str = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        force_refresh: bool = False,
     ) -> Dict[str, Any]:
         """
         Procesa RFX para revisión conversacional PREVIA a persistencia.
@@ -2432,6 +2537,8 @@ TEXTO: {text[:5000]}"""
             blobs=blobs,
             user_id=user_id,
             organization_id=organization_id,
+            progress_callback=progress_callback,
+            force_refresh=force_refresh,
         )
         rfx_processed: RFXProcessed = extracted["rfx_processed"]
         validated_data: Dict[str, Any] = extracted["validated_data"] or {}
@@ -2467,6 +2574,21 @@ TEXTO: {text[:5000]}"""
             "evaluation_metadata": extracted.get("evaluation_metadata") or {},
         }
 
+    def _get_catalog_version(
+        self,
+        organization_id: Optional[str],
+        user_id: Optional[str],
+        business_unit_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Versión del catálogo para la llave de checkpoint; "none" sin catálogo, None si falla."""
+        if not self.catalog_search or not hasattr(self.catalog_search, "get_catalog_version"):
+            return "none"
+        return self.catalog_search.get_catalog_version(
+            organization_id=organization_id,
+            user_id=user_id,
+            business_unit_id=business_unit_id,
+        )
+
     def _orchestrate_products_with_llm_tools(
         self,
         products: List[Dict[str, Any]],
@@ -2768,6 +2890,7 @@ TEXTO: {text[:5000]}"""
         logger.warning(f"⚠️ Could not detect content type for {filename}, treating as text")
         return "text"
 
+    @track_stage("ocr")
     def _extract_text_with_ocr(self, file_bytes: bytes, kind: str = "image", filename: Optional[str] = None) -> str:
         """Optional OCR via pytesseract; for PDF, uses pdf2image if available."""
         if not USE_OCR:
@@ -3023,6 +3146,7 @@ TEXTO: {text[:5000]}"""
         # Fallback
         return "12:00"
 
+    @track_stage("catalog_resolution")
     def _enrich_products_with_catalog(
         self, 
         products: List[Dict[str, Any]], 
@@ -13,7 +13,7 @@ import logging
 import time
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+from backend.utils.lazy_import import lazy_attr
 
 from backend.core.config import get_openai_config
 from backend.models.chat_models import (
@@ -26,6 +26,8 @@ from backend.models.chat_models import (
 
 logger = logging.getLogger(__name__)
 
+OpenAI = lazy_attr("openai", "OpenAI")
+
 
 class SessionReviewChatService:
     """OpenAI-backed structured chat for review sessions."""
@@ -5,11 +5,14 @@ Usa las tablas existentes extendidas en lugar de crear nuevas
 """
 import uuid
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 
 from backend.core.database import get_database_client
 from backend.models.pricing_models import PricingCalculation
+from backend.services.pricing_config_cache import (
+    pricing_config_cache, Uncached, RFX_EFFECTIVE_CONFIG, USER_UNIFIED_CONFIG
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,83 +28,96 @@ class UnifiedBudgetConfigurationService:
     # ========================
     
     def get_user_unified_config(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Obtiene configuración unificada completa por usuario"""
+        """Obtiene configuración unificada completa por usuario (read-through cache)"""
         try:
-            logger.info(f"🔍 Getting unified config for user: {user_id}")
-            
-            # Usar función de DB optimizada
-            result = self.db_client.client.rpc(
-                'get_user_unified_budget_config',
-                {'p_user_id': user_id}
-            ).execute()
-            
-            if not result.data:
-                logger.info(f"📝 No config found for user {user_id}, creating defaults")
-                return self._create_smart_user_defaults(user_id)
-            
-            config_data = result.data[0]
-            
-            # Formatear respuesta unificada
-            unified_config = {
-                "user_id": user_id,
-                "has_defaults": config_data.get('has_defaults', False),
-                "branding": config_data.get('branding_config', {}),
-                "pricing": config_data.get('pricing_config', {}),
-                "document": config_data.get('document_config', {}),
-                "auto_settings": config_data.get('auto_settings', {}),
-                "statistics": config_data.get('statistics', {}),
-                "last_updated": datetime.now().isoformat()
-            }
-            
-            logger.info(f"✅ Retrieved unified config for user {user_id}")
-            return unified_config
-            
+            return pricing_config_cache.get_or_load(
+                USER_UNIFIED_CONFIG, user_id,
+                lambda: self._load_user_unified_config(user_id)
+            )
         except Exception as e:
             logger.error(f"❌ Error getting unified config for user {user_id}: {e}")
             return self._create_smart_user_defaults(user_id)
     
+    def _load_user_unified_config(self, user_id: str) -> Union[Dict[str, Any], Uncached, None]:
+        """Lee configuración unificada del usuario desde DB (sin cache)"""
+        logger.info(f"🔍 Getting unified config for user: {user_id}")
+        
+        # Usar función de DB optimizada
+        result = self.db_client.client.rpc(
+            'get_user_unified_budget_config',
+            {'p_user_id': user_id}
+        ).execute()
+        
+        if not result.data:
+            logger.info(f"📝 No config found for user {user_id}, creating defaults")
+            # Defaults sintetizados: no se cachean para no ocultar una config real posterior
+            return Uncached(self._create_smart_user_defaults(user_id))
+        
+        config_data = result.data[0]
+        
+        # Formatear respuesta unificada
+        unified_config = {
+            "user_id": user_id,
+            "has_defaults": config_data.get('has_defaults', False),
+            "branding": config_data.get('branding_config', {}),
+            "pricing": config_data.get('pricing_config', {}),
+            "document": config_data.get('document_config', {}),
+            "auto_settings": config_data.get('auto_settings', {}),
+            "statistics": config_data.get('statistics', {}),
+            "last_updated": datetime.now().isoformat()
+        }
+        
+        logger.info(f"✅ Retrieved unified config for user {user_id}")
+        return unified_config
+    
     def get_rfx_effective_config(self, rfx_id: str) -> Optional[Dict[str, Any]]:
-        """Obtiene configuración efectiva para un RFX (con herencia de usuario)"""
+        """Obtiene configuración efectiva para un RFX (con herencia de usuario, read-through cache)"""
         try:
-            logger.info(f"🔍 Getting effective config for RFX: {rfx_id}")
-            
-            # Verificar si el RFX existe en la base de datos primero
-            rfx_check = self.db_client.client.table('rfx_v2')\
-                .select('id, user_id')\
-                .eq('id', rfx_id)\
-                .execute()
-            
-            if not rfx_check.data:
-                logger.warning(f"⚠️ RFX {rfx_id} no encontrado en base de datos")
-                return None
-            
-            # Usar función de DB optimizada
-            result = self.db_client.client.rpc(
-                'get_rfx_effective_budget_config',
-                {'p_rfx_id': rfx_id}
-            ).execute()
-            
-            if not result.data:
-                logger.warning(f"⚠️ No effective config found for RFX {rfx_id}")
-                return None
-            
-            config_data = result.data[0]
-            
-            effective_config = {
-                "rfx_id": rfx_id,
-                "user_id": config_data.get('user_id'),
-                "config": config_data.get('effective_config', {}),
-                "source_info": config_data.get('source_info', {}),
-                "retrieved_at": datetime.now().isoformat()
-            }
-            
-            logger.info(f"✅ Retrieved effective config for RFX {rfx_id}")
-            return effective_config
-            
+            return pricing_config_cache.get_or_load(
+                RFX_EFFECTIVE_CONFIG, rfx_id,
+                lambda: self._load_rfx_effective_config(rfx_id)
+            )
         except Exception as e:
             logger.error(f"❌ Error getting effective config for RFX {rfx_id}: {e}")
             return None
     
+    def _load_rfx_effective_config(self, rfx_id: str) -> Optional[Dict[str, Any]]:
+        """Lee configuración efectiva de un RFX desde DB (sin cache)"""
+        logger.info(f"🔍 Getting effective config for RFX: {rfx_id}")
+        
+        # Verificar si el RFX existe en la base de datos primero
+        rfx_check = self.db_client.client.table('rfx_v2')\
+            .select('id, user_id')\
+            .eq('id', rfx_id)\
+            .execute()
+        
+        if not rfx_check.data:
+            logger.warning(f"⚠️ RFX {rfx_id} no encontrado en base de datos")
+            return None
+        
+        # Usar función de DB optimizada
+        result = self.db_client.client.rpc(
+            'get_rfx_effective_budget_config',
+            {'p_rfx_id': rfx_id}
+        ).execute()
+        
+        if not result.data:
+            logger.warning(f"⚠️ No effective config found for RFX {rfx_id}")
+            return None
+        
+        config_data = result.data[0]
+        
+        effective_config = {
+            "rfx_id": rfx_id,
+            "user_id": config_data.get('user_id'),
+            "config": config_data.get('effective_config', {}),
+            "source_info": config_data.get('source_info', {}),
+            "retrieved_at": datetime.now().isoformat()
+        }
+        
+        logger.info(f"✅ Retrieved effective config for RFX {rfx_id}")
+        return effective_config
+    
     def update_user_defaults(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Actualiza configuraciones por defecto del usuario"""
         try:
@@ -136,6 +152,8 @@ class UnifiedBudgetConfigurationService:
             if 'pricing' in updates:
                 self._update_user_pricing_defaults(user_id, updates['pricing'])
             
+            pricing_config_cache.invalidate_user(user_id)
+            
             logger.info(f"✅ Updated user defaults for {user_id}")
             return True
             
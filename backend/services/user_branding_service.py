@@ -12,6 +12,7 @@ Cambios V3.0:
 - Nuevas validaciones de permisos por usuario
 """
 import asyncio
+import copy
 import json
 import os
 from pathlib import Path
@@ -23,9 +24,20 @@ from uuid import UUID
 import logging
 
 from backend.core.database import get_database_client
+from backend.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Cache por usuario del registro de branding (análisis parseado, html_template y
+# logo_url). Es de módulo: la API crea un UserBrandingService por request y la
+# generación de propuestas lee por el singleton; todos deben ver la misma
+# invalidación. Writers de este servicio y VisionAnalysisService invalidan por user_id.
+_branding_cache = TTLCache(
+    ttl_seconds=float(os.getenv("BRANDING_CACHE_TTL_SECONDS", "120")),
+    max_entries=1024,
+)
+
+
 class UserBrandingService:
     """
     Servicio de branding personalizado por usuario con análisis de IA cacheado
@@ -105,6 +117,7 @@ class UserBrandingService:
         
         # 3. Guardar archivos en BD
         await self._save_in_database(user_id, result, analyze_now)
+        self.invalidate_cache(user_id)
         
         # 4. Ejecutar análisis de forma síncrona para asegurar consistencia
         if analyze_now and result.get("template_path"):
@@ -112,6 +125,7 @@ class UserBrandingService:
                 result["template_path"],
                 user_id
             )
+            self.invalidate_cache(user_id)
             result["analysis_status"] = "completed"
             result["message"] = "Files uploaded and analysis completed."
         else:
@@ -165,6 +179,7 @@ class UserBrandingService:
         
         # Actualizar en BD
         await self._update_in_database(user_id, result)
+        self.invalidate_cache(user_id)
         
         # Re-analizar si se solicita y hay template
         if reanalyze and (template_file or existing.get('template_path')):
@@ -174,6 +189,7 @@ class UserBrandingService:
                     template_path,
                     user_id
                 )
+                self.invalidate_cache(user_id)
                 result["analysis_status"] = "completed"
                 result["message"] = "Branding updated and re-analysis completed."
             else:
@@ -398,41 +414,68 @@ class UserBrandingService:
             return None
         
         try:
-            # Usar Supabase client
-            response = self.db.client.table("company_branding_assets")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .eq("is_active", True)\
-                .execute()
-            
-            if not response.data:
-                return None
-            
-            result = response.data[0]
-            
-            # Parsear JSON fields (Supabase ya los retorna como dict si son JSONB)
-            if isinstance(result.get('logo_analysis'), str):
-                try:
-                    result['logo_analysis'] = json.loads(result['logo_analysis'])
-                except:
-                    result['logo_analysis'] = {}
-            elif not result.get('logo_analysis'):
-                result['logo_analysis'] = {}
-            
-            if isinstance(result.get('template_analysis'), str):
-                try:
-                    result['template_analysis'] = json.loads(result['template_analysis'])
-                except:
-                    result['template_analysis'] = {}
-            elif not result.get('template_analysis'):
-                result['template_analysis'] = {}
-            
-            logger.debug(f"📖 Retrieved branding for user: {user_id}, status: {result.get('analysis_status')}")
-            return result
-            
+            # "Sin branding" no se cachea: otro worker no se entera del upload del logo
+            branding = _branding_cache.get_or_load(
+                user_id,
+                lambda: self._load_branding(user_id),
+                should_cache=lambda value: value is not None,
+            )
         except Exception as e:
             logger.error(f"❌ Error retrieving branding: {e}")
             return None
+
+        # Copia: los callers mutan el dict y no deben contaminar el cache
+        return copy.deepcopy(branding)
+
+    def _load_branding(self, user_id: str) -> Optional[Dict]:
+        """Lee y normaliza el branding activo. Propaga errores para no cachearlos."""
+        response = self.db.client.table("company_branding_assets")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .eq("is_active", True)\
+            .execute()
+        
+        if not response.data:
+            return None
+        
+        result = response.data[0]
+        
+        # Parsear JSON fields (Supabase ya los retorna como dict si son JSONB)
+        if isinstance(result.get('logo_analysis'), str):
+            try:
+                result['logo_analysis'] = json.loads(result['logo_analysis'])
+            except:
+                result['logo_analysis'] = {}
+        elif not result.get('logo_analysis'):
+            result['logo_analysis'] = {}
+        
+        if isinstance(result.get('template_analysis'), str):
+            try:
+                result['template_analysis'] = json.loads(result['template_analysis'])
+            except:
+                result['template_analysis'] = {}
+        elif not result.get('template_analysis'):
+            result['template_analysis'] = {}
+        
+        logger.debug(f"📖 Retrieved branding for user: {user_id}, status: {result.get('analysis_status')}")
+        return result
+
+    def get_logo_url(self, user_id: str) -> Optional[str]:
+        """
+        URL pública (http/https) del logo desde el branding cacheado
+        
+        Returns:
+            URL del logo o None si no existe o no es pública
+        """
+        branding = self.get_branding_with_analysis(user_id)
+        logo_url = (branding or {}).get('logo_url')
+        if logo_url and logo_url.startswith('http'):
+            return logo_url
+        return None
+
+    def invalidate_cache(self, user_id: str) -> None:
+        """Descarta el branding cacheado del usuario tras cualquier escritura"""
+        _branding_cache.invalidate(user_id)
     
     def get_analysis_status(self, user_id: str) -> Optional[Dict]:
         """
@@ -490,8 +533,10 @@ class UserBrandingService:
             })\
             .eq("user_id", user_id)\
             .execute()
+        self.invalidate_cache(user_id)
 
         await self.vision_service.analyze_template(template_path, user_id)
+        self.invalidate_cache(user_id)
 
         return {
             "user_id": user_id,
@@ -525,6 +570,7 @@ class UserBrandingService:
                 })\
                 .eq("user_id", user_id)\
                 .execute()
+            self.invalidate_cache(user_id)
             
             logger.info(f"🗑️ Branding deactivated for user: {user_id}")
             return True
@@ -307,6 +307,8 @@ class VisionAnalysisService:
                 .eq("user_id", user_id)\
                 .execute()
             
+            self._invalidate_branding_cache(user_id)
+            
             if result.data:
                 logger.info(f"✅ Analysis and HTML saved successfully for user: {user_id}")
                 logger.info(f"✅ Updated fields: {list(update_data.keys())}")
@@ -317,6 +319,12 @@ class VisionAnalysisService:
             logger.error(f"❌ Error saving to database: {e}", exc_info=True)
             raise
     
+    def _invalidate_branding_cache(self, user_id: str):
+        """Descarta el branding cacheado tras escribir el análisis"""
+        from backend.services.user_branding_service import user_branding_service
+        
+        user_branding_service.invalidate_cache(user_id)
+    
     async def _save_error_to_database(self, user_id: str, error: str):
         """Guarda error de análisis en BD usando Supabase client"""
         try:
@@ -335,6 +343,7 @@ class VisionAnalysisService:
                 .update(error_data)\
                 .eq("user_id", user_id)\
                 .execute()
+            self._invalidate_branding_cache(user_id)
             
             logger.info(f"💾 Error saved to database for user: {user_id}")
             
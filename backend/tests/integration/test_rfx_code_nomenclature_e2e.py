@@ -127,6 +127,10 @@ class _FakeDatabaseClient:
         self.processing_status = {}
         self.regeneration_count = {}
 
+    def save_rfx_graph(self, **_graph):
+        # Sin RPC transaccional: el procesador usa los inserts secuenciales
+        return None
+
     def insert_company(self, company_data):
         company_id = f"company-{len(self._companies) + 1}"
         company = {"id": company_id, **(company_data or {})}
@@ -338,7 +342,7 @@ class _PreviewProcessor:
 def _build_confirm_processor(fake_db):
     class _ConfirmProcessor:
         _save_rfx_to_database = RFXProcessorService._save_rfx_to_database
-        _fallback_next_rfx_sequence = RFXProcessorService._fallback_next_rfx_sequence
+        _save_rfx_graph_sequentially = RFXProcessorService._save_rfx_graph_sequentially
 
         def __init__(self, *args, **kwargs):
             self.db_client = fake_db
@@ -455,12 +459,15 @@ def e2e_client(monkeypatch):
     monkeypatch.setattr(
         rfx_api,
         "_submit_preview_processing",
-        lambda session_id, rfx_input, valid_files, user_id, organization_id: rfx_api._process_preview_session(
-            session_id,
-            rfx_input,
-            valid_files,
-            user_id,
-            organization_id,
+        lambda session_id, rfx_input, valid_files, user_id, organization_id, force_refresh=False: (
+            rfx_api._process_preview_session(
+                session_id,
+                rfx_input,
+                valid_files,
+                user_id,
+                organization_id,
+                force_refresh=force_refresh,
+            )
         ),
     )
     monkeypatch.setattr(rfx_chat_api, "RFXProcessingSessionService", _FakeSessionService)
@@ -1,4 +1,5 @@
 import os
+from copy import copy
 from io import BytesIO
 
 from openpyxl import load_workbook
@@ -125,3 +126,32 @@ def test_apu_chevron_builder_raises_when_section_exceeds_template_capacity():
         assert "máximo Chevron" in str(exc)
     else:
         raise AssertionError("Expected Chevron capacity validation to fail")
+
+
+def test_template_stamp_matches_per_cell_clone_for_every_sheet():
+    payload = _sample_output().model_dump()
+    payload["partidas"] = [
+        dict(payload["partidas"][0], numero=f"{idx:02d}", descripcion=f"Partida {idx}")
+        for idx in range(1, 4)
+    ]
+    output = APUOutput.model_validate(payload)
+
+    stamped = load_workbook(BytesIO(_APUExcelBuilder(output).build()))
+    reference = load_workbook(BytesIO(_APUExcelBuilder(output, use_template_stamp=False).build()))
+
+    assert stamped.sheetnames == reference.sheetnames
+    for name in ["P01", "P02", "P03"]:
+        ws, ref = stamped[name], reference[name]
+        assert sorted(map(str, ws.merged_cells.ranges)) == sorted(map(str, ref.merged_cells.ranges))
+        assert {k: (d.width, d.hidden) for k, d in ws.column_dimensions.items()} == {
+            k: (d.width, d.hidden) for k, d in ref.column_dimensions.items()
+        }
+        assert ws.print_area == ref.print_area
+        assert len(ws._images) == len(ref._images) == 1
+        for row in ref.iter_rows():
+            for ref_cell in row:
+                cell = ws[ref_cell.coordinate]
+                assert cell.value == ref_cell.value, ref_cell.coordinate
+                assert cell.number_format == ref_cell.number_format, ref_cell.coordinate
+                for attr in ("font", "fill", "border", "alignment", "protection"):
+                    assert copy(getattr(cell, attr)) == copy(getattr(ref_cell, attr)), (ref_cell.coordinate, attr)
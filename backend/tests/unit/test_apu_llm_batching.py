@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test1234567890")
+
+from backend.models.apu_models import APUInput, APUOutput
+from backend.services import apu_generator
+from backend.services.apu_generator import APUGenerationError, APUGeneratorService
+from backend.services.rfx_pipeline_checkpoints import RFXPipelineCheckpointStore
+
+
+def _apu_input(product_count: int) -> APUInput:
+    return APUInput.model_validate({
+        "rfx_id": "rfx-2024-0100",
+        "project_name": "Galpon industrial",
+        "client_company": "Constructora Andina C.A.",
+        "rfx_date": "2024-05-02",
+        "tasa_bcv": 36.5,
+        "products": [
+            {"id": f"p-{idx}", "name": f"Partida {idx}", "quantity": 1, "unit": "m3"}
+            for idx in range(1, product_count + 1)
+        ],
+    })
+
+
+def _batch_output(batch_input: APUInput) -> APUOutput:
+    return APUOutput.model_validate({
+        "rfx_id": batch_input.rfx_id,
+        "project_name": batch_input.project_name,
+        "client_company": batch_input.client_company,
+        "rfx_date": batch_input.rfx_date,
+        "tasa_bcv": 36.5,
+        "tasa_bcv_missing": False,
+        "pct_admin_gg": 0.16,
+        "pct_utilidad": 0.10,
+        "pct_sobre_costo_labor": 0.35,
+        "partidas": [
+            {
+                "numero": "01",
+                "descripcion": product.name,
+                "unidad": "m3",
+                "cantidad_obra": 1,
+                "rendimiento_und_dia": 1,
+                "pct_sobre_costo_labor": 0.35,
+                "materiales": [],
+                "equipos": [],
+                "mano_obra": [
+                    {"descripcion": "Obrero", "cantidad_dias": 1, "costo_por_dia_usd": 20.0, "bono_usd": 0.0, "es_precio_estimado": True}
+                ],
+            }
+            for product in batch_input.products
+        ],
+        "warnings": ["Precios estimados", f"Lote {batch_input.products[0].name}"],
+    })
+
+
+@pytest.fixture(autouse=True)
+def _output_cache(tmp_path, monkeypatch):
+    cache = RFXPipelineCheckpointStore(str(tmp_path / "apu_cache.sqlite3"), ttl_seconds=60, enabled=True)
+    monkeypatch.setattr(apu_generator, "apu_output_cache", cache)
+    return cache
+
+
+def _service(monkeypatch, call):
+    service = APUGeneratorService.__new__(APUGeneratorService)
+    service.openai_client = object()
+    service.openai_config = type("_Config", (), {"model": "gpt-4o"})()
+    service._prompt_text = "prompt"
+    monkeypatch.setattr(service, "_call_llm_with_validation", call)
+    return service
+
+
+def test_batches_run_concurrently_and_merge_in_batch_order(monkeypatch):
+    monkeypatch.setattr(apu_generator, "LLM_MAX_CONCURRENT_BATCHES", 4)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def _call(batch_input):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        # First batch is slowest so completion order differs from batch order
+        time.sleep(0.15 if batch_input.products[0].name == "Partida 1" else 0.05)
+        with lock:
+            state["running"] -= 1
+        return _batch_output(batch_input), 1
+
+    service = _service(monkeypatch, _call)
+    output, attempts = service._call_llm_batched_with_validation(_apu_input(15))
+
+    assert state["peak"] == 3
+    assert attempts == 3
+    assert [p.descripcion for p in output.partidas] == [f"Partida {i}" for i in range(1, 16)]
+    assert [p.numero for p in output.partidas] == [f"{i:02d}" for i in range(1, 16)]
+    assert output.warnings == ["Precios estimados", "Lote Partida 1", "Lote Partida 7", "Lote Partida 13"]
+
+
+def test_failed_batch_cancels_pending_batches_and_fails_the_apu(monkeypatch):
+    monkeypatch.setattr(apu_generator, "LLM_MAX_CONCURRENT_BATCHES", 1)
+    started = []
+
+    def _call(batch_input):
+        started.append(batch_input.products[0].name)
+        if batch_input.products[0].name == "Partida 7":
+            raise APUGenerationError("LLM output failed validation after 2 attempts")
+        time.sleep(0.1)
+        return _batch_output(batch_input), 2
+
+    service = _service(monkeypatch, _call)
+    started_at = time.monotonic()
+    with pytest.raises(APUGenerationError, match="APU batch 2 of 4 failed"):
+        service._call_llm_batched_with_validation(_apu_input(19))
+
+    # No espera al lote que ya corría; el último seguía en cola y se canceló
+    assert time.monotonic() - started_at < 0.2
+    time.sleep(0.15)
+    assert "Partida 19" not in started
+
+
+def test_unchanged_batches_are_served_from_output_cache(monkeypatch):
+    calls = []
+
+    def _call(batch_input):
+        calls.append(batch_input.products[0].name)
+        return _batch_output(batch_input), 1
+
+    service = _service(monkeypatch, _call)
+    first, first_attempts = service._call_llm_batched_with_validation(_apu_input(13))
+    cached, cached_attempts = service._call_llm_batched_with_validation(_apu_input(13))
+
+    assert sorted(calls) == ["Partida 1", "Partida 13", "Partida 7"]
+    assert (first_attempts, cached_attempts) == (3, 0)
+    assert cached == first
+
+    # Only the batch containing the edited product goes back to the LLM
+    calls.clear()
+    edited = _apu_input(13)
+    edited.products[8].quantity = 4
+    service._call_llm_batched_with_validation(edited)
+    assert calls == ["Partida 7"]
+
+    # A new prompt version invalidates every batch; use_cache=False always regenerates
+    calls.clear()
+    monkeypatch.setattr(apu_generator, "PROMPT_VERSION", "9.9")
+    service._call_llm_batched_with_validation(_apu_input(6))
+    service._call_llm_batched_with_validation(_apu_input(6), use_cache=False)
+    assert calls == ["Partida 1", "Partida 1"]
@@ -5,7 +5,9 @@ os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
 os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
 os.environ.setdefault("SECRET_KEY", "test-secret")
 
-from backend.services.bcv_rate_service import BCVRateService
+import pytest
+
+from backend.services.bcv_rate_service import BCVRateError, BCVRateService
 
 
 def test_extract_rate_from_html_with_decimal_comma():
@@ -57,3 +59,105 @@ def test_save_snapshot_returns_in_memory_value_when_insert_fails():
 
     assert snapshot["rate"] == 36.5
     assert snapshot["provider"] == "bcv"
+
+
+def _snapshot(minutes_valid=60, rate=36.5):
+    from datetime import datetime, timedelta, timezone
+
+    fetched_at = datetime.now(timezone.utc)
+    return {
+        "rate": rate,
+        "fetched_at": fetched_at.isoformat(),
+        "expires_at": (fetched_at + timedelta(minutes=minutes_valid)).isoformat(),
+        "is_stale": False,
+    }
+
+
+def test_get_current_rate_serves_fresh_snapshot_from_memory():
+    service = BCVRateService(provider_url="https://example.test")
+    reads = []
+
+    def latest():
+        reads.append(1)
+        return _snapshot()
+
+    service._get_latest_snapshot = latest  # type: ignore[assignment]
+
+    first = service.get_current_rate()
+    first["rate"] = 0
+    second = service.get_current_rate()
+
+    assert len(reads) == 1
+    assert second["rate"] == 36.5
+
+
+def test_concurrent_refresh_fetches_provider_once():
+    import threading
+    import time
+
+    service = BCVRateService(provider_url="https://example.test")
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        time.sleep(0.05)
+        return _snapshot(rate=40.0)
+
+    service._get_latest_snapshot = lambda: None  # type: ignore[assignment]
+    service._fetch_provider_snapshot = fetch  # type: ignore[assignment]
+    service._save_snapshot = lambda snapshot: service._normalize_snapshot(snapshot)  # type: ignore[assignment]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get_current_rate())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert [result["rate"] for result in results] == [40.0] * 8
+
+
+def test_refresh_reuses_stale_snapshot_when_other_worker_holds_lock():
+    service = BCVRateService(provider_url="https://example.test")
+    stale = _snapshot(minutes_valid=-5)
+    service._get_latest_snapshot = lambda: dict(stale)  # type: ignore[assignment]
+    service._acquire_distributed_lock = lambda: False  # type: ignore[assignment]
+
+    def fetch():
+        raise AssertionError("provider must not be called while another worker refreshes")
+
+    service._fetch_provider_snapshot = fetch  # type: ignore[assignment]
+
+    snapshot = service.get_current_rate(allow_stale=True)
+
+    assert snapshot["rate"] == 36.5
+    assert snapshot["is_stale"] is True
+
+
+def test_failed_refresh_serves_stale_snapshot_without_retrying_providers_during_cooldown():
+    service = BCVRateService(provider_url="https://example.test")
+    service.failure_cooldown_seconds = 60
+    stale = _snapshot(minutes_valid=-5)
+    service._get_latest_snapshot = lambda: dict(stale)  # type: ignore[assignment]
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        raise Exception("provider timeout")
+
+    service._fetch_provider_snapshot = fetch  # type: ignore[assignment]
+
+    for _ in range(5):
+        snapshot = service.get_current_rate(allow_stale=True)
+        assert snapshot["is_stale"] is True
+
+    assert len(fetches) == 1
+    with pytest.raises(BCVRateError, match="cool-down"):
+        service.get_current_rate(allow_stale=False)
+    assert len(fetches) == 1
+
+    # After the cool-down the providers are tried again
+    service._last_failure_at -= 61
+    service.get_current_rate(allow_stale=True)
+    assert len(fetches) == 2
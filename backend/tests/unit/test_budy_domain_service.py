@@ -375,3 +375,126 @@ def test_get_payment_submissions_normalizes_trailing_question_mark():
     result = service._get_payment_submissions("proposal-1")
 
     assert result[0]["proof_file_url"] == "https://example.com/signed-proof.png?token=abc"
+
+
+def test_list_opportunities_paginates_rfx_list():
+    service = BudyDomainService()
+    captured = {}
+
+    class FakeDB:
+        def get_rfx_history(self, **kwargs):
+            captured.update(kwargs)
+            return []
+
+    service.db = FakeDB()  # type: ignore[assignment]
+    service._batch_latest_proposals = lambda _rfx_ids: {}  # type: ignore[assignment]
+
+    service.list_opportunities(user_id="user-1", organization_id="org-1", limit=50, offset=100)
+
+    assert captured["limit"] == 50
+    assert captured["offset"] == 100
+
+
+def test_batch_latest_proposals_uses_slim_rpc_projection():
+    service = BudyDomainService()
+    captured = {}
+
+    class FakeExecuteResult:
+        def __init__(self, data):
+            self.data = data
+
+    class FakeRPC:
+        def execute(self):
+            return FakeExecuteResult(
+                [{"id": "doc-2", "rfx_id": "rfx-1", "metadata": {"commercial_status": "sent"}}]
+            )
+
+    class FakeClient:
+        def rpc(self, name, params):
+            captured["name"] = name
+            captured["params"] = params
+            return FakeRPC()
+
+        def table(self, _name):
+            raise AssertionError("generated_documents should not be scanned when the RPC is available")
+
+    service.db._client = FakeClient()  # type: ignore[attr-defined]
+
+    latest = service._batch_latest_proposals(["rfx-1"])
+
+    assert captured["name"] == "get_latest_proposal_summaries"
+    assert captured["params"] == {"p_rfx_ids": ["rfx-1"]}
+    assert latest["rfx-1"]["id"] == "doc-2"
+
+
+def test_batch_latest_proposals_fallback_never_selects_full_documents():
+    service = BudyDomainService()
+    selected = []
+
+    class FakeExecuteResult:
+        def __init__(self, data):
+            self.data = data
+
+    class FakeQuery:
+        def select(self, columns):
+            selected.append(columns)
+            return self
+
+        def in_(self, *_args):
+            return self
+
+        def eq(self, *_args):
+            return self
+
+        def order(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            return FakeExecuteResult(
+                [
+                    {"id": "doc-2", "rfx_id": "rfx-1"},
+                    {"id": "doc-1", "rfx_id": "rfx-1"},
+                ]
+            )
+
+    class FakeClient:
+        def rpc(self, *_args):
+            raise Exception("Could not find the function public.get_latest_proposal_summaries")
+
+        def table(self, _name):
+            return FakeQuery()
+
+    service.db._client = FakeClient()  # type: ignore[attr-defined]
+
+    latest = service._batch_latest_proposals(["rfx-1"])
+
+    assert latest["rfx-1"]["id"] == "doc-2"
+    assert selected and "*" not in selected[0]
+    assert "content" not in selected[0]
+
+
+def test_public_proposal_payload_is_cached_and_views_are_buffered(monkeypatch):
+    from backend.services import budy_domain_service as module
+
+    service = BudyDomainService()
+    builds = []
+    recorded = []
+
+    def fake_build(token):
+        builds.append(token)
+        return {"proposal": {"id": "proposal-1", "rfx_id": "rfx-1"}, "opportunity": {"id": "rfx-1"}}
+
+    service._build_public_payload = fake_build  # type: ignore[assignment]
+    monkeypatch.setattr(module.public_view_tracker, "record_view", lambda proposal_id, rfx_id=None: recorded.append(proposal_id))
+
+    first = service.get_public_proposal("tok")
+    first["proposal"]["id"] = "mutated"
+    second = service.get_public_proposal("tok")
+
+    assert builds == ["tok"]
+    assert second["proposal"]["id"] == "proposal-1"
+    assert recorded == ["proposal-1", "proposal-1"]
+
+    service.invalidate_public_proposal("tok")
+    service.get_public_proposal("tok")
+    assert builds == ["tok", "tok"]
@@ -0,0 +1,186 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from backend.services import credits_service as credits_module
+from backend.services.credits_service import CreditsService
+
+NOW = datetime(2026, 3, 1, 6, 0, 0)
+DUE = "2026-02-28T00:00:00"
+NOT_DUE = "2026-03-15T00:00:00"
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.filters = []
+        self.order_key = None
+        self.limit_n = None
+
+    def select(self, *_args):
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def lte(self, key, value):
+        self.filters.append(lambda row: row.get(key) <= value)
+        return self
+
+    def gt(self, key, value):
+        self.filters.append(lambda row: row.get(key) > value)
+        return self
+
+    def in_(self, key, values):
+        self.filters.append(lambda row: row.get(key) in values)
+        return self
+
+    def contains(self, key, value):
+        self.filters.append(lambda row: value.items() <= (row.get(key) or {}).items())
+        return self
+
+    def order(self, key):
+        self.order_key = key
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.op))
+        if self.client.fail_on == (self.table, self.op):
+            self.client.fail_on = None
+            raise Exception("connection reset")
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.op == "insert":
+            rows.extend(dict(row) for row in self.payload)
+            return _Result(self.payload)
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+            return _Result(matched)
+        if self.order_key:
+            matched.sort(key=lambda row: row[self.order_key])
+        return _Result(matched[:self.limit_n] if self.limit_n else matched)
+
+
+class _Rpc:
+    def execute(self):
+        raise Exception("Could not find the function public.reset_monthly_credits_bulk")
+
+
+class _FakeClient:
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = []
+        self.fail_on = None
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, *_args):
+        return _Rpc()
+
+
+class _FakeDB:
+    def __init__(self, client):
+        self.client = client
+
+
+def _service(tables):
+    service = CreditsService.__new__(CreditsService)
+    service.db = _FakeDB(_FakeClient(tables))
+    return service
+
+
+def _tables():
+    organizations = [
+        {"id": f"org-{i:02d}", "plan_tier": "pro" if i % 3 == 0 else "free", "credits_used": 50,
+         "credits_total": 0, "credits_reset_date": DUE}
+        for i in range(7)
+    ]
+    organizations.append({"id": "org-late", "plan_tier": "pro", "credits_used": 9, "credits_total": 1500,
+                          "credits_reset_date": NOT_DUE})
+    organizations.append({"id": "org-legacy", "plan_tier": "legacy", "credits_used": 9, "credits_total": 1,
+                          "credits_reset_date": DUE})
+    return {
+        "organizations": organizations,
+        "user_credits": [
+            {"user_id": "user-1", "plan_tier": None, "credits_used": 20, "credits_total": 100, "credits_reset_date": DUE},
+            {"user_id": "user-2", "plan_tier": "starter", "credits_used": 20, "credits_total": 250,
+             "credits_reset_date": NOT_DUE},
+        ],
+        "credit_transactions": [],
+    }
+
+
+def test_batched_reset_groups_by_tier_and_reports_counts(monkeypatch):
+    monkeypatch.setattr(credits_module, "MONTHLY_RESET_BATCH_SIZE", 4)
+    service = _service(_tables())
+
+    result = service.reset_monthly_credits(run_id="run-1", now=NOW)
+
+    assert result["status"] == "success"
+    assert result["mode"] == "batched"
+    assert result["org_reset_by_tier"] == {"free": 4, "pro": 3}
+    assert result["user_reset_by_tier"] == {"free": 1}
+    assert (result["org_reset_count"], result["user_reset_count"], result["reset_count"]) == (7, 1, 8)
+    assert result["transactions_recorded"] == 7
+    assert result["skipped_count"] == 1
+    assert result["elapsed_ms"] >= 0
+
+    tables = service.db.client.tables
+    by_id = {org["id"]: org for org in tables["organizations"]}
+    assert by_id["org-03"]["credits_total"] == 1500 and by_id["org-03"]["credits_used"] == 0
+    assert by_id["org-01"]["credits_total"] == 100
+    assert by_id["org-late"]["credits_used"] == 9
+    assert by_id["org-legacy"]["credits_reset_date"] == DUE
+    assert {tx["metadata"]["reset_run_id"] for tx in tables["credit_transactions"]} == {"run-1"}
+
+    # One UPDATE per tier per page, never one per row
+    org_updates = [call for call in service.db.client.calls if call == ("organizations", "update")]
+    assert len(org_updates) < 7
+
+
+def test_rerunning_or_resuming_a_run_does_not_duplicate_work():
+    service = _service(_tables())
+    client = service.db.client
+
+    # Crash after the first tier's transactions were recorded but before its UPDATE
+    client.fail_on = ("organizations", "update")
+    assert service.reset_monthly_credits(run_id="run-1", now=NOW)["status"] == "error"
+    recorded_before_resume = len(client.tables["credit_transactions"])
+    assert recorded_before_resume > 0
+
+    resumed = service.reset_monthly_credits(run_id="run-1", now=NOW)
+    assert resumed["org_reset_count"] == 7
+    assert resumed["transactions_recorded"] == 7 - recorded_before_resume
+    assert len(client.tables["credit_transactions"]) == 7
+
+    again = service.reset_monthly_credits(run_id="run-1", now=NOW)
+    assert again["reset_count"] == 0
+    assert again["transactions_recorded"] == 0
+    assert len(client.tables["credit_transactions"]) == 7
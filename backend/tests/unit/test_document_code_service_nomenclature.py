@@ -6,7 +6,7 @@ os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
 os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
 os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
 
-from backend.services.document_code_service import DocumentCodeService
+from backend.services.document_code_service import DocumentCodeBlockAllocator, DocumentCodeService
 
 
 class _RPCResponse:
@@ -71,3 +71,62 @@ def test_build_proposal_code_uses_rfx_code_plus_revision_suffix():
 
     assert rfx_code == f"SAB-PP-AUT-{yy:02d}-001"
     assert proposal_code == f"{rfx_code}-R01"
+
+
+class _BlockRPCClient(_FakeSupabaseClient):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def rpc(self, fn_name, payload):
+        self.calls.append(fn_name)
+        if fn_name == "reserve_document_code_block":
+            key = (
+                str(payload.get("p_code_type")),
+                str(payload.get("p_domain_prefix")),
+                int(payload.get("p_year")),
+            )
+            self.sequences[key] = self.sequences.get(key, 0) + int(payload["p_block_size"])
+            return _RPCResponse([{"reserve_document_code_block": self.sequences[key]}])
+        return super().rpc(fn_name, payload)
+
+
+def test_rfx_codes_are_served_from_reserved_blocks():
+    db = _FakeDBClient()
+    db.client = _BlockRPCClient()
+    service = DocumentCodeService(db, allocator=DocumentCodeBlockAllocator(block_size=10))
+
+    codes = [service.generate_rfx_code(rfx_type="catering", year=2026, origin="aut") for _ in range(25)]
+
+    assert codes[0] == "SAB-PP-AUT-26-001"
+    assert codes[-1] == "SAB-PP-AUT-26-025"
+    assert db.client.calls == ["reserve_document_code_block"] * 3
+    # Otro scope reserva su propio bloque
+    assert service.generate_rfx_code(rfx_type="catering", year=2026, origin="humano") == "SAB-PP-H-26-001"
+
+
+def test_blocks_from_different_processes_never_overlap():
+    db = _FakeDBClient()
+    db.client = _BlockRPCClient()
+    process_a = DocumentCodeService(db, allocator=DocumentCodeBlockAllocator(block_size=5))
+    process_b = DocumentCodeService(db, allocator=DocumentCodeBlockAllocator(block_size=5))
+
+    codes = []
+    for _ in range(7):
+        codes.append(process_a.generate_rfx_code(rfx_type="catering", year=2026))
+        codes.append(process_b.generate_rfx_code(rfx_type="catering", year=2026))
+
+    sequences = sorted(int(code.rsplit("-", 1)[1]) for code in codes)
+    assert len(set(sequences)) == 14
+    assert sequences[:5] == [1, 2, 3, 4, 5]
+    # Huecos tolerados: el resto de los bloques en curso queda sin usar
+    assert max(sequences) == 17
+
+
+def test_allocator_falls_back_to_single_sequence_rpc_when_block_rpc_missing():
+    db = _FakeDBClient()
+    service = DocumentCodeService(db, allocator=DocumentCodeBlockAllocator(block_size=10))
+
+    assert service.generate_rfx_code(rfx_type="catering", year=2026) == "SAB-PP-AUT-26-001"
+    assert service.generate_rfx_code(rfx_type="catering", year=2026) == "SAB-PP-AUT-26-002"
+    assert service.allocator._block_rpc_available is False
@@ -0,0 +1,43 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+
+from backend.services.domain_detector import DomainDetectorService
+
+
+def test_single_pass_matcher_matches_per_keyword_findall():
+    detector = DomainDetectorService()
+    text = (
+        "Servicio de CATERING para evento corporativo: 200 tequeños, tequeño, café y té. "
+        "Equipo de sonido + equipo de iluminación; data center y base de datos. "
+        "Montaje/desmontaje en el salón del hotel; distribución y distribuciónes. "
+        "eventos, pre-evento, evento_especial, evento."
+    )
+
+    analysis = detector._analyze_domains(text)
+
+    assert analysis == detector._analyze_domains_reference(text)
+    assert analysis["keywords_by_domain"]["catering"]["primary"] == ["catering", "evento", "evento", "evento"]
+    assert analysis["keywords_by_domain"]["events"]["products"] == ["equipo de sonido", "iluminación"]
+    assert analysis["keywords_by_domain"]["logistics"]["primary"] == ["distribución"]
+
+
+def test_matcher_is_rebuilt_when_keywords_are_added():
+    detector = DomainDetectorService()
+    text = "Suministro de paneles solares e inversor híbrido, kit c++ y e-commerce."
+
+    assert "energy" not in detector._analyze_domains(text)["keywords_by_domain"]
+
+    detector.add_domain_keywords("energy", {
+        "primary": ["Paneles Solares", "inversor"],
+        "products": ["c++", "e-commerce", "kit"],
+    })
+    analysis = detector._analyze_domains(text)
+
+    assert analysis == detector._analyze_domains_reference(text)
+    assert analysis["keywords_by_domain"]["energy"] == {
+        "primary": ["paneles solares", "inversor"],
+        "products": ["e-commerce", "kit"],
+    }
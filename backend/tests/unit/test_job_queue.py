@@ -0,0 +1,129 @@
+from backend.services.job_queue import (
+    CANCELLED,
+    COMMITTING,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    SQLiteJobStore,
+)
+
+
+def _claim(store, owner="worker-1", lease_seconds=60, max_running=10, max_per_key=1):
+    return store.claim(
+        "preview",
+        owner,
+        lease_seconds=lease_seconds,
+        max_running=max_running,
+        max_per_key=max_per_key,
+    )
+
+
+def test_enqueue_is_idempotent_per_key(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+    first, created_first = store.enqueue("preview", "session-1", {"n": 1}, fairness_key="org-a")
+    second, created_second = store.enqueue("preview", "session-1", {"n": 2}, fairness_key="org-a")
+
+    assert created_first is True
+    assert created_second is False
+    assert first["id"] == second["id"]
+    assert store.stats("preview")[QUEUED] == 1
+
+
+def test_claim_is_fair_across_organizations(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    for index in range(3):
+        store.enqueue("preview", f"a-{index}", {}, fairness_key="org-a")
+    store.enqueue("preview", "b-0", {}, fairness_key="org-b")
+
+    first = _claim(store)
+    second = _claim(store)
+    blocked = _claim(store)
+
+    assert first["idempotency_key"] == "a-0"
+    assert second["idempotency_key"] == "b-0"
+    assert blocked is None  # org-a ya tiene su único slot ocupado
+
+    store.complete(first["id"], "worker-1")
+    store.complete(second["id"], "worker-1")
+    assert _claim(store)["idempotency_key"] == "a-1"
+
+
+def test_retryable_failure_is_requeued_then_succeeds(tmp_path):
+    calls = []
+
+    def handler(job, progress):
+        calls.append(job["attempts"])
+        progress("extracting")
+        if len(calls) == 1:
+            raise ConnectionError("upstream reset")
+
+    queue = JobQueue(
+        "preview",
+        handler,
+        store=SQLiteJobStore(str(tmp_path / "jobs.sqlite3")),
+        retryable=(ConnectionError,),
+        retry_backoff_seconds=0,
+    )
+    queue.owner = "worker-1"
+    queue.store.enqueue("preview", "session-1", {"files": []}, fairness_key="org-a")
+
+    assert queue.run_job(_claim(queue.store)) == QUEUED
+    assert queue.run_job(_claim(queue.store)) == SUCCEEDED
+
+    job = queue.get("session-1")
+    assert calls == [1, 2]
+    assert job["status"] == SUCCEEDED
+    assert job["stage"] == "extracting"
+
+
+def test_cancel_queued_and_running_jobs(tmp_path):
+    cancelled = []
+    queue = JobQueue(
+        "preview",
+        lambda job, progress: progress("llm"),
+        store=SQLiteJobStore(str(tmp_path / "jobs.sqlite3")),
+        on_cancel=lambda job: cancelled.append(job["idempotency_key"]),
+    )
+    queue.owner = "worker-1"
+    queue.store.enqueue("preview", "queued-session", {}, fairness_key="org-a")
+    queue.store.enqueue("preview", "running-session", {}, fairness_key="org-b")
+
+    assert queue.cancel("queued-session")["status"] == CANCELLED
+    running = _claim(queue.store)
+    assert running["idempotency_key"] == "running-session"
+
+    assert queue.cancel("running-session")["status"] == RUNNING
+    assert queue.run_job(running) == CANCELLED
+    assert cancelled == ["queued-session", "running-session"]
+
+
+def test_cancel_is_refused_once_the_handler_is_committing(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    holder = {}
+
+    def handler(job, progress):
+        progress(COMMITTING)
+        holder["cancel"] = queue.cancel("session-1")
+
+    queue = JobQueue("preview", handler, store=store)
+    queue.owner = "worker-1"
+    store.enqueue("preview", "session-1", {}, fairness_key="org-a")
+
+    assert queue.run_job(_claim(store)) == SUCCEEDED
+    assert holder["cancel"]["stage"] == COMMITTING
+    assert holder["cancel"]["cancel_requested"] is False
+    assert queue.get("session-1")["status"] == SUCCEEDED
+
+
+def test_expired_lease_is_recovered_by_another_worker(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    store.enqueue("preview", "session-1", {}, fairness_key="org-a")
+    _claim(store, owner="dead-worker", lease_seconds=-1)
+
+    assert store.reap_expired("preview") == []
+    recovered = _claim(store, owner="worker-2")
+
+    assert recovered["idempotency_key"] == "session-1"
+    assert recovered["attempts"] == 2
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from backend.utils.lazy_import import LazyModule, lazy_attr
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def test_lazy_module_imports_on_first_attribute_access(tmp_path, monkeypatch):
+    (tmp_path / "lazy_probe_module.py").write_text("LOADS = 1\nclass Widget:\n    def __init__(self, size):\n        self.size = size\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe_module", raising=False)
+
+    module = LazyModule("lazy_probe_module")
+    Widget = lazy_attr("lazy_probe_module", "Widget")
+
+    assert "lazy_probe_module" not in sys.modules
+    assert not module.is_loaded
+
+    widget = Widget(size=3)
+
+    assert "lazy_probe_module" in sys.modules
+    assert widget.size == 3
+    assert isinstance(widget, Widget)
+    assert module.LOADS == 1
+
+
+def test_service_modules_do_not_import_heavy_dependencies_at_startup():
+    probe = (
+        "import sys\n"
+        "import backend.core.database, backend.services.rfx_processor, backend.services.apu_generator\n"
+        "import backend.services.proposals.proposal_service, backend.services.catalog_import_service\n"
+        "heavy = ['openai', 'numpy', 'pandas', 'openpyxl', 'PyPDF2', 'supabase']\n"
+        "print('HEAVY=' + ','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "HEAVY=\n" in result.stdout
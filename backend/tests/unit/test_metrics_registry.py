@@ -0,0 +1,114 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import json
+import threading
+
+import pytest
+from flask import Flask
+
+from backend.utils.metrics import STAGE_ERRORS, STAGE_SECONDS, track_stage
+from backend.utils.metrics.registry import MetricsRegistry, reset_multiprocess_dir
+
+
+def test_histogram_exposition_is_cumulative_with_inf_bucket():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", ["stage"], buckets=[0.1, 1.0])
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="ocr")
+
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="ocr",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="ocr",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="ocr",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="ocr"} 4' in text
+
+
+def test_counter_is_thread_safe_and_validates_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ["route"])
+
+    def _work():
+        for _ in range(1000):
+            counter.inc(route='/api/"x"')
+
+    threads = [threading.Thread(target=_work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value(route='/api/"x"') == 8000
+    assert 'requests_total{route="/api/\\"x\\""} 8000' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc(method="GET")
+
+
+def test_multiprocess_collect_sums_workers_and_archives_dead_ones(tmp_path):
+    registry = MetricsRegistry(multiprocess_dir=str(tmp_path), flush_interval_seconds=0)
+    counter = registry.counter("jobs_total", "Jobs", ["stage"])
+    gauge = registry.gauge("in_progress", "Running", ["stage"])
+    counter.inc(2, stage="ocr")
+    gauge.set(1, stage="ocr")
+
+    dead_worker = {
+        "jobs_total": {"type": "counter", "help": "Jobs", "labelnames": ["stage"], "samples": {'["ocr"]': 5}},
+        "in_progress": {
+            "type": "gauge", "help": "Running", "labelnames": ["stage"],
+            "multiprocess_mode": "sum", "samples": {'["ocr"]': 7},
+        },
+    }
+    (tmp_path / "999999999.json").write_text(json.dumps(dead_worker))
+
+    merged = registry.collect()
+    assert merged["jobs_total"]["samples"]['["ocr"]'] == 7
+    # Gauges de procesos muertos no se suman
+    assert merged["in_progress"]["samples"]['["ocr"]'] == 1
+    assert not (tmp_path / "999999999.json").exists()
+    assert (tmp_path / "archive.json").exists()
+
+    # El archivo consolidado conserva los conteos en scrapes posteriores
+    assert registry.collect()["jobs_total"]["samples"]['["ocr"]'] == 7
+
+
+def test_track_stage_records_latency_errors_and_request_labels():
+    app = Flask(__name__)
+
+    @track_stage("unit_test_stage", engine="fake")
+    def _fails():
+        raise RuntimeError("boom")
+
+    @app.route("/api/things/<thing_id>")
+    def _view(thing_id):
+        with track_stage("unit_test_stage", engine="fake"):
+            pass
+        return "ok"
+
+    with app.test_client() as client:
+        assert client.get("/api/things/123").status_code == 200
+
+    with pytest.raises(RuntimeError):
+        _fails()
+
+    samples = STAGE_SECONDS.snapshot()["samples"]
+    assert samples[json.dumps(["unit_test_stage", "fake", "/api/things/<thing_id>", "unknown"])]["count"] == 1
+    assert samples[json.dumps(["unit_test_stage", "fake", "background", "unknown"])]["count"] == 1
+    assert STAGE_ERRORS.value(
+        stage="unit_test_stage", engine="fake", error="RuntimeError", route="background", org_tier="unknown"
+    ) == 1
+
+
+def test_reset_multiprocess_dir_drops_snapshots_from_a_previous_run(tmp_path):
+    (tmp_path / "12345.json").write_text("{}")
+    (tmp_path / "archive.json").write_text("{}")
+    (tmp_path / "keep.txt").write_text("x")
+
+    reset_multiprocess_dir(str(tmp_path))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["keep.txt"]
@@ -0,0 +1,158 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+
+from backend.core import database as database_module
+from backend.core.database import DatabaseClient, current_usage_period
+from backend.services import credits_service as credits_module
+from backend.services.credits_service import CreditsService
+from backend.utils.ttl_cache import TTLCache
+
+
+class _Result:
+    def __init__(self, data=None, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = ""
+        self.count = None
+        self.op = "select"
+
+    def select(self, columns, count=None):
+        self.columns, self.count = columns, count
+        return self
+
+    def update(self, payload):
+        self.op = "update"
+        self.client.rows[self.table].update(payload)
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def gte(self, *_args):
+        return self
+
+    def limit(self, *_args):
+        return self
+
+    def single(self):
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.op, self.count or self.columns))
+        if self.op == "update":
+            return _Result([self.client.rows[self.table]])
+        if self.count == "exact":
+            return _Result([], count=self.client.exact_counts[self.table])
+        if "organization_usage_counters" in self.columns and self.client.counters is None:
+            raise Exception("Could not find a relationship between 'organizations' and 'organization_usage_counters'")
+        row = dict(self.client.rows[self.table])
+        if "organization_usage_counters" in self.columns:
+            row["organization_usage_counters"] = self.client.counters
+        return _Result([row] if self.table == "organizations" and "organization_usage_counters" in self.columns else row)
+
+
+class _FakeClient:
+    def __init__(self, counters):
+        self.counters = counters
+        self.calls = []
+        self.rows = {
+            "organizations": {"id": "org-1", "plan_tier": "starter", "max_users": None, "max_rfx_per_month": 30,
+                              "credits_total": 250, "credits_used": 240},
+        }
+        self.exact_counts = {"users": 4, "rfx_v2": 12}
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _db(counters):
+    db = DatabaseClient.__new__(DatabaseClient)
+    db._client = _FakeClient(counters)
+    return db
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches(monkeypatch):
+    monkeypatch.setattr(database_module, "_org_usage_cache", TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(credits_module, "_credits_balance_cache", TTLCache(ttl_seconds=60))
+
+
+def test_limit_checks_share_one_cached_counter_read():
+    db = _db({"members_count": 5, "rfx_period": current_usage_period(), "rfx_count": 7})
+
+    users = db.check_organization_limit("org-1", "users")
+    rfx = db.check_organization_limit("org-1", "rfx_monthly")
+
+    # max_users NULL → límite del plan starter; max_rfx_per_month de la org tiene prioridad
+    assert users == {"can_proceed": False, "current_count": 5, "limit": 5, "plan_tier": "starter"}
+    assert rfx == {"can_proceed": True, "current_count": 7, "limit": 30, "plan_tier": "starter"}
+    assert len(db.client.calls) == 1
+    assert all(count != "exact" for _table, _op, count in db.client.calls)
+
+    db.client.counters["members_count"] = 3
+    assert db.check_organization_limit("org-1", "users")["current_count"] == 5
+    db.invalidate_organization_usage("org-1")
+    assert db.check_organization_limit("org-1", "users")["current_count"] == 3
+    assert db.check_organization_limit("org-1", "users", use_cache=False)["current_count"] == 3
+    assert len(db.client.calls) == 3
+
+
+def test_stale_rfx_period_counts_as_zero_and_missing_counters_fall_back_to_count_exact():
+    db = _db([{"members_count": 2, "rfx_period": "2001-01-01", "rfx_count": 99}])
+    assert db.check_organization_limit("org-1", "rfx_monthly")["current_count"] == 0
+
+    db = _db(None)
+    db.invalidate_organization_usage()
+    db.get_organization = lambda _org_id: dict(db.client.rows["organizations"])
+    assert db.check_organization_limit("org-1", "users")["current_count"] == 4
+    assert db.check_organization_limit("org-1", "rfx_monthly")["current_count"] == 12
+    assert db.check_organization_limit("org-1", "seats") == {"can_proceed": False, "error": "Invalid limit_type: seats"}
+
+
+def test_credit_prechecks_are_cached_but_consumption_reads_fresh():
+    service = CreditsService.__new__(CreditsService)
+    service.db = type("_FakeDB", (), {})()
+    service.db.client = _FakeClient(counters=None)
+
+    assert service.check_credits_available("org-1", "extraction")[0] is True
+    assert service.check_credits_available("org-1", "extraction")[0] is True
+    balance_reads = [call for call in service.db.client.calls if call[1] == "select"]
+    assert len(balance_reads) == 1
+
+    service.db.client.rows["organizations"]["credits_used"] = 250
+    assert service.check_credits_available("org-1", "extraction")[0] is True
+    result = service.consume_credits("org-1", "extraction")
+    assert result["status"] == "error"
+    assert result["credits_available"] == 0
+
+
+def test_cross_worker_overshoot_is_bounded_by_the_ttl_and_enforcement_reads_the_row(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("backend.utils.ttl_cache.time.monotonic", lambda: clock["now"])
+    monkeypatch.setattr(database_module, "_org_usage_cache", TTLCache(ttl_seconds=30))
+    db = _db({"members_count": 4, "rfx_period": current_usage_period(), "rfx_count": 0})
+    assert db.check_organization_limit("org-1", "users")["can_proceed"] is True
+
+    # Otro worker agrega el 5º miembro: este proceso no ve el cambio hasta el TTL
+    db.client.counters["members_count"] = 5
+    clock["now"] += 29
+    assert db.check_organization_limit("org-1", "users")["can_proceed"] is True
+    clock["now"] += 2
+    assert db.check_organization_limit("org-1", "users")["can_proceed"] is False
+
+    # La ruta que hace cumplir el límite no depende del TTL
+    db.client.counters["members_count"] = 4
+    assert db.check_organization_limit("org-1", "users")["can_proceed"] is False
+    assert db.check_organization_limit("org-1", "users", use_cache=False)["can_proceed"] is True
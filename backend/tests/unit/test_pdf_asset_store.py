@@ -0,0 +1,119 @@
+import io
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from PIL import Image
+
+from backend.services.pdf_asset_store import PDFAssetStore
+
+LOGO_URL = "https://res.cloudinary.com/demo/image/upload/v1/logos/user/logo.png"
+
+
+def _png_bytes(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color=(14, 37, 65)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _store(tmp_path, content, **kwargs):
+    store = PDFAssetStore(base_dir=str(tmp_path), **kwargs)
+    fetches = []
+
+    def fake_fetch(url):
+        fetches.append(url)
+        if content is None:
+            raise Exception("network down")
+        return content, "image/png"
+
+    store._fetch = fake_fetch  # type: ignore[assignment]
+    return store, fetches
+
+
+def test_remote_images_are_inlined_and_fetched_once(tmp_path):
+    store, fetches = _store(tmp_path, _png_bytes(40, 20))
+    html = f'<img src="{LOGO_URL}"><div style="background: url({LOGO_URL})"></div>'
+
+    first = store.inline_remote_assets(html)
+    second = store.inline_remote_assets(html)
+
+    assert LOGO_URL not in first
+    assert first.count("data:image/png;base64,") == 2
+    assert second == first
+    assert fetches == [LOGO_URL]
+
+
+def test_store_is_content_addressed_across_instances(tmp_path):
+    store, fetches = _store(tmp_path, _png_bytes(10, 10))
+    ref = store.resolve(LOGO_URL)
+
+    fresh, fresh_fetches = _store(tmp_path, None)
+
+    assert fresh.resolve(LOGO_URL) == ref
+    assert fresh_fetches == []
+    assert os.path.basename(ref["path"]) == ref["digest"]
+
+
+def test_large_images_use_resized_variant(tmp_path):
+    store, _fetches = _store(tmp_path, _png_bytes(2400, 600), max_dimension=300)
+
+    data_uri = store.get_data_uri(LOGO_URL)
+
+    import base64
+
+    resized = Image.open(io.BytesIO(base64.b64decode(data_uri.split(",", 1)[1])))
+    assert resized.size == (300, 75)
+
+
+def test_unreachable_assets_keep_remote_url_and_are_not_retried(tmp_path):
+    store, fetches = _store(tmp_path, None)
+    html = f'<img src="{LOGO_URL}">'
+
+    assert store.inline_remote_assets(html) == html
+    assert store.inline_remote_assets(html) == html
+    assert fetches == [LOGO_URL]
+
+
+def test_reference_and_data_uri_share_the_same_ttl(tmp_path):
+    store, _fetches = _store(tmp_path, _png_bytes(10, 10))
+
+    assert store._data_uris.ttl_seconds == store.ref_ttl_seconds
+
+
+def test_invalidate_forgets_a_deleted_logo(tmp_path):
+    store, fetches = _store(tmp_path, _png_bytes(10, 10))
+    assert store.get_data_uri(LOGO_URL)
+
+    def logo_gone(url):
+        fetches.append(url)
+        raise Exception("404 Not Found")
+
+    store._fetch = logo_gone  # type: ignore[assignment]
+    store.invalidate(LOGO_URL)
+
+    assert store.resolve(LOGO_URL) is None
+    assert store.get_data_uri(LOGO_URL) is None
+    assert fetches == [LOGO_URL, LOGO_URL]
+
+
+def test_logo_delete_invalidates_cached_reference(tmp_path, monkeypatch):
+    import cloudinary.uploader
+
+    from backend.services import cloudinary_service
+    from backend.services import pdf_asset_store as asset_module
+
+    store, _fetches = _store(tmp_path, _png_bytes(10, 10))
+    monkeypatch.setattr(asset_module, "pdf_asset_store", store)
+    monkeypatch.setattr(cloudinary_service, "_configure_cloudinary", lambda: None)
+    monkeypatch.setattr(cloudinary_service, "_build_logo_url", lambda user_id: LOGO_URL)
+    monkeypatch.setattr(cloudinary.uploader, "destroy", lambda public_id: {"result": "ok"})
+
+    assert cloudinary_service.get_logo_url("user", validate=True) == LOGO_URL
+
+    store._fetch = lambda url: (_ for _ in ()).throw(Exception("404 Not Found"))  # type: ignore[assignment]
+    assert cloudinary_service.delete_logo("user") is True
+
+    assert cloudinary_service.get_logo_url("user", validate=True) is None
@@ -0,0 +1,63 @@
+import glob
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+
+from backend.utils.pdf_html_sanitizer import (
+    CHROMIUM_PDF_SANITIZER,
+    PDF_LAYOUT_SANITIZER,
+    PLAYWRIGHT_STABILITY_SANITIZER,
+)
+
+SANITIZERS = [CHROMIUM_PDF_SANITIZER, PLAYWRIGHT_STABILITY_SANITIZER, PDF_LAYOUT_SANITIZER]
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+EDGE_CASES = [
+    "<div style='backdrop-filter: blur(2px); -webkit-backdrop-filter: blur(1px); filter: none;'>x</div>",
+    "<style>* { -webkit-print-color-adjust: exact !important; } body { width: 216mm; padding: 0 10mm; }</style>",
+    "<svg width='1'><g/></svg><p>keep</p><svg>unclosed <SVG>also</svg>",
+    "<IFRAME src=x></iframe><video controls><source></VIDEO><canvas/><audio>open",
+    "<ıframe>dotless</ıframe><İframe>dotted</İFRAME><ſcript>long s</ſcript>",
+    "<p onclick=\"x()\" onLoad='y'>Ñandú – transıtion: all 1s; maſk: none;</p>",
+    "<table class='t' style='margin: 5mm 10mm; width: calc(100% - 20mm)'><tr><td>1</td></tr></table>",
+    "<img src='data:image/png;base64," + "A" * 6000 + "'>",
+]
+
+
+def _corpus():
+    paths = glob.glob(os.path.join(REPO_ROOT, "templates", "*.html"))
+    paths += glob.glob(os.path.join(REPO_ROOT, "backend", "templates", "*.html"))
+    documents = []
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as handle:
+            documents.append(handle.read())
+    return documents
+
+
+@pytest.mark.parametrize("sanitizer", SANITIZERS, ids=lambda sanitizer: sanitizer.name)
+def test_engine_output_matches_sequential_reference(sanitizer):
+    for html in _corpus() + EDGE_CASES:
+        assert sanitizer.sanitize(html, use_memo=False) == sanitizer.sanitize_reference(html)
+
+
+def test_unclosed_svg_is_handled_without_rescanning():
+    html = "<html><body>" + ("<svg width='10'>" + "<td>Item</td>" * 500) * 50 + "</body></html>"
+
+    assert PLAYWRIGHT_STABILITY_SANITIZER.sanitize(html, use_memo=False) == (
+        PLAYWRIGHT_STABILITY_SANITIZER.sanitize_reference(html)
+    )
+
+
+def test_memoized_result_is_reused_for_retries():
+    html = "<div style='filter: blur(1px); color: red'>retry</div>"
+
+    first = CHROMIUM_PDF_SANITIZER.sanitize(html)
+    second = CHROMIUM_PDF_SANITIZER.sanitize(html)
+
+    assert first == "<div style=' color: red'>retry</div>"
+    assert second is first
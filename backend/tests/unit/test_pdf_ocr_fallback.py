@@ -5,6 +5,14 @@ import pytest
 from unittest.mock import Mock, patch
 
 from backend.services.rfx_processor import RFXProcessorService
+from backend.utils import pdf_page_extractor
+from backend.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_page_cache(monkeypatch):
+    """Los tests reutilizan los mismos bytes de PDF con textos distintos."""
+    monkeypatch.setattr(pdf_page_extractor, "_page_cache", TTLCache(ttl_seconds=60))
 
 @pytest.fixture
 def svc(monkeypatch):
@@ -0,0 +1,75 @@
+import pytest
+
+from backend.utils import pdf_page_extractor
+from backend.utils.pdf_page_extractor import extract_pdf_text, iter_pdf_pages
+from backend.utils.ttl_cache import TTLCache
+
+
+class _Page:
+    def __init__(self, text, log):
+        self.text = text
+        self.log = log
+
+    def extract_text(self):
+        self.log.append(self.text[:8])
+        return self.text
+
+
+class _ReaderFactory:
+    def __init__(self, texts):
+        self.texts = texts
+        self.opened = 0
+        self.parsed = []
+
+    def __call__(self, _stream):
+        self.opened += 1
+        reader = type("_Reader", (), {})()
+        reader.pages = [_Page(text, self.parsed) for text in self.texts]
+        return reader
+
+
+@pytest.fixture(autouse=True)
+def _fresh_page_cache(monkeypatch):
+    monkeypatch.setattr(pdf_page_extractor, "_page_cache", TTLCache(ttl_seconds=60))
+
+
+def _filler(n):
+    return "Cláusula general del contrato sin datos relevantes. " * n
+
+
+def test_pages_are_parsed_lazily_and_cached_by_content_hash():
+    factory = _ReaderFactory(["page-one", "page-two", "page-three"])
+
+    pages = iter_pdf_pages(b"%PDF-1.7 tender", factory)
+    assert next(pages) == (0, "page-one")
+    assert factory.parsed == ["page-one"]
+    pages.close()
+
+    assert extract_pdf_text(b"%PDF-1.7 tender", factory) == "page-one\npage-two\npage-three"
+    assert factory.parsed == ["page-one", "page-two", "page-thr"]
+
+    # Re-subida del mismo documento: sin reader ni parseo
+    opened, parsed = factory.opened, list(factory.parsed)
+    assert extract_pdf_text(b"%PDF-1.7 tender", factory) == "page-one\npage-two\npage-three"
+    assert (factory.opened, factory.parsed) == (opened, parsed)
+
+
+def test_over_budget_keeps_cover_and_item_tables_in_document_order():
+    cover = "Solicitud de cotización - Cliente ACME - Entrega 15/03"
+    items = "Ítem  Descripción  Cantidad  Unidad\nSillas plegables 40 und\nMesas redondas 8 und\n"
+    intro = _filler(4)
+    texts = [cover, intro, _filler(10), items, _filler(10)]
+    factory = _ReaderFactory(texts)
+
+    text = extract_pdf_text(b"%PDF big", factory, char_budget=len(cover) + len(intro) + len(items) + 50)
+
+    assert text == f"{cover}\n{intro}\n{items}"
+
+
+def test_scan_stops_early_once_far_over_budget(monkeypatch):
+    factory = _ReaderFactory([_filler(2)] * 50)
+
+    extract_pdf_text(b"%PDF huge", factory, char_budget=300)
+
+    # Presupuesto 300 × factor 3 → ~9 páginas de ~104 chars, no las 50
+    assert len(factory.parsed) < 12
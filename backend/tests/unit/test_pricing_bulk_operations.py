@@ -0,0 +1,153 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from backend.services.pricing_config_service_v2 import PricingConfigurationServiceV2
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _RecordingQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.op = None
+        self.payload = None
+        self.kwargs = {}
+
+    def select(self, *_args, **_kwargs):
+        self.op = "select"
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, **kwargs):
+        self.op, self.payload, self.kwargs = "upsert", payload, kwargs
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def in_(self, *_args):
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.op, self.payload, self.kwargs))
+        if self.table == "rfx_pricing_configurations" and self.op == "select":
+            return _Result(self.client.existing)
+        return _Result(self.payload if isinstance(self.payload, list) else [])
+
+
+class _RecordingClient:
+    def __init__(self, existing):
+        self.existing = existing
+        self.calls = []
+
+    def table(self, name):
+        return _RecordingQuery(self, name)
+
+
+class _FakeDB:
+    def __init__(self, client):
+        self.client = client
+        self.history_batches = []
+
+    def insert_rfx_history_batch(self, events):
+        self.history_batches.append(events)
+        return len(events)
+
+
+def _service(existing):
+    service = PricingConfigurationServiceV2.__new__(PricingConfigurationServiceV2)
+    service.db_client = _FakeDB(_RecordingClient(existing))
+    return service
+
+
+def test_bulk_coordination_uses_constant_round_trips():
+    service = _service([{"id": "cfg-1", "rfx_id": "rfx-1"}])
+
+    results = service.bulk_update_coordination(["rfx-1", "rfx-2", "rfx-3"], True, 0.2)
+
+    calls = service.db_client.client.calls
+    assert results == {"rfx-1": True, "rfx-2": True, "rfx-3": True}
+    assert [(table, op) for table, op, _payload, _kwargs in calls] == [
+        ("rfx_pricing_configurations", "select"),
+        ("rfx_pricing_configurations", "insert"),
+        ("coordination_configurations", "upsert"),
+    ]
+    inserted = calls[1][2]
+    assert [row["rfx_id"] for row in inserted] == ["rfx-2", "rfx-3"]
+    upserted = calls[2][2]
+    assert len(upserted) == 3
+    assert calls[2][3] == {"on_conflict": "pricing_config_id"}
+    assert len(service.db_client.history_batches) == 1
+    assert len(service.db_client.history_batches[0]) == 3
+
+
+def test_bulk_taxes_disable_updates_without_creating_rows():
+    service = _service([{"id": "cfg-1", "rfx_id": "rfx-1"}])
+
+    results = service.bulk_update_taxes(["rfx-1"], False)
+
+    ops = [(table, op) for table, op, _payload, _kwargs in service.db_client.client.calls]
+    assert results == {"rfx-1": True}
+    assert ("tax_configurations", "update") in ops
+    assert ("tax_configurations", "upsert") not in ops
+
+
+def test_bulk_apply_unknown_preset_fails_every_rfx():
+    service = _service([])
+
+    results = service.bulk_apply_preset(["rfx-1", "rfx-2"], "does_not_exist")
+
+    assert results == {"rfx-1": False, "rfx-2": False}
+    assert service.db_client.client.calls == []
+
+
+def test_bulk_failure_is_reported_per_rfx():
+    service = _service([{"id": "cfg-1", "rfx_id": "rfx-1"}])
+
+    def failing_upsert(*_args, **_kwargs):
+        raise Exception("db down")
+
+    service._bulk_upsert_child_rows = failing_upsert  # type: ignore[assignment]
+
+    results = service.bulk_update_cost_per_person(["rfx-1"], True, 80)
+
+    assert results == {"rfx-1": False}
+    assert service.db_client.history_batches == []
+
+
+def test_failing_chunk_falls_back_to_per_rfx_writes():
+    service = _service([{"id": "cfg-1", "rfx_id": "rfx-1"}, {"id": "cfg-2", "rfx_id": "rfx-2"},
+                        {"id": "cfg-3", "rfx_id": "rfx-3"}])
+    original_resolve = service._resolve_active_pricing_config_ids
+    service._resolve_active_pricing_config_ids = lambda ids: {
+        rfx_id: config_id for rfx_id, config_id in original_resolve(ids).items() if rfx_id in ids
+    }
+    writes = []
+
+    def upsert(_table, rows):
+        if any(row["pricing_config_id"] == "cfg-2" for row in rows):
+            raise Exception("check constraint violated")
+        writes.append([row["pricing_config_id"] for row in rows])
+
+    service._bulk_upsert_child_rows = upsert  # type: ignore[assignment]
+
+    results = service.bulk_update_coordination(["rfx-1", "rfx-2", "rfx-3"], True, 0.2)
+
+    assert results == {"rfx-1": True, "rfx-2": False, "rfx-3": True}
+    assert writes == [["cfg-1"], ["cfg-3"]]
+    assert [event["rfx_id"] for event in service.db_client.history_batches[0]] == ["rfx-1", "rfx-3"]
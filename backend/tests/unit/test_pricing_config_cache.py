@@ -0,0 +1,146 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from flask import Flask
+
+from backend.services.pricing_config_cache import PricingConfigCache, RFX_EFFECTIVE_CONFIG, USER_UNIFIED_CONFIG
+from backend.services.pricing_config_service_v2 import PricingConfigurationServiceV2
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _CountingClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        self.calls += 1
+        return _Result(self.rows)
+
+
+def test_repeated_reads_collapse_into_one_loader_call():
+    cache = PricingConfigCache(ttl_seconds=30)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"pricing": {"coordination_enabled": True}}
+
+    first = cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+    first["pricing"]["coordination_enabled"] = False
+    second = cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+
+    assert len(calls) == 1
+    assert second["pricing"]["coordination_enabled"] is True
+
+
+def test_invalidate_rfx_and_user_force_reload():
+    cache = PricingConfigCache(ttl_seconds=30)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+    cache.invalidate_rfx("rfx-1")
+    assert cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader) == {"value": 2}
+
+    cache.get_or_load(USER_UNIFIED_CONFIG, "user-1", loader)
+    cache.invalidate_user("user-1")
+    # User defaults feed every effective config, so both are reloaded
+    assert cache.get_or_load(USER_UNIFIED_CONFIG, "user-1", loader) == {"value": 4}
+    assert cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader) == {"value": 5}
+
+
+def test_request_scope_caches_even_when_process_cache_disabled():
+    cache = PricingConfigCache(ttl_seconds=0)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"ok": True}
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+        cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+    with app.test_request_context():
+        cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+
+    assert len(calls) == 2
+
+
+def test_fallback_results_are_not_cached():
+    cache = PricingConfigCache(ttl_seconds=30)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+    cache.get_or_load(RFX_EFFECTIVE_CONFIG, "rfx-1", loader)
+
+    assert len(calls) == 2
+
+
+def test_calculate_pricing_reads_active_view_once(monkeypatch):
+    from backend.services import pricing_config_service_v2 as module
+
+    monkeypatch.setattr(module, "pricing_config_cache", PricingConfigCache(ttl_seconds=30))
+    service = PricingConfigurationServiceV2.__new__(PricingConfigurationServiceV2)
+    client = _CountingClient([{"coordination_enabled": True, "coordination_rate": 0.1}])
+
+    class FakeDB:
+        pass
+
+    service.db_client = FakeDB()
+    service.db_client.client = client
+
+    first = service.calculate_pricing("rfx-1", 100.0)
+    second = service.calculate_pricing("rfx-1", 200.0)
+
+    assert client.calls == 1
+    assert first.coordination_amount == 10.0
+    assert second.coordination_amount == 20.0
+
+
+def test_synthesized_defaults_are_returned_but_not_cached(monkeypatch):
+    from backend.services import pricing_config_service_v2 as module
+    from backend.services import unified_budget_configuration_service as unified_module
+    from backend.services.pricing_config_cache import Uncached
+    from backend.services.unified_budget_configuration_service import UnifiedBudgetConfigurationService
+
+    cache = PricingConfigCache(ttl_seconds=30)
+    monkeypatch.setattr(module, "pricing_config_cache", cache)
+    monkeypatch.setattr(unified_module, "pricing_config_cache", cache)
+
+    assert cache.get_or_load(USER_UNIFIED_CONFIG, "user-1", lambda: Uncached({"has_defaults": False})) == {
+        "has_defaults": False
+    }
+
+    service = UnifiedBudgetConfigurationService.__new__(UnifiedBudgetConfigurationService)
+    service._load_user_unified_config = lambda user_id: Uncached({"user_id": user_id, "default": True})
+    assert service.get_user_unified_config("user-1")["default"] is True
+
+    service._load_user_unified_config = lambda user_id: {"user_id": user_id, "default": False}
+    # La config real escrita después del default se ve en la siguiente lectura
+    assert service.get_user_unified_config("user-1") == {"user_id": "user-1", "default": False}
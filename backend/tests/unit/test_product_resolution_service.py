@@ -183,3 +183,44 @@ def test_chat_resolver_ignores_low_confidence_catalog_variant_for_pricing():
     assert item.get("pricing_source") == "chat_resolver_low_conf_catalog_ignored"
     assert float(item.get("precio_unitario") or 0) == 0.0
     assert bool(item.get("requires_clarification")) is True
+
+
+class _CountingCatalog:
+    def __init__(self, variants_by_name=None):
+        self.variants_by_name = variants_by_name or {}
+        self.calls = []
+
+    def search_product_variants(self, query, organization_id=None, user_id=None, business_unit_id=None, max_variants=5):
+        self.calls.append((query, business_unit_id, max_variants))
+        return list(self.variants_by_name.get(query.lower(), []))[:max_variants]
+
+
+def test_chat_resolver_deduplicates_catalog_lookups_across_products_and_breakdowns():
+    catalog = _CountingCatalog(
+        {
+            "arroz blanco": [{"id": "c-1", "product_name": "Arroz Blanco", "unit_price": 3.0, "confidence": 1.0}],
+            "ensalada": [{"id": "c-2", "product_name": "Ensalada", "unit_price": 2.5, "confidence": 0.9}],
+        }
+    )
+    service = ProductResolutionService(catalog_search=catalog, rfx_orchestrator_agent=None)
+    breakdown = [
+        {"name": "Arroz blanco", "quantity": 1},
+        {"name": "Ensalada", "quantity": 1},
+        {"name": "arroz  blanco", "quantity": 1},
+    ]
+
+    items = service.resolve_for_chat_products(
+        products=[
+            {"nombre": "Menú del día", "cantidad": 10, "unidad": "unidades", "bundle_breakdown": breakdown},
+            {"nombre": "Combo almuerzo", "cantidad": 5, "unidad": "unidades", "bundle_breakdown": breakdown},
+            {"nombre": "Arroz blanco", "cantidad": 2, "unidad": "unidades"},
+        ],
+        organization_id="org-test",
+        rfx_context={},
+    )
+
+    queried = sorted(" ".join(q.split()).lower() for q, _, _ in catalog.calls)
+    assert queried == ["arroz blanco", "combo almuerzo", "ensalada", "menú del día"]
+    prices = [row.get("precio_unitario") for row in items[0]["bundle_breakdown"]]
+    assert prices == [3.0, 2.5, 3.0]
+    assert items[2]["precio_unitario"] == 3.0
@@ -0,0 +1,171 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import threading
+
+from backend.services.public_view_tracker import PublicViewTracker
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _RpcCall:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        if self.client.fail_with:
+            raise Exception(self.client.fail_with)
+        self.client.rpc_calls.append((self.name, self.params))
+        return _Result(len(self.params["p_views"]))
+
+
+class _TableQuery:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.ops = []
+
+    def __getattr__(self, op):
+        def _record(*args):
+            self.ops.append((op, *args))
+            return self
+        return _record
+
+    def execute(self):
+        self.client.table_calls.append((self.name, self.ops))
+        return _Result([{"public_view_count": 4}])
+
+
+class _FakeClient:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.rpc_calls = []
+        self.table_calls = []
+
+    def rpc(self, name, params):
+        return _RpcCall(self, name, params)
+
+    def table(self, name):
+        return _TableQuery(self, name)
+
+
+class _FakeDB:
+    def __init__(self, client):
+        self.client = client
+
+
+def _tracker(client):
+    tracker = PublicViewTracker(flush_interval_seconds=3600, max_pending=100)
+    tracker.db = _FakeDB(client)
+    return tracker
+
+
+def test_views_are_aggregated_into_one_rpc_call():
+    client = _FakeClient()
+    tracker = _tracker(client)
+
+    for _ in range(3):
+        tracker.record_view("proposal-1", "rfx-1")
+    tracker.record_view("proposal-2", "rfx-2")
+
+    assert tracker.flush() == 2
+    assert len(client.rpc_calls) == 1
+    name, params = client.rpc_calls[0]
+    assert name == "increment_proposal_public_views"
+    views = {item["proposal_id"]: item["views"] for item in params["p_views"]}
+    assert views == {"proposal-1": 3, "proposal-2": 1}
+    assert tracker.pending_views("proposal-1") == 0
+
+
+def test_failed_flush_requeues_views():
+    client = _FakeClient(fail_with="connection reset")
+    tracker = _tracker(client)
+    tracker.record_view("proposal-1")
+    tracker.record_view("proposal-1")
+
+    assert tracker.flush() == 0
+    assert tracker.pending_views("proposal-1") == 2
+
+    client.fail_with = None
+    tracker.record_view("proposal-1")
+    assert tracker.flush() == 1
+    assert client.rpc_calls[0][1]["p_views"][0]["views"] == 3
+
+
+def test_full_buffer_flushes_inline():
+    client = _FakeClient()
+    tracker = PublicViewTracker(flush_interval_seconds=3600, max_pending=2)
+    tracker.db = _FakeDB(client)
+
+    tracker.record_view("proposal-1")
+    assert client.rpc_calls == []
+    tracker.record_view("proposal-2")
+
+    assert len(client.rpc_calls) == 1
+
+
+def test_partial_fallback_failure_requeues_only_unwritten_entries():
+    client = _FakeClient(fail_with="Could not find the function increment_proposal_public_views")
+    tracker = _tracker(client)
+    written = []
+
+    def write_entry(entry):
+        if entry["proposal_id"] == "proposal-2":
+            raise Exception("timeout")
+        written.append((entry["proposal_id"], entry["views"]))
+
+    tracker._write_entry_fallback = write_entry
+    tracker.record_view("proposal-1")
+    tracker.record_view("proposal-1")
+    tracker.record_view("proposal-2")
+
+    assert tracker.flush() == 1
+    assert written == [("proposal-1", 2)]
+    assert tracker.pending_views("proposal-1") == 0
+    assert tracker.pending_views("proposal-2") == 1
+
+
+def test_requeued_views_are_retried_by_the_timer():
+    client = _FakeClient(fail_with="connection reset")
+    tracker = PublicViewTracker(flush_interval_seconds=0.05, max_pending=100)
+    tracker.db = _FakeDB(client)
+    retried = threading.Event()
+    flush = tracker.flush
+
+    def flush_and_signal():
+        result = flush()
+        if result:
+            retried.set()
+        client.fail_with = None
+        return result
+
+    tracker.flush = flush_and_signal
+    tracker.record_view("proposal-1")
+
+    # Primer flush (timer) falla y re-encola; el timer re-armado lo reintenta sin nuevas vistas
+    assert retried.wait(2)
+    assert tracker.pending_views("proposal-1") == 0
+    assert client.rpc_calls[0][1]["p_views"][0]["views"] == 1
+
+
+def test_fallback_moves_rfx_with_null_stage_to_viewed():
+    client = _FakeClient()
+    tracker = _tracker(client)
+
+    tracker._write_entry_fallback(
+        {"proposal_id": "proposal-1", "rfx_id": "rfx-1", "views": 2, "last_viewed_at": "2026-10-18T00:00:00"}
+    )
+
+    name, ops = client.table_calls[-1]
+    assert name == "rfx_v2"
+    assert ("update", {"sales_stage": "viewed"}) in ops
+    assert ("or_", "sales_stage.is.null,sales_stage.in.(draft,sent)") in ops
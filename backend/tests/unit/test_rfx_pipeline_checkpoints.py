@@ -0,0 +1,152 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+
+from types import SimpleNamespace
+
+import backend.services.rfx_processor as rfx_processor_module
+from backend.models.rfx_models import RFXInput
+from backend.services.rfx_pipeline_checkpoints import (
+    STAGE_LLM,
+    STAGE_SOURCES,
+    RFXPipelineCheckpointStore,
+)
+from backend.services.rfx_processor import RFXProcessorService
+
+
+def test_checkpoint_roundtrip_and_skip_non_json_values(tmp_path):
+    store = RFXPipelineCheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    key = store.fingerprint(STAGE_LLM, "texto combinado", "catering", "gpt-4o")
+
+    assert store.get(STAGE_LLM, key) is None
+    assert store.put(STAGE_LLM, key, {"productos": [{"nombre": "Café", "cantidad": 2}]})
+    assert store.get(STAGE_LLM, key) == {"productos": [{"nombre": "Café", "cantidad": 2}]}
+
+    # Otra entrada → otra clave; valores no JSON no se guardan
+    assert store.fingerprint(STAGE_LLM, "texto combinado", "catering", "gpt-4o-mini") != key
+    assert store.put(STAGE_LLM, "other", {"fecha": datetime(2025, 1, 1)}) is False
+    assert store.get(STAGE_LLM, "other") is None
+
+
+def test_expired_and_disabled_checkpoints_are_ignored(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    expired = RFXPipelineCheckpointStore(path, ttl_seconds=-1)
+    disabled = RFXPipelineCheckpointStore(path, ttl_seconds=60, enabled=False)
+
+    assert expired.put(STAGE_LLM, "k", {"a": 1}) is False
+    assert disabled.put(STAGE_LLM, "k", {"a": 1}) is False
+
+    RFXPipelineCheckpointStore(path, ttl_seconds=60).put(STAGE_LLM, "k", {"a": 1})
+    assert disabled.get(STAGE_LLM, "k") is None
+
+
+def test_blob_sources_are_reused_for_identical_content(tmp_path, monkeypatch):
+    store = RFXPipelineCheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    monkeypatch.setattr(rfx_processor_module, "rfx_checkpoint_store", store)
+
+    processor = RFXProcessorService.__new__(RFXProcessorService)
+    calls = []
+
+    def _fake_extract(fname, content):
+        calls.append(fname)
+        return {"filename": fname, "kind": "text", "text_part": f"\n\n### SOURCE: {fname}\n{content.decode()}", "items": []}
+
+    processor._extract_file_source = _fake_extract
+
+    first = processor._extract_blob_sources("pedido.txt", b"200 sillas")
+    second = processor._extract_blob_sources("pedido.txt", b"200 sillas")
+    changed = processor._extract_blob_sources("pedido.txt", b"300 sillas")
+
+    assert first == second
+    assert calls == ["pedido.txt", "pedido.txt"]
+    assert "300 sillas" in changed[0]["text_part"]
+    key = store.fingerprint(STAGE_SOURCES, store.content_hash(b"200 sillas"), "pedido.txt", rfx_processor_module.USE_ZIP)
+    assert store.get(STAGE_SOURCES, key) == first
+
+
+def test_incomplete_blob_sources_are_not_checkpointed(tmp_path, monkeypatch):
+    store = RFXPipelineCheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    monkeypatch.setattr(rfx_processor_module, "rfx_checkpoint_store", store)
+
+    processor = RFXProcessorService.__new__(RFXProcessorService)
+    calls = []
+
+    def _failing_extract(fname, content):
+        calls.append(fname)
+        raise RuntimeError("OCR timeout")
+
+    processor._extract_file_source = _failing_extract
+
+    assert processor._extract_blob_sources("scan.pdf", b"%PDF-1.4") == []
+    assert processor._extract_blob_sources("scan.pdf", b"%PDF-1.4") == []
+    assert calls == ["scan.pdf", "scan.pdf"]
+
+
+class _VersionedCatalog:
+    def __init__(self):
+        self.version = "2026-10-01T00:00:00|10"
+
+    def get_catalog_version(self, organization_id=None, user_id=None, business_unit_id=None):
+        return self.version
+
+
+def _pipeline_processor(calls):
+    processor = RFXProcessorService.__new__(RFXProcessorService)
+    processor.openai_config = SimpleNamespace(model="gpt-test")
+    processor.catalog_search = _VersionedCatalog()
+    processor.rfx_orchestrator_agent = None
+    processor.product_resolution_service = None
+    processor._extract_blob_sources = lambda fname, content: [
+        {"filename": fname, "text_part": content.decode(), "items": []}
+    ]
+
+    def _llm(text, industry_context=None):
+        calls.append("llm")
+        return {"productos": [{"nombre": "Silla", "cantidad": 10}]}
+
+    def _enrich(products, organization_id, user_id=None, rfx_context=None):
+        calls.append("catalog")
+        return [{**p, "precio_unitario": 5} for p in products]
+
+    processor._process_with_ai = _llm
+    processor._enrich_products_with_catalog = _enrich
+    processor._resolve_default_rfx_type = lambda context: "catering"
+    processor._validate_and_clean_data = lambda raw, rfx_id: raw
+    processor._evaluate_rfx_intelligently = lambda data, rfx_id: {}
+    processor._create_rfx_processed = lambda data, rfx_input, meta: None
+    return processor
+
+
+def test_resolved_products_follow_catalog_version_and_force_refresh(tmp_path, monkeypatch):
+    store = RFXPipelineCheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    monkeypatch.setattr(rfx_processor_module, "rfx_checkpoint_store", store)
+    calls = []
+    processor = _pipeline_processor(calls)
+
+    def run(**kwargs):
+        return processor._extract_rfx_case_data(
+            RFXInput(id="RFX-1"), [{"filename": "pedido.txt", "content": b"10 sillas"}],
+            user_id="user-1", organization_id="org-1", **kwargs,
+        )
+
+    run()
+    run()
+    assert calls == ["llm", "catalog"]
+
+    # Cambio de catálogo (precio editado) → se vuelve a resolver, el LLM se reutiliza
+    processor.catalog_search.version = "2026-10-02T00:00:00|10"
+    run()
+    assert calls == ["llm", "catalog", "catalog"]
+
+    run(force_refresh=True)
+    assert calls == ["llm", "catalog", "catalog", "llm", "catalog"]
+
+    # Sin versión de catálogo no se reutiliza ni se guarda la resolución
+    processor.catalog_search.version = None
+    run()
+    run()
+    assert calls[-2:] == ["catalog", "catalog"]
@@ -62,11 +62,22 @@ class _FakeSupabaseClient:
 
 
 class _FakeDBClient:
-    def __init__(self):
+    def __init__(self, graph_rpc_available=False):
         self.client = _FakeSupabaseClient()
+        self.graph_rpc_available = graph_rpc_available
+        self.saved_graphs = []
         self.last_rfx_data = None
 
+    def save_rfx_graph(self, company, requester, rfx, products, history):
+        if not self.graph_rpc_available:
+            return None
+        self.saved_graphs.append({"company": company, "requester": requester, "rfx": rfx, "products": products, "history": history})
+        self.last_rfx_data = dict(rfx)
+        return {"rfx_id": rfx["id"], "rfx_code": rfx["rfx_code"], "product_count": len(products), "replayed": False}
+
     def insert_company(self, company_data):
+        if self.graph_rpc_available:
+            raise AssertionError("sequential insert used while save_rfx_graph is available")
         return {"id": "company-1", **company_data}
 
     def insert_requester(self, requester_data):
@@ -83,13 +94,15 @@ class _FakeDBClient:
         return {}
 
 
-def test_save_rfx_persists_canonical_rfx_code_in_column_and_metadata():
-    fake_db = _FakeDBClient()
+def _service(fake_db):
     service = object.__new__(RFXProcessorService)
     service.db_client = fake_db
     service.document_code_service = DocumentCodeService(fake_db)
+    return service
 
-    rfx_processed = RFXProcessed(
+
+def _rfx_processed(products=None):
+    return RFXProcessed(
         id=uuid4(),
         rfx_type=RFXType.CATERING,
         title="RFX E2E Test",
@@ -103,9 +116,15 @@ def test_save_rfx_persists_canonical_rfx_code_in_column_and_metadata():
         requester_name="QA User",
         company_name="Sabra QA",
         email="qa@sabra.test",
-        products=[],
+        products=products or [],
     )
 
+
+def test_save_rfx_persists_canonical_rfx_code_in_column_and_metadata():
+    fake_db = _FakeDBClient()
+    service = _service(fake_db)
+    rfx_processed = _rfx_processed()
+
     service._save_rfx_to_database(
         rfx_processed=rfx_processed,
         user_id=str(uuid4()),
@@ -122,3 +141,70 @@ def test_save_rfx_persists_canonical_rfx_code_in_column_and_metadata():
     assert stored_code is not None
     assert stored_metadata_code == stored_code
     assert re.match(expected_pattern, stored_code), f"Unexpected code format: {stored_code}"
+
+
+def test_save_rfx_sends_whole_graph_in_one_call_when_rpc_available():
+    fake_db = _FakeDBClient(graph_rpc_available=True)
+    service = _service(fake_db)
+    rfx_processed = _rfx_processed(products=[
+        {"product_name": "Tequeños", "quantity": 200, "unit": "unidades", "precio_unitario": 0.5},
+    ])
+
+    service._save_rfx_to_database(rfx_processed=rfx_processed, user_id=str(uuid4()), organization_id=None)
+
+    assert len(fake_db.saved_graphs) == 1
+    graph = fake_db.saved_graphs[0]
+    assert graph["rfx"]["id"] == str(rfx_processed.id)
+    assert "company_id" not in graph["rfx"] and "company_id" not in graph["requester"]
+    assert graph["company"]["name"] == "Sabra QA"
+    assert graph["requester"]["email"] == "qa@sabra.test"
+    assert [(p["product_name"], p["quantity"], p["estimated_unit_price"]) for p in graph["products"]] == [("Tequeños", 200, 0.5)]
+    assert [event["event_type"] for event in graph["history"]] == ["rfx_processed"]
+
+
+def test_database_save_rfx_graph_normalizes_payload_and_falls_back_when_rpc_missing():
+    from backend.core.database import DatabaseClient
+
+    calls = []
+
+    class _GraphRpcClient:
+        def __init__(self, error=None):
+            self.error = error
+
+        def rpc(self, fn_name, payload):
+            calls.append((fn_name, payload))
+            if self.error:
+                raise Exception(self.error)
+            return _RPCResponse({"rfx_id": payload["p_rfx"]["id"], "product_count": len(payload["p_products"]), "replayed": True})
+
+    db = DatabaseClient.__new__(DatabaseClient)
+    db._client = _GraphRpcClient()
+    rfx_id = str(uuid4())
+    graph = dict(
+        company={"name": "Sabra QA"},
+        requester={"name": "QA User"},
+        rfx={"id": rfx_id, "rfx_code": "SAB-PP-AUT-26-001"},
+        products=[{"product_name": "Sillas", "quantity": None}, {"product_name": ""}],
+        history=[{"event_type": "rfx_processed"}],
+    )
+
+    result = db.save_rfx_graph(**graph)
+
+    assert result["replayed"] is True
+    fn_name, payload = calls[0]
+    assert fn_name == "save_rfx_graph"
+    assert [(p["product_name"], p["quantity"], p["unit"], p["rfx_id"]) for p in payload["p_products"]] == [
+        ("Sillas", 1, "unidades", rfx_id)
+    ]
+    assert payload["p_history"][0]["rfx_id"] == rfx_id
+
+    db._client = _GraphRpcClient("PGRST202: Could not find the function public.save_rfx_graph")
+    assert db.save_rfx_graph(**graph) is None
+
+    db._client = _GraphRpcClient('duplicate key value violates unique constraint "rfx_v2_rfx_code_key"')
+    try:
+        db.save_rfx_graph(**graph)
+    except Exception as exc:
+        assert "rfx_code_key" in str(exc)
+    else:
+        raise AssertionError("non-missing-function errors must propagate")
@@ -0,0 +1,111 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from backend.core.database import DatabaseClient, rank_rfx_search_match
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _RpcCall:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.rpc_calls.append((self.name, self.params))
+        return _Result(self.client.rows)
+
+
+class _FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.rpc_calls = []
+
+    def rpc(self, name, params):
+        return _RpcCall(self, name, params)
+
+
+def _db(rows):
+    db = DatabaseClient()
+    db._client = _FakeClient(rows)
+    return db
+
+
+def test_rank_prefers_exact_codes_then_names_then_partial_text():
+    exact_code = rank_rfx_search_match("rfx-2026-0007", {"rfx_code": "RFX-2026-0007"})
+    exact_requester = rank_rfx_search_match("ana perez", {"requester_name": "Ana Perez"})
+    partial_code = rank_rfx_search_match("2026-0007", {"proposal_code": "RFX-2026-0007-R01"})
+    fuzzy_title = rank_rfx_search_match("catering", {"title": "Catring corporativo"})
+
+    assert exact_code > exact_requester > partial_code > fuzzy_title > 0
+    assert rank_rfx_search_match("zzz", {"title": "Evento"}) < 0.5
+
+
+def test_search_rfx_passes_scope_and_pagination_to_rpc():
+    db = _db([{"id": "rfx-1", "rank": 3.0, "total_count": 1}])
+
+    rows = db.search_rfx("  Ana   Perez ", organization_id="org-1", user_id="user-1", limit=500, offset=-3)
+
+    assert rows[0]["id"] == "rfx-1"
+    name, params = db.client.rpc_calls[0]
+    assert name == "search_rfx"
+    assert params == {
+        "p_query": "Ana Perez",
+        "p_organization_id": "org-1",
+        "p_user_id": "user-1",
+        "p_limit": 100,
+        "p_offset": 0,
+    }
+
+
+def test_find_rfx_by_identifier_loads_top_ranked_result(monkeypatch):
+    db = _db([{"id": "rfx-9", "rank": 2.0, "total_count": 3}])
+    loaded = []
+    monkeypatch.setattr(db, "get_rfx_by_id", lambda rfx_id: loaded.append(rfx_id) or {"id": rfx_id})
+
+    result = db.find_rfx_by_identifier("Acme Corp", organization_id="org-1")
+
+    assert result == {"id": "rfx-9"}
+    assert loaded == ["rfx-9"]
+    assert db.client.rpc_calls[0][1]["p_limit"] == 1
+    assert db.find_rfx_by_identifier("   ") is None
+
+
+def test_strict_lookup_rejects_fuzzy_ambiguous_and_unscoped_matches(monkeypatch):
+    db = _db([{"id": "rfx-1", "rank": 0.8, "total_count": 1}])
+    monkeypatch.setattr(db, "get_rfx_by_id", lambda rfx_id: {"id": rfx_id})
+
+    assert db.find_rfx_by_identifier("Acme Corp", organization_id="org-1", strict=True) is None
+    assert db.client.rpc_calls[0][1]["p_limit"] == 2
+    assert db.client.rpc_calls[0][1]["p_organization_id"] == "org-1"
+
+    db.client.rows = [{"id": "rfx-1", "rank": 2.0}, {"id": "rfx-2", "rank": 2.0}]
+    assert db.find_rfx_by_identifier("Acme Corp", organization_id="org-1", strict=True) is None
+
+    db.client.rows = [{"id": "rfx-1", "rank": 3.0}, {"id": "rfx-2", "rank": 1.5}]
+    assert db.find_rfx_by_identifier("RFX-2026-0001", organization_id="org-1", strict=True) == {"id": "rfx-1"}
+
+    calls = len(db.client.rpc_calls)
+    assert db.find_rfx_by_identifier("RFX-2026-0001", strict=True) is None
+    assert len(db.client.rpc_calls) == calls
+
+
+def test_strict_uuid_lookup_checks_the_caller_scope(monkeypatch):
+    rfx_uuid = "7b0c6a9e-1f2d-4c3b-9a8e-0d1e2f3a4b5c"
+    db = _db([])
+    monkeypatch.setattr(
+        db, "get_rfx_by_id",
+        lambda rfx_id: {"id": rfx_id, "organization_id": "org-2", "user_id": "user-2"},
+    )
+
+    assert db.find_rfx_by_identifier(rfx_uuid, organization_id="org-1", user_id="user-1", strict=True) is None
+    assert db.find_rfx_by_identifier(rfx_uuid, user_id="user-2", strict=True) is None
+    assert db.find_rfx_by_identifier(rfx_uuid, organization_id="org-2", strict=True)["id"] == rfx_uuid
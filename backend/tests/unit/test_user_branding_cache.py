@@ -0,0 +1,122 @@
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+
+from backend.services import user_branding_service as branding_module
+from backend.services.user_branding_service import UserBrandingService
+from backend.utils.ttl_cache import TTLCache
+
+USER_ID = "5b2f6d3e-8f4c-4a7e-9d1b-2c3e4f5a6b7c"
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _CountingClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = 0
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_args, **_kwargs):
+        self.selects += 1
+        return self
+
+    def update(self, payload):
+        self.pending_update = payload
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        payload = getattr(self, "pending_update", None)
+        if payload is not None:
+            self.pending_update = None
+            for row in self.rows:
+                row.update(payload)
+            self.rows = [row for row in self.rows if row.get("is_active", True)]
+        return _Result([dict(row) for row in self.rows])
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(branding_module, "_branding_cache", TTLCache(ttl_seconds=60))
+
+
+class _FakeDB:
+    def __init__(self, client):
+        self.client = client
+
+
+def _service(rows, client=None):
+    service = UserBrandingService()
+    client = client or _CountingClient(rows)
+    service.db = _FakeDB(client)
+    return service, client
+
+
+def test_branding_reads_share_one_fetch_until_invalidated():
+    service, client = _service(
+        [
+            {
+                "user_id": USER_ID,
+                "logo_url": "https://res.cloudinary.com/demo/logo.png",
+                "template_analysis": '{"company_name": "Acme"}',
+                "html_template": "<html></html>",
+                "is_active": True,
+            }
+        ]
+    )
+
+    branding = service.get_branding_with_analysis(USER_ID)
+    branding["template_analysis"]["company_name"] = "mutated"
+    assert service.get_branding_with_analysis(USER_ID)["template_analysis"] == {"company_name": "Acme"}
+    assert service.get_logo_url(USER_ID) == "https://res.cloudinary.com/demo/logo.png"
+    assert client.selects == 1
+
+    service.invalidate_cache(USER_ID)
+    service.get_branding_with_analysis(USER_ID)
+    assert client.selects == 2
+
+
+def test_missing_branding_is_not_cached_so_a_new_upload_is_seen():
+    service, client = _service([])
+
+    assert service.get_branding_with_analysis(USER_ID) is None
+    assert service.get_logo_url(USER_ID) is None
+    assert client.selects == 2
+
+    # Logo subido desde otro worker: sin invalidación local, igual se ve
+    client.rows = [{"user_id": USER_ID, "logo_url": "https://res.cloudinary.com/demo/logo.png"}]
+    assert service.get_logo_url(USER_ID) == "https://res.cloudinary.com/demo/logo.png"
+
+
+def test_local_logo_paths_are_not_returned_as_public_urls():
+    service, _client = _service([{"user_id": USER_ID, "logo_url": "/static/branding/logo.png"}])
+
+    assert service.get_logo_url(USER_ID) is None
+
+
+def test_writes_through_a_request_scoped_service_invalidate_the_singleton(monkeypatch):
+    client = _CountingClient([{"user_id": USER_ID, "logo_url": "https://res.cloudinary.com/demo/logo.png"}])
+    monkeypatch.setattr(branding_module.user_branding_service, "db", _FakeDB(client))
+    singleton = branding_module.user_branding_service
+
+    # La generación de propuestas lee por el singleton y deja el branding en cache
+    assert singleton.get_logo_url(USER_ID) == "https://res.cloudinary.com/demo/logo.png"
+
+    # api/branding.py crea un UserBrandingService() por request para borrar
+    api_service, _client = _service(None, client=client)
+    assert api_service.delete_branding(USER_ID) is True
+
+    assert singleton.get_logo_url(USER_ID) is None
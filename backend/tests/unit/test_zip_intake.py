@@ -0,0 +1,105 @@
+import io
+import os
+import zipfile
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+
+import backend.services.rfx_processor as rfx_processor_module
+from backend.services.rfx_pipeline_checkpoints import RFXPipelineCheckpointStore
+from backend.services.rfx_processor import RFXProcessorService
+from backend.utils.zip_intake import ZipIntakeLimitError, iter_zip_members
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("docs/", "")
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _kind(head, name):
+    if name.endswith(".doc"):
+        return "doc"
+    return "text"
+
+
+def test_members_stream_one_at_a_time_and_unsupported_are_not_inflated():
+    archive = _zip({
+        "docs/specs.txt": "Sillas plegables x 40",
+        "docs/legacy.doc": b"\xD0\xCF\x11\xE0" + b"\x00" * 50_000,
+        "docs/items.csv": "name,qty\nmesa,4\n",
+    })
+    sniffed = []
+
+    def detect(head, name):
+        sniffed.append((name, len(head)))
+        return _kind(head, name)
+
+    members = iter_zip_members(archive, detect_kind=detect)
+    first = next(members)
+    assert (first.filename, first.read()) == ("docs/specs.txt", b"Sillas plegables x 40")
+
+    second = next(members)
+    assert first.stream.closed
+    assert second.filename == "docs/items.csv"
+    assert second.size == len(b"name,qty\nmesa,4\n")
+    assert list(members) == []
+
+    # El .doc no soportado se re-detecta con el miembro completo y se omite igual
+    assert ("docs/legacy.doc", 4096) in sniffed
+    assert ("docs/legacy.doc", 50_004) in sniffed
+
+
+def test_member_and_total_limits_use_inflated_bytes():
+    archive = _zip({"a.txt": "a" * 100, "big.txt": "b" * 5_000, "c.txt": "c" * 100})
+
+    names = [m.filename for m in iter_zip_members(archive, detect_kind=_kind, max_member_bytes=1_000)]
+    assert names == ["a.txt", "c.txt"]
+
+    with pytest.raises(ZipIntakeLimitError):
+        list(iter_zip_members(archive, detect_kind=_kind, max_total_bytes=3_000))
+
+
+def test_processor_extracts_zip_members_without_materializing_the_archive(tmp_path, monkeypatch):
+    store = RFXPipelineCheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    monkeypatch.setattr(rfx_processor_module, "rfx_checkpoint_store", store)
+    svc = RFXProcessorService.__new__(RFXProcessorService)
+    seen = []
+    monkeypatch.setattr(
+        svc, "_extract_file_source",
+        lambda fname, content: seen.append((fname, content)) or
+        {"filename": fname, "kind": "text", "text_part": f"### SOURCE: {fname}", "items": []},
+        raising=False,
+    )
+    archive = _zip({"Bases.TXT": "Evento corporativo 200 personas", "old.doc": b"\xD0\xCF\x11\xE0" * 10})
+
+    sources = svc._extract_blob_sources("licitacion-zip-intake-test.zip", archive)
+
+    assert seen == [("bases.txt", b"Evento corporativo 200 personas")]
+    assert [s["filename"] for s in sources] == ["bases.txt"]
+    assert svc._extract_blob_sources("broken.zip", b"PK not a zip") == []
+
+
+def test_extensionless_docx_member_is_detected_from_the_full_member():
+    svc = RFXProcessorService.__new__(RFXProcessorService)
+
+    docx = io.BytesIO()
+    with zipfile.ZipFile(docx, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>" * 1_000)
+        zf.writestr("word/document.xml", "<w:t>Sillas plegables x 40</w:t>" * 500)
+    archive = _zip({"docs/BASES": docx.getvalue(), "docs/notas": "Café y té para 200 personas. " * 300})
+
+    kinds = {m.filename: m.kind for m in iter_zip_members(
+        archive,
+        detect_kind=svc._sniff_zip_member_kind,
+        full_detect_kind=lambda data, name: svc._detect_content_type(data, name.lower()),
+    )}
+
+    assert kinds == {"docs/BASES": "docx", "docs/notas": "text"}
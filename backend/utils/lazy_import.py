@@ -0,0 +1,119 @@
+"""
+💤 Lazy Import - Proxies para dependencias pesadas importadas bajo demanda
+
+openai, numpy, pandas, openpyxl y PyPDF2 suman más de un segundo de import y
+solo se usan en rutas concretas (extracción, catálogo, APU). Los servicios los
+declaran a nivel de módulo con un proxy: el nombre sigue existiendo (y se puede
+parchear en tests), pero el import real ocurre en el primer uso.
+
+Usage:
+    PyPDF2 = lazy_import("PyPDF2")
+    OpenAI = lazy_attr("openai", "OpenAI")
+
+    reader = PyPDF2.PdfReader(stream)   # importa PyPDF2 aquí
+    client = OpenAI(api_key=key)        # importa openai aquí
+
+Notas:
+- Usar `from __future__ import annotations` si el módulo anota con atributos
+  del proxy (p.ej. `np.ndarray`); si no, la anotación fuerza el import.
+- `scripts/benchmark_import_time.py` falla si un módulo pesado vuelve a
+  importarse al cargar la app.
+"""
+import importlib
+import threading
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Proxy de módulo que importa en el primer acceso a un atributo."""
+
+    __slots__ = ("_lazy_name", "_lazy_module", "_lazy_lock")
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_module", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _load(self):
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is None:
+                    module = importlib.import_module(self._lazy_name)
+                    object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._lazy_name!r} ({state})>"
+
+
+class LazyAttribute:
+    """Proxy de un atributo de módulo (clase o función) resuelto en el primer uso."""
+
+    __slots__ = ("_lazy_module", "_lazy_attr", "_lazy_target")
+
+    def __init__(self, module: LazyModule, attr: str):
+        object.__setattr__(self, "_lazy_module", module)
+        object.__setattr__(self, "_lazy_attr", attr)
+        object.__setattr__(self, "_lazy_target", None)
+
+    def _resolve(self):
+        target = self._lazy_target
+        if target is None:
+            target = getattr(self._lazy_module, self._lazy_attr)
+            object.__setattr__(self, "_lazy_target", target)
+        return target
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_target is not None
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __instancecheck__(self, instance) -> bool:
+        return isinstance(instance, self._resolve())
+
+    def __repr__(self) -> str:
+        name = f"{self._lazy_module._lazy_name}.{self._lazy_attr}"
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyAttribute {name!r} ({state})>"
+
+
+_modules: dict = {}
+_modules_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Proxy compartido por nombre de módulo (un solo import real por proceso)."""
+    with _modules_lock:
+        proxy: Optional[LazyModule] = _modules.get(name)
+        if proxy is None:
+            proxy = _modules[name] = LazyModule(name)
+        return proxy
+
+
+def lazy_attr(module_name: str, attr: str) -> LazyAttribute:
+    """Proxy de `from module_name import attr` que importa en el primer uso."""
+    return LazyAttribute(lazy_import(module_name), attr)
+
+
+__all__ = ["LazyModule", "LazyAttribute", "lazy_import", "lazy_attr"]
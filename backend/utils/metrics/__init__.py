@@ -0,0 +1,147 @@
+"""
+📈 Métricas de proceso para hot paths (extracción, OCR, LLM, catálogo, DB, PDF)
+
+Usage:
+    from backend.utils.metrics import track_stage
+
+    @track_stage("ocr")
+    def _extract_text_with_ocr(...):
+        ...
+
+    with track_stage("pdf_render", engine="playwright"):
+        ...
+
+Las métricas se exponen en GET /metrics (backend/api/metrics.py).
+"""
+import functools
+import os
+import time
+from typing import Optional
+
+from flask import g, has_request_context, request
+
+from backend.utils.metrics.registry import (
+    DEFAULT_BUCKETS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    merge_snapshots,
+    render_text,
+)
+
+registry = MetricsRegistry(
+    multiprocess_dir=os.getenv("METRICS_MULTIPROC_DIR") or None,
+    flush_interval_seconds=float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5")),
+)
+
+HTTP_REQUESTS = registry.counter(
+    "rfx_http_requests_total",
+    "HTTP requests by route template, method, status and org tier",
+    ["route", "method", "status", "org_tier"],
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "rfx_http_request_duration_seconds",
+    "HTTP request latency by route template and org tier",
+    ["route", "method", "org_tier"],
+)
+STAGE_SECONDS = registry.histogram(
+    "rfx_stage_duration_seconds",
+    "Latency of pipeline stages (text_extraction, ocr, llm_extraction, catalog_resolution, db_write, pdf_render)",
+    ["stage", "engine", "route", "org_tier"],
+)
+STAGE_ERRORS = registry.counter(
+    "rfx_stage_errors_total",
+    "Pipeline stage failures by exception type",
+    ["stage", "engine", "error", "route", "org_tier"],
+)
+STAGE_IN_PROGRESS = registry.gauge(
+    "rfx_stage_in_progress",
+    "Pipeline stages currently running",
+    ["stage"],
+)
+
+
+def _request_labels():
+    """route/org_tier del request actual; 'background' fuera de un request (p.ej. executor de previews)"""
+    if not has_request_context():
+        return "background", "unknown"
+    rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    return rule, current_org_tier()
+
+
+def current_org_tier(request_globals=g) -> str:
+    tier = getattr(request_globals, "metrics_org_tier", None)
+    if tier:
+        return str(tier)
+    user = getattr(request_globals, "current_user", None) or {}
+    tier = user.get("plan_tier") if isinstance(user, dict) else None
+    if tier:
+        return str(tier)
+    return "org" if getattr(request_globals, "organization_id", None) else "unknown"
+
+
+def set_request_org_tier(plan_tier: Optional[str]) -> None:
+    """Etiqueta el request actual con el plan de la org (se llama donde el plan ya se consultó)"""
+    if plan_tier and has_request_context():
+        g.metrics_org_tier = str(plan_tier)
+
+
+class track_stage:
+    """Decorator y context manager: latencia, errores y concurrencia de una etapa"""
+
+    __slots__ = ("stage", "engine", "_start", "_labels")
+
+    def __init__(self, stage: str, engine: str = "default"):
+        self.stage = stage
+        self.engine = engine
+        self._start = 0.0
+        self._labels = None
+
+    def __enter__(self):
+        self._labels = _request_labels()
+        STAGE_IN_PROGRESS.inc(stage=self.stage)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        route, org_tier = self._labels
+        STAGE_IN_PROGRESS.dec(stage=self.stage)
+        STAGE_SECONDS.observe(elapsed, stage=self.stage, engine=self.engine, route=route, org_tier=org_tier)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(
+                stage=self.stage, engine=self.engine, error=exc_type.__name__, route=route, org_tier=org_tier
+            )
+        return False
+
+    def __call__(self, func):
+        stage, engine = self.stage, self.engine
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Instancia nueva por llamada: el decorator es compartido entre hilos
+            with track_stage(stage, engine):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "merge_snapshots",
+    "render_text",
+    "registry",
+    "HTTP_REQUESTS",
+    "HTTP_REQUEST_SECONDS",
+    "STAGE_SECONDS",
+    "STAGE_ERRORS",
+    "STAGE_IN_PROGRESS",
+    "current_org_tier",
+    "set_request_org_tier",
+    "track_stage",
+]
@@ -0,0 +1,455 @@
+"""
+📈 Metrics Registry - Counters, gauges e histogramas en proceso
+
+Registro liviano y thread-safe con exposición en formato texto de Prometheus.
+No depende de prometheus_client.
+
+Multi-proceso (gunicorn con varios workers): si se define
+`METRICS_MULTIPROC_DIR`, cada proceso escribe periódicamente un snapshot
+`<pid>.json` en ese directorio y el endpoint /metrics agrega todos los
+snapshots. Los contadores e histogramas de workers que ya terminaron
+(p.ej. por --max-requests) se consolidan en `archive.json` para no perder
+conteos; sus gauges se descartan. El hook `on_starting` de gunicorn.conf.py
+vacía el directorio (reset_multiprocess_dir) al arrancar el master, para no
+sumar snapshots de un despliegue anterior.
+
+Usage:
+    requests_total = registry.counter("http_requests_total", "Requests", ["route"])
+    requests_total.inc(route="/api/rfx/process")
+
+    latency = registry.histogram("stage_seconds", "Stage latency", ["stage"])
+    with latency.time(stage="ocr"):
+        ...
+"""
+import atexit
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if len(labels) != len(self.labelnames) or not all(name in labels for name in self.labelnames):
+            missing = set(self.labelnames) - set(labels)
+            extra = set(labels) - set(self.labelnames)
+            raise ValueError(f"Invalid labels for {self.name}: missing={sorted(missing)} extra={sorted(extra)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _snapshot_samples(self) -> Dict[str, Any]:
+        with self._lock:
+            return {json.dumps(list(key)): self._copy_value(value) for key, value in self._values.items()}
+
+    def _copy_value(self, value):
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.metric_type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self._snapshot_samples(),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Contador monotónico"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Valor instantáneo. `multiprocess_mode`: 'sum' o 'max' al agregar workers vivos"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        if multiprocess_mode not in {"sum", "max"}:
+            raise ValueError(f"Unsupported gauge multiprocess_mode: {multiprocess_mode}")
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["multiprocess_mode"] = self.multiprocess_mode
+        return data
+
+
+class Histogram(_Metric):
+    """Histograma con buckets fijos (límites superiores, sin incluir +Inf)"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        if not self.buckets:
+            raise ValueError("Histogram requires at least one finite bucket")
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # counts por bucket (no acumulados) + slot final para +Inf
+                state = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy_value(self, value):
+        return {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso, con agregación opcional multi-proceso"""
+
+    def __init__(self, multiprocess_dir: Optional[str] = None, flush_interval_seconds: float = 5.0):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.flush_interval_seconds = flush_interval_seconds
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        if self.multiprocess_dir:
+            atexit.register(self._flush_quietly)
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # ========================
+    # REGISTRO
+    # ========================
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "sum") -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+        self._ensure_flusher()
+        return metric
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    # ========================
+    # MULTI-PROCESO
+    # ========================
+
+    def _ensure_flusher(self) -> None:
+        """Un hilo daemon por proceso (se re-crea tras fork de gunicorn)"""
+        if not self.multiprocess_dir or self.flush_interval_seconds <= 0:
+            return
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flusher", daemon=True)
+            self._flusher.start()
+
+    def _after_fork(self) -> None:
+        # El worker no hereda conteos ni locks del master (sus conteos ya están en el archivo del master)
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+        self._flusher_pid = None
+        self._ensure_flusher()
+
+    def _flush_loop(self) -> None:
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ Metrics flush failed: {e}")
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def flush(self) -> None:
+        """Escribe el snapshot de este proceso en el directorio compartido"""
+        if not self.multiprocess_dir:
+            return
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def collect(self) -> Dict[str, Any]:
+        """Snapshot agregado: todos los workers si hay directorio compartido, si no solo este proceso"""
+        if not self.multiprocess_dir:
+            return self.snapshot()
+
+        self.flush()
+        with self._dir_lock():
+            self._archive_dead_processes()
+            snapshots: List[Tuple[bool, Dict[str, Any]]] = []
+            for path in self.multiprocess_dir.glob("*.json"):
+                data = _read_json(path)
+                if data is not None:
+                    snapshots.append((path.stem != "archive", data))
+        return merge_snapshots(snapshots)
+
+    def _archive_dead_processes(self) -> None:
+        archive_path = self.multiprocess_dir / "archive.json"
+        dead = []
+        for path in self.multiprocess_dir.glob("*.json"):
+            if path.stem == "archive" or not path.stem.isdigit():
+                continue
+            if not _pid_alive(int(path.stem)):
+                dead.append(path)
+        if not dead:
+            return
+
+        snapshots = [(False, data) for data in (_read_json(path) for path in dead) if data is not None]
+        archive = _read_json(archive_path)
+        if archive is not None:
+            snapshots.append((False, archive))
+        merged = merge_snapshots(snapshots)
+        tmp_path = archive_path.with_name("archive.json.tmp")
+        tmp_path.write_text(json.dumps(merged), encoding="utf-8")
+        os.replace(tmp_path, archive_path)
+        for path in dead:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    @contextmanager
+    def _dir_lock(self):
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.multiprocess_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ========================
+    # EXPOSICIÓN
+    # ========================
+
+    def render(self) -> str:
+        return render_text(self.collect())
+
+
+def merge_snapshots(snapshots: Iterable[Tuple[bool, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Agrega snapshots de varios procesos. Cada entrada es (proceso_vivo, snapshot).
+    Counters/histogramas se suman; gauges solo de procesos vivos (sum o max).
+    """
+    merged: Dict[str, Any] = {}
+    for alive, snapshot in snapshots:
+        for name, metric in snapshot.items():
+            metric_type = metric.get("type")
+            if metric_type == "gauge" and not alive:
+                continue
+            target = merged.get(name)
+            if target is None:
+                target = {key: value for key, value in metric.items() if key != "samples"}
+                target["samples"] = {}
+                merged[name] = target
+            samples = target["samples"]
+            for key, value in (metric.get("samples") or {}).items():
+                if key not in samples:
+                    samples[key] = (
+                        {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+                        if metric_type == "histogram"
+                        else value
+                    )
+                elif metric_type == "histogram":
+                    current = samples[key]
+                    if len(current["counts"]) != len(value["counts"]):
+                        continue
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                elif metric_type == "gauge" and metric.get("multiprocess_mode") == "max":
+                    samples[key] = max(samples[key], value)
+                else:
+                    samples[key] += value
+    return merged
+
+
+def render_text(snapshot: Dict[str, Any]) -> str:
+    """Formato de exposición de texto de Prometheus (version 0.0.4)"""
+    lines: List[str] = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        metric_type = metric.get("type", "untyped")
+        labelnames = metric.get("labelnames") or []
+        lines.append(f"# HELP {name} {_escape_help(metric.get('help', ''))}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for key in sorted(metric.get("samples") or {}):
+            value = metric["samples"][key]
+            labels = list(zip(labelnames, json.loads(key)))
+            if metric_type == "histogram":
+                cumulative = 0
+                for bound, count in zip(list(metric.get("buckets") or []) + [math.inf], value["counts"]):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{name}="{_escape_label_value(value)}"' for name, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def reset_multiprocess_dir(multiprocess_dir: str) -> None:
+    """Borra snapshots y archivo consolidado de un arranque anterior (llamar desde el master)"""
+    path = Path(multiprocess_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    for entry in path.iterdir():
+        if entry.is_file() and (entry.suffix in {".json", ".tmp"} or entry.name == ".lock"):
+            try:
+                entry.unlink()
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove stale metrics file {entry}: {e}")
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,288 @@
+"""
+🧹 PDF HTML Sanitizer - Motor de sanitización precompilado para el pipeline PDF
+
+Las reglas de `api/download.py` (CSS que tumba Chromium, tags multimedia,
+scripts, normalización de layout) se compilan una sola vez al importar y se
+aplican con tres optimizaciones que NO cambian el resultado:
+
+1. Gates literales: cada regla declara los literales que cualquier match debe
+   contener; si no están en el documento, la pasada se omite.
+2. Bloques `<tag>...</tag>` (svg, script, iframe...) se eliminan con un
+   tokenizer: se localiza cada apertura y se valida con el patrón original
+   anclado, recordando cierres inexistentes para no re-escanear el documento
+   desde cada apertura (backtracking cuadrático con HTML grande del LLM).
+3. Resultados memoizados por contenido, porque cada retry de Playwright vuelve
+   a sanitizar el mismo HTML.
+
+El orden de las reglas es el original: la salida es idéntica byte a byte a la
+de aplicar `re.sub` secuencialmente (ver scripts/benchmark_pdf_sanitizer.py).
+"""
+import hashlib
+import re
+from typing import Callable, Iterable, List, Tuple, Union
+
+from backend.utils.ttl_cache import TTLCache
+
+Replacement = Union[str, Callable[["re.Match"], str]]
+
+# Caracteres no ASCII que IGNORECASE de `re` equipara con letras ASCII y que
+# str.lower() no lleva a esa letra: 'ſ' (s), 'ı' (i) e 'İ' (lower() la expande
+# a dos caracteres). 'K' (Kelvin) ya baja a 'k'.
+_IGNORECASE_FOLDS = (("\u017f", "s"), ("\u0131", "i"))
+
+
+def _fold_for_gates(text: str) -> str:
+    """Texto en minúsculas sobre el que se evalúan los gates de reglas IGNORECASE"""
+    if text.isascii():
+        return text.lower()
+    if "\u0130" in text:
+        text = text.replace("\u0130", "i")
+    lowered = text.lower()
+    for source, target in _IGNORECASE_FOLDS:
+        if source in lowered:
+            lowered = lowered.replace(source, target)
+    return lowered
+
+
+class SanitizerRule:
+    """Regla `pattern -> replacement` con gates literales opcionales"""
+
+    def __init__(
+        self,
+        pattern: str,
+        replacement: Replacement,
+        flags: int = 0,
+        gates: Iterable[str] = (),
+        any_gates: Iterable[str] = (),
+    ):
+        self.regex = re.compile(pattern, flags)
+        self.replacement = replacement
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        # Con IGNORECASE los gates se comparan contra el texto en minúsculas
+        self.gates = tuple(g.lower() for g in gates) if self.ignore_case else tuple(gates)
+        self.any_gates = tuple(g.lower() for g in any_gates) if self.ignore_case else tuple(any_gates)
+
+    def may_match(self, text: str, lowered: str) -> bool:
+        haystack = lowered if self.ignore_case else text
+        if any(gate not in haystack for gate in self.gates):
+            return False
+        if self.any_gates and not any(gate in haystack for gate in self.any_gates):
+            return False
+        return True
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        return self.regex.subn(self.replacement, text)
+
+
+class BlockRemovalRule(SanitizerRule):
+    """
+    Elimina bloques `<tag ...>...</tag>` con un patrón DOTALL lazy.
+
+    `opener` es un prefijo del patrón: solo donde hace match puede empezar un
+    match del patrón completo. Si el patrón falla en una apertura, falla en
+    todas las siguientes con la misma clave (no hay cierre después), así que
+    esas aperturas se saltan sin volver a escanear hasta el final.
+    """
+
+    def __init__(self, pattern: str, opener: str, flags: int = 0, gates: Iterable[str] = (), any_gates: Iterable[str] = ()):
+        super().__init__(pattern, "", flags, gates, any_gates)
+        self.opener = re.compile(opener, flags)
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        parts: List[str] = []
+        pos = 0
+        search_from = 0
+        removed = 0
+        dead_keys = set()
+        while True:
+            opening = self.opener.search(text, search_from)
+            if not opening:
+                break
+            key = opening.group(1).lower() if self.opener.groups else ""
+            if key in dead_keys:
+                search_from = opening.start() + 1
+                continue
+            match = self.regex.match(text, opening.start())
+            if not match:
+                if not self.opener.groups:
+                    break
+                # Claves no ASCII: la equivalencia del backreference difiere de
+                # lower(), no se memoiza el fallo.
+                if key.isascii():
+                    dead_keys.add(key)
+                search_from = opening.start() + 1
+                continue
+            parts.append(text[pos:match.start()])
+            pos = match.end()
+            search_from = match.end()
+            removed += 1
+        if not removed:
+            return text, 0
+        parts.append(text[pos:])
+        return "".join(parts), removed
+
+
+class HTMLSanitizer:
+    """Aplica un conjunto ordenado de reglas precompiladas"""
+
+    _memo = TTLCache(ttl_seconds=300, max_entries=32)
+
+    def __init__(self, name: str, rules: List[SanitizerRule]):
+        self.name = name
+        self.rules = rules
+
+    def sanitize(self, html_content: str, use_memo: bool = True) -> str:
+        if not html_content:
+            return html_content
+        if not use_memo:
+            return self._apply(html_content)
+        memo_key = (self.name, hashlib.blake2b(html_content.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            return cached
+        text = self._apply(html_content)
+        self._memo.set(memo_key, text)
+        return text
+
+    def _apply(self, html_content: str) -> str:
+        text = html_content
+        lowered = _fold_for_gates(text)
+        for rule in self.rules:
+            if not rule.may_match(text, lowered):
+                continue
+            text, count = rule.apply(text)
+            if count:
+                lowered = _fold_for_gates(text)
+        return text
+
+    def sanitize_reference(self, html_content: str) -> str:
+        """Aplicación secuencial sin gates ni tokenizer (comportamiento histórico)"""
+        text = html_content
+        for rule in self.rules:
+            text = re.sub(rule.regex.pattern, rule.replacement, text, flags=rule.regex.flags)
+        return text
+
+
+# ========================
+# REGLAS
+# ========================
+
+_UNIVERSAL_PRINT_COLOR_BLOCK = SanitizerRule(
+    r'\*\s*(?:,\s*\*::before\s*,\s*\*::after\s*)?\{[^}]*-webkit-print-color-adjust[^}]*\}',
+    '',
+    gates=('{', '-webkit-print-color-adjust'),
+)
+
+_MEDIA_TAGS = ('<iframe', '<embed', '<object', '<video', '<audio', '<canvas')
+
+
+def _script_block_rule() -> BlockRemovalRule:
+    return BlockRemovalRule(
+        r'<script[^>]*>.*?</script>', r'<script',
+        flags=re.DOTALL | re.IGNORECASE, gates=('<script', '</script>'),
+    )
+
+
+def _event_handler_rule() -> SanitizerRule:
+    return SanitizerRule(
+        r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '',
+        flags=re.IGNORECASE, gates=('on', '='),
+    )
+
+
+def _css(pattern: str, *gates: str, replacement: str = '') -> SanitizerRule:
+    return SanitizerRule(pattern, replacement, flags=re.IGNORECASE, gates=gates)
+
+
+CHROMIUM_PDF_SANITIZER = HTMLSanitizer("chromium_pdf", [
+    # Filters y effects (muy problemáticos con page.pdf)
+    _css(r'filter:\s*[^;]+;', 'filter:'),
+    _css(r'backdrop-filter:\s*[^;]+;', 'backdrop-filter:'),
+    _css(r'-webkit-backdrop-filter:\s*[^;]+;', '-webkit-backdrop-filter:'),
+    _css(r'mix-blend-mode:\s*[^;]+;', 'mix-blend-mode:'),
+    # Masks y clips complejos
+    _css(r'-webkit-mask:\s*[^;]+;', '-webkit-mask:'),
+    _css(r'-webkit-mask-image:\s*[^;]+;', '-webkit-mask-image:'),
+    _css(r'mask:\s*[^;]+;', 'mask:'),
+    _css(r'clip-path:\s*polygon[^;]+;', 'clip-path:', 'polygon'),
+    # Transforms 3D problemáticos
+    _css(r'transform:\s*[^;]*perspective[^;]+;', 'transform:', 'perspective'),
+    _css(r'transform:\s*[^;]*rotateX[^;]+;', 'transform:', 'rotateX'),
+    _css(r'transform:\s*[^;]*rotateY[^;]+;', 'transform:', 'rotateY'),
+    _css(r'transform:\s*[^;]*rotateZ[^;]+;', 'transform:', 'rotateZ'),
+    _css(r'transform-style:\s*preserve-3d;', 'transform-style:', 'preserve-3d'),
+    # Will-change (no sirve en PDF)
+    _css(r'will-change:\s*[^;]+;', 'will-change:'),
+    # Contenido generado problemático
+    _css(r'content:\s*url\([^)]+\);', 'content:', 'url('),
+    # Animaciones y transiciones (no tienen sentido en PDF)
+    _css(r'animation:\s*[^;]+;', 'animation:'),
+    _css(r'animation-[^:]+:\s*[^;]+;', 'animation-'),
+    _css(r'transition:\s*[^;]+;', 'transition:'),
+    _css(r'transition-[^:]+:\s*[^;]+;', 'transition-'),
+    # image-rendering no estándar
+    _css(r'image-rendering:\s*-webkit-optimize-contrast[^;]*;', 'image-rendering:', '-webkit-optimize-contrast',
+         replacement='image-rendering: auto;'),
+    # -webkit-print-color-adjust con !important en selectores universales
+    _css(r'-webkit-print-color-adjust:\s*exact\s*!important\s*;', '-webkit-print-color-adjust:', '!important',
+         replacement='-webkit-print-color-adjust: exact;'),
+    # Bloques universales (*) con -webkit-print-color-adjust (principal causa de crash)
+    _UNIVERSAL_PRINT_COLOR_BLOCK,
+    _script_block_rule(),
+    _event_handler_rule(),
+])
+
+
+PLAYWRIGHT_STABILITY_SANITIZER = HTMLSanitizer("playwright_stability", [
+    # Dependencias externas e imports CSS dinámicos
+    SanitizerRule(r'<link[^>]+rel=["\']?stylesheet["\']?[^>]*>', '', flags=re.IGNORECASE,
+                  gates=('<link', 'rel=', 'stylesheet')),
+    SanitizerRule(r'@import\s+url\([^)]+\)\s*;?', '', flags=re.IGNORECASE, gates=('@import', 'url(')),
+    # Tags multimedia/embebidos problemáticos para PDF
+    BlockRemovalRule(r'<(iframe|embed|object|video|audio|canvas)[^>]*>.*?</\1>',
+                     r'<(iframe|embed|object|video|audio|canvas)',
+                     flags=re.IGNORECASE | re.DOTALL, any_gates=_MEDIA_TAGS),
+    SanitizerRule(r'<(iframe|embed|object|video|audio|canvas)[^>]*/?>', '', flags=re.IGNORECASE,
+                  any_gates=_MEDIA_TAGS),
+    # SVG complejos pueden tumbar el renderer en algunos hosts
+    BlockRemovalRule(r'<svg[^>]*>.*?</svg>', r'<svg', flags=re.IGNORECASE | re.DOTALL, gates=('<svg', '</svg>')),
+    # Data URIs extremadamente largos
+    SanitizerRule(r'data:[^"\')\s]{5000,}', 'data:,', flags=re.IGNORECASE, gates=('data:',)),
+    _script_block_rule(),
+    _event_handler_rule(),
+])
+
+
+_BODY_WIDTH_RE = re.compile(r'\bwidth\s*:\s*[\d.]+(?:mm|cm|in|px|pt)\s*;', re.IGNORECASE)
+_BODY_HEIGHT_RE = re.compile(r'\bheight\s*:\s*[\d.]+(?:mm|cm|in|px|pt)\s*;', re.IGNORECASE)
+_BODY_PADDING_RE = re.compile(r'\bpadding\s*:[^;]*\d+(?:mm|cm|in|pt)[^;]*;', re.IGNORECASE)
+
+
+def _sanitize_body_block(match: "re.Match") -> str:
+    block = match.group(0)
+    # Width/height con unidades absolutas y padding en mm/cm/pt
+    block = _BODY_WIDTH_RE.sub('', block)
+    block = _BODY_HEIGHT_RE.sub('', block)
+    block = _BODY_PADDING_RE.sub('', block)
+    return block
+
+
+PDF_LAYOUT_SANITIZER = HTMLSanitizer("pdf_layout", [
+    # 1. image-rendering: -webkit-optimize-contrast (no estándar, crash)
+    SanitizerRule(r'image-rendering:\s*-webkit-optimize-contrast[^;]*;', 'image-rendering: auto;',
+                  gates=('image-rendering:', '-webkit-optimize-contrast')),
+    # 2. Selectores universales (*) con -webkit-print-color-adjust
+    _UNIVERSAL_PRINT_COLOR_BLOCK,
+    # 3. -webkit-print-color-adjust: exact !important
+    SanitizerRule(r'-webkit-print-color-adjust:\s*exact\s*!important\s*;', '-webkit-print-color-adjust: exact;',
+                  gates=('-webkit-print-color-adjust:', '!important')),
+    # 4. Widths con calc() -> 100%
+    SanitizerRule(r'(width\s*:\s*)calc\([^)]*\)', r'\1100%', flags=re.IGNORECASE, gates=('width', 'calc(')),
+    # 5. Dimensiones fijas en body {}
+    SanitizerRule(r'body\s*\{[^}]*\}', _sanitize_body_block, flags=re.IGNORECASE, gates=('body', '{', '}')),
+    # 7. Márgenes explícitos en mm/cm/in/pt dentro de <table style="...">
+    SanitizerRule(
+        r'(<table[^>]*style\s*=\s*["\'][^"\']*?)margin(?:-(?:left|right|top|bottom))?\s*:\s*[\d.]+(?:mm|cm|in|pt)[^;]*;',
+        r'\1margin: 0;', flags=re.IGNORECASE, gates=('<table', 'style', 'margin'),
+    ),
+])
@@ -0,0 +1,144 @@
+"""
+📄 PDF Page Extractor - Texto de PDF página a página con presupuesto y cache
+
+Reemplaza el "leer todas las páginas y unir" de la extracción de PDF:
+- iter_pdf_pages() es un generador: cada página se parsea solo cuando se pide,
+  así que cortar la iteración evita parsear el resto del documento
+- Cache por hash de contenido + índice de página (TTLCache por proceso): una
+  re-subida del mismo PDF no vuelve a parsear sus páginas
+- extract_pdf_text() aplica un presupuesto de caracteres (RFX_PDF_CHAR_BUDGET,
+  ~4 caracteres por token). Si el documento lo excede se conservan las primeras
+  páginas (portada: cliente, fechas, lugar) y luego las de mayor prioridad
+  (tablas de ítems, especificaciones), en el orden original del documento.
+  El escaneo se corta al llegar a PDF_SCAN_FACTOR × presupuesto.
+
+Usage:
+    text = extract_pdf_text(pdf_bytes, PyPDF2.PdfReader)
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from backend.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PDF_CHAR_BUDGET = int(os.getenv("RFX_PDF_CHAR_BUDGET", "200000"))
+PDF_MAX_PAGES = int(os.getenv("RFX_PDF_MAX_PAGES", "500"))
+PDF_SCAN_FACTOR = 3
+PDF_LEAD_PAGES = 2
+
+_page_cache = TTLCache(
+    ttl_seconds=float(os.getenv("RFX_PDF_PAGE_CACHE_TTL_SECONDS", "3600")),
+    max_entries=int(os.getenv("RFX_PDF_PAGE_CACHE_MAX_PAGES", "8192")),
+)
+
+# Señales de secciones útiles para la extracción de ítems
+_PRIORITY_TERMS = re.compile(
+    r"\b(cantidad(es)?|cant|qty|quantity|unidad(es)?|und|uom|partidas?|[ií]tems?|"
+    r"especificaci[oó]n(es)?|specifications?|specs|descripci[oó]n|precios?|"
+    r"alcance|requerimientos?|requisitos|entregables?|lotes?|suministro)\b",
+    re.IGNORECASE,
+)
+_TABLE_ROW = re.compile(r"\d+(?:[.,]\d+)?\s*(?:und|uds?|unid|pzas?|kg|m2|m|lts?|cajas?|%)?\s*$", re.IGNORECASE)
+
+PdfPage = Tuple[int, str]
+
+
+def iter_pdf_pages(
+    content: bytes,
+    reader_factory: Callable[[io.BytesIO], Any],
+    max_pages: Optional[int] = None,
+) -> Iterator[PdfPage]:
+    """
+    Genera (índice, texto) por página de forma perezosa.
+
+    El reader solo se construye si alguna página pedida no está en cache.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    limit = PDF_MAX_PAGES if max_pages is None else max_pages
+    reader = None
+
+    page_count = _page_cache.get((digest, "pages"))
+    if page_count is None:
+        reader = reader_factory(io.BytesIO(content))
+        page_count = len(reader.pages)
+        _page_cache.set((digest, "pages"), page_count)
+
+    if page_count > limit:
+        logger.warning(f"⚠️ PDF has {page_count} pages, reading only the first {limit}")
+
+    for index in range(min(page_count, limit)):
+        text = _page_cache.get((digest, index))
+        if text is None:
+            if reader is None:
+                reader = reader_factory(io.BytesIO(content))
+            text = reader.pages[index].extract_text() or ""
+            _page_cache.set((digest, index), text)
+        yield index, text
+
+
+def extract_pdf_text(
+    content: bytes,
+    reader_factory: Callable[[io.BytesIO], Any],
+    char_budget: Optional[int] = None,
+) -> str:
+    """Texto del PDF dentro del presupuesto de caracteres (0 = sin límite)."""
+    budget = PDF_CHAR_BUDGET if char_budget is None else char_budget
+    return select_pages_within_budget(iter_pdf_pages(content, reader_factory), budget)
+
+
+def select_pages_within_budget(pages: Iterable[PdfPage], char_budget: int) -> str:
+    """
+    Consume `pages` hasta PDF_SCAN_FACTOR × presupuesto y une las páginas elegidas.
+
+    Dentro del presupuesto se devuelve todo en orden; si se excede se priorizan
+    las primeras PDF_LEAD_PAGES y luego las páginas con más señales de ítems.
+    """
+    if char_budget <= 0:
+        return "\n".join(text for _index, text in pages)
+
+    scanned: List[PdfPage] = []
+    total = 0
+    scan_limit = char_budget * PDF_SCAN_FACTOR
+    for index, text in pages:
+        scanned.append((index, text))
+        total += len(text)
+        if total >= scan_limit:
+            logger.info(f"✂️ PDF scan cutoff at page {index + 1}: {total} chars scanned")
+            break
+
+    if total <= char_budget:
+        return "\n".join(text for _index, text in scanned)
+
+    chosen = set()
+    used = 0
+    for index, text in scanned[:PDF_LEAD_PAGES]:
+        chosen.add(index)
+        used += len(text)
+
+    ranked = sorted(scanned[PDF_LEAD_PAGES:], key=lambda page: (-_page_priority(page[1]), page[0]))
+    for index, text in ranked:
+        if used + len(text) > char_budget:
+            continue
+        chosen.add(index)
+        used += len(text)
+
+    logger.info(
+        f"📑 PDF text over budget: kept {len(chosen)}/{len(scanned)} scanned pages "
+        f"({used}/{total} chars, budget {char_budget})"
+    )
+    return "\n".join(text for index, text in scanned if index in chosen)
+
+
+def _page_priority(text: str) -> float:
+    """Densidad de señales de tablas de ítems / especificaciones por cada 1000 caracteres."""
+    if not text.strip():
+        return 0.0
+    terms = len(_PRIORITY_TERMS.findall(text))
+    table_rows = sum(1 for line in text.splitlines() if _TABLE_ROW.search(line.strip()))
+    return (2 * terms + table_rows) / (len(text) / 1000 + 1)
+
@@ -0,0 +1,100 @@
+"""
+⏱️ TTL Cache - Cache en memoria por proceso con expiración
+
+Cache thread-safe y sin dependencias externas para lecturas repetidas de
+configuración (pricing, branding, tasas). Cada worker de gunicorn tiene su
+propia instancia, por lo que los TTL deben ser cortos y los writers deben
+invalidar explícitamente las claves que modifican.
+
+Usage:
+    cache = TTLCache(ttl_seconds=30, max_entries=1024)
+    value = cache.get_or_load(("rfx", rfx_id), lambda: load_from_db(rfx_id))
+    cache.invalidate(("rfx", rfx_id))
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache LRU acotado con expiración por entrada."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 1024):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna el valor vigente para `key` o `default` si no existe o expiró."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Guarda `value` bajo `key` con el TTL por defecto o uno específico."""
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        *,
+        should_cache: Callable[[Any], bool] = lambda value: value is not None,
+    ) -> Any:
+        """
+        Read-through: retorna el valor cacheado o lo carga con `loader`.
+
+        El loader se ejecuta fuera del lock para no serializar lecturas lentas;
+        `should_cache` permite no guardar resultados de fallback o vacíos.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if should_cache(value):
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Elimina una clave. Retorna True si existía."""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Elimina todas las claves que cumplan `predicate`. Retorna cuántas se eliminaron."""
+        with self._lock:
+            stale_keys = [key for key in self._data if predicate(key)]
+            for key in stale_keys:
+                del self._data[key]
+            return len(stale_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,151 @@
+"""
+🗜️ ZIP Intake - Expansión en streaming de archivos ZIP con límites de tamaño
+
+Itera los miembros de un ZIP uno a uno en lugar de materializarlos todos con
+`zf.read(name)`:
+- El tipo se detecta primero con los primeros bytes del miembro (sniff). Si
+  ese tipo es desconocido o no soportado, el miembro se descomprime completo y
+  se vuelve a detectar sobre todo el contenido (un DOCX/XLSX sin extensión o un
+  texto UTF-8 cortado a mitad de carácter no se reconocen con solo la cabecera)
+- Cada miembro soportado se copia a un SpooledTemporaryFile: en memoria si es
+  pequeño, a disco si supera ZIP_SPOOL_THRESHOLD_BYTES
+- Límites de tamaño descomprimido por miembro y total, contados sobre los bytes
+  reales (no sobre el header, que un ZIP malicioso puede falsear)
+
+Usage:
+    for member in iter_zip_members(content, detect_kind=detector._detect_content_type):
+        data = member.read()   # el spool se cierra al avanzar al siguiente miembro
+"""
+import io
+import logging
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Callable, Collection, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ZIP_MAX_MEMBER_BYTES = int(os.getenv("RFX_ZIP_MAX_MEMBER_MB", "100")) * 1024 * 1024
+ZIP_MAX_TOTAL_BYTES = int(os.getenv("RFX_ZIP_MAX_TOTAL_MB", "300")) * 1024 * 1024
+ZIP_SPOOL_THRESHOLD_BYTES = int(os.getenv("RFX_ZIP_SPOOL_THRESHOLD_MB", "8")) * 1024 * 1024
+ZIP_SNIFF_BYTES = 4096
+ZIP_COPY_CHUNK_BYTES = 1024 * 1024
+
+# Tipos que el pipeline RFX sabe extraer (ver RFXProcessorService._extract_file_source)
+SUPPORTED_KINDS = frozenset({"pdf", "docx", "text", "xlsx", "csv", "image"})
+
+
+class ZipIntakeLimitError(ValueError):
+    """El contenido descomprimido del ZIP supera ZIP_MAX_TOTAL_BYTES."""
+
+
+@dataclass
+class ZipMember:
+    """Miembro de un ZIP ya descomprimido a un spool (memoria o disco)."""
+    filename: str
+    kind: str
+    size: int
+    stream: IO[bytes]
+
+    def read(self) -> bytes:
+        self.stream.seek(0)
+        return self.stream.read()
+
+
+def iter_zip_members(
+    source: Union[bytes, IO[bytes]],
+    detect_kind: Callable[[bytes, str], str],
+    supported_kinds: Collection[str] = SUPPORTED_KINDS,
+    full_detect_kind: Optional[Callable[[bytes, str], str]] = None,
+    max_member_bytes: Optional[int] = None,
+    max_total_bytes: Optional[int] = None,
+    spool_threshold: Optional[int] = None,
+) -> Iterator[ZipMember]:
+    """
+    Genera los miembros soportados de un ZIP de forma perezosa.
+
+    Args:
+        source: Bytes del ZIP o file-like con seek
+        detect_kind: Detector (head_bytes, filename) -> kind sobre la cabecera
+        supported_kinds: Tipos que se entregan; el resto se omite
+        full_detect_kind: Detector (content, filename) -> kind para el miembro
+            completo cuando la cabecera da un tipo no soportado (default detect_kind)
+        max_member_bytes: Miembros más grandes se omiten (default ZIP_MAX_MEMBER_BYTES)
+        max_total_bytes: Tope de bytes descomprimidos entregados (default ZIP_MAX_TOTAL_BYTES)
+        spool_threshold: Tamaño a partir del cual el spool pasa a disco
+
+    Raises:
+        zipfile.BadZipFile: Si `source` no es un ZIP válido
+        ZipIntakeLimitError: Si el total descomprimido supera max_total_bytes
+
+    El spool de cada miembro se cierra al pedir el siguiente: el consumidor debe
+    terminar de usar `member.stream` antes de avanzar el iterador.
+    """
+    member_limit = ZIP_MAX_MEMBER_BYTES if max_member_bytes is None else max_member_bytes
+    total_limit = ZIP_MAX_TOTAL_BYTES if max_total_bytes is None else max_total_bytes
+    spool_limit = ZIP_SPOOL_THRESHOLD_BYTES if spool_threshold is None else spool_threshold
+    fileobj = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+    total = 0
+    with zipfile.ZipFile(fileobj) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            name = info.filename
+            if info.file_size > member_limit:
+                logger.warning(f"⚠️ ZIP member too large, skipping: {name} ({info.file_size} bytes declared)")
+                continue
+            if total + info.file_size > total_limit:
+                raise ZipIntakeLimitError(
+                    f"ZIP exceeds {total_limit} decompressed bytes at member '{name}'"
+                )
+
+            with zf.open(info) as raw:
+                head = raw.read(ZIP_SNIFF_BYTES)
+                kind = detect_kind(head, name)
+
+                spool = tempfile.SpooledTemporaryFile(max_size=spool_limit)
+                size = _copy_limited(raw, head, spool, member_limit)
+                if size is None:
+                    spool.close()
+                    logger.warning(f"⚠️ ZIP member exceeded {member_limit} bytes while inflating, skipping: {name}")
+                    continue
+
+            if kind not in supported_kinds:
+                # La cabecera no alcanzó: detectar sobre el miembro completo
+                spool.seek(0)
+                kind = (full_detect_kind or detect_kind)(spool.read(), name)
+            if kind not in supported_kinds:
+                spool.close()
+                logger.info(f"⏭️ ZIP member skipped (kind={kind}): {name}")
+                continue
+
+            total += size
+            if total > total_limit:
+                spool.close()
+                raise ZipIntakeLimitError(
+                    f"ZIP exceeds {total_limit} decompressed bytes at member '{name}'"
+                )
+
+            spool.seek(0)
+            try:
+                yield ZipMember(filename=name, kind=kind, size=size, stream=spool)
+            finally:
+                spool.close()
+
+
+def _copy_limited(raw: IO[bytes], head: bytes, dest: IO[bytes], limit: int) -> Optional[int]:
+    """Copia head + resto de `raw` a `dest` por chunks; None si supera `limit`."""
+    size = len(head)
+    if size > limit:
+        return None
+    dest.write(head)
+    while True:
+        chunk = raw.read(ZIP_COPY_CHUNK_BYTES)
+        if not chunk:
+            return size
+        size += len(chunk)
+        if size > limit:
+            return None
+        dest.write(chunk)
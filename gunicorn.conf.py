@@ -0,0 +1,18 @@
+"""
+Gunicorn config (se carga automáticamente desde el directorio de trabajo).
+
+Las opciones de bind/workers/timeouts siguen en el CMD de los Dockerfiles y en
+railway.json; aquí solo viven los hooks del servidor.
+"""
+import os
+
+
+def on_starting(server):
+    """Vacía el directorio de métricas multi-proceso antes de lanzar workers."""
+    multiprocess_dir = os.getenv("METRICS_MULTIPROC_DIR")
+    if not multiprocess_dir:
+        return
+    from backend.utils.metrics.registry import reset_multiprocess_dir
+
+    reset_multiprocess_dir(multiprocess_dir)
+    server.log.info(f"📈 Metrics multiprocess dir reset: {multiprocess_dir}")
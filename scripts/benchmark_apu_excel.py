@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark + verificación del builder Excel de APU (plantilla Chevron).
+
+Construye un APU sintético de N partidas con el estampado de plantilla
+(`_APUExcelBuilder`, estilos resueltos una vez por build) y con la copia
+celda a celda histórica (`use_template_stamp=False`), exige un resultado
+idéntico a nivel de celda (valor, formato numérico, fuente, relleno, borde,
+alineación, protección, merges, dimensiones y configuración de impresión)
+y reporta tiempos.
+
+Uso:
+    python scripts/benchmark_apu_excel.py                  # 50 partidas
+    python scripts/benchmark_apu_excel.py --partidas 30 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+for key, value in {
+    "SUPABASE_URL": "https://example.supabase.co",
+    "SUPABASE_ANON_KEY": "benchmark",
+    "OPENAI_API_KEY": "sk-benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+from openpyxl import load_workbook  # noqa: E402
+
+from backend.models.apu_models import APUOutput  # noqa: E402
+from backend.services.apu_generator import _APUExcelBuilder  # noqa: E402
+
+CELL_ATTRS = ("value", "data_type", "number_format", "font", "fill", "border", "alignment", "protection")
+
+
+def sample_output(partidas: int) -> APUOutput:
+    return APUOutput.model_validate({
+        "rfx_id": "rfx-benchmark",
+        "project_name": "Benchmark APU",
+        "client_company": "Constructora Benchmark C.A.",
+        "rfx_date": "2024-04-29",
+        "tasa_bcv": 36.5,
+        "tasa_bcv_missing": False,
+        "pct_admin_gg": 0.16,
+        "pct_utilidad": 0.10,
+        "pct_sobre_costo_labor": 0.35,
+        "partidas": [
+            {
+                "numero": f"{idx:02d}",
+                "descripcion": f"Partida de obra civil {idx}",
+                "unidad": "m3",
+                "cantidad_obra": 10 + idx,
+                "rendimiento_und_dia": 6,
+                "pct_sobre_costo_labor": 0.35,
+                "materiales": [
+                    {
+                        "descripcion": f"Material {idx}-{item}",
+                        "unidad": "sa",
+                        "cantidad": 1.5 + item,
+                        "desperdicio": 0.02,
+                        "precio_unitario_usd": 8.5 + item,
+                        "es_precio_estimado": True,
+                    }
+                    for item in range(3)
+                ],
+                "equipos": [
+                    {
+                        "descripcion": "Concretera 1 saco",
+                        "cantidad_dias": 1,
+                        "costo_por_dia_usd": 45.0,
+                        "dep_o_alq": 1.0,
+                        "es_precio_estimado": True,
+                    }
+                ],
+                "mano_obra": [
+                    {
+                        "descripcion": "Albanil oficial",
+                        "cantidad_dias": 2,
+                        "costo_por_dia_usd": 40.0,
+                        "bono_usd": 8.0,
+                        "es_precio_estimado": True,
+                    }
+                ],
+            }
+            for idx in range(1, partidas + 1)
+        ],
+        "warnings": [],
+    })
+
+
+def _unproxy(value):
+    return getattr(value, "_StyleProxy__target", value)
+
+
+def diff_workbooks(expected: bytes, actual: bytes, limit: int = 20):
+    """Diferencias celda a celda entre dos workbooks serializados."""
+    wb_a = load_workbook(BytesIO(expected))
+    wb_b = load_workbook(BytesIO(actual))
+    diffs = []
+    if wb_a.sheetnames != wb_b.sheetnames:
+        return [f"sheetnames: {wb_a.sheetnames} != {wb_b.sheetnames}"]
+
+    for name in wb_a.sheetnames:
+        ws_a, ws_b = wb_a[name], wb_b[name]
+        if sorted(map(str, ws_a.merged_cells.ranges)) != sorted(map(str, ws_b.merged_cells.ranges)):
+            diffs.append(f"{name}: merged ranges differ")
+        for attr in ("column_dimensions", "row_dimensions"):
+            dims_a = {k: (d.width if attr == "column_dimensions" else d.height, d.hidden) for k, d in getattr(ws_a, attr).items()}
+            dims_b = {k: (d.width if attr == "column_dimensions" else d.height, d.hidden) for k, d in getattr(ws_b, attr).items()}
+            if dims_a != dims_b:
+                diffs.append(f"{name}: {attr} differ")
+        for attr in ("page_setup", "page_margins", "print_options", "print_area", "freeze_panes"):
+            if getattr(ws_a, attr) != getattr(ws_b, attr):
+                diffs.append(f"{name}: {attr} differs")
+
+        coords = set(ws_a._cells) | set(ws_b._cells)
+        for row, col in sorted(coords):
+            cell_a, cell_b = ws_a.cell(row=row, column=col), ws_b.cell(row=row, column=col)
+            for attr in CELL_ATTRS:
+                # cell.font & co. are StyleProxy objects; compare the wrapped styles
+                value_a = _unproxy(getattr(cell_a, attr))
+                value_b = _unproxy(getattr(cell_b, attr))
+                if value_a != value_b:
+                    diffs.append(f"{name}!{cell_a.coordinate}.{attr}: {value_a!r} != {value_b!r}")
+        if len(diffs) >= limit:
+            break
+    return diffs[:limit]
+
+
+def time_build(output: APUOutput, use_template_stamp: bool, repeat: int):
+    best, data = None, None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        data = _APUExcelBuilder(output, use_template_stamp=use_template_stamp).build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partidas", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=1, help="Builds por variante (se toma el mejor)")
+    args = parser.parse_args()
+
+    output = sample_output(args.partidas)
+    legacy_s, legacy_bytes = time_build(output, use_template_stamp=False, repeat=args.repeat)
+    stamp_s, stamp_bytes = time_build(output, use_template_stamp=True, repeat=args.repeat)
+
+    print(f"{'builder':<28} {'seconds':>10}")
+    print("-" * 40)
+    print(f"{'per-cell copy (legacy)':<28} {legacy_s:>10.2f}")
+    print(f"{'template stamp':<28} {stamp_s:>10.2f}")
+    print(f"{'speedup':<28} {legacy_s / max(stamp_s, 1e-9):>9.1f}x")
+    print("-" * 40)
+
+    diffs = diff_workbooks(legacy_bytes, stamp_bytes)
+    if diffs:
+        print("❌ Cell-level mismatch:")
+        for diff in diffs:
+            print(f"   - {diff}")
+        return 1
+    print(f"✅ Identical cell-level result across {args.partidas + 1} sheets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark + verificación del análisis de keywords de DomainDetectorService.
+
+Para cada documento compara el matcher de una pasada (`_analyze_domains`)
+contra la implementación histórica con un `re.findall` por keyword
+(`_analyze_domains_reference`), exige `keywords_by_domain`, conteos y total
+idénticos y reporta tiempos.
+
+Uso:
+    python scripts/benchmark_domain_detector.py                 # corpus sintético
+    python scripts/benchmark_domain_detector.py dump/*.txt      # textos extraídos reales
+    python scripts/benchmark_domain_detector.py --repeat 50 --size 200000
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+for key, value in {
+    "SUPABASE_URL": "https://example.supabase.co",
+    "SUPABASE_ANON_KEY": "benchmark",
+    "OPENAI_API_KEY": "sk-benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+from backend.services.domain_detector import DomainDetectorService  # noqa: E402
+
+FILLER = (
+    "el cliente solicita cotización para el día indicado con entrega en sitio "
+    "según especificaciones anexas y condiciones generales del pliego"
+).split()
+
+
+def synthetic_document(detector: DomainDetectorService, size: int, seed: int) -> str:
+    """Texto grande mezclando keywords (incl. multi-palabra y acentos) con relleno."""
+    rng = random.Random(seed)
+    keywords = [kw for cats in detector.domain_keywords.values() for kws in cats.values() for kw in kws]
+    # Variantes que NO deben contar: prefijos/sufijos pegados y mayúsculas
+    noisy = [f"{kw}s" for kw in keywords[:20]] + [f"pre{kw}" for kw in keywords[20:40]]
+    words = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.08:
+            word = rng.choice(keywords)
+            word = word.upper() if rng.random() < 0.2 else word
+        elif roll < 0.10:
+            word = rng.choice(noisy)
+        else:
+            word = rng.choice(FILLER)
+        punctuation = rng.choice(["", "", "", ",", ".", ":", " -", "\n"])
+        words.append(word + punctuation)
+        length += len(word) + len(punctuation) + 1
+    return " ".join(words)
+
+
+def load_corpus(detector: DomainDetectorService, patterns, size: int):
+    documents = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            documents[path] = Path(path).read_text(encoding="utf-8", errors="ignore")
+    if not documents:
+        for seed, doc_size in enumerate([2_000, 20_000, size, size * 2]):
+            documents[f"<synthetic {doc_size // 1000}k chars>"] = synthetic_document(detector, doc_size, seed)
+        documents["<equipo de sonido / data center overlaps>"] = (
+            "equipo de sonido, equipo. data center data centers; base de datos base de datos_ té, café "
+        ) * 2000
+    return documents
+
+
+def time_call(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Globs de archivos de texto (default: corpus sintético)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--size", type=int, default=120_000, help="Tamaño del documento sintético grande")
+    args = parser.parse_args()
+
+    detector = DomainDetectorService()
+    documents = load_corpus(detector, args.paths, args.size)
+
+    mismatches = 0
+    print(f"{'document':<45} {'chars':>9} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8}")
+    print("-" * 88)
+    totals = {"legacy": 0.0, "matcher": 0.0}
+    for name, text in documents.items():
+        if detector._analyze_domains(text) != detector._analyze_domains_reference(text):
+            mismatches += 1
+            print(f"❌ MISMATCH {name}")
+            continue
+        legacy = time_call(detector._analyze_domains_reference, text, args.repeat)
+        matcher = time_call(detector._analyze_domains, text, args.repeat)
+        totals["legacy"] += legacy
+        totals["matcher"] += matcher
+        print(f"{name[-45:]:<45} {len(text):>9} {legacy * 1000:>10.2f} {matcher * 1000:>11.2f} {legacy / max(matcher, 1e-9):>7.1f}x")
+
+    print("-" * 88)
+    print(f"{'TOTAL':<45} {'':>9} {totals['legacy'] * 1000:>10.2f} {totals['matcher'] * 1000:>11.2f} "
+          f"{totals['legacy'] / max(totals['matcher'], 1e-9):>7.1f}x")
+    if mismatches:
+        print(f"❌ {mismatches} document(s) with different keywords_by_domain")
+        return 1
+    print("✅ Identical keywords_by_domain on every document")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
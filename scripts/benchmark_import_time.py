@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de tiempo de import (cold start) de la app y sus blueprints.
+
+Lanza `python -X importtime -c "import <módulo>"` en un proceso limpio por
+módulo, descuenta el arranque del intérprete y reporta el costo de import
+propio del backend y los paquetes más pesados. Falla (exit 1) si:
+
+- algún módulo supera el presupuesto (--budget-ms / IMPORT_TIME_BUDGET_MS), o
+- al importar se carga una dependencia pesada que debe ser lazy
+  (openai, numpy, pandas, openpyxl, PyPDF2, supabase, ...; ver
+  backend/utils/lazy_import.py).
+
+Uso:
+    python scripts/benchmark_import_time.py                       # backend.app
+    python scripts/benchmark_import_time.py --blueprints          # cada blueprint por separado
+    python scripts/benchmark_import_time.py -m backend.api.health --budget-ms 300
+    python scripts/benchmark_import_time.py --allow langchain --runs 5
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+BLUEPRINT_MODULES = [
+    "backend.api.health",
+    "backend.api.metrics",
+    "backend.api.rfx",
+    "backend.api.rfx_chat",
+    "backend.api.proposals",
+    "backend.api.download",
+    "backend.api.pricing",
+    "backend.api.branding",
+    "backend.api.catalog_sync",
+    "backend.api.budy",
+    "backend.api.auth_flask",
+    "backend.api.organization",
+    "backend.api.credits",
+    "backend.api.templates",
+    "backend.api.apu",
+]
+
+# Dependencias que solo deben importarse en la ruta que las usa
+HEAVY_PACKAGES = [
+    "openai",
+    "numpy",
+    "pandas",
+    "openpyxl",
+    "PyPDF2",
+    "supabase",
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "PIL",
+    "playwright",
+    "weasyprint",
+    "pdfkit",
+    "pytesseract",
+    "pdf2image",
+    "docx",
+]
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str):
+    """[(módulo, self_us, cumulative_us, depth)] en el orden que reporta -X importtime"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def run_importtime(statement: str):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(error[-5:]) or f"exit code {result.returncode}")
+    return parse_importtime(result.stderr)
+
+
+def measure(module: str, baseline: set, runs: int):
+    """Mejor de `runs` corridas: total en ms, paquetes pesados cargados y costo por paquete"""
+    best = None
+    for _ in range(max(1, runs)):
+        rows = [row for row in run_importtime(f"import {module}") if row[0] not in baseline]
+        total_us = sum(row[1] for row in rows)
+        if best is None or total_us < best[0]:
+            best = (total_us, rows)
+    total_us, rows = best
+    by_package = {}
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "heavy": sorted(pkg for pkg in HEAVY_PACKAGES if pkg in by_package),
+        "top": sorted(by_package.items(), key=lambda item: item[1], reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-m", "--module", action="append", help="Módulo a medir (repetible). Default: backend.app")
+    parser.add_argument("--blueprints", action="store_true", help="Medir cada blueprint de backend/api por separado")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")))
+    parser.add_argument("--runs", type=int, default=3, help="Corridas por módulo (se toma la mejor)")
+    parser.add_argument("--top", type=int, default=8, help="Paquetes más costosos a mostrar por módulo")
+    parser.add_argument("--allow", action="append", default=[], help="Paquete pesado permitido (repetible)")
+    args = parser.parse_args()
+
+    modules = args.module or (BLUEPRINT_MODULES if args.blueprints else ["backend.app"])
+    baseline = {row[0] for row in run_importtime("pass")}
+
+    failures = []
+    print(f"{'module':<32} {'import ms':>10}  heavy deps loaded")
+    print("-" * 78)
+    for module in modules:
+        try:
+            result = measure(module, baseline, args.runs)
+        except RuntimeError as e:
+            print(f"{module:<32} {'ERROR':>10}  {str(e).splitlines()[-1]}")
+            failures.append(f"{module}: import failed")
+            continue
+
+        heavy = [pkg for pkg in result["heavy"] if pkg not in args.allow]
+        print(f"{module:<32} {result['total_ms']:>10.1f}  {', '.join(heavy) or '-'}")
+        for package, self_us in result["top"][: args.top]:
+            print(f"    {self_us / 1000:>8.1f} ms  {package}")
+
+        if result["total_ms"] > args.budget_ms:
+            failures.append(f"{module}: {result['total_ms']:.0f}ms > budget {args.budget_ms:.0f}ms")
+        if heavy:
+            failures.append(f"{module}: eager import of {', '.join(heavy)}")
+
+    print("-" * 78)
+    if failures:
+        print("❌ Import-time budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print(f"✅ All modules within {args.budget_ms:.0f}ms and no eager heavy dependencies")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark + verificación del sanitizador HTML del pipeline PDF.
+
+Para cada documento del corpus compara el motor precompilado
+(backend/utils/pdf_html_sanitizer.py) contra la aplicación secuencial
+histórica de las mismas reglas con `re.sub`, exige salida idéntica byte a
+byte y reporta tiempos.
+
+Uso:
+    python scripts/benchmark_pdf_sanitizer.py                 # templates del repo
+    python scripts/benchmark_pdf_sanitizer.py dump/*.html     # propuestas exportadas
+    python scripts/benchmark_pdf_sanitizer.py --repeat 50
+"""
+import argparse
+import glob
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.utils.pdf_html_sanitizer import (  # noqa: E402
+    CHROMIUM_PDF_SANITIZER,
+    PDF_LAYOUT_SANITIZER,
+    PLAYWRIGHT_STABILITY_SANITIZER,
+)
+
+SANITIZERS = [CHROMIUM_PDF_SANITIZER, PLAYWRIGHT_STABILITY_SANITIZER, PDF_LAYOUT_SANITIZER]
+DEFAULT_CORPUS = ["templates/*.html", "backend/templates/*.html", "html-prueba.html"]
+
+
+def load_corpus(patterns):
+    documents = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            documents[path] = Path(path).read_text(encoding="utf-8", errors="surrogateescape")
+    # Caso sintético: HTML grande del LLM con <svg> sin cerrar (backtracking)
+    filler = "<td style='transition: none; filter: none;'>Item</td>" * 2000
+    documents["<synthetic: unclosed svg>"] = "<html><body>" + ("<svg width='10'>" + filler) * 20 + "</body></html>"
+    return documents
+
+
+def time_call(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Globs de archivos HTML (default: templates del repo)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.paths or DEFAULT_CORPUS)
+    if not documents:
+        print("❌ Corpus vacío")
+        return 1
+
+    mismatches = 0
+    print(f"{'document':<45} {'sanitizer':<22} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8}")
+    print("-" * 100)
+    totals = {"legacy": 0.0, "engine": 0.0}
+    for name, html in documents.items():
+        for sanitizer in SANITIZERS:
+            legacy_output = sanitizer.sanitize_reference(html)
+            engine_output = sanitizer.sanitize(html, use_memo=False)
+            if legacy_output != engine_output:
+                mismatches += 1
+                print(f"❌ MISMATCH {name} [{sanitizer.name}]")
+                continue
+            legacy = time_call(sanitizer.sanitize_reference, html, args.repeat)
+            engine = time_call(lambda text: sanitizer.sanitize(text, use_memo=False), html, args.repeat)
+            totals["legacy"] += legacy
+            totals["engine"] += engine
+            print(f"{name[-45:]:<45} {sanitizer.name:<22} {legacy * 1000:>10.2f} {engine * 1000:>10.2f} {legacy / max(engine, 1e-9):>7.1f}x")
+
+    print("-" * 100)
+    print(f"{'TOTAL':<68} {totals['legacy'] * 1000:>10.2f} {totals['engine'] * 1000:>10.2f} "
+          f"{totals['legacy'] / max(totals['engine'], 1e-9):>7.1f}x")
+    if mismatches:
+        print(f"❌ {mismatches} outputs differ from the sequential reference")
+        return 1
+    print(f"✅ {len(documents)} documents byte-identical across {len(SANITIZERS)} sanitizers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())